@@ -2,6 +2,7 @@
 
 from .service import DataIngestionService
 from .config import config
+from .snapshot import PricingDataSnapshot, SnapshotStore, get_snapshot_store
 
 # Lazy import scheduler to avoid import errors if apscheduler is not installed
 try:
@@ -14,6 +15,9 @@ except ImportError:
 __all__ = [
     "DataIngestionService",
     "config",
+    "PricingDataSnapshot",
+    "SnapshotStore",
+    "get_snapshot_store",
 ]
 
 if SCHEDULER_AVAILABLE:
@@ -33,7 +33,8 @@ async def initialize_database():
 async def refresh_msif_data(
     year: int,
     prefer_csv: bool = Query(False, description="Prefer CSV over Excel (faster, good for development)"),
-    csv_path: Optional[str] = Query(None, description="Custom CSV file path. If None, uses default from input/other")
+    csv_path: Optional[str] = Query(None, description="Custom CSV file path. If None, uses default from input/other"),
+    force: bool = Query(False, description="Download, parse and save even if the source file is unchanged")
 ):
     """
     Refresh MSIF data for a specific year.
@@ -42,6 +43,9 @@ async def refresh_msif_data(
     
     Supports loading from CSV file (faster) or Excel file (official source).
     Can use CSV as fallback if Excel parsing fails.
+    
+    The Excel download is conditional (ETag/Last-Modified); if the file is unchanged
+    the response has "not_modified": true and nothing is parsed or written.
     """
     try:
         if year not in [2024, 2025]:
@@ -52,7 +56,7 @@ async def refresh_msif_data(
             }
         
         service = get_service()
-        result = service.refresh_msif_data(year=year, prefer_csv=prefer_csv, csv_path=csv_path)
+        result = service.refresh_msif_data(year=year, prefer_csv=prefer_csv, csv_path=csv_path, force=force)
         return result
     except HTTPException:
         # Re-raise HTTP exceptions as-is
@@ -108,6 +112,32 @@ async def refresh_lottie_data(
         }
 
 
+@router.post("/refresh-all")
+async def refresh_all_data(
+    force: bool = Query(False, description="Download, parse and save even if sources are unchanged"),
+    use_fallback: bool = Query(True, description="Use fallback constants data if Lottie scraping fails")
+):
+    """
+    Refresh MSIF 2025, MSIF 2024 and Lottie in one orchestrated run.
+    
+    Downloads run concurrently, parsing runs in worker processes, database writes are
+    serialized and the snapshot is rebuilt once at the end. If a run covering these
+    options is already in progress the request waits for it and returns its report
+    ("coalesced": true); a run with other options (e.g. unforced while force=true is
+    requested) is waited for and followed by this one ("queued": true). If another
+    instance holds the job lock, the status is "skipped".
+    The report includes per-source results and a per-stage duration breakdown.
+    """
+    from fastapi.concurrency import run_in_threadpool
+    from .locking import get_job_lock
+    from .pipeline import get_refresh_pipeline
+    
+    pipeline = get_refresh_pipeline(get_service())
+    return await run_in_threadpool(
+        pipeline.run, force=force, use_fallback=use_fallback, job_lock=get_job_lock()
+    )
+
+
 @router.get("/update-status")
 async def get_update_status():
     """Get update status log."""
@@ -136,3 +166,84 @@ async def get_update_status():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+
+def _serialize_row(row: dict) -> dict:
+    return {
+        key: value.isoformat() if hasattr(value, "isoformat") else value
+        for key, value in row.items()
+    }
+
+
+@router.get("/runs")
+async def get_run_history(
+    data_source: Optional[str] = Query(None, description="Only runs of this data source (e.g. 'MSIF 2025')"),
+    days: int = Query(30, ge=1, le=365, description="Only runs started in the last days"),
+    limit: int = Query(200, ge=1, le=5000, description="Maximum number of runs")
+):
+    """
+    Get run history: per-stage timings (download, parse, diff, write, invalidate),
+    bytes downloaded, rows added/changed/removed and source hash, newest first.
+    """
+    try:
+        service = get_service()
+        runs = [_serialize_row(run) for run in service.get_run_history(data_source, days, limit)]
+        return {"total": len(runs), "runs": runs}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/runs/timeseries")
+async def get_run_timeseries(
+    data_source: Optional[str] = Query(None, description="Only runs of this data source"),
+    days: int = Query(30, ge=1, le=365, description="Only runs started in the last days"),
+    bucket: str = Query("day", description="Time bucket: hour, day or week")
+):
+    """
+    Get runs aggregated per time bucket and data source (run and failure counts,
+    average duration and stage timings, bytes downloaded, rows changed).
+    """
+    service = get_service()
+    try:
+        points = service.get_run_timeseries(data_source, days, bucket)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"bucket": bucket, "points": [_serialize_row(point) for point in points]}
+
+
+@router.get("/snapshot")
+async def get_snapshot_status():
+    """Get version and contents summary of the current pricing data snapshot."""
+    try:
+        service = get_service()
+        return service.get_snapshot_status()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/snapshot/refresh")
+async def refresh_snapshot():
+    """Rebuild the pricing data snapshot from the database and publish it."""
+    service = get_service()
+    version = service.publish_snapshot()
+    if version is None:
+        raise HTTPException(status_code=500, detail="Snapshot rebuild failed, previous version kept")
+    return service.get_snapshot_status()
+
+
+@router.get("/msif-cache")
+async def get_msif_cache_status():
+    """Get status of the parsed MSIF workbook cache (hash per workbook, cached or not)."""
+    try:
+        service = get_service()
+        return service.get_msif_cache_status()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/msif-cache")
+async def clear_msif_cache():
+    """Remove parsed MSIF artifacts; workbooks are reparsed on next load."""
+    service = get_service()
+    return {"status": "success", "removed": service.clear_msif_cache()}
@@ -0,0 +1,156 @@
+"""
+Per-record change detection for data refreshes.
+
+Incoming records and the rows currently in the database are hashed with the same
+canonical form (money rounded to pennies, as stored in the NUMERIC(10, 2) columns),
+and the diff decides which rows are written. Refreshes that change nothing write
+nothing, keep ``updated_at``, and do not publish a new snapshot or send alerts.
+"""
+
+import hashlib
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+_PENNY = Decimal("0.01")
+
+# Keys listed per category in ChangeSummary.to_dict()
+MAX_LISTED_KEYS = 20
+
+
+def _canonical(value) -> str:
+    """Canonical text of one field (numbers rounded half-up to 2 dp like PostgreSQL)."""
+    if value is None:
+        return ""
+    if isinstance(value, (float, int, Decimal)) and not isinstance(value, bool):
+        try:
+            return str(Decimal(repr(value) if isinstance(value, float) else value).quantize(
+                _PENNY, rounding=ROUND_HALF_UP
+            ))
+        except InvalidOperation:
+            return str(value)
+    return str(value)
+
+
+def record_hash(values: Iterable) -> str:
+    """
+    Content hash of a record's values.
+
+    Args:
+        values: Field values in a fixed order (key fields excluded)
+
+    Returns:
+        Hex digest
+    """
+    text = "\x1f".join(_canonical(value) for value in values)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _format_key(key: Hashable) -> str:
+    if isinstance(key, tuple):
+        return "/".join(str(part) for part in key)
+    return str(key)
+
+
+class ChangeSummary:
+    """Diff between incoming records and the current database state."""
+
+    __slots__ = ("added", "changed", "removed", "unchanged")
+
+    def __init__(
+        self,
+        added: List[Hashable],
+        changed: List[Hashable],
+        removed: List[Hashable],
+        unchanged: int,
+    ):
+        self.added = added
+        self.changed = changed
+        self.removed = removed
+        self.unchanged = unchanged
+
+    @property
+    def is_empty(self) -> bool:
+        """True if no record was added or changed (removals are only reported)."""
+        return not self.added and not self.changed
+
+    @property
+    def to_write(self) -> List[Hashable]:
+        """Keys of records that must be written."""
+        return self.added + self.changed
+
+    def to_dict(self, max_keys: int = MAX_LISTED_KEYS) -> Dict:
+        """
+        Summary for API responses, logs and alerts.
+
+        Args:
+            max_keys: Maximum keys listed per category
+
+        Returns:
+            Dict with counts and (truncated) key lists
+        """
+        return {
+            "added": len(self.added),
+            "changed": len(self.changed),
+            "removed": len(self.removed),
+            "unchanged": self.unchanged,
+            "added_keys": [_format_key(key) for key in self.added[:max_keys]],
+            "changed_keys": [_format_key(key) for key in self.changed[:max_keys]],
+            "removed_keys": [_format_key(key) for key in self.removed[:max_keys]],
+        }
+
+    def describe(self) -> str:
+        """One-line summary, e.g. "2 added, 5 changed, 0 removed, 143 unchanged"."""
+        return (
+            f"{len(self.added)} added, {len(self.changed)} changed, "
+            f"{len(self.removed)} removed, {self.unchanged} unchanged"
+        )
+
+    def __repr__(self) -> str:
+        return f"ChangeSummary({self.describe()})"
+
+
+def diff_records(
+    current: Dict[Hashable, str], incoming: Dict[Hashable, str]
+) -> ChangeSummary:
+    """
+    Compare record hashes.
+
+    Args:
+        current: key -> hash of rows in the database
+        incoming: key -> hash of new records
+
+    Returns:
+        ChangeSummary (key lists keep the incoming/current order)
+    """
+    added = []
+    changed = []
+    unchanged = 0
+    for key, digest in incoming.items():
+        existing = current.get(key)
+        if existing is None:
+            added.append(key)
+        elif existing != digest:
+            changed.append(key)
+        else:
+            unchanged += 1
+    removed = [key for key in current if key not in incoming]
+    return ChangeSummary(added, changed, removed, unchanged)
+
+
+def hash_rows(rows: Iterable[Tuple], key_size: int = 1) -> Dict[Hashable, str]:
+    """
+    Hash rows of (key fields..., value fields...).
+
+    Args:
+        rows: Tuples with the key fields first
+        key_size: Number of leading key fields
+
+    Returns:
+        key -> hash (key is the single field, or a tuple for composite keys)
+    """
+    result: Dict[Hashable, str] = {}
+    for row in rows:
+        key = row[0] if key_size == 1 else tuple(row[:key_size])
+        result[key] = record_hash(row[key_size:])
+    return result
+
@@ -43,9 +43,30 @@ class DataIngestionConfig(BaseSettings):
     # Cache directory
     cache_dir: Path = Path.home() / ".cache" / "data_ingestion"
     
+    # Pricing data snapshot (rebuilt in the background once older than this; 0 disables)
+    snapshot_max_age_seconds: int = int(os.getenv("SNAPSHOT_MAX_AGE_SECONDS", "300"))
+    
     # Scheduler
     scheduler_enabled: bool = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
     scheduler_interval_days: int = 7
+    # A run missed by less than this (e.g. process was down) still runs once on startup
+    scheduler_misfire_grace_seconds: int = int(os.getenv("SCHEDULER_MISFIRE_GRACE_SECONDS", "3600"))
+    
+    # Job lock so one instance runs each refresh: "local" (single process), "redis" or "postgres"
+    job_lock_backend: str = os.getenv("JOB_LOCK_BACKEND", "local")
+    job_lock_ttl_seconds: int = int(os.getenv("JOB_LOCK_TTL_SECONDS", "7200"))
+    # How often non-leader instances check for newly published data
+    snapshot_sync_seconds: int = int(os.getenv("SNAPSHOT_SYNC_SECONDS", "60"))
+    
+    # Redis (job_lock_backend == "redis")
+    redis_host: str = os.getenv("REDIS_HOST", "localhost")
+    redis_port: int = int(os.getenv("REDIS_PORT", "6379"))
+    redis_db: int = int(os.getenv("REDIS_DB", "0"))
+    redis_password: Optional[str] = os.getenv("REDIS_PASSWORD")
+    
+    # Refresh pipeline: concurrent downloads, parse processes (0 = parse in-process)
+    pipeline_io_workers: int = int(os.getenv("PIPELINE_IO_WORKERS", "4"))
+    pipeline_parse_workers: int = int(os.getenv("PIPELINE_PARSE_WORKERS", "2"))
     
     # Telegram alerts
     telegram_bot_token: Optional[str] = os.getenv("TELEGRAM_BOT_TOKEN")
@@ -4,6 +4,12 @@ import os
 from typing import Generator
 from contextlib import contextmanager
 import structlog
+from observability import (
+    record_db_connection_closed,
+    record_db_connection_opened,
+    record_db_error,
+    span,
+)
 from .config import config
 from .exceptions import DatabaseError
 
@@ -40,17 +46,20 @@ def get_db_connection() -> Generator:
     psycopg2 = _get_psycopg2()
     conn = None
     try:
-        conn = psycopg2.connect(
-            host=config.db_host,
-            port=config.db_port,
-            database=config.db_name,
-            user=config.db_user,
-            password=config.db_password
-        )
+        with span("db.connect"):
+            conn = psycopg2.connect(
+                host=config.db_host,
+                port=config.db_port,
+                database=config.db_name,
+                user=config.db_user,
+                password=config.db_password
+            )
+        record_db_connection_opened()
         logger.debug("Database connection established")
         yield conn
         conn.commit()
     except psycopg2.Error as e:
+        record_db_error()
         if conn:
             conn.rollback()
         logger.error("Database error", error=str(e))
@@ -58,6 +67,7 @@ def get_db_connection() -> Generator:
     finally:
         if conn:
             conn.close()
+            record_db_connection_closed()
             logger.debug("Database connection closed")
 
 
@@ -124,6 +134,31 @@ def init_database() -> None:
             )
         """)
         
+        # Run history details (see run_history.py); added to existing tables too
+        for column, column_type in (
+            ("download_seconds", "DOUBLE PRECISION"),
+            ("parse_seconds", "DOUBLE PRECISION"),
+            ("diff_seconds", "DOUBLE PRECISION"),
+            ("write_seconds", "DOUBLE PRECISION"),
+            ("invalidate_seconds", "DOUBLE PRECISION"),
+            ("bytes_downloaded", "BIGINT DEFAULT 0"),
+            ("rows_added", "INTEGER"),
+            ("rows_changed", "INTEGER"),
+            ("rows_removed", "INTEGER"),
+            ("source_hash", "TEXT"),
+        ):
+            cursor.execute(
+                f"ALTER TABLE data_update_log ADD COLUMN IF NOT EXISTS {column} {column_type}"
+            )
+        
+        # Job lock fencing tokens and data generation (see locking.py)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ingestion_state (
+                key TEXT PRIMARY KEY,
+                value BIGINT NOT NULL
+            )
+        """)
+        
         # Create indexes
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_msif_2025_la 
@@ -140,6 +175,11 @@ def init_database() -> None:
             ON data_update_log(data_source, status, started_at DESC)
         """)
         
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_update_log_started 
+            ON data_update_log(started_at)
+        """)
+        
         conn.commit()
         logger.info("Database tables initialized")
 
@@ -30,3 +30,12 @@ class TelegramAlertError(DataIngestionError):
     """Error sending Telegram alerts."""
     pass
 
+
+class JobLockError(DataIngestionError):
+    """Error acquiring or releasing a job lock."""
+    pass
+
+
+class StaleLeaseError(JobLockError):
+    """Write rejected: a newer lock holder (higher fencing token) has written."""
+    pass
@@ -0,0 +1,352 @@
+"""
+Job locks for scheduled ingestion.
+
+Every uvicorn worker / pod builds its own ``DataIngestionScheduler``; without
+coordination each refresh would run once per instance and the upserts would
+compete. Before a refresh the instance acquires a named lock; only the holder runs
+the job, the others skip it and reload their snapshot once the holder announces new
+data (``bump_generation`` / ``generation``).
+
+Backends:
+
+* ``LocalJobLock`` - in-process, for single-instance deployments (default);
+* ``RedisJobLock`` - ``SET NX PX`` with an owner value, safe release;
+* ``PostgresJobLock`` - session advisory lock held on a dedicated connection
+  (released by PostgreSQL if the holder dies).
+
+Each lease carries a fencing token that increases with every acquisition. Writers
+pass it to ``check_fencing_token`` inside their transaction, so a holder whose lease
+expired (e.g. a paused process) cannot overwrite data written by a newer holder.
+"""
+
+import hashlib
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Dict, Optional
+
+import structlog
+
+from .config import config
+from .database import _get_psycopg2, get_db_connection
+from .exceptions import JobLockError, StaleLeaseError
+
+logger = structlog.get_logger(__name__)
+
+KEY_PREFIX = "rch:ingestion:"
+
+
+def _owner_id() -> str:
+    """Identifier of this process (host:pid:random)."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class LockLease:
+    """A held job lock."""
+
+    __slots__ = ("name", "owner", "token", "acquired_at", "ttl_seconds", "_handle")
+
+    def __init__(self, name: str, owner: str, token: int, ttl_seconds: Optional[int], handle=None):
+        self.name = name
+        self.owner = owner
+        # Increases with every acquisition of this lock name
+        self.token = token
+        self.acquired_at = time.time()
+        self.ttl_seconds = ttl_seconds
+        # Backend state (e.g. the connection holding an advisory lock)
+        self._handle = handle
+
+    def __repr__(self) -> str:
+        return f"LockLease(name={self.name!r}, owner={self.owner!r}, token={self.token})"
+
+
+class JobLock:
+    """Base class for job lock backends."""
+
+    # Whether the lock coordinates several processes (non-holders then sync snapshots)
+    shared = True
+
+    def __init__(self):
+        self.owner = _owner_id()
+
+    def acquire(self, name: str, ttl_seconds: Optional[int] = None) -> Optional[LockLease]:
+        """
+        Try to acquire a lock without waiting.
+
+        Args:
+            name: Lock name (e.g. the scheduler job id)
+            ttl_seconds: Lease expiry for backends that need one
+                (default config.job_lock_ttl_seconds)
+
+        Returns:
+            LockLease, or None if another instance holds the lock
+        """
+        raise NotImplementedError
+
+    def release(self, lease: LockLease) -> bool:
+        """
+        Release a lease.
+
+        Args:
+            lease: Lease returned by acquire()
+
+        Returns:
+            True if the lease was still held and is now released
+        """
+        raise NotImplementedError
+
+    def bump_generation(self) -> int:
+        """Announce newly published data; returns the new generation."""
+        raise NotImplementedError
+
+    def generation(self) -> int:
+        """Current data generation (0 if nothing was announced yet)."""
+        raise NotImplementedError
+
+
+class LocalJobLock(JobLock):
+    """In-process lock (single instance deployments)."""
+
+    shared = False
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._held: Dict[str, LockLease] = {}
+        self._tokens: Dict[str, int] = {}
+        self._generation = 0
+
+    def acquire(self, name: str, ttl_seconds: Optional[int] = None) -> Optional[LockLease]:
+        with self._lock:
+            if name in self._held:
+                return None
+            token = self._tokens[name] = self._tokens.get(name, 0) + 1
+            lease = self._held[name] = LockLease(name, self.owner, token, ttl_seconds)
+            return lease
+
+    def release(self, lease: LockLease) -> bool:
+        with self._lock:
+            if self._held.get(lease.name) is not lease:
+                return False
+            del self._held[lease.name]
+            return True
+
+    def bump_generation(self) -> int:
+        with self._lock:
+            self._generation += 1
+            return self._generation
+
+    def generation(self) -> int:
+        return self._generation
+
+
+class RedisJobLock(JobLock):
+    """Redis lock: ``SET key owner:token NX PX ttl``, released only by its owner."""
+
+    def __init__(self, client=None, prefix: str = KEY_PREFIX):
+        """
+        Initialize Redis lock.
+
+        Args:
+            client: redis.Redis client (default: built from config)
+            prefix: Key prefix
+        """
+        super().__init__()
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise JobLockError("redis is not installed. Install it with: pip install redis")
+            client = redis.Redis(
+                host=config.redis_host,
+                port=config.redis_port,
+                db=config.redis_db,
+                password=config.redis_password,
+                decode_responses=True,
+            )
+        self.client = client
+        self.prefix = prefix
+
+    @staticmethod
+    def _text(value) -> Optional[str]:
+        return value.decode() if isinstance(value, bytes) else value
+
+    def acquire(self, name: str, ttl_seconds: Optional[int] = None) -> Optional[LockLease]:
+        ttl_seconds = ttl_seconds or config.job_lock_ttl_seconds
+        key = f"{self.prefix}lock:{name}"
+        # Tokens of failed attempts are simply skipped; only monotonicity matters
+        token = int(self.client.incr(f"{self.prefix}fence:{name}"))
+        value = f"{self.owner}:{token}"
+        if not self.client.set(key, value, nx=True, px=int(ttl_seconds * 1000)):
+            holder = self._text(self.client.get(key))
+            logger.info("Job lock held by another instance", lock=name, holder=holder)
+            return None
+        logger.info("Job lock acquired", lock=name, token=token, ttl_seconds=ttl_seconds)
+        return LockLease(name, self.owner, token, ttl_seconds, handle=value)
+
+    def release(self, lease: LockLease) -> bool:
+        from redis.exceptions import WatchError
+
+        key = f"{self.prefix}lock:{lease.name}"
+        # Compare-and-delete: never remove a lock that expired and was taken by another owner
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                if self._text(pipe.get(key)) != lease._handle:
+                    pipe.unwatch()
+                    logger.warning("Job lock lease was lost before release", lock=lease.name, token=lease.token)
+                    return False
+                pipe.multi()
+                pipe.delete(key)
+                pipe.execute()
+                return True
+            except WatchError:
+                return False
+
+    def bump_generation(self) -> int:
+        return int(self.client.incr(f"{self.prefix}generation"))
+
+    def generation(self) -> int:
+        return int(self._text(self.client.get(f"{self.prefix}generation")) or 0)
+
+
+def _advisory_key(name: str) -> int:
+    """Stable signed 64-bit advisory lock key for a lock name."""
+    digest = hashlib.blake2b(f"{KEY_PREFIX}{name}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def _next_state_value(cursor, key: str) -> int:
+    """Increment a counter in ingestion_state and return it."""
+    cursor.execute("""
+        INSERT INTO ingestion_state (key, value) VALUES (%s, 1)
+        ON CONFLICT (key) DO UPDATE SET value = ingestion_state.value + 1
+        RETURNING value
+    """, (key,))
+    return int(cursor.fetchone()[0])
+
+
+class PostgresJobLock(JobLock):
+    """PostgreSQL session advisory lock, held on a dedicated connection for the lease."""
+
+    def __init__(self, connect=None):
+        """
+        Initialize Postgres lock.
+
+        Args:
+            connect: Callable returning a new psycopg2 connection (default: from config)
+        """
+        super().__init__()
+        self._connect = connect or self._default_connect
+
+    @staticmethod
+    def _default_connect():
+        psycopg2 = _get_psycopg2()
+        return psycopg2.connect(
+            host=config.db_host,
+            port=config.db_port,
+            database=config.db_name,
+            user=config.db_user,
+            password=config.db_password
+        )
+
+    def acquire(self, name: str, ttl_seconds: Optional[int] = None) -> Optional[LockLease]:
+        try:
+            conn = self._connect()
+        except Exception as e:
+            raise JobLockError(f"Could not connect to acquire job lock {name}: {e}") from e
+        try:
+            conn.autocommit = True
+            cursor = conn.cursor()
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", (_advisory_key(name),))
+            if not cursor.fetchone()[0]:
+                conn.close()
+                logger.info("Job lock held by another instance", lock=name)
+                return None
+            token = _next_state_value(cursor, f"token:{name}")
+        except Exception as e:
+            conn.close()
+            raise JobLockError(f"Could not acquire job lock {name}: {e}") from e
+        logger.info("Job lock acquired", lock=name, token=token)
+        # No TTL: the lock lives as long as the session
+        return LockLease(name, self.owner, token, None, handle=conn)
+
+    def release(self, lease: LockLease) -> bool:
+        conn = lease._handle
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (_advisory_key(lease.name),))
+            return bool(cursor.fetchone()[0])
+        except Exception as e:
+            logger.warning("Could not release job lock", lock=lease.name, error=str(e))
+            return False
+        finally:
+            conn.close()
+
+    def bump_generation(self) -> int:
+        with get_db_connection() as conn:
+            value = _next_state_value(conn.cursor(), "generation")
+            conn.commit()
+            return value
+
+    def generation(self) -> int:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT value FROM ingestion_state WHERE key = 'generation'")
+            row = cursor.fetchone()
+            return int(row[0]) if row else 0
+
+
+def check_fencing_token(cursor, resource: str, token: int) -> None:
+    """
+    Reject a write from a lease older than the newest one that wrote resource.
+
+    Must run inside the writer's transaction: the ingestion_state row stays locked
+    until commit, so writers of one resource are also serialized.
+
+    Args:
+        cursor: Cursor of the write transaction
+        resource: Written resource (e.g. table name)
+        token: Fencing token of the writer's lease
+
+    Raises:
+        StaleLeaseError: If a lease with a higher token already wrote resource
+    """
+    cursor.execute("""
+        INSERT INTO ingestion_state (key, value) VALUES (%s, %s)
+        ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value
+        WHERE ingestion_state.value <= EXCLUDED.value
+        RETURNING value
+    """, (f"fence:{resource}", token))
+    if cursor.fetchone() is None:
+        raise StaleLeaseError(f"Fencing token {token} is stale for {resource}")
+
+
+_job_lock: Optional[JobLock] = None
+_job_lock_lock = threading.Lock()
+
+
+def get_job_lock() -> JobLock:
+    """
+    Get the process-wide job lock for config.job_lock_backend.
+
+    Raises:
+        JobLockError: If the backend is unknown or cannot be created
+    """
+    global _job_lock
+    if _job_lock is None:
+        with _job_lock_lock:
+            if _job_lock is None:
+                backend = config.job_lock_backend.lower()
+                if backend == "redis":
+                    _job_lock = RedisJobLock()
+                elif backend == "postgres":
+                    _job_lock = PostgresJobLock()
+                elif backend == "local":
+                    _job_lock = LocalJobLock()
+                else:
+                    raise JobLockError(f"Unknown job lock backend: {config.job_lock_backend}")
+                logger.info("Job lock backend", backend=backend, owner=_job_lock.owner)
+    return _job_lock
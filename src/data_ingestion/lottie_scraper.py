@@ -1,18 +1,105 @@
 """Lottie website scraper for regional averages."""
 
+import asyncio
+import concurrent.futures
+import hashlib
 import re
 import json
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 import httpx
-from selectolax.parser import HTMLParser
 import structlog
+from observability import TARGET_LOTTIE, outbound_call
 from .config import config
 from .exceptions import LottieScrapingError
+from .change_detection import diff_records, hash_rows
 from .database import get_db_connection
+from .locking import check_fencing_token
+from .run_history import timed
 
 logger = structlog.get_logger(__name__)
 
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+# Region -> aliases found on Lottie pages; dict order is the match priority
+REGION_ALIASES = {
+    "London": ["London", "Greater London"],
+    "South East": ["South East", "South East England"],
+    "South West": ["South West", "South West England"],
+    "West Midlands": ["West Midlands"],
+    "East Midlands": ["East Midlands"],
+    "Yorkshire and the Humber": ["Yorkshire", "Yorkshire and the Humber"],
+    "North West": ["North West", "North West England"],
+    "North East": ["North East", "North East England"],
+    "East of England": ["East of England", "East England"],
+}
+
+_REGION_PRIORITY = {region: i for i, region in enumerate(REGION_ALIASES)}
+_ALIAS_REGION: Dict[str, str] = {}
+for _region, _aliases in REGION_ALIASES.items():
+    for _alias in _aliases:
+        _ALIAS_REGION.setdefault(_alias.lower(), _region)
+
+# One scan finds every alias occurrence: the lookahead matches at each position
+# (so overlapping aliases such as "north east england" / "east england" are all
+# seen), longest alias first
+_ALIAS_PATTERN = re.compile(
+    "(?=("
+    + "|".join(re.escape(alias) for alias in sorted(_ALIAS_REGION, key=len, reverse=True))
+    + "))"
+)
+_PRICE_PATTERN = re.compile(r"£(\d+)")
+_JSON_PRICE_PATTERN = re.compile(r'\{[^{}]*"price"[^{}]*\}')
+
+# Weekly prices outside this range are not care home fees
+MIN_PRICE = 500
+MAX_PRICE = 3000
+
+# Parsed pages kept per scraper (keyed by care type and HTML hash)
+PARSE_CACHE_SIZE = 16
+
+
+def regions_in(text: str) -> List[str]:
+    """
+    Regions whose aliases occur in text (case-insensitive), by priority.
+    
+    Args:
+        text: Text to scan
+        
+    Returns:
+        Region names, highest priority first
+    """
+    found = {_ALIAS_REGION[match.group(1)] for match in _ALIAS_PATTERN.finditer(text.lower())}
+    return sorted(found, key=_REGION_PRIORITY.__getitem__)
+
+
+def match_region(text: str) -> Optional[str]:
+    """Highest priority region mentioned in text, or None."""
+    found = regions_in(text)
+    return found[0] if found else None
+
+
+def _prices_in(text: str) -> List[float]:
+    """£ amounts in text within the weekly fee range."""
+    prices = []
+    for amount in _PRICE_PATTERN.findall(text.replace(",", "")):
+        price = float(amount)
+        if MIN_PRICE <= price <= MAX_PRICE:
+            prices.append(price)
+    return prices
+
+
+def _run_sync(coroutine):
+    """Run a coroutine from sync code, also when called on an event loop thread."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    # Called from async code (e.g. a FastAPI handler): run on a separate thread
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
 
 class LottieScraper:
     """Scrape Lottie website for regional care home price averages."""
@@ -26,13 +113,27 @@ class LottieScraper:
         """
         self.cache_dir = cache_dir or config.cache_dir / "lottie"
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # url -> DownloadResult of the last fetch_page() / fetch_page_async() call
+        self.last_downloads: Dict = {}
+        # Whether the last load_lottie_data() skipped parse/save (pages not modified)
+        self.last_not_modified = False
+        # ChangeSummary of the last save_to_database() call (None if no diff was computed)
+        self.last_changes = None
+        # "care_type:html hash" -> extracted prices, so unchanged pages are not reparsed
+        self._parse_cache: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+        # Stage -> seconds of the last load (download, parse, diff, write; see run_history)
+        self.last_timings: Dict[str, float] = {}
     
-    def fetch_page(self, url: str) -> str:
+    def fetch_page(self, url: str, force: bool = False) -> str:
         """
         Fetch HTML content from URL.
         
+        The request is conditional on the cached copy (ETag/Last-Modified); on
+        304 Not Modified the cached HTML is returned.
+        
         Args:
             url: URL to fetch
+            force: Ignore stored validators and download unconditionally
             
         Returns:
             HTML content as string
@@ -40,32 +141,123 @@ class LottieScraper:
         Raises:
             LottieScrapingError: If fetch fails
         """
+        from pricing_calculator.downloader import conditional_download
+        
         logger.info("Fetching Lottie page", url=url)
         
+        cache_file = self._cache_file(url)
         try:
-            with httpx.Client(timeout=config.http_timeout) as client:
-                response = client.get(url, headers={
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-                })
-                response.raise_for_status()
-                
-                html_content = response.text
-                logger.info("Fetched Lottie page", url=url, size_bytes=len(html_content))
-                
-                # Cache HTML
-                cache_file = self.cache_dir / f"{url.split('/')[-2]}.html"
-                cache_file.write_text(html_content, encoding='utf-8')
-                
-                return html_content
+            result = conditional_download(
+                url,
+                cache_file,
+                TARGET_LOTTIE,
+                timeout=config.http_timeout,
+                headers={"User-Agent": USER_AGENT},
+                force=force,
+            )
+            self.last_downloads[url] = result
+            
+            html_content = cache_file.read_text(encoding="utf-8", errors="replace")
+            logger.info(
+                "Fetched Lottie page",
+                url=url,
+                size_bytes=len(html_content),
+                modified=result.modified,
+            )
+            return html_content
+        except httpx.HTTPError as e:
+            raise LottieScrapingError(f"Failed to fetch Lottie page {url}: {e}") from e
+        except Exception as e:
+            raise LottieScrapingError(f"Unexpected error fetching Lottie page {url}: {e}") from e
+    
+    def _cache_file(self, url: str) -> Path:
+        """Cached HTML file of a page."""
+        return self.cache_dir / f"{url.split('/')[-2]}.html"
+    
+    async def fetch_page_async(self, url: str, client: httpx.AsyncClient, force: bool = False) -> str:
+        """
+        Fetch HTML content from URL over a shared async client.
+        
+        Same conditional request and caching as fetch_page().
+        
+        Args:
+            url: URL to fetch
+            client: Pooled httpx.AsyncClient
+            force: Ignore stored validators and download unconditionally
+            
+        Returns:
+            HTML content as string
+            
+        Raises:
+            LottieScrapingError: If fetch fails
+        """
+        from pricing_calculator.downloader import async_conditional_download
+        
+        logger.info("Fetching Lottie page", url=url)
+        
+        cache_file = self._cache_file(url)
+        try:
+            result = await async_conditional_download(
+                url, cache_file, TARGET_LOTTIE, client, force=force
+            )
+            self.last_downloads[url] = result
+            
+            html_content = cache_file.read_text(encoding="utf-8", errors="replace")
+            logger.info(
+                "Fetched Lottie page",
+                url=url,
+                size_bytes=len(html_content),
+                modified=result.modified,
+            )
+            return html_content
         except httpx.HTTPError as e:
             raise LottieScrapingError(f"Failed to fetch Lottie page {url}: {e}") from e
         except Exception as e:
             raise LottieScrapingError(f"Unexpected error fetching Lottie page {url}: {e}") from e
     
+    async def fetch_all_pages_async(self, force: bool = False) -> Dict[str, str]:
+        """
+        Fetch all Lottie pages concurrently over one pooled client.
+        
+        Args:
+            force: Ignore stored validators and download unconditionally
+        
+        Returns:
+            Dict mapping: {care_type: html_content} (pages that failed are omitted)
+        """
+        urls = self._page_urls()
+        limits = httpx.Limits(max_connections=len(urls), max_keepalive_connections=len(urls))
+        async with httpx.AsyncClient(
+            timeout=config.http_timeout,
+            follow_redirects=True,
+            limits=limits,
+            headers={"User-Agent": USER_AGENT},
+        ) as client:
+            results = await asyncio.gather(
+                *(self.fetch_page_async(url, client, force=force) for url in urls.values()),
+                return_exceptions=True,
+            )
+        
+        pages: Dict[str, str] = {}
+        for (care_type, url), result in zip(urls.items(), results):
+            if isinstance(result, BaseException):
+                logger.error("Failed to scrape Lottie page", 
+                            care_type=care_type, 
+                            error=str(result),
+                            url=url)
+                continue
+            pages[care_type] = result
+        return pages
+    
     def extract_regional_prices(self, html_content: str, care_type: str) -> Dict[str, float]:
         """
         Extract regional prices from HTML content.
         
+        Each table row is scanned once: cell texts are matched against all region
+        aliases with one precompiled pattern, and prices are only collected for rows
+        that mention a region. Results are memoized by HTML hash, so unchanged
+        (cached) pages are not parsed again.
+        
         Args:
             html_content: HTML content from Lottie page
             care_type: Care type identifier (residential, nursing, dementia)
@@ -73,6 +265,22 @@ class LottieScraper:
         Returns:
             Dict mapping: {region: price_per_week}
         """
+        key = f"{care_type}:{hashlib.blake2b(html_content.encode('utf-8', 'replace'), digest_size=16).hexdigest()}"
+        cached = self._parse_cache.get(key)
+        if cached is not None:
+            self._parse_cache.move_to_end(key)
+            logger.debug("Reusing parsed Lottie page", care_type=care_type)
+            return dict(cached)
+        
+        result = self._extract_regional_prices(html_content, care_type)
+        self._parse_cache[key] = dict(result)
+        while len(self._parse_cache) > PARSE_CACHE_SIZE:
+            self._parse_cache.popitem(last=False)
+        return result
+    
+    def _extract_regional_prices(self, html_content: str, care_type: str) -> Dict[str, float]:
+        from selectolax.parser import HTMLParser
+        
         parser = HTMLParser(html_content)
         result: Dict[str, float] = {}
         
@@ -81,20 +289,6 @@ class LottieScraper:
             logger.warning("HTML content seems too short, might be JavaScript-rendered", 
                           content_length=len(html_content))
         
-        # Region name mapping
-        REGIONS = {
-            "London": ["London", "Greater London"],
-            "South East": ["South East", "South East England"],
-            "South West": ["South West", "South West England"],
-            "West Midlands": ["West Midlands"],
-            "East Midlands": ["East Midlands"],
-            "Yorkshire and the Humber": ["Yorkshire", "Yorkshire and the Humber"],
-            "North West": ["North West", "North West England"],
-            "North East": ["North East", "North East England"],
-            "East of England": ["East of England", "East England"],
-        }
-        
-        # Debug: Check what we have
         pound_count = html_content.count('£')
         tables = parser.css("table")
         logger.debug("Parsing HTML", 
@@ -102,95 +296,72 @@ class LottieScraper:
                     pound_symbols=pound_count,
                     tables_found=len(tables))
         
-        # Look for tables
+        # Tables: a region cell takes the prices within two cells of it
         for table in tables:
-            rows = table.css("tr")
-            
-            for row in rows:
+            for row in table.css("tr"):
                 cells = [cell.text(strip=True) for cell in row.css("td, th")]
                 
                 if len(cells) < 2:
                     continue
                 
-                # Look for region names and prices
+                cell_prices = None
                 for i, cell in enumerate(cells):
-                    cell_lower = cell.lower()
+                    matched_region = match_region(cell)
+                    if matched_region is None:
+                        continue
                     
-                    # Check if this cell contains a region name
-                    matched_region = None
-                    for region, aliases in REGIONS.items():
-                        if any(alias.lower() in cell_lower for alias in aliases):
-                            matched_region = region
-                            break
+                    if cell_prices is None:
+                        cell_prices = [_prices_in(text) for text in cells]
+                    prices_found = [
+                        price
+                        for j in range(max(0, i - 2), min(len(cells), i + 3))
+                        for price in cell_prices[j]
+                    ]
                     
-                    if matched_region:
-                        # Look for prices in nearby cells
-                        prices_found = []
-                        for j in range(max(0, i-2), min(len(cells), i+3)):
-                            price_cell = cells[j]
-                            # Look for £ amount
-                            price_matches = re.findall(r'£[\d,]+', price_cell.replace(',', ''))
-                            for price_match in price_matches:
-                                price_str = price_match.replace('£', '').replace(',', '')
-                                try:
-                                    price = float(price_str)
-                                    # Filter reasonable prices (between £500 and £3000 per week)
-                                    if 500 <= price <= 3000:
-                                        prices_found.append(price)
-                                except ValueError:
-                                    pass
-                        
-                        # Use the first reasonable price found
-                        if prices_found:
-                            if matched_region not in result:
-                                result[matched_region] = prices_found[0]
-                            else:
-                                # If multiple prices found, use average
-                                result[matched_region] = sum(prices_found) / len(prices_found)
+                    # Use the first reasonable price found
+                    if prices_found:
+                        if matched_region not in result:
+                            result[matched_region] = prices_found[0]
+                        else:
+                            # If multiple prices found, use average
+                            result[matched_region] = sum(prices_found) / len(prices_found)
         
         # Also try to find prices in divs/spans with specific classes
         price_elements = parser.css("div.price, span.price, [class*='price'], [class*='cost']")
         for elem in price_elements:
-            text = elem.text(strip=True)
-            price_matches = re.findall(r'£[\d,]+', text.replace(',', ''))
-            for price_match in price_matches:
-                price_str = price_match.replace('£', '').replace(',', '')
-                try:
-                    price = float(price_str)
-                    if 500 <= price <= 3000:
-                        # Try to find associated region in parent or sibling elements
-                        parent = elem.parent
-                        if parent:
-                            parent_text = parent.text(strip=True)
-                            for region, aliases in REGIONS.items():
-                                if any(alias.lower() in parent_text.lower() for alias in aliases):
-                                    if region not in result:
-                                        result[region] = price
-                                    break
-                except ValueError:
-                    pass
+            prices = _prices_in(elem.text(strip=True))
+            if not prices:
+                continue
+            # Associated region: first one mentioned by the parent element
+            parent = elem.parent
+            region = match_region(parent.text(strip=True)) if parent else None
+            if region is not None and region not in result:
+                result[region] = prices[0]
         
         # Try to extract from JSON-LD or script tags (common for JS-rendered content)
-        script_tags = parser.css("script")
-        for script in script_tags:
+        for script in parser.css("script"):
             script_text = script.text()
-            if script_text and ('price' in script_text.lower() or 'cost' in script_text.lower()):
-                # Try to find JSON data
-                json_matches = re.findall(r'\{[^{}]*"price"[^{}]*\}', script_text)
-                for json_match in json_matches:
-                    try:
-                        import json
-                        data = json.loads(json_match)
-                        if 'price' in data:
-                            price = float(str(data['price']).replace('£', '').replace(',', ''))
-                            if 500 <= price <= 3000:
-                                # Try to find region in surrounding text
-                                for region, aliases in REGIONS.items():
-                                    if any(alias.lower() in script_text.lower() for alias in aliases):
-                                        if region not in result:
-                                            result[region] = price
-                    except (json.JSONDecodeError, ValueError, KeyError):
-                        pass
+            if not script_text:
+                continue
+            script_lower = script_text.lower()
+            if 'price' not in script_lower and 'cost' not in script_lower:
+                continue
+            
+            script_regions = None
+            for json_match in _JSON_PRICE_PATTERN.findall(script_text):
+                try:
+                    data = json.loads(json_match)
+                    if 'price' in data:
+                        price = float(str(data['price']).replace('£', '').replace(',', ''))
+                        if MIN_PRICE <= price <= MAX_PRICE:
+                            # Regions mentioned anywhere in the script
+                            if script_regions is None:
+                                script_regions = regions_in(script_text)
+                            for region in script_regions:
+                                if region not in result:
+                                    result[region] = price
+                except (json.JSONDecodeError, ValueError, KeyError):
+                    pass
         
         # If no data found, log warning
         if len(result) == 0:
@@ -208,26 +379,41 @@ class LottieScraper:
         
         return result
     
-    def scrape_all_pages(self) -> Dict[str, Dict[str, float]]:
+    def _page_urls(self) -> Dict[str, str]:
+        """Map care types to Lottie page URLs."""
+        return {
+            "residential": config.lottie_residential_url,
+            "nursing": config.lottie_nursing_url,
+            "dementia": config.lottie_dementia_url,
+        }
+    
+    def fetch_all_pages(self, force: bool = False) -> Dict[str, str]:
         """
-        Scrape all Lottie pages and extract regional averages.
+        Fetch all Lottie pages (concurrently, see fetch_all_pages_async()).
+        
+        Args:
+            force: Ignore stored validators and download unconditionally
+        
+        Returns:
+            Dict mapping: {care_type: html_content} (pages that failed are omitted)
+        """
+        return _run_sync(self.fetch_all_pages_async(force=force))
+    
+    def extract_all_pages(self, pages: Dict[str, str]) -> Dict[str, Dict[str, float]]:
+        """
+        Extract regional averages from fetched pages.
+        
+        Args:
+            pages: Dict mapping: {care_type: html_content}
         
         Returns:
             Dict mapping: {care_type: {region: price}}
         """
         result: Dict[str, Dict[str, float]] = {}
+        urls = self._page_urls()
         
-        # Map URLs to care types
-        url_map = {
-            "residential": config.lottie_residential_url,
-            "nursing": config.lottie_nursing_url,
-            "dementia": config.lottie_dementia_url,
-        }
-        
-        for care_type, url in url_map.items():
+        for care_type, html_content in pages.items():
             try:
-                logger.info("Scraping Lottie page", care_type=care_type, url=url)
-                html_content = self.fetch_page(url)
                 regional_prices = self.extract_regional_prices(html_content, care_type)
                 
                 if regional_prices:
@@ -238,69 +424,140 @@ class LottieScraper:
                 else:
                     logger.warning("No prices extracted from Lottie page", 
                                   care_type=care_type,
-                                  url=url,
+                                  url=urls.get(care_type),
                                   hint="Page might require JavaScript rendering")
             except Exception as e:
                 logger.error("Failed to scrape Lottie page", 
                             care_type=care_type, 
                             error=str(e),
-                            url=url,
+                            url=urls.get(care_type),
                             exc_info=True)
-                # Continue with other pages
                 continue
         
         return result
     
-    def save_to_database(self, data: Dict[str, Dict[str, float]]) -> int:
+    def scrape_all_pages(self) -> Dict[str, Dict[str, float]]:
+        """
+        Scrape all Lottie pages and extract regional averages.
+        
+        Returns:
+            Dict mapping: {care_type: {region: price}}
+        """
+        return self.extract_all_pages(self.fetch_all_pages())
+    
+    def _saved_pages_file(self) -> Path:
+        """File holding url -> SHA-256 of the pages last saved to the database."""
+        return self.cache_dir / "saved_pages.json"
+    
+    def pages_unchanged(self, pages: Dict[str, str]) -> bool:
+        """
+        Whether every page was fetched unchanged and was already saved to the database.
+        
+        Args:
+            pages: Pages returned by fetch_all_pages() (hashes from last_downloads)
+        """
+        urls = self._page_urls()
+        if set(pages) != set(urls):
+            return False
+        try:
+            saved = json.loads(self._saved_pages_file().read_text())
+        except (OSError, ValueError):
+            return False
+        for url in urls.values():
+            download = self.last_downloads.get(url)
+            if download is None or download.modified or saved.get(url) != download.sha256:
+                return False
+        return True
+    
+    def mark_pages_saved(self) -> None:
+        """Record hashes of the fetched pages after a successful save (see pages_unchanged)."""
+        saved = {
+            url: download.sha256
+            for url, download in self.last_downloads.items()
+            if download.sha256
+        }
+        try:
+            self._saved_pages_file().write_text(json.dumps(saved))
+        except OSError as e:
+            logger.warning("Could not record saved Lottie pages", error=str(e))
+    
+    def save_to_database(
+        self,
+        data: Dict[str, Dict[str, float]],
+        fencing_token: Optional[int] = None
+    ) -> int:
         """
         Save scraped Lottie data to database.
         
+        Prices are hashed and diffed against the rows currently in the table; only
+        added and changed (region, care_type) rows are upserted, in one statement.
+        The diff is stored in ``last_changes``.
+        
         Args:
             data: Scraped data mapping {care_type: {region: price}}
+            fencing_token: Job lock fencing token; the write is rejected if a newer
+                lock holder already wrote the table (see locking.check_fencing_token)
             
         Returns:
-            Number of records updated
+            Number of records saved (written or already up to date)
             
         Raises:
             DatabaseError: If database operation fails
+            StaleLeaseError: If fencing_token is stale
         """
         logger.info("Saving Lottie data to database", care_types=len(data))
+        self.last_changes = None
+        self.last_timings.pop("diff", None)
+        self.last_timings.pop("write", None)
         
         if not data:
             logger.warning("No Lottie data to save")
             return 0
         
-        records_updated = 0
+        rows = {}
+        for care_type, regional_prices in data.items():
+            if not regional_prices:
+                logger.warning("No prices for care type", care_type=care_type)
+                continue
+            for region, price in regional_prices.items():
+                rows[(region, care_type)] = (region, care_type, price)
         
         try:
             with get_db_connection() as conn:
                 cursor = conn.cursor()
+                if fencing_token is not None:
+                    check_fencing_token(cursor, "lottie_regional_averages", fencing_token)
                 
-                for care_type, regional_prices in data.items():
-                    if not regional_prices:
-                        logger.warning("No prices for care type", care_type=care_type)
-                        continue
-                    
-                    for region, price in regional_prices.items():
-                        try:
-                            cursor.execute("""
-                                INSERT INTO lottie_regional_averages (
-                                    region, care_type, price_per_week, updated_at
-                                ) VALUES (%s, %s, %s, CURRENT_TIMESTAMP)
-                                ON CONFLICT (region, care_type) 
-                                DO UPDATE SET
-                                    price_per_week = EXCLUDED.price_per_week,
-                                    updated_at = CURRENT_TIMESTAMP
-                            """, (region, care_type, price))
-                            records_updated += 1
-                        except Exception as e:
-                            logger.error("Failed to save Lottie record", region=region, care_type=care_type, error=str(e))
-                            continue
+                with timed(self.last_timings, "diff"):
+                    cursor.execute("SELECT region, care_type, price_per_week FROM lottie_regional_averages")
+                    changes = diff_records(
+                        hash_rows(cursor.fetchall(), key_size=2),
+                        hash_rows(rows.values(), key_size=2),
+                    )
+                    to_write = [rows[key] for key in changes.to_write]
                 
-                conn.commit()
+                with timed(self.last_timings, "write"):
+                    if to_write:
+                        values = ", ".join(["(%s, %s, %s::numeric(10, 2))"] * len(to_write))
+                        cursor.execute(f"""
+                            INSERT INTO lottie_regional_averages (
+                                region, care_type, price_per_week, updated_at
+                            )
+                            SELECT region, care_type, price_per_week, CURRENT_TIMESTAMP
+                            FROM (VALUES {values}) AS incoming (region, care_type, price_per_week)
+                            ON CONFLICT (region, care_type) 
+                            DO UPDATE SET
+                                price_per_week = EXCLUDED.price_per_week,
+                                updated_at = CURRENT_TIMESTAMP
+                            WHERE lottie_regional_averages.price_per_week
+                                IS DISTINCT FROM EXCLUDED.price_per_week
+                        """, [value for row in to_write for value in row])
+                    
+                    conn.commit()
             
-            logger.info("Lottie data saved to database", records=records_updated)
-            return records_updated
+            self.last_changes = changes
+            logger.info("Lottie data saved to database", records=len(rows), changes=changes.describe())
+            return len(rows)
         except Exception as e:
             logger.error("Failed to save Lottie data to database", error=str(e), exc_info=True)
             raise
@@ -312,6 +569,10 @@ class LottieScraper:
         Args:
             use_fallback: If True, use fallback constants data if scraping fails
         
+        Pages are fetched with conditional requests; if none changed since the last
+        successful save, parsing and the database write are skipped (returns 0 and
+        sets ``last_not_modified``).
+        
         Returns:
             Number of records updated
             
@@ -319,15 +580,29 @@ class LottieScraper:
             LottieScrapingError: If scraping fails and use_fallback=False
         """
         logger.info("Loading Lottie data", use_fallback=use_fallback)
+        self.last_downloads = {}
+        self.last_not_modified = False
+        self.last_changes = None
+        self.last_timings = {}
         
         try:
-            # Scrape all pages
-            data = self.scrape_all_pages()
+            # Fetch all pages (conditional requests)
+            with timed(self.last_timings, "download"):
+                pages = self.fetch_all_pages()
+            if self.pages_unchanged(pages):
+                logger.info("Lottie pages not modified, skipping parse and database write")
+                self.last_not_modified = True
+                return 0
+            
+            # Parse
+            with timed(self.last_timings, "parse"):
+                data = self.extract_all_pages(pages)
+            scraped = bool(data)
             
             if not data:
                 if use_fallback:
                     logger.info("No data scraped, using fallback constants data")
-                    data = self._load_fallback_data()
+                    data = self.load_fallback_data()
                 else:
                     error_msg = (
                         "No data scraped from Lottie pages. "
@@ -345,7 +620,7 @@ class LottieScraper:
             if total_regions == 0:
                 if use_fallback:
                     logger.info("No prices extracted, using fallback constants data")
-                    data = self._load_fallback_data()
+                    data = self.load_fallback_data()
                     total_regions = sum(len(prices) for prices in data.values())
                 else:
                     error_msg = (
@@ -360,6 +635,8 @@ class LottieScraper:
             
             # Save to database
             records_updated = self.save_to_database(data)
+            if scraped and records_updated > 0:
+                self.mark_pages_saved()
             
             if records_updated == 0 and len(data) > 0:
                 logger.warning(
@@ -377,7 +654,7 @@ class LottieScraper:
             if use_fallback:
                 logger.info("Scraping failed, using fallback constants data")
                 try:
-                    data = self._load_fallback_data()
+                    data = self.load_fallback_data()
                     records_updated = self.save_to_database(data)
                     logger.info("Loaded Lottie data from fallback", records=records_updated)
                     return records_updated
@@ -390,7 +667,7 @@ class LottieScraper:
             if use_fallback:
                 logger.info("Attempting to use fallback constants data")
                 try:
-                    data = self._load_fallback_data()
+                    data = self.load_fallback_data()
                     records_updated = self.save_to_database(data)
                     logger.info("Loaded Lottie data from fallback after error", records=records_updated)
                     return records_updated
@@ -398,7 +675,7 @@ class LottieScraper:
                     logger.error("Failed to load fallback data", error=str(fallback_error))
             raise LottieScrapingError(f"Failed to load Lottie data: {e}") from e
     
-    def _load_fallback_data(self) -> Dict[str, Dict[str, float]]:
+    def load_fallback_data(self) -> Dict[str, Dict[str, float]]:
         """
         Load fallback Lottie data from constants.py.
         
@@ -1,16 +1,66 @@
 """MSIF data loader - downloads and parses MSIF XLS files."""
 
-import pandas as pd
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Optional
 import httpx
 import structlog
+from observability import TARGET_MSIF
 from .config import config
-from .exceptions import MSIFDownloadError, MSIFParseError
+from .exceptions import MSIFDownloadError, MSIFParseError, StaleLeaseError
+from .change_detection import diff_records, hash_rows
 from .database import get_db_connection
+from .locking import check_fencing_token
+from .run_history import timed
 
 logger = structlog.get_logger(__name__)
 
+# msif_fees_<year> fee column -> fee table key
+MSIF_FEE_COLUMNS = (
+    ("residential_fee_65_plus", "residential"),
+    ("nursing_fee_65_plus", "nursing"),
+    ("residential_dementia_fee", "residential_dementia"),
+    ("nursing_dementia_fee", "nursing_dementia"),
+    ("respite_fee", "respite"),
+)
+
+# Rows per upsert statement
+UPSERT_PAGE_SIZE = 1000
+
+
+@lru_cache(maxsize=32)
+def _upsert_sql(table_name: str, rows: int) -> str:
+    """
+    Set-based upsert of `rows` LA rows into an msif_fees table.
+    
+    Rows whose fees are unchanged are not written. Returns one row
+    (inserted, updated); unchanged = rows - inserted - updated.
+    """
+    columns = [column for column, _ in MSIF_FEE_COLUMNS]
+    # Fees are rounded like the NUMERIC(10, 2) columns, so unchanged rows compare equal
+    row_template = "(%s, " + ", ".join(["%s::numeric(10, 2)"] * len(columns)) + ")"
+    column_list = ", ".join(columns)
+    return f"""
+        WITH incoming (local_authority, {column_list}) AS (
+            VALUES {", ".join([row_template] * rows)}
+        ),
+        changed AS (
+            INSERT INTO {table_name} (local_authority, {column_list}, updated_at)
+            SELECT local_authority, {column_list}, CURRENT_TIMESTAMP FROM incoming
+            ON CONFLICT (local_authority)
+            DO UPDATE SET
+                {", ".join(f"{column} = EXCLUDED.{column}" for column in columns)},
+                updated_at = CURRENT_TIMESTAMP
+            WHERE ({", ".join(f"{table_name}.{column}" for column in columns)})
+                IS DISTINCT FROM ({", ".join(f"EXCLUDED.{column}" for column in columns)})
+            RETURNING (xmax = 0) AS inserted
+        )
+        SELECT
+            COUNT(*) FILTER (WHERE inserted),
+            COUNT(*) FILTER (WHERE NOT inserted)
+        FROM changed
+    """
+
 
 class MSIFLoader:
     """Load and parse MSIF XLS files."""
@@ -24,14 +74,29 @@ class MSIFLoader:
         """
         self.cache_dir = cache_dir or config.cache_dir / "msif"
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # DownloadResult of the last download_msif_file() call, and whether the last
+        # load_msif_data() skipped parse/save because the workbook was not modified
+        self.last_download = None
+        self.last_not_modified = False
+        # Inserted/updated/unchanged row counts and ChangeSummary (None if no diff was
+        # computed) of the last save_to_database() call
+        self.last_save_stats: Dict[str, int] = {}
+        self.last_changes = None
+        # Stage -> seconds of the last load (download, parse, diff, write; see run_history)
+        self.last_timings: Dict[str, float] = {}
     
-    def download_msif_file(self, url: str, year: int) -> Path:
+    def download_msif_file(self, url: str, year: int, force: bool = False) -> Path:
         """
         Download MSIF XLS file.
         
+        The request is conditional on the cached copy (ETag/Last-Modified) and the body
+        is streamed to disk; on 304 Not Modified the cached file is kept. The
+        DownloadResult is stored in ``last_download``.
+        
         Args:
             url: URL to download from
             year: Year for filename (2024 or 2025)
+            force: Ignore stored validators and download unconditionally
             
         Returns:
             Path to downloaded file
@@ -39,24 +104,54 @@ class MSIFLoader:
         Raises:
             MSIFDownloadError: If download fails
         """
+        from pricing_calculator.downloader import conditional_download
+        
         file_path = self.cache_dir / f"msif_{year}.xlsx"
         
         logger.info("Downloading MSIF file", url=url, year=year, target=str(file_path))
         
         try:
-            with httpx.Client(timeout=config.http_timeout) as client:
-                response = client.get(url)
-                response.raise_for_status()
-                
-                file_path.write_bytes(response.content)
-                logger.info("MSIF file downloaded", file=str(file_path), size_bytes=len(response.content))
-                
-                return file_path
+            result = conditional_download(
+                url, file_path, TARGET_MSIF, timeout=config.http_timeout, force=force
+            )
+            self.last_download = result
+            logger.info(
+                "MSIF file downloaded",
+                file=str(file_path),
+                size_bytes=result.size_bytes,
+                modified=result.modified,
+            )
+            return file_path
         except httpx.HTTPError as e:
             raise MSIFDownloadError(f"Failed to download MSIF {year}: {e}") from e
         except Exception as e:
             raise MSIFDownloadError(f"Unexpected error downloading MSIF {year}: {e}") from e
     
+    def _loaded_marker(self, year: int) -> Path:
+        """File holding the SHA-256 of the last workbook saved to the database."""
+        return self.cache_dir / f"msif_{year}.loaded"
+    
+    def is_unchanged(self, year: int, sha256: Optional[str]) -> bool:
+        """
+        Whether the workbook with this hash was already saved to the database.
+        
+        Args:
+            year: MSIF year
+            sha256: SHA-256 of the downloaded workbook
+        """
+        marker = self._loaded_marker(year)
+        return bool(sha256) and marker.exists() and marker.read_text().strip() == sha256
+    
+    def mark_loaded(self, year: int, sha256: str) -> None:
+        """
+        Record the workbook hash after a successful database write (see is_unchanged).
+        
+        Args:
+            year: MSIF year
+            sha256: SHA-256 of the saved workbook
+        """
+        self._loaded_marker(year).write_text(sha256)
+    
     def parse_msif_xls(self, file_path: Path, year: int) -> Dict[str, Dict[str, float]]:
         """
         Parse MSIF XLS file and extract fee data.
@@ -71,132 +166,13 @@ class MSIFLoader:
         Raises:
             MSIFParseError: If parsing fails
         """
+        from pricing_calculator.msif_cache import get_parsed_msif_cache
+        
         logger.info("Parsing MSIF XLS file", file=str(file_path), year=year)
         
         try:
-            xls = pd.ExcelFile(file_path)
-            
-            # Find Table A sheet
-            target_sheet = None
-            for sheet_name in xls.sheet_names:
-                sheet_lower = sheet_name.lower()
-                if "table a" in sheet_lower and str(year) in sheet_lower:
-                    target_sheet = sheet_name
-                    break
-            
-            if target_sheet is None:
-                # Try alternative names
-                for sheet_name in xls.sheet_names:
-                    if any(keyword in sheet_name.lower() for keyword in ["table a", "fees", "data"]):
-                        target_sheet = sheet_name
-                        break
-            
-            if target_sheet is None:
-                raise MSIFParseError(
-                    f"Could not find Table A sheet in MSIF {year} file. "
-                    f"Available sheets: {xls.sheet_names}"
-                )
-            
-            logger.info("Using sheet", sheet=target_sheet)
-            
-            # Read with header row
-            df = pd.read_excel(xls, sheet_name=target_sheet, header=1)
-            
-            result: Dict[str, Dict[str, float]] = {}
-            
-            # Find column indices dynamically
-            la_col_idx = None
-            residential_col_idx = None
-            nursing_col_idx = None
-            
-            # Look for Local Authority column
-            for idx, col in enumerate(df.columns):
-                col_str = str(col).lower()
-                if "local authority" in col_str or (idx == 1 and "unnamed" not in col_str.lower()):
-                    la_col_idx = idx
-                    break
-            
-            if la_col_idx is None:
-                la_col_idx = 1  # Fallback
-            
-            # Look for residential and nursing columns
-            for idx, col in enumerate(df.columns):
-                col_str = str(col).lower()
-                if "care homes without nursing" in col_str and "65" in col_str and str(year) in col_str:
-                    residential_col_idx = idx
-                elif "care homes with nursing" in col_str and "65" in col_str and str(year) in col_str:
-                    nursing_col_idx = idx
-            
-            # Fallback to known positions
-            if residential_col_idx is None and len(df.columns) > 6:
-                residential_col_idx = 6
-            
-            if nursing_col_idx is None and len(df.columns) > 9:
-                nursing_col_idx = 9
-            
-            if residential_col_idx is None or nursing_col_idx is None:
-                raise MSIFParseError(
-                    f"Could not find required fee columns. "
-                    f"Residential col: {residential_col_idx}, Nursing col: {nursing_col_idx}. "
-                    f"Available columns: {list(df.columns[:10])}"
-                )
-            
-            logger.info(
-                "Found columns",
-                la_col=la_col_idx,
-                residential_col=residential_col_idx,
-                nursing_col=nursing_col_idx
-            )
-            
-            # Extract data
-            for idx, row in df.iterrows():
-                if idx < 2:  # Skip header rows
-                    continue
-                
-                la_name = str(row.iloc[la_col_idx]).strip()
-                
-                # Skip invalid rows
-                if (not la_name or 
-                    la_name.lower() in ["nan", "none", "", "this worksheet", "ons code"] or
-                    la_name.startswith("Table") or
-                    len(la_name) < 2):
-                    continue
-                
-                try:
-                    residential_fee_raw = row.iloc[residential_col_idx]
-                    nursing_fee_raw = row.iloc[nursing_col_idx]
-                    
-                    residential_fee = None
-                    nursing_fee = None
-                    
-                    if pd.notna(residential_fee_raw):
-                        try:
-                            residential_fee = float(residential_fee_raw)
-                        except (ValueError, TypeError):
-                            pass
-                    
-                    if pd.notna(nursing_fee_raw):
-                        try:
-                            nursing_fee = float(nursing_fee_raw)
-                        except (ValueError, TypeError):
-                            pass
-                    
-                    if residential_fee or nursing_fee:
-                        if la_name not in result:
-                            result[la_name] = {}
-                        
-                        if residential_fee and residential_fee > 0:
-                            result[la_name]["residential"] = residential_fee
-                            result[la_name]["residential_dementia"] = residential_fee * 1.12
-                            result[la_name]["respite"] = residential_fee
-                        
-                        if nursing_fee and nursing_fee > 0:
-                            result[la_name]["nursing"] = nursing_fee
-                            result[la_name]["nursing_dementia"] = nursing_fee * 1.12
-                
-                except (ValueError, TypeError, IndexError) as e:
-                    logger.debug("Skipping row", la=la_name, error=str(e), row_idx=idx)
-                    continue
+            # Unchanged workbooks (same SHA-256) are read from the parsed artifact cache
+            result = get_parsed_msif_cache().load(file_path, year)
             
             logger.info("Parsed MSIF data", local_authorities=len(result), year=year)
             
@@ -209,59 +185,89 @@ class MSIFLoader:
             logger.error("Failed to parse MSIF XLS", error=str(e), year=year)
             raise MSIFParseError(f"Failed to parse MSIF {year} XLS file: {e}") from e
     
-    def save_to_database(self, data: Dict[str, Dict[str, float]], year: int) -> int:
+    def save_to_database(
+        self,
+        data: Dict[str, Dict[str, float]],
+        year: int,
+        fencing_token: Optional[int] = None
+    ) -> int:
         """
         Save parsed MSIF data to database.
         
+        Incoming rows are hashed and diffed against the rows currently in the table;
+        only added and changed rows are upserted (in pages of UPSERT_PAGE_SIZE, one
+        multi-row ``INSERT ... ON CONFLICT DO UPDATE`` statement per page). The diff is
+        stored in ``last_changes`` and inserted/updated/unchanged counts in
+        ``last_save_stats``. Rows missing from the new data are reported, not deleted.
+        
         Args:
             data: Parsed MSIF data
             year: Year (2024 or 2025)
+            fencing_token: Job lock fencing token; the write is rejected if a newer
+                lock holder already wrote the table (see locking.check_fencing_token)
             
         Returns:
-            Number of records updated
+            Number of records saved (inserted, updated or already up to date)
+        
+        Raises:
+            StaleLeaseError: If fencing_token is stale
         """
         table_name = f"msif_fees_{year}"
         logger.info("Saving MSIF data to database", table=table_name, records=len(data))
         
+        rows = {
+            la_name: (la_name,) + tuple(fees.get(key) for _, key in MSIF_FEE_COLUMNS)
+            for la_name, fees in data.items()
+        }
+        self.last_save_stats = {"inserted": 0, "updated": 0, "unchanged": 0}
+        self.last_changes = None
+        self.last_timings.pop("diff", None)
+        self.last_timings.pop("write", None)
+        
         try:
-            records_updated = 0
+            inserted = updated = 0
             
             with get_db_connection() as conn:
                 cursor = conn.cursor()
+                if fencing_token is not None:
+                    check_fencing_token(cursor, table_name, fencing_token)
                 
-                for la_name, fees in data.items():
-                    cursor.execute(f"""
-                        INSERT INTO {table_name} (
-                            local_authority,
-                            residential_fee_65_plus,
-                            nursing_fee_65_plus,
-                            residential_dementia_fee,
-                            nursing_dementia_fee,
-                            respite_fee,
-                            updated_at
-                        ) VALUES (%s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
-                        ON CONFLICT (local_authority) 
-                        DO UPDATE SET
-                            residential_fee_65_plus = EXCLUDED.residential_fee_65_plus,
-                            nursing_fee_65_plus = EXCLUDED.nursing_fee_65_plus,
-                            residential_dementia_fee = EXCLUDED.residential_dementia_fee,
-                            nursing_dementia_fee = EXCLUDED.nursing_dementia_fee,
-                            respite_fee = EXCLUDED.respite_fee,
-                            updated_at = CURRENT_TIMESTAMP
-                    """, (
-                        la_name,
-                        fees.get("residential"),
-                        fees.get("nursing"),
-                        fees.get("residential_dementia"),
-                        fees.get("nursing_dementia"),
-                        fees.get("respite")
-                    ))
-                    records_updated += 1
+                with timed(self.last_timings, "diff"):
+                    cursor.execute(
+                        f"SELECT local_authority, {', '.join(column for column, _ in MSIF_FEE_COLUMNS)} "
+                        f"FROM {table_name}"
+                    )
+                    changes = diff_records(hash_rows(cursor.fetchall()), hash_rows(rows.values()))
+                    to_write = [rows[la_name] for la_name in changes.to_write]
                 
-                conn.commit()
-            
-            logger.info("MSIF data saved to database", records=records_updated, year=year)
-            return records_updated
+                with timed(self.last_timings, "write"):
+                    for start in range(0, len(to_write), UPSERT_PAGE_SIZE):
+                        page = to_write[start:start + UPSERT_PAGE_SIZE]
+                        params = [value for row in page for value in row]
+                        cursor.execute(_upsert_sql(table_name, len(page)), params)
+                        counts = cursor.fetchone()
+                        if counts:
+                            inserted += int(counts[0] or 0)
+                            updated += int(counts[1] or 0)
+                    
+                    conn.commit()
+            
+            self.last_changes = changes
+            self.last_save_stats = {
+                "inserted": inserted,
+                "updated": updated,
+                "unchanged": max(len(rows) - inserted - updated, 0),
+            }
+            logger.info(
+                "MSIF data saved to database",
+                records=len(rows),
+                year=year,
+                changes=changes.describe(),
+                **self.last_save_stats
+            )
+            return len(rows)
+        except StaleLeaseError:
+            raise
         except Exception as e:
             logger.warning(
                 "Could not save MSIF data to database",
@@ -286,6 +292,9 @@ class MSIFLoader:
         Raises:
             MSIFParseError: If CSV file not found or parsing fails
         """
+        import pandas as pd
+        from pricing_calculator.msif_parser import frame_to_fee_table, parse_processed_csv
+        
         if csv_path is None:
             # Use default CSV path from input/other
             # __file__ is src/data_ingestion/msif_loader.py
@@ -307,52 +316,8 @@ class MSIFLoader:
         try:
             df = pd.read_csv(csv_path)
             
-            # Validate required columns
-            required_cols = ['local_authority', 'residential_65_median', 'nursing_65_median']
-            missing_cols = [col for col in required_cols if col not in df.columns]
-            if missing_cols:
-                raise MSIFParseError(
-                    f"CSV file missing required columns: {missing_cols}. "
-                    f"Found columns: {list(df.columns)}"
-                )
-            
-            result: Dict[str, Dict[str, float]] = {}
-            
-            for _, row in df.iterrows():
-                la_name = str(row['local_authority']).strip()
-                
-                # Skip invalid rows
-                if not la_name or la_name.lower() in ["nan", "none", ""]:
-                    continue
-                
-                residential_fee = None
-                nursing_fee = None
-                
-                # Extract fees with validation
-                if pd.notna(row['residential_65_median']):
-                    try:
-                        residential_fee = float(row['residential_65_median'])
-                    except (ValueError, TypeError):
-                        pass
-                
-                if pd.notna(row['nursing_65_median']):
-                    try:
-                        nursing_fee = float(row['nursing_65_median'])
-                    except (ValueError, TypeError):
-                        pass
-                
-                # Only add if we have at least one valid fee
-                if residential_fee or nursing_fee:
-                    result[la_name] = {}
-                    
-                    if residential_fee and residential_fee > 0:
-                        result[la_name]["residential"] = residential_fee
-                        result[la_name]["residential_dementia"] = residential_fee * 1.12
-                        result[la_name]["respite"] = residential_fee
-                    
-                    if nursing_fee and nursing_fee > 0:
-                        result[la_name]["nursing"] = nursing_fee
-                        result[la_name]["nursing_dementia"] = nursing_fee * 1.12
+            # Repeated LA names: the last row wins
+            result = frame_to_fee_table(parse_processed_csv(df), merge_duplicates=False)
             
             logger.info("Loaded MSIF data from CSV", local_authorities=len(result), year=year)
             
@@ -372,7 +337,8 @@ class MSIFLoader:
         year: int, 
         prefer_csv: bool = False,
         csv_path: Optional[Path] = None,
-        fallback_to_csv: bool = True
+        fallback_to_csv: bool = True,
+        force: bool = False
     ) -> int:
         """
         Download, parse and save MSIF data for a given year.
@@ -385,10 +351,17 @@ class MSIFLoader:
             prefer_csv: If True, try CSV first, then Excel if CSV fails
             csv_path: Optional path to CSV file. If None, uses default from input/other
             fallback_to_csv: If True, use CSV as fallback if Excel parsing fails
+            force: Download, parse and save even if the workbook is unchanged
             
         Returns:
-            Number of records updated
+            Number of records updated (0 if the workbook was not modified since the
+            last successful load; see ``last_download``)
         """
+        self.last_download = None
+        self.last_not_modified = False
+        self.last_save_stats = {}
+        self.last_changes = None
+        self.last_timings = {}
         url = config.msif_2025_url if year == 2025 else config.msif_2024_url
         
         logger.info(
@@ -403,7 +376,8 @@ class MSIFLoader:
         if prefer_csv:
             try:
                 logger.info("Attempting to load from CSV", year=year)
-                data = self.load_msif_from_csv(csv_path=csv_path, year=year)
+                with timed(self.last_timings, "parse"):
+                    data = self.load_msif_from_csv(csv_path=csv_path, year=year)
                 logger.info("Parsed MSIF CSV file", year=year, local_authorities=len(data))
                 records_updated = self.save_to_database(data, year)
                 
@@ -425,15 +399,30 @@ class MSIFLoader:
         
         # Try Excel (official source)
         try:
-            # Download
-            file_path = self.download_msif_file(url, year)
+            # Download (conditional request)
+            with timed(self.last_timings, "download"):
+                file_path = self.download_msif_file(url, year, force=force)
+            download = self.last_download
+            
+            if (not force and download is not None and not download.modified
+                    and self.is_unchanged(year, download.sha256)):
+                logger.info(
+                    "MSIF file not modified, skipping parse and database write",
+                    year=year,
+                    status_code=download.status_code,
+                )
+                self.last_not_modified = True
+                return 0
             
             # Parse
-            data = self.parse_msif_xls(file_path, year)
+            with timed(self.last_timings, "parse"):
+                data = self.parse_msif_xls(file_path, year)
             logger.info("Parsed MSIF Excel file", year=year, local_authorities=len(data))
             
             # Save to database
             records_updated = self.save_to_database(data, year)
+            if records_updated > 0 and download is not None and download.sha256:
+                self.mark_loaded(year, download.sha256)
             
             if records_updated == 0 and len(data) > 0:
                 logger.warning(
@@ -454,7 +443,8 @@ class MSIFLoader:
             if fallback_to_csv:
                 try:
                     logger.info("Falling back to CSV", year=year)
-                    data = self.load_msif_from_csv(csv_path=csv_path, year=year)
+                    with timed(self.last_timings, "parse"):
+                        data = self.load_msif_from_csv(csv_path=csv_path, year=year)
                     records_updated = self.save_to_database(data, year)
                     logger.info("Successfully loaded MSIF from CSV (fallback)", records=records_updated, year=year)
                     return records_updated
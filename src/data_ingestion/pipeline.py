@@ -0,0 +1,669 @@
+"""
+Orchestrated refresh of all data sources.
+
+The scheduler used to run MSIF 2025, MSIF 2024 and Lottie as independent jobs, each
+downloading, parsing and writing serially, and two jobs could hit the database at
+once. ``RefreshPipeline`` runs one refresh of every source as a dependency graph:
+
+* downloads of all sources run concurrently (threads);
+* CPU-bound MSIF parsing (openpyxl) runs in a process pool; Lottie pages are
+  fetched concurrently and parsed in the task thread, where the scraper's parse
+  cache skips pages whose HTML did not change;
+* database writes are serialized, one transaction per source;
+* the pricing data snapshot is rebuilt once, after every source has finished, and
+  only if some source changed data.
+
+Triggers that arrive while a run with the same options is in progress join that run
+instead of starting another one (a forced run also serves unforced triggers); a
+trigger with other options runs after it. Every run reports a per-task and per-stage
+duration breakdown.
+
+With a ``job_lock`` (see ``locking``), a run only starts if this instance holds the
+lock; writes carry the lease's fencing token and, after a run that published new
+data, the lock's data generation is bumped so other instances reload their snapshot.
+"""
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime
+from functools import partial
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import structlog
+
+from observability import span
+from .config import config
+from .exceptions import LottieScrapingError
+from .locking import JobLock
+from .lottie_scraper import LottieScraper
+from .msif_loader import MSIFLoader
+from .run_history import STAGE_INVALIDATE, RunRecord
+from .service import DataIngestionService
+
+logger = structlog.get_logger(__name__)
+
+STAGE_DOWNLOAD = "download"
+STAGE_PARSE = "parse"
+STAGE_WRITE = "write"
+STAGE_PUBLISH = "publish"
+
+STAGES = (STAGE_DOWNLOAD, STAGE_PARSE, STAGE_WRITE, STAGE_PUBLISH)
+
+# Task name prefix -> data source name (as logged in data_update_log)
+SOURCES = (
+    ("msif_2025", "MSIF 2025"),
+    ("msif_2024", "MSIF 2024"),
+    ("lottie", "Lottie Regional Averages"),
+)
+
+SNAPSHOT_TASK = "snapshot"
+
+# Job lock name of a full refresh
+LOCK_NAME = "refresh_all"
+
+# Serializes ingestion database writes within the process
+_db_write_lock = threading.Lock()
+
+
+class TaskSkipped(Exception):
+    """Raised by a task to skip itself and its dependants (e.g. source not modified)."""
+    pass
+
+
+class PipelineTask:
+    """Node of a TaskGraph and its outcome."""
+
+    __slots__ = (
+        "name", "stage", "func", "deps", "serialize", "always_run",
+        "status", "result", "error", "reason", "waited", "started", "finished",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        stage: str,
+        func: Callable[[Dict], object],
+        deps: Iterable[str] = (),
+        serialize: bool = False,
+        always_run: bool = False
+    ):
+        self.name = name
+        self.stage = stage
+        # Called with {dependency name: result} of the dependencies that succeeded
+        self.func = func
+        self.deps = tuple(deps)
+        # Hold the write lock while running
+        self.serialize = serialize
+        # Run even if a dependency failed or was skipped
+        self.always_run = always_run
+        self.status = "pending"
+        self.result = None
+        self.error: Optional[Exception] = None
+        self.reason: Optional[str] = None
+        self.waited = 0.0
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    @property
+    def duration(self) -> float:
+        """Run time in seconds (0 if the task did not run)."""
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+    def to_dict(self) -> Dict:
+        """Task outcome and timings for run reports."""
+        entry = {
+            "stage": self.stage,
+            "status": self.status,
+            "duration_seconds": round(self.duration, 3),
+            "waited_seconds": round(self.waited, 3),
+            "start_offset_seconds": round(self.started, 3) if self.started is not None else None,
+        }
+        if self.error is not None:
+            entry["error"] = str(self.error)
+        if self.reason:
+            entry["reason"] = self.reason
+        return entry
+
+
+class TaskGraph:
+    """Dependency graph of tasks run on a thread pool."""
+
+    def __init__(self):
+        """Initialize empty graph."""
+        self.tasks: Dict[str, PipelineTask] = {}
+
+    def add(
+        self,
+        name: str,
+        stage: str,
+        func: Callable[[Dict], object],
+        deps: Iterable[str] = (),
+        serialize: bool = False,
+        always_run: bool = False
+    ) -> PipelineTask:
+        """
+        Add a task.
+
+        Dependencies must be added first, so the graph cannot have cycles.
+
+        Args:
+            name: Unique task name
+            stage: Stage for the duration breakdown (download, parse, write, publish)
+            func: Called with {dependency name: result}; raise TaskSkipped to skip
+            deps: Names of tasks that must finish first
+            serialize: Run under the write lock (one serialized task at a time)
+            always_run: Run even if a dependency failed or was skipped
+
+        Returns:
+            The new task
+
+        Raises:
+            ValueError: If the name is taken or a dependency is unknown
+        """
+        if name in self.tasks:
+            raise ValueError(f"Duplicate task: {name}")
+        unknown = [dep for dep in deps if dep not in self.tasks]
+        if unknown:
+            raise ValueError(f"Unknown dependencies of {name}: {unknown}")
+        task = PipelineTask(name, stage, func, deps, serialize, always_run)
+        self.tasks[name] = task
+        return task
+
+    def run(self, max_workers: int = 4, write_lock: Optional[threading.Lock] = None) -> float:
+        """
+        Run all tasks, each as soon as its dependencies have finished.
+
+        A failed or skipped task skips its dependants (except always_run ones);
+        independent branches keep running. Outcomes are stored on the tasks.
+
+        Args:
+            max_workers: Tasks running at the same time
+            write_lock: Lock held by serialize=True tasks (default: a new lock)
+
+        Returns:
+            Wall time in seconds
+        """
+        write_lock = write_lock or threading.Lock()
+        origin = time.perf_counter()
+        pending = dict(self.tasks)
+        running: Dict[Future, PipelineTask] = {}
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingestion") as executor:
+            while pending or running:
+                # Insertion order is topological, so one pass settles chains of skips
+                for task in list(pending.values()):
+                    deps = [self.tasks[dep] for dep in task.deps]
+                    if any(dep.status in ("pending", "running") for dep in deps):
+                        continue
+                    del pending[task.name]
+
+                    blocked = [dep for dep in deps if dep.status != "success"]
+                    if blocked and not task.always_run:
+                        task.status = "skipped"
+                        task.reason = f"{blocked[0].name} {blocked[0].status}"
+                        continue
+
+                    inputs = {dep.name: dep.result for dep in deps if dep.status == "success"}
+                    task.status = "running"
+                    future = executor.submit(
+                        self._execute, task, inputs, origin, write_lock if task.serialize else None
+                    )
+                    running[future] = task
+
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    running.pop(future)
+
+        return time.perf_counter() - origin
+
+    @staticmethod
+    def _execute(
+        task: PipelineTask,
+        inputs: Dict,
+        origin: float,
+        lock: Optional[threading.Lock]
+    ) -> None:
+        queued = time.perf_counter()
+        if lock is not None:
+            lock.acquire()
+        try:
+            task.waited = time.perf_counter() - queued
+            task.started = time.perf_counter() - origin
+            with span(f"data_ingestion.pipeline.{task.stage}"):
+                task.result = task.func(inputs)
+            task.status = "success"
+        except TaskSkipped as e:
+            task.status = "skipped"
+            task.reason = str(e)
+        except Exception as e:
+            task.status = "failed"
+            task.error = e
+            logger.error("Pipeline task failed", task=task.name, error=str(e), exc_info=True)
+        finally:
+            task.finished = time.perf_counter() - origin
+            if lock is not None:
+                lock.release()
+
+
+def parse_msif_source(
+    file_path: Optional[str],
+    year: int,
+    fallback_to_csv: bool = True,
+    csv_path: Optional[str] = None
+) -> Tuple[Dict[str, Dict[str, float]], str]:
+    """
+    Parse an MSIF workbook, or the processed CSV (process pool worker).
+
+    Args:
+        file_path: Downloaded workbook (None to load the CSV)
+        year: Year (2024 or 2025)
+        fallback_to_csv: Load the CSV if the workbook cannot be parsed
+        csv_path: Optional CSV path (default from input/other)
+
+    Returns:
+        (fee table, "excel" or "csv")
+
+    Raises:
+        MSIFParseError: If neither source can be parsed
+    """
+    from pathlib import Path
+
+    loader = MSIFLoader()
+    csv = Path(csv_path) if csv_path else None
+    if file_path is None:
+        return loader.load_msif_from_csv(csv_path=csv, year=year), "csv"
+    try:
+        return loader.parse_msif_xls(Path(file_path), year), "excel"
+    except Exception as e:
+        if not fallback_to_csv:
+            raise
+        logger.warning("Falling back to CSV", year=year, error=str(e))
+        return loader.load_msif_from_csv(csv_path=csv, year=year), "csv"
+
+
+class RefreshPipeline:
+    """One orchestrated refresh of MSIF 2025, MSIF 2024 and Lottie."""
+
+    def __init__(
+        self,
+        service: Optional[DataIngestionService] = None,
+        io_workers: Optional[int] = None,
+        parse_workers: Optional[int] = None
+    ):
+        """
+        Initialize pipeline.
+
+        Args:
+            service: Service providing loaders, update log, alerts and snapshot
+            io_workers: Tasks running at the same time (default config.pipeline_io_workers)
+            parse_workers: Parse processes; 0 parses in the task thread
+                (default config.pipeline_parse_workers)
+        """
+        self.service = service or DataIngestionService()
+        self.io_workers = io_workers if io_workers is not None else config.pipeline_io_workers
+        self.parse_workers = (
+            parse_workers if parse_workers is not None else config.pipeline_parse_workers
+        )
+        # Report of the last finished run
+        self.last_run: Optional[Dict] = None
+        self._run_lock = threading.Lock()
+        self._current: Optional[Future] = None
+        # (force, use_fallback) of the run in progress
+        self._current_options: Optional[Tuple[bool, bool]] = None
+
+    def run(
+        self,
+        force: bool = False,
+        use_fallback: bool = True,
+        job_lock: Optional[JobLock] = None
+    ) -> Dict:
+        """
+        Refresh all sources.
+
+        If a run that covers these options is already in progress (same use_fallback,
+        and forced if force is set), waits for it and returns its report (with
+        "coalesced": true) instead of starting another one. Otherwise waits for the
+        run in progress to finish and then runs (the report has "queued": true).
+
+        Args:
+            force: Download, parse and save even if sources are unchanged
+            use_fallback: Use fallback constants if Lottie scraping yields nothing
+            job_lock: Run only if this instance acquires LOCK_NAME; otherwise the
+                report has status "skipped"
+
+        Returns:
+            Run report: status, per-source results, snapshot version, total
+            duration and per-stage / per-task timings
+        """
+        queued = False
+        while True:
+            with self._run_lock:
+                current = self._current
+                if current is None or current.done():
+                    current = self._current = Future()
+                    self._current_options = (force, use_fallback)
+                    break
+                running_force, running_use_fallback = self._current_options
+                joinable = (running_force or not force) and running_use_fallback == use_fallback
+
+            if joinable:
+                logger.info("Refresh already running, joining it")
+                return dict(current.result(), coalesced=True)
+            # The run in progress would ignore these options: run after it instead
+            logger.info(
+                "Refresh running with other options, queued after it",
+                force=force, use_fallback=use_fallback,
+                running_force=running_force, running_use_fallback=running_use_fallback,
+            )
+            queued = True
+            wait([current])
+
+        try:
+            if job_lock is None:
+                report = self._run(force, use_fallback)
+            else:
+                report = self._run_locked(job_lock, force, use_fallback)
+        except BaseException as e:
+            current.set_exception(e)
+            raise
+        current.set_result(report)
+        return dict(report, queued=True) if queued else report
+
+    def _run_locked(self, job_lock: JobLock, force: bool, use_fallback: bool) -> Dict:
+        lease = job_lock.acquire(LOCK_NAME)
+        if lease is None:
+            logger.info("Refresh skipped, another instance holds the job lock", lock=LOCK_NAME)
+            return {"status": "skipped", "reason": "job lock held by another instance", "lock": LOCK_NAME}
+        try:
+            report = self._run(force, use_fallback, fencing_token=lease.token)
+            report["fencing_token"] = lease.token
+            if report["snapshot_version"] is not None:
+                # Other instances reload their snapshot when they see a new generation
+                report["data_generation"] = job_lock.bump_generation()
+            return report
+        finally:
+            job_lock.release(lease)
+
+    def _run(self, force: bool, use_fallback: bool, fencing_token: Optional[int] = None) -> Dict:
+        started_at = datetime.now()
+        logger.info("Refresh pipeline started", force=force, parse_workers=self.parse_workers)
+        runs = {data_source: self.service.start_run(data_source) for _, data_source in SOURCES}
+
+        parse_pool = self._parse_pool()
+        try:
+            graph = self.build_graph(
+                parse_pool, force=force, use_fallback=use_fallback, fencing_token=fencing_token
+            )
+            wall = graph.run(max_workers=self.io_workers, write_lock=_db_write_lock)
+        finally:
+            if parse_pool is not None:
+                parse_pool.shutdown()
+
+        sources = {
+            data_source: self._source_result(graph, key, data_source, runs[data_source])
+            for key, data_source in SOURCES
+        }
+        # Run history of all sources in one round trip
+        self.service.record_runs(*runs.values())
+        succeeded = sum(result["status"] == "success" for result in sources.values())
+
+        stages = {stage: 0.0 for stage in STAGES}
+        for task in graph.tasks.values():
+            stages[task.stage] += task.duration
+        snapshot = graph.tasks[SNAPSHOT_TASK]
+
+        report = {
+            "status": "success" if succeeded == len(sources) else ("partial" if succeeded else "error"),
+            "started_at": started_at.isoformat(),
+            "duration_seconds": round(wall, 3),
+            # Summed task time per stage; more than duration_seconds when tasks overlapped
+            "stages": {stage: round(seconds, 3) for stage, seconds in stages.items()},
+            "tasks": {name: task.to_dict() for name, task in graph.tasks.items()},
+            "sources": sources,
+            "snapshot_version": snapshot.result.get("snapshot_version") if snapshot.status == "success" else None,
+        }
+        self.last_run = report
+        logger.info(
+            "Refresh pipeline finished",
+            status=report["status"],
+            duration_seconds=report["duration_seconds"],
+            stages=report["stages"],
+            snapshot_version=report["snapshot_version"],
+        )
+        return report
+
+    def _parse_pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.parse_workers <= 0:
+            return None
+        # spawn: forking a process that runs threads can deadlock the child
+        return ProcessPoolExecutor(
+            max_workers=self.parse_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def build_graph(
+        self,
+        parse_pool: Optional[ProcessPoolExecutor] = None,
+        force: bool = False,
+        use_fallback: bool = True,
+        fencing_token: Optional[int] = None
+    ) -> TaskGraph:
+        """
+        Build the refresh graph: download -> parse -> write per source, then snapshot.
+
+        Args:
+            parse_pool: Process pool for MSIF parse tasks (None parses in the task thread)
+            force: Download, parse and save even if sources are unchanged
+            use_fallback: Use fallback constants if Lottie scraping yields nothing
+            fencing_token: Job lock fencing token passed to the database writes
+
+        Returns:
+            TaskGraph
+        """
+        graph = TaskGraph()
+        writes = []
+
+        for key, _ in SOURCES:
+            if not key.startswith("msif_"):
+                continue
+            year = int(key.split("_")[1])
+            # One loader per year: loaders keep per-call state (last_download, last_changes)
+            loader = MSIFLoader(cache_dir=self.service.msif_loader.cache_dir)
+            graph.add(f"{key}.download", STAGE_DOWNLOAD, partial(self._download_msif, loader, year, force))
+            graph.add(
+                f"{key}.parse", STAGE_PARSE, partial(self._parse_msif, parse_pool, year),
+                deps=[f"{key}.download"],
+            )
+            graph.add(
+                f"{key}.write", STAGE_WRITE, partial(self._write_msif, loader, year, fencing_token),
+                deps=[f"{key}.parse"], serialize=True,
+            )
+            writes.append(f"{key}.write")
+
+        scraper = self.service.lottie_scraper
+        graph.add("lottie.download", STAGE_DOWNLOAD, partial(self._download_lottie, scraper, force))
+        graph.add(
+            "lottie.parse", STAGE_PARSE, partial(self._parse_lottie, scraper, use_fallback),
+            deps=["lottie.download"],
+        )
+        graph.add(
+            "lottie.write", STAGE_WRITE, partial(self._write_lottie, scraper, fencing_token),
+            deps=["lottie.parse"], serialize=True,
+        )
+        writes.append("lottie.write")
+
+        graph.add(SNAPSHOT_TASK, STAGE_PUBLISH, self._publish_snapshot, deps=writes, always_run=True)
+        return graph
+
+    @staticmethod
+    def _run_cpu(pool: Optional[ProcessPoolExecutor], func: Callable, *args):
+        if pool is None:
+            return func(*args)
+        return pool.submit(func, *args).result()
+
+    @staticmethod
+    def _upstream(inputs: Dict):
+        (result,) = inputs.values()
+        return result
+
+    def _download_msif(self, loader: MSIFLoader, year: int, force: bool, inputs: Dict) -> Dict:
+        if config.msif_prefer_csv:
+            return {"file_path": None, "sha256": None, "downloads": []}
+
+        url = config.msif_2025_url if year == 2025 else config.msif_2024_url
+        try:
+            file_path = loader.download_msif_file(url, year, force=force)
+        except Exception as e:
+            if not config.msif_fallback_to_csv:
+                raise
+            logger.warning("MSIF download failed, will load CSV", year=year, error=str(e))
+            return {"file_path": None, "sha256": None, "downloads": []}
+
+        download = loader.last_download
+        if (not force and download is not None and not download.modified
+                and loader.is_unchanged(year, download.sha256)):
+            raise TaskSkipped("not_modified")
+        return {
+            "file_path": str(file_path),
+            "sha256": download.sha256 if download else None,
+            "downloads": [download] if download else [],
+        }
+
+    def _parse_msif(self, pool: Optional[ProcessPoolExecutor], year: int, inputs: Dict) -> Dict:
+        download = self._upstream(inputs)
+        data, source = self._run_cpu(
+            pool, parse_msif_source, download["file_path"], year,
+            config.msif_fallback_to_csv, config.msif_csv_path,
+        )
+        return {"data": data, "source": source, "sha256": download["sha256"] if source == "excel" else None}
+
+    def _write_msif(
+        self, loader: MSIFLoader, year: int, fencing_token: Optional[int], inputs: Dict
+    ) -> Dict:
+        parsed = self._upstream(inputs)
+        records_updated = loader.save_to_database(parsed["data"], year, fencing_token=fencing_token)
+        if records_updated > 0 and parsed["sha256"]:
+            loader.mark_loaded(year, parsed["sha256"])
+        return {
+            "records_updated": records_updated,
+            "changes": loader.last_changes,
+            "stats": dict(loader.last_save_stats),
+            "timings": dict(loader.last_timings),
+            "source": parsed["source"],
+        }
+
+    def _download_lottie(self, scraper: LottieScraper, force: bool, inputs: Dict) -> Dict:
+        scraper.last_downloads = {}
+        pages = scraper.fetch_all_pages()
+        if not force and scraper.pages_unchanged(pages):
+            raise TaskSkipped("not_modified")
+        return {"pages": pages, "downloads": list(scraper.last_downloads.values())}
+
+    def _parse_lottie(self, scraper: LottieScraper, use_fallback: bool, inputs: Dict) -> Dict:
+        pages = self._upstream(inputs)["pages"]
+        data = scraper.extract_all_pages(pages) if pages else {}
+        if data:
+            return {"data": data, "scraped": True}
+        if not use_fallback:
+            raise LottieScrapingError("No regional prices extracted from Lottie pages")
+        logger.info("No data scraped, using fallback constants data")
+        return {"data": scraper.load_fallback_data(), "scraped": False}
+
+    def _write_lottie(self, scraper: LottieScraper, fencing_token: Optional[int], inputs: Dict) -> Dict:
+        parsed = self._upstream(inputs)
+        records_updated = scraper.save_to_database(parsed["data"], fencing_token=fencing_token)
+        if parsed["scraped"] and records_updated > 0:
+            scraper.mark_pages_saved()
+        return {
+            "records_updated": records_updated,
+            "changes": scraper.last_changes,
+            "timings": dict(scraper.last_timings),
+            "source": "scraped" if parsed["scraped"] else "fallback",
+        }
+
+    def _publish_snapshot(self, inputs: Dict) -> Dict:
+        changed = [
+            name for name, write in inputs.items()
+            if self.service.has_changes(write["records_updated"], write["changes"])
+        ]
+        if not changed:
+            raise TaskSkipped("no data changes")
+        return {"snapshot_version": self.service.publish_snapshot(), "changed": changed}
+
+    def _source_result(self, graph: TaskGraph, key: str, data_source: str, run: RunRecord) -> Dict:
+        """Fill in the run record, send alerts and build the refresh result of one source."""
+        tasks = [graph.tasks[f"{key}.{stage}"] for stage in (STAGE_DOWNLOAD, STAGE_PARSE, STAGE_WRITE)]
+        failed = next((task for task in tasks if task.status == "failed"), None)
+
+        download, parse, write_task = tasks
+        for task, stage in ((download, STAGE_DOWNLOAD), (parse, STAGE_PARSE)):
+            if task.started is not None:
+                run.add_stage(stage, task.duration)
+        if download.status == "success":
+            for result in download.result["downloads"]:
+                run.add_download(result)
+        if write_task.status == "success":
+            run.add_stages(write_task.result["timings"])
+            run.set_changes(write_task.result["changes"])
+        snapshot = graph.tasks[SNAPSHOT_TASK]
+        if snapshot.status == "success" and write_task.name in snapshot.result["changed"]:
+            run.add_stage(STAGE_INVALIDATE, snapshot.duration)
+
+        if failed is not None:
+            run.finish(0, error=str(failed.error))
+            try:
+                self.service.telegram_alerts.send_error(data_source, failed.error)
+            except Exception as e:
+                logger.warning("Could not send Telegram error alert", error=str(e))
+            return {
+                "status": "error",
+                "data_source": data_source,
+                "error": str(failed.error),
+                "failed_task": failed.name,
+            }
+
+        if download.reason == "not_modified":
+            run.finish(0)
+            return {
+                "status": "success",
+                "data_source": data_source,
+                "records_updated": 0,
+                "not_modified": True,
+            }
+
+        write = write_task.result
+        run.finish(write["records_updated"])
+        result = {
+            "status": "success",
+            "data_source": data_source,
+            "records_updated": write["records_updated"],
+            "source": write["source"],
+        }
+        result.update(write.get("stats", {}))
+        # The snapshot is published once for all sources by the snapshot task
+        self.service.record_changes(data_source, write["records_updated"], write["changes"], result)
+        return result
+
+
+_pipeline: Optional[RefreshPipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def get_refresh_pipeline(service: Optional[DataIngestionService] = None) -> RefreshPipeline:
+    """
+    Get process-wide refresh pipeline.
+
+    Args:
+        service: Service used when the pipeline is created
+    """
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = RefreshPipeline(service)
+    return _pipeline
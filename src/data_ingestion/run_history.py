@@ -0,0 +1,308 @@
+"""
+Structured history of ingestion runs.
+
+Each refresh of a data source is described by a ``RunRecord``: status, record
+count, per-stage timings (download, parse, diff, write, invalidate), bytes
+downloaded, rows added/changed/removed and a hash of the downloaded source. The
+record is built in memory while the refresh runs and written to
+``data_update_log`` once it has finished, in a single INSERT (the pipeline writes
+the records of all sources of a run in one statement).
+
+``get_run_history`` and ``get_run_timeseries`` read the history back for the
+data-admin API and the Streamlit admin charts.
+"""
+
+import hashlib
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import structlog
+
+from .database import get_db_connection
+
+logger = structlog.get_logger(__name__)
+
+STAGE_DOWNLOAD = "download"
+STAGE_PARSE = "parse"
+STAGE_DIFF = "diff"
+STAGE_WRITE = "write"
+STAGE_INVALIDATE = "invalidate"
+STAGES = (STAGE_DOWNLOAD, STAGE_PARSE, STAGE_DIFF, STAGE_WRITE, STAGE_INVALIDATE)
+
+# Time-series buckets (date_trunc fields)
+BUCKETS = ("hour", "day", "week")
+
+# Columns of data_update_log written by save_runs(), in order
+_COLUMNS = (
+    "data_source", "status", "records_updated", "error_message",
+    "started_at", "completed_at", "duration_seconds",
+    "download_seconds", "parse_seconds", "diff_seconds", "write_seconds", "invalidate_seconds",
+    "bytes_downloaded", "rows_added", "rows_changed", "rows_removed", "source_hash",
+)
+
+HISTORY_COLUMNS = ("id",) + _COLUMNS
+
+
+@contextmanager
+def timed(timings: Dict[str, float], stage: str):
+    """Add the time spent in the block to timings[stage]."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - started
+
+
+class RunRecord:
+    """One refresh of one data source, as logged to data_update_log."""
+
+    __slots__ = (
+        "data_source", "status", "records_updated", "error_message",
+        "started_at", "completed_at", "stage_seconds", "bytes_downloaded",
+        "rows_added", "rows_changed", "rows_removed", "_hashes", "_started",
+    )
+
+    def __init__(self, data_source: str, started_at: Optional[datetime] = None):
+        """
+        Start a run record.
+
+        Args:
+            data_source: Name of data source (e.g. "MSIF 2025")
+            started_at: Start time (default now)
+        """
+        self.data_source = data_source
+        self.status = "running"
+        self.records_updated = 0
+        self.error_message: Optional[str] = None
+        self.started_at = started_at or datetime.now()
+        self.completed_at: Optional[datetime] = None
+        self.stage_seconds: Dict[str, float] = {}
+        self.bytes_downloaded = 0
+        self.rows_added: Optional[int] = None
+        self.rows_changed: Optional[int] = None
+        self.rows_removed: Optional[int] = None
+        self._hashes: List[str] = []
+        self._started = time.perf_counter()
+
+    def add_stage(self, stage: str, seconds: float) -> None:
+        """Add time spent in a stage (repeated stages accumulate)."""
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage: {stage}")
+        self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+
+    def add_stages(self, timings: Dict[str, float]) -> None:
+        """Add several stage timings (e.g. a loader's ``last_timings``)."""
+        for stage, seconds in timings.items():
+            self.add_stage(stage, seconds)
+
+    def stage(self, stage: str):
+        """Context manager timing the enclosed block as stage."""
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage: {stage}")
+        return timed(self.stage_seconds, stage)
+
+    def add_download(self, download) -> None:
+        """
+        Account for a conditional download.
+
+        Args:
+            download: pricing_calculator.downloader.DownloadResult (None is ignored);
+                only a 200 response counts towards bytes_downloaded
+        """
+        if download is None:
+            return
+        if download.status_code == 200:
+            self.bytes_downloaded += download.size_bytes
+        if download.sha256:
+            self._hashes.append(download.sha256)
+
+    def set_changes(self, changes) -> None:
+        """Record row counts of a change_detection.ChangeSummary (None is ignored)."""
+        if changes is None:
+            return
+        self.rows_added = len(changes.added)
+        self.rows_changed = len(changes.changed)
+        self.rows_removed = len(changes.removed)
+
+    @property
+    def source_hash(self) -> Optional[str]:
+        """SHA-256 of the downloaded source (combined for multi-page sources)."""
+        if not self._hashes:
+            return None
+        if len(self._hashes) == 1:
+            return self._hashes[0]
+        return hashlib.sha256("\n".join(sorted(self._hashes)).encode()).hexdigest()
+
+    @property
+    def duration_seconds(self) -> Optional[float]:
+        if self.completed_at is None:
+            return None
+        return round((self.completed_at - self.started_at).total_seconds(), 3)
+
+    def finish(self, records_updated: int = 0, error: Optional[str] = None) -> "RunRecord":
+        """
+        Mark the run as finished.
+
+        Args:
+            records_updated: Number of records updated
+            error: Error message if the run failed
+
+        Returns:
+            self
+        """
+        self.records_updated = records_updated
+        self.error_message = error
+        self.status = "failed" if error else "success"
+        self.completed_at = self.started_at + timedelta(seconds=time.perf_counter() - self._started)
+        return self
+
+    def row(self) -> tuple:
+        """Values of _COLUMNS."""
+        return (
+            self.data_source, self.status, self.records_updated, self.error_message,
+            self.started_at, self.completed_at,
+            round(self.duration_seconds) if self.completed_at is not None else None,
+            *(self._stage_value(stage) for stage in STAGES),
+            self.bytes_downloaded, self.rows_added, self.rows_changed, self.rows_removed,
+            self.source_hash,
+        )
+
+    def _stage_value(self, stage: str) -> Optional[float]:
+        seconds = self.stage_seconds.get(stage)
+        return round(seconds, 4) if seconds is not None else None
+
+    def to_dict(self) -> Dict:
+        """Record as a dict (keys of HISTORY_COLUMNS, without id)."""
+        return dict(zip(_COLUMNS, self.row()))
+
+    def __repr__(self) -> str:
+        return f"RunRecord(data_source={self.data_source!r}, status={self.status!r})"
+
+
+def save_runs(records: Iterable[RunRecord]) -> List[int]:
+    """
+    Write finished run records to data_update_log in one statement.
+
+    Args:
+        records: Finished RunRecords
+
+    Returns:
+        Ids of the inserted rows (empty if the database is unavailable)
+    """
+    records = list(records)
+    if not records:
+        return []
+    placeholders = "(" + ", ".join(["%s"] * len(_COLUMNS)) + ")"
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"INSERT INTO data_update_log ({', '.join(_COLUMNS)}) "
+                f"VALUES {', '.join([placeholders] * len(records))} RETURNING id",
+                [value for record in records for value in record.row()],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+            conn.commit()
+            return ids
+    except Exception as e:
+        logger.warning(
+            "Could not log update runs to database",
+            error=str(e),
+            data_sources=[record.data_source for record in records],
+        )
+        return []
+
+
+def get_run_history(
+    data_source: Optional[str] = None,
+    days: int = 30,
+    limit: int = 200
+) -> List[Dict]:
+    """
+    Recent runs, newest first.
+
+    Args:
+        data_source: Only runs of this source
+        days: Only runs started in the last days
+        limit: Maximum number of runs
+
+    Returns:
+        Dicts with the keys of HISTORY_COLUMNS
+    """
+    where = ["started_at >= %s"]
+    params: list = [datetime.now() - timedelta(days=days)]
+    if data_source:
+        where.append("data_source = %s")
+        params.append(data_source)
+    params.append(limit)
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT {', '.join(HISTORY_COLUMNS)} FROM data_update_log "
+            f"WHERE {' AND '.join(where)} ORDER BY started_at DESC LIMIT %s",
+            params,
+        )
+        return [dict(zip(HISTORY_COLUMNS, row)) for row in cursor.fetchall()]
+
+
+def get_run_timeseries(
+    data_source: Optional[str] = None,
+    days: int = 30,
+    bucket: str = "day"
+) -> List[Dict]:
+    """
+    Runs aggregated per time bucket and source.
+
+    Args:
+        data_source: Only runs of this source
+        days: Only runs started in the last days
+        bucket: "hour", "day" or "week"
+
+    Returns:
+        Dicts (oldest bucket first) with bucket, data_source, runs, failures,
+        avg_duration_seconds, avg_<stage>_seconds, bytes_downloaded and rows_changed
+        (added + changed + removed)
+
+    Raises:
+        ValueError: If bucket is unknown
+    """
+    if bucket not in BUCKETS:
+        raise ValueError(f"Unknown bucket {bucket!r}, expected one of {', '.join(BUCKETS)}")
+
+    where = ["started_at >= %s", "status <> 'running'"]
+    params: list = [bucket, datetime.now() - timedelta(days=days)]
+    if data_source:
+        where.append("data_source = %s")
+        params.append(data_source)
+
+    columns = ["bucket", "data_source", "runs", "failures", "avg_duration_seconds"]
+    columns += [f"avg_{stage}_seconds" for stage in STAGES]
+    columns += ["bytes_downloaded", "rows_changed"]
+    stage_averages = ", ".join(f"AVG({stage}_seconds)" for stage in STAGES)
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT
+                date_trunc(%s, started_at) AS bucket,
+                data_source,
+                COUNT(*),
+                COUNT(*) FILTER (WHERE status = 'failed'),
+                AVG(duration_seconds),
+                {stage_averages},
+                COALESCE(SUM(bytes_downloaded), 0),
+                COALESCE(SUM(COALESCE(rows_added, 0) + COALESCE(rows_changed, 0)
+                             + COALESCE(rows_removed, 0)), 0)
+            FROM data_update_log
+            WHERE {' AND '.join(where)}
+            GROUP BY bucket, data_source
+            ORDER BY bucket, data_source
+        """, params)
+        return [
+            {
+                column: float(value) if column.startswith("avg_") and value is not None else value
+                for column, value in zip(columns, row)
+            }
+            for row in cursor.fetchall()
+        ]
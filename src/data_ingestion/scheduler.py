@@ -3,6 +3,9 @@
 import structlog
 from .config import config
 from .service import DataIngestionService
+from .pipeline import get_refresh_pipeline
+from .locking import get_job_lock
+from .snapshot import get_snapshot_store
 
 logger = structlog.get_logger(__name__)
 
@@ -29,27 +32,51 @@ def _get_apscheduler():
 class DataIngestionScheduler:
     """Scheduler for automatic data ingestion updates."""
     
+    JOB_ID = 'refresh_all'
+    SYNC_JOB_ID = 'sync_snapshot'
+    
     def __init__(self):
         """Initialize scheduler."""
         BackgroundScheduler, IntervalTrigger = _get_apscheduler()
         self.scheduler = BackgroundScheduler()
         self.service = DataIngestionService()
+        self.pipeline = get_refresh_pipeline(self.service)
+        # Every instance schedules the job; only the lock holder runs it
+        self.job_lock = get_job_lock()
         self.enabled = config.scheduler_enabled
+        self._seen_generation = None
     
-    def _refresh_msif_2025(self):
-        """Refresh MSIF 2025-2026 data."""
-        logger.info("Scheduled refresh: MSIF 2025")
-        self.service.refresh_msif_data(year=2025)
-    
-    def _refresh_msif_2024(self):
-        """Refresh MSIF 2024-2025 data."""
-        logger.info("Scheduled refresh: MSIF 2024")
-        self.service.refresh_msif_data(year=2024)
+    def _refresh_all(self):
+        """Refresh MSIF 2025, MSIF 2024 and Lottie in one orchestrated run."""
+        logger.info("Scheduled refresh: all sources")
+        report = self.pipeline.run(job_lock=self.job_lock)
+        if report["status"] == "skipped":
+            logger.info("Scheduled refresh skipped", reason=report["reason"])
+            return
+        # Our own publish is already in the local snapshot
+        self._seen_generation = report.get("data_generation", self._seen_generation)
+        logger.info(
+            "Scheduled refresh finished",
+            status=report["status"],
+            duration_seconds=report["duration_seconds"],
+            stages=report["stages"],
+            fencing_token=report.get("fencing_token")
+        )
     
-    def _refresh_lottie(self):
-        """Refresh Lottie regional averages."""
-        logger.info("Scheduled refresh: Lottie")
-        self.service.refresh_lottie_data()
+    def _sync_snapshot(self):
+        """Reload the local snapshot when another instance has published new data."""
+        try:
+            generation = self.job_lock.generation()
+        except Exception as e:
+            logger.warning("Could not read data generation", error=str(e))
+            return
+        if self._seen_generation is None:
+            self._seen_generation = generation
+            return
+        if generation != self._seen_generation:
+            logger.info("New data published by another instance, reloading snapshot", generation=generation)
+            get_snapshot_store().refresh()
+            self._seen_generation = generation
     
     def start(self):
         """Start the scheduler."""
@@ -59,36 +86,38 @@ class DataIngestionScheduler:
         
         _, IntervalTrigger = _get_apscheduler()
         
-        # Add jobs
+        # One job for all sources: downloads overlap, DB writes are serialized and the
+        # snapshot is rebuilt once (see pipeline.RefreshPipeline). Runs missed while the
+        # process was down or busy are coalesced into a single run.
         self.scheduler.add_job(
-            func=self._refresh_msif_2025,
+            func=self._refresh_all,
             trigger=IntervalTrigger(days=config.scheduler_interval_days),
-            id='refresh_msif_2025',
-            name='Refresh MSIF 2025-2026',
-            replace_existing=True
+            id=self.JOB_ID,
+            name='Refresh MSIF and Lottie data',
+            replace_existing=True,
+            coalesce=True,
+            max_instances=1,
+            misfire_grace_time=config.scheduler_misfire_grace_seconds
         )
         
-        self.scheduler.add_job(
-            func=self._refresh_msif_2024,
-            trigger=IntervalTrigger(days=config.scheduler_interval_days),
-            id='refresh_msif_2024',
-            name='Refresh MSIF 2024-2025',
-            replace_existing=True
-        )
-        
-        self.scheduler.add_job(
-            func=self._refresh_lottie,
-            trigger=IntervalTrigger(days=config.scheduler_interval_days),
-            id='refresh_lottie',
-            name='Refresh Lottie Regional Averages',
-            replace_existing=True
-        )
+        if self.job_lock.shared:
+            self._sync_snapshot()
+            self.scheduler.add_job(
+                func=self._sync_snapshot,
+                trigger=IntervalTrigger(seconds=config.snapshot_sync_seconds),
+                id=self.SYNC_JOB_ID,
+                name='Reload snapshot after refreshes by other instances',
+                replace_existing=True,
+                coalesce=True,
+                max_instances=1
+            )
         
         self.scheduler.start()
         logger.info(
             "Data ingestion scheduler started",
             interval_days=config.scheduler_interval_days,
-            jobs=len(self.scheduler.get_jobs())
+            jobs=len(self.scheduler.get_jobs()),
+            job_lock=type(self.job_lock).__name__
         )
     
     def stop(self):
@@ -100,4 +129,3 @@ class DataIngestionScheduler:
     def get_jobs(self):
         """Get list of scheduled jobs."""
         return self.scheduler.get_jobs()
-
@@ -1,13 +1,17 @@
 """Main service for data ingestion."""
 
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 import structlog
 from .msif_loader import MSIFLoader
 from .lottie_scraper import LottieScraper
 from .telegram_alerts import TelegramAlerts
 from .database import get_db_connection
 from .exceptions import DataIngestionError
+from .snapshot import get_snapshot_store
+from .change_detection import ChangeSummary
+from .run_history import STAGE_INVALIDATE, RunRecord, get_run_history, get_run_timeseries, save_runs
 
 logger = structlog.get_logger(__name__)
 
@@ -21,78 +25,59 @@ class DataIngestionService:
         self.lottie_scraper = LottieScraper()
         self.telegram_alerts = TelegramAlerts()
     
-    def log_update_start(self, data_source: str) -> int:
+    def start_run(self, data_source: str) -> RunRecord:
         """
-        Log start of data update.
+        Start the run history record of a data update.
         
         Args:
             data_source: Name of data source
             
         Returns:
-            Log entry ID
-            
-        Note:
-            If database is not available, returns None and continues without logging.
+            RunRecord to fill in while the update runs (written by record_runs())
         """
-        try:
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO data_update_log (data_source, status, started_at)
-                    VALUES (%s, 'running', CURRENT_TIMESTAMP)
-                    RETURNING id
-                """, (data_source,))
-                log_id = cursor.fetchone()[0]
-                conn.commit()
-                return log_id
-        except Exception as e:
-            logger.warning("Could not log update start to database", error=str(e), data_source=data_source)
-            return None
+        return RunRecord(data_source)
     
-    def log_update_complete(self, log_id: Optional[int], records_updated: int, error: Optional[str] = None) -> None:
+    def record_runs(self, *runs: RunRecord) -> List[int]:
         """
-        Log completion of data update.
+        Write finished run records to data_update_log in one round trip.
         
         Args:
-            log_id: Log entry ID (can be None if logging failed)
-            records_updated: Number of records updated
-            error: Optional error message
+            runs: Finished RunRecords
+            
+        Returns:
+            Log entry IDs
             
         Note:
-            If database is not available, silently continues without logging.
+            If database is not available, returns [] and continues without logging.
         """
-        if log_id is None:
-            return
-        
-        try:
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    UPDATE data_update_log
-                    SET status = %s,
-                        records_updated = %s,
-                        error_message = %s,
-                        completed_at = CURRENT_TIMESTAMP,
-                        duration_seconds = EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - started_at))::INTEGER
-                    WHERE id = %s
-                """, ('success' if not error else 'failed', records_updated, error, log_id))
-                conn.commit()
-        except Exception as e:
-            logger.warning("Could not log update complete to database", error=str(e), log_id=log_id)
+        return save_runs(runs)
+    
+    @staticmethod
+    def _record_loader_run(run: RunRecord, loader, downloads) -> None:
+        """Copy stage timings, downloads and the diff of a loader's last load into run."""
+        run.add_stages(loader.last_timings)
+        for download in downloads:
+            run.add_download(download)
+        run.set_changes(loader.last_changes)
     
     def refresh_msif_data(
         self, 
         year: int = 2025,
         prefer_csv: Optional[bool] = None,
-        csv_path: Optional[str] = None
+        csv_path: Optional[str] = None,
+        force: bool = False
     ) -> dict:
         """
         Refresh MSIF data for a given year.
         
+        If the gov.uk workbook is unchanged since the last successful load (304 Not
+        Modified or identical content), parsing and the database write are skipped.
+        
         Args:
             year: Year (2024 or 2025)
             prefer_csv: If True, try CSV first. If None, uses config default
             csv_path: Optional path to CSV file. If None, uses default from input/other
+            force: Download, parse and save even if the workbook is unchanged
             
         Returns:
             Dict with status and details
@@ -101,10 +86,9 @@ class DataIngestionService:
         from pathlib import Path
         
         data_source = f"MSIF {year}"
-        log_id = None
+        run = self.start_run(data_source)
         
         try:
-            log_id = self.log_update_start(data_source)
             logger.info("Refreshing MSIF data", year=year, prefer_csv=prefer_csv)
             
             # Use config defaults if not specified
@@ -119,14 +103,21 @@ class DataIngestionService:
                 year=year,
                 prefer_csv=prefer_csv,
                 csv_path=csv_path_obj,
-                fallback_to_csv=config.msif_fallback_to_csv
+                fallback_to_csv=config.msif_fallback_to_csv,
+                force=force
             )
+            self._record_loader_run(run, self.msif_loader, [self.msif_loader.last_download])
             
-            self.log_update_complete(log_id, records_updated)
-            try:
-                self.telegram_alerts.send_success(data_source, records_updated)
-            except Exception as e:
-                logger.warning("Could not send Telegram alert", error=str(e))
+            if self.msif_loader.last_not_modified:
+                logger.info("MSIF source not modified, nothing to update", year=year)
+                self.record_runs(run.finish(records_updated))
+                return {
+                    "status": "success",
+                    "data_source": data_source,
+                    "records_updated": 0,
+                    "source": "excel",
+                    "not_modified": True
+                }
             
             result = {
                 "status": "success",
@@ -134,6 +125,8 @@ class DataIngestionService:
                 "records_updated": records_updated,
                 "source": "csv" if prefer_csv else "excel"
             }
+            # Inserted/updated/unchanged row counts
+            result.update(self.msif_loader.last_save_stats)
             
             # Add warning if records_updated is 0 but operation succeeded
             if records_updated == 0:
@@ -147,13 +140,14 @@ class DataIngestionService:
                 )
                 logger.warning("MSIF refresh completed with 0 records saved", year=year, **result)
             
+            self._publish_changes(data_source, records_updated, self.msif_loader.last_changes, result, run=run)
+            self.record_runs(run.finish(records_updated))
             return result
         except Exception as e:
             error_msg = str(e)
             logger.error("Failed to refresh MSIF data", year=year, error=error_msg)
             
-            if log_id:
-                self.log_update_complete(log_id, 0, error=error_msg)
+            self.record_runs(run.finish(0, error=error_msg))
             
             self.telegram_alerts.send_error(data_source, e)
             
@@ -174,19 +168,23 @@ class DataIngestionService:
             Dict with status and details
         """
         data_source = "Lottie Regional Averages"
-        log_id = None
+        run = self.start_run(data_source)
         
         try:
-            log_id = self.log_update_start(data_source)
             logger.info("Refreshing Lottie data", use_fallback=use_fallback)
             
             records_updated = self.lottie_scraper.load_lottie_data(use_fallback=use_fallback)
+            self._record_loader_run(run, self.lottie_scraper, self.lottie_scraper.last_downloads.values())
             
-            self.log_update_complete(log_id, records_updated)
-            try:
-                self.telegram_alerts.send_success(data_source, records_updated)
-            except Exception as e:
-                logger.warning("Could not send Telegram alert", error=str(e))
+            if self.lottie_scraper.last_not_modified:
+                logger.info("Lottie pages not modified, nothing to update")
+                self.record_runs(run.finish(records_updated))
+                return {
+                    "status": "success",
+                    "data_source": data_source,
+                    "records_updated": 0,
+                    "not_modified": True
+                }
             
             result = {
                 "status": "success",
@@ -198,13 +196,14 @@ class DataIngestionService:
             if records_updated > 0:
                 result["source"] = "scraped" if records_updated > 0 else "fallback"
             
+            self._publish_changes(data_source, records_updated, self.lottie_scraper.last_changes, result, run=run)
+            self.record_runs(run.finish(records_updated))
             return result
         except Exception as e:
             error_msg = str(e)
             logger.error("Failed to refresh Lottie data", error=error_msg)
             
-            if log_id:
-                self.log_update_complete(log_id, 0, error=error_msg)
+            self.record_runs(run.finish(0, error=error_msg))
             
             try:
                 self.telegram_alerts.send_error(data_source, e)
@@ -226,6 +225,126 @@ class DataIngestionService:
             
             return result
     
+    @staticmethod
+    def has_changes(records_updated: int, changes: Optional[ChangeSummary]) -> bool:
+        """
+        Whether a refresh changed data (and a new snapshot should be published).
+        
+        Args:
+            records_updated: Records saved by the refresh
+            changes: Diff computed by the loader's save_to_database() (None if none was computed)
+        """
+        return records_updated > 0 and (changes is None or not changes.is_empty)
+    
+    def record_changes(
+        self,
+        data_source: str,
+        records_updated: int,
+        changes: Optional[ChangeSummary],
+        result: dict
+    ) -> None:
+        """
+        Add the diff summary to a refresh result and send the success alert.
+        
+        Does not publish a snapshot (RefreshPipeline publishes once for all sources).
+        
+        Args:
+            data_source: Name of data source
+            records_updated: Records saved by the refresh
+            changes: Diff computed by the loader's save_to_database()
+            result: Refresh result dict; "changes" is added (None if no diff was computed)
+        """
+        result["changes"] = changes.to_dict() if changes is not None else None
+        
+        if changes is not None and changes.is_empty:
+            logger.info("Refresh found no data changes", data_source=data_source, changes=changes.describe())
+            return
+        
+        try:
+            self.telegram_alerts.send_success(
+                data_source,
+                records_updated,
+                changes=changes.describe() if changes is not None else None
+            )
+        except Exception as e:
+            logger.warning("Could not send Telegram alert", error=str(e))
+    
+    def _publish_changes(
+        self,
+        data_source: str,
+        records_updated: int,
+        changes: Optional[ChangeSummary],
+        result: dict,
+        run: Optional[RunRecord] = None
+    ) -> None:
+        """
+        record_changes(), then publish a new snapshot if the refresh changed data.
+        
+        Adds "snapshot_version" to result when published.
+        
+        Args:
+            data_source, records_updated, changes, result: as record_changes
+            run: Run record; the snapshot rebuild is timed as its invalidate stage
+        """
+        self.record_changes(data_source, records_updated, changes, result)
+        if self.has_changes(records_updated, changes):
+            with run.stage(STAGE_INVALIDATE) if run is not None else nullcontext():
+                result["snapshot_version"] = self.publish_snapshot()
+    
+    def publish_snapshot(self) -> Optional[int]:
+        """
+        Rebuild the pricing data snapshot from the database and publish it.
+        
+        Returns:
+            New snapshot version, or None if the rebuild failed
+        """
+        try:
+            return get_snapshot_store().refresh().version
+        except Exception as e:
+            logger.warning("Could not publish pricing data snapshot", error=str(e))
+            return None
+    
+    def get_snapshot_status(self) -> dict:
+        """
+        Get summary of the current pricing data snapshot.
+        
+        Returns:
+            Snapshot summary dict (version, sources, record counts)
+        """
+        return get_snapshot_store().current().summary()
+    
+    def get_msif_cache_status(self) -> dict:
+        """
+        Get status of the parsed MSIF workbook cache.
+        
+        Reports on the workbooks downloaded by this module and by pricing_calculator.
+        
+        Returns:
+            Cache status dict (format, hit/miss counters, per-workbook hash and
+            whether a parsed artifact exists)
+        """
+        from pricing_calculator.fair_cost_loader import CACHE_FILE_2024, CACHE_FILE_2025
+        from pricing_calculator.msif_cache import get_parsed_msif_cache
+        
+        sources = [
+            (self.msif_loader.cache_dir / "msif_2025.xlsx", 2025),
+            (self.msif_loader.cache_dir / "msif_2024.xlsx", 2024),
+            (CACHE_FILE_2025, 2025),
+            (CACHE_FILE_2024, 2024),
+        ]
+        return get_parsed_msif_cache().status(sources)
+    
+    def clear_msif_cache(self) -> int:
+        """
+        Remove all parsed MSIF artifacts (workbooks are reparsed on next load).
+        
+        Returns:
+            Number of artifacts removed
+        """
+        from pricing_calculator.msif_cache import get_parsed_msif_cache
+        
+        return get_parsed_msif_cache().clear()
+    
     def get_update_status(self) -> list:
         """
         Get status of recent data updates.
@@ -265,4 +384,60 @@ class DataIngestionService:
         except Exception as e:
             logger.warning("Could not get update status from database", error=str(e))
             return []
-
+    
+    def get_run_history(
+        self,
+        data_source: Optional[str] = None,
+        days: int = 30,
+        limit: int = 200
+    ) -> list:
+        """
+        Get recent runs with stage timings, bytes downloaded and row changes.
+        
+        Args:
+            data_source: Only runs of this source
+            days: Only runs started in the last days
+            limit: Maximum number of runs
+            
+        Returns:
+            List of run dicts, newest first
+            
+        Note:
+            Returns empty list if database is not available.
+        """
+        try:
+            return get_run_history(data_source=data_source, days=days, limit=limit)
+        except Exception as e:
+            logger.warning("Could not get run history from database", error=str(e))
+            return []
+    
+    def get_run_timeseries(
+        self,
+        data_source: Optional[str] = None,
+        days: int = 30,
+        bucket: str = "day"
+    ) -> list:
+        """
+        Get runs aggregated per time bucket (average stage timings, bytes, rows changed).
+        
+        Args:
+            data_source: Only runs of this source
+            days: Only runs started in the last days
+            bucket: "hour", "day" or "week"
+            
+        Returns:
+            List of bucket dicts, oldest first
+            
+        Raises:
+            ValueError: If bucket is unknown
+            
+        Note:
+            Returns empty list if database is not available.
+        """
+        try:
+            return get_run_timeseries(data_source=data_source, days=days, bucket=bucket)
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.warning("Could not get run time series from database", error=str(e))
+            return []
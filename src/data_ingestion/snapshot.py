@@ -0,0 +1,485 @@
+"""Immutable, versioned snapshot of pricing reference data.
+
+A ``PricingDataSnapshot`` holds MSIF fees (2025-26 and 2024-25) and Lottie regional
+averages. Snapshots are built off the request path (startup warm-up, scheduler refresh)
+and published by replacing a single reference, so every reader sees one consistent
+version for the whole calculation.
+A rebuild whose MSIF and Lottie data equal the current snapshot publishes nothing:
+the version stays and listeners are not called:
+
+    snapshot = get_snapshot_store().current()
+    fee = snapshot.msif_fee("Birmingham", "residential")
+    avg = snapshot.lottie_price("West Midlands", "residential")
+"""
+
+import hashlib
+import json
+import threading
+from datetime import datetime
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional
+
+import structlog
+
+from .config import config
+from .database import get_db_connection
+
+logger = structlog.get_logger(__name__)
+
+# MSIF years held in every snapshot
+MSIF_YEARS = (2025, 2024)
+
+# msif_fees_<year> column -> care type key used across pricing modules
+MSIF_COLUMNS = {
+    "residential_fee_65_plus": "residential",
+    "nursing_fee_65_plus": "nursing",
+    "residential_dementia_fee": "residential_dementia",
+    "nursing_dementia_fee": "nursing_dementia",
+    "respite_fee": "respite",
+}
+
+FeeTable = Dict[str, Dict[str, float]]
+
+
+def _freeze(table: Mapping[str, Mapping[str, float]]) -> Mapping[str, Mapping[str, float]]:
+    """Return a read-only copy of a two-level mapping."""
+    return MappingProxyType({key: MappingProxyType(dict(values)) for key, values in table.items()})
+
+
+def _content_hash(msif: Mapping[int, Mapping], lottie: Mapping) -> str:
+    """Digest of MSIF and Lottie data (order-independent)."""
+    payload = {
+        "msif": {str(year): {key: dict(values) for key, values in table.items()} for year, table in msif.items()},
+        "lottie": {key: dict(values) for key, values in lottie.items()},
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+class PricingDataSnapshot:
+    """
+    Read-only view of pricing reference data at one version.
+
+    Attributes:
+        version: Monotonic version number (per process)
+        created_at: When the snapshot was built
+        sources: Data source per dataset (e.g. {"msif_2025": "database", "lottie": "database"})
+        content_hash: Digest of the MSIF and Lottie data (equal data, equal hash)
+    """
+
+    __slots__ = ("version", "created_at", "sources", "content_hash", "_msif", "_lottie")
+
+    def __init__(
+        self,
+        version: int,
+        msif: Optional[Mapping[int, FeeTable]] = None,
+        lottie: Optional[FeeTable] = None,
+        sources: Optional[Mapping[str, str]] = None,
+        created_at: Optional[datetime] = None,
+    ):
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "created_at", created_at or datetime.now())
+        object.__setattr__(self, "sources", MappingProxyType(dict(sources or {})))
+        object.__setattr__(
+            self,
+            "_msif",
+            MappingProxyType({year: _freeze(table) for year, table in (msif or {}).items()}),
+        )
+        object.__setattr__(self, "_lottie", _freeze(lottie or {}))
+        object.__setattr__(self, "content_hash", _content_hash(self._msif, self._lottie))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PricingDataSnapshot is immutable")
+
+    def msif_fees(self, year: int = 2025) -> Mapping[str, Mapping[str, float]]:
+        """
+        Get MSIF fees for a year.
+
+        Args:
+            year: MSIF year (2025 = 2025-26, 2024 = 2024-25)
+
+        Returns:
+            Read-only mapping {local_authority: {care_type: fee}} (empty if not loaded)
+        """
+        return self._msif.get(year, MappingProxyType({}))
+
+    def msif_fee(self, local_authority: str, care_type: str, year: int = 2025) -> Optional[float]:
+        """
+        Get a single MSIF fee.
+
+        Args:
+            local_authority: Local authority name
+            care_type: Care type key ("residential", "nursing", "residential_dementia", ...)
+            year: MSIF year
+
+        Returns:
+            Fee in GBP per week, or None if not available
+        """
+        fees = self.msif_fees(year).get(local_authority)
+        if not fees:
+            return None
+        return fees.get(care_type)
+
+    @property
+    def lottie(self) -> Mapping[str, Mapping[str, float]]:
+        """Lottie averages as read-only mapping {region: {care_type: price_per_week}}."""
+        return self._lottie
+
+    def lottie_price(self, region: str, care_type: str) -> Optional[float]:
+        """
+        Get a Lottie regional average.
+
+        Args:
+            region: Region name as stored (e.g. "West Midlands")
+            care_type: Lottie care type ("residential", "nursing", "dementia", "respite")
+
+        Returns:
+            Price per week, or None if not available
+        """
+        prices = self._lottie.get(region)
+        if not prices:
+            return None
+        return prices.get(care_type)
+
+    def summary(self) -> Dict:
+        """
+        Get a JSON-serializable summary (for admin endpoints and logs).
+
+        Returns:
+            Dict with version, created_at, sources and record counts
+        """
+        return {
+            "version": self.version,
+            "created_at": self.created_at.isoformat(),
+            "content_hash": self.content_hash,
+            "sources": dict(self.sources),
+            "msif_local_authorities": {
+                str(year): len(table) for year, table in self._msif.items()
+            },
+            "lottie_regions": len(self._lottie),
+        }
+
+
+def load_msif_from_database(year: int) -> FeeTable:
+    """
+    Load all MSIF fees for a year in one query.
+
+    Args:
+        year: MSIF year
+
+    Returns:
+        Dict mapping {local_authority: {care_type: fee}} (empty if unavailable)
+    """
+    columns = list(MSIF_COLUMNS)
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT local_authority, {", ".join(columns)}
+                FROM msif_fees_{year}
+            """)
+            rows = cursor.fetchall()
+    except Exception as e:
+        logger.warning("Could not load MSIF data from database", year=year, error=str(e))
+        return {}
+
+    result: FeeTable = {}
+    for row in rows:
+        fees = {
+            MSIF_COLUMNS[column]: float(value)
+            for column, value in zip(columns, row[1:])
+            if value
+        }
+        if fees:
+            result[row[0]] = fees
+    return result
+
+
+def load_lottie_from_database() -> FeeTable:
+    """
+    Load all Lottie regional averages in one query.
+
+    Returns:
+        Dict mapping {region: {care_type: price_per_week}} (empty if unavailable)
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT region, care_type, price_per_week
+                FROM lottie_regional_averages
+                ORDER BY updated_at ASC
+            """)
+            rows = cursor.fetchall()
+    except Exception as e:
+        logger.warning("Could not load Lottie data from database", error=str(e))
+        return {}
+
+    result: FeeTable = {}
+    # Ordered by updated_at so the latest row wins
+    for region, care_type, price in rows:
+        if price:
+            result.setdefault(region, {})[care_type] = float(price)
+    return result
+
+
+def _load_msif_from_files(year: int) -> FeeTable:
+    """
+    Fallback: MSIF fees from the cached gov.uk workbook (pricing_calculator loader).
+
+    Only already-downloaded files are parsed; building a snapshot never downloads.
+    """
+    try:
+        from pricing_calculator.fair_cost_loader import (
+            CACHE_FILE_2024,
+            CACHE_FILE_2025,
+            _parse_msif_xls,
+        )
+    except ImportError:
+        return {}
+
+    path = CACHE_FILE_2025 if year == 2025 else CACHE_FILE_2024
+    if not path.exists():
+        return {}
+    try:
+        return _parse_msif_xls(path, year=year)
+    except Exception as e:
+        logger.warning("Could not load MSIF data from files", year=year, error=str(e))
+        return {}
+
+
+def load_snapshot_data() -> Dict:
+    """
+    Load all datasets for a new snapshot.
+
+    MSIF comes from the database, falling back to the cached gov.uk workbook if one
+    was already downloaded.
+    Lottie comes from the database; pricing modules apply their own constants fallback
+    for regions missing here.
+
+    Returns:
+        Dict with "msif", "lottie" and "sources" keys (PricingDataSnapshot arguments)
+    """
+    msif: Dict[int, FeeTable] = {}
+    sources: Dict[str, str] = {}
+
+    for year in MSIF_YEARS:
+        fees = load_msif_from_database(year)
+        source = "database"
+        if not fees:
+            fees = _load_msif_from_files(year)
+            source = "file"
+        if fees:
+            msif[year] = fees
+            sources[f"msif_{year}"] = source
+
+    lottie = load_lottie_from_database()
+    if lottie:
+        sources["lottie"] = "database"
+
+    return {"msif": msif, "lottie": lottie, "sources": sources}
+
+
+class SnapshotStore:
+    """
+    Holds the current ``PricingDataSnapshot`` and publishes new versions.
+
+    Readers call ``current()`` and get a reference to an immutable snapshot; publishing
+    builds the next snapshot completely before swapping the reference, so readers never
+    observe a partially updated dataset. In multi-process deployments each process owns
+    a store; snapshots older than ``max_age_seconds`` are rebuilt in the background.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Dict] = load_snapshot_data,
+        max_age_seconds: Optional[int] = None,
+    ):
+        """
+        Initialize snapshot store.
+
+        Args:
+            loader: Callable returning PricingDataSnapshot arguments (msif, lottie, sources)
+            max_age_seconds: Rebuild snapshots older than this in the background
+                (default from config; 0 disables)
+        """
+        self._loader = loader
+        self._max_age_seconds = (
+            config.snapshot_max_age_seconds if max_age_seconds is None else max_age_seconds
+        )
+        self._current: Optional[PricingDataSnapshot] = None
+        # Last rebuild that found the data unchanged (resets staleness)
+        self._verified_at: Optional[datetime] = None
+        self._version = 0
+        self._lock = threading.Lock()
+        # Serializes listener calls (outside _lock; reentrant so listeners may publish)
+        self._notify_lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._listeners: List[Callable[[PricingDataSnapshot], None]] = []
+
+    def current(self) -> PricingDataSnapshot:
+        """
+        Get the current snapshot, building the first one on demand.
+
+        Returns:
+            Current PricingDataSnapshot
+        """
+        snapshot = self._current
+        if snapshot is None:
+            built = None
+            with self._lock:
+                if self._current is None:
+                    built = PricingDataSnapshot(self._next_version(), **self._loader())
+                    self._swap(built)
+                snapshot = self._current
+            if built is not None:
+                self._notify(built)
+        elif self._is_stale(snapshot):
+            self._refresh_in_background()
+        return snapshot
+
+    @property
+    def version(self) -> int:
+        """Version of the current snapshot (0 if none built yet)."""
+        snapshot = self._current
+        return snapshot.version if snapshot else 0
+
+    def refresh(self) -> PricingDataSnapshot:
+        """
+        Rebuild the snapshot from sources and publish it.
+
+        Datasets the loader could not provide are carried over from the current snapshot.
+
+        Returns:
+            Newly published snapshot (the current one if the data is unchanged)
+        """
+        data = self._loader()
+        if self._current is None:
+            with self._lock:
+                snapshot = None
+                if self._current is None:
+                    snapshot = PricingDataSnapshot(self._next_version(), **data)
+                    self._swap(snapshot)
+            if snapshot is not None:
+                self._notify(snapshot)
+                return snapshot
+
+        # Keep the previous datasets for sources that returned nothing (e.g. DB down)
+        return self.publish(
+            msif=data["msif"],
+            lottie=data["lottie"] or None,
+            sources=data["sources"],
+        )
+
+    def publish(
+        self,
+        msif: Optional[Mapping[int, FeeTable]] = None,
+        lottie: Optional[FeeTable] = None,
+        sources: Optional[Mapping[str, str]] = None,
+    ) -> PricingDataSnapshot:
+        """
+        Publish a new version with some datasets replaced.
+
+        Datasets not passed are carried over from the current snapshot. If the
+        resulting MSIF and Lottie data equal the current snapshot's, nothing is
+        published (same version, listeners not called).
+
+        Args:
+            msif: MSIF fees to replace, by year
+            lottie: Lottie averages to replace
+            sources: Source labels for the replaced datasets
+
+        Returns:
+            Newly published snapshot, or the current one if the data is unchanged
+        """
+        self.current()
+        with self._lock:
+            # Merge into the snapshot current under the lock, so concurrent
+            # publishes of different datasets do not drop each other's data
+            base = self._current
+            merged_msif = {year: base.msif_fees(year) for year in MSIF_YEARS if base.msif_fees(year)}
+            merged_msif.update(msif or {})
+            merged_sources = dict(base.sources)
+            merged_sources.update(sources or {})
+            snapshot = PricingDataSnapshot(
+                self._version + 1,
+                msif=merged_msif,
+                lottie=base.lottie if lottie is None else lottie,
+                sources=merged_sources,
+            )
+            if snapshot.content_hash == base.content_hash:
+                self._verified_at = datetime.now()
+                logger.debug("Pricing data unchanged, snapshot kept", version=base.version)
+                return base
+            self._next_version()
+            self._swap(snapshot)
+        self._notify(snapshot)
+        return snapshot
+
+    def add_listener(self, callback: Callable[[PricingDataSnapshot], None]) -> None:
+        """
+        Register a callback invoked after each new version is published.
+
+        Args:
+            callback: Called with the new snapshot (exceptions are logged and ignored)
+        """
+        self._listeners.append(callback)
+
+    def _next_version(self) -> int:
+        self._version += 1
+        return self._version
+
+    def _swap(self, snapshot: PricingDataSnapshot) -> None:
+        """Publish snapshot (caller holds the lock; call _notify after releasing it)."""
+        self._current = snapshot
+        logger.info("Published pricing data snapshot", **snapshot.summary())
+
+    def _notify(self, snapshot: PricingDataSnapshot) -> None:
+        """Call listeners with snapshot unless a newer version has replaced it."""
+        with self._notify_lock:
+            if self._current is not snapshot:
+                return
+            for callback in list(self._listeners):
+                try:
+                    callback(snapshot)
+                except Exception as e:
+                    logger.warning("Snapshot listener failed", error=str(e))
+
+    def _is_stale(self, snapshot: PricingDataSnapshot) -> bool:
+        if not self._max_age_seconds:
+            return False
+        checked_at = snapshot.created_at
+        if self._verified_at is not None and self._verified_at > checked_at:
+            checked_at = self._verified_at
+        age = (datetime.now() - checked_at).total_seconds()
+        return age > self._max_age_seconds
+
+    def _refresh_in_background(self) -> None:
+        """Start a single background rebuild (no-op if one is already running)."""
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+
+        def run():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning("Background snapshot refresh failed", error=str(e))
+            finally:
+                self._refresh_lock.release()
+
+        threading.Thread(target=run, name="snapshot-refresh", daemon=True).start()
+
+
+# Global store instance
+_store: Optional[SnapshotStore] = None
+_store_lock = threading.Lock()
+
+
+def get_snapshot_store() -> SnapshotStore:
+    """Get or create the process-wide SnapshotStore."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SnapshotStore()
+    return _store
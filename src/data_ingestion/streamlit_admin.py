@@ -120,3 +120,72 @@ try:
 except Exception as e:
     st.error(f"❌ Error loading update status: {e}")
 
+
+st.divider()
+
+# Run history charts
+st.subheader("⏱️ Run History")
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    history_source = st.selectbox(
+        "Data Source",
+        ["All", "MSIF 2025", "MSIF 2024", "Lottie Regional Averages"],
+    )
+with col2:
+    history_days = st.slider("Days", min_value=1, max_value=90, value=30)
+with col3:
+    history_bucket = st.selectbox("Bucket", ["day", "hour", "week"])
+
+try:
+    points = service.get_run_timeseries(
+        data_source=None if history_source == "All" else history_source,
+        days=history_days,
+        bucket=history_bucket,
+    )
+    
+    if points:
+        ts = pd.DataFrame(points)
+        
+        # Average stage timings (summed over sources per bucket)
+        stage_columns = {
+            f"avg_{stage}_seconds": stage.capitalize()
+            for stage in ("download", "parse", "diff", "write", "invalidate")
+        }
+        stages_df = (
+            ts.groupby("bucket")[list(stage_columns)].sum(min_count=1)
+            .rename(columns=stage_columns)
+            .astype(float)
+        )
+        st.markdown("**Average stage time (s)**")
+        st.area_chart(stages_df)
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("**Bytes downloaded**")
+            st.bar_chart(ts.pivot_table(index="bucket", columns="data_source",
+                                        values="bytes_downloaded", aggfunc="sum"))
+        with col2:
+            st.markdown("**Rows changed**")
+            st.bar_chart(ts.pivot_table(index="bucket", columns="data_source",
+                                        values="rows_changed", aggfunc="sum"))
+        
+        st.markdown("**Runs and failures**")
+        st.line_chart(ts.groupby("bucket")[["runs", "failures"]].sum())
+    else:
+        st.info("No run history in the selected period.")
+    
+    runs = service.get_run_history(
+        data_source=None if history_source == "All" else history_source,
+        days=history_days,
+        limit=50,
+    )
+    if runs:
+        with st.expander("Recent runs"):
+            st.dataframe(
+                pd.DataFrame(runs).drop(columns=["error_message"]),
+                use_container_width=True,
+                hide_index=True
+            )
+except Exception as e:
+    st.error(f"❌ Error loading run history: {e}")
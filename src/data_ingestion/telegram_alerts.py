@@ -57,18 +57,21 @@ class TelegramAlerts:
             # Don't raise exception - alerts shouldn't break the main flow
             return False
     
-    def send_success(self, data_source: str, records_updated: int) -> bool:
+    def send_success(self, data_source: str, records_updated: int, changes: Optional[str] = None) -> bool:
         """
         Send success notification.
         
         Args:
             data_source: Name of data source (e.g., "MSIF 2025")
             records_updated: Number of records updated
+            changes: Optional change summary (e.g., "2 added, 5 changed, 0 removed, 143 unchanged")
             
         Returns:
             True if sent successfully
         """
         message = f"✅ {data_source} updated successfully\n\nRecords updated: {records_updated}"
+        if changes:
+            message += f"\nChanges: {changes}"
         return self.send_alert(message)
     
     def send_error(self, data_source: str, error: Exception) -> bool:
@@ -0,0 +1,67 @@
+"""Tests for change_detection.py."""
+
+from decimal import Decimal
+
+from data_ingestion.change_detection import ChangeSummary, diff_records, hash_rows, record_hash
+
+
+class TestRecordHash:
+    """Test record_hash function."""
+    
+    def test_matches_database_rounding(self):
+        """Test floats hash like the NUMERIC(10, 2) value stored for them."""
+        assert record_hash([978.712, None]) == record_hash([Decimal("978.71"), None])
+        assert record_hash([1116.0 * 1.12]) == record_hash([Decimal("1249.92")])
+        assert record_hash([0.125]) == record_hash([Decimal("0.13")])  # half-up
+    
+    def test_detects_differences(self):
+        """Test changed values, NULLs and field order change the hash."""
+        assert record_hash([950.0]) != record_hash([950.01])
+        assert record_hash([None]) != record_hash([0])
+        assert record_hash([1, None]) != record_hash([None, 1])
+
+
+class TestDiffRecords:
+    """Test diff_records function."""
+    
+    def test_diff(self):
+        """Test added, changed, removed and unchanged keys."""
+        current = hash_rows([("Barnet", 1116.0), ("Camden", 1200.0), ("Kent", 900.0)])
+        incoming = hash_rows([("Barnet", 1116.0), ("Camden", 1250.0), ("Luton", 800.0)])
+        
+        changes = diff_records(current, incoming)
+        
+        assert changes.added == ["Luton"]
+        assert changes.changed == ["Camden"]
+        assert changes.removed == ["Kent"]
+        assert changes.unchanged == 1
+        assert changes.to_write == ["Luton", "Camden"]
+        assert not changes.is_empty
+        assert changes.describe() == "1 added, 1 changed, 1 removed, 1 unchanged"
+    
+    def test_removals_only_is_empty(self):
+        """Test a diff with only removals writes nothing."""
+        changes = diff_records(hash_rows([("Kent", 900.0)]), {})
+        assert changes.is_empty
+        assert changes.removed == ["Kent"]
+    
+    def test_composite_keys(self):
+        """Test multi-field keys are tuples and formatted with '/'."""
+        current = hash_rows([("London", "residential", 950.0)], key_size=2)
+        incoming = hash_rows([("London", "residential", 975.0)], key_size=2)
+        
+        changes = diff_records(current, incoming)
+        
+        assert changes.changed == [("London", "residential")]
+        assert changes.to_dict()["changed_keys"] == ["London/residential"]
+
+
+def test_to_dict_truncates_keys():
+    """Test key lists are truncated but counts are not."""
+    summary = ChangeSummary([f"LA {i}" for i in range(30)], [], [], 5)
+    
+    data = summary.to_dict(max_keys=10)
+    
+    assert data["added"] == 30
+    assert len(data["added_keys"]) == 10
+    assert data["unchanged"] == 5
@@ -0,0 +1,200 @@
+"""Tests for locking.py."""
+
+import os
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from data_ingestion.exceptions import StaleLeaseError
+from data_ingestion.locking import (
+    LocalJobLock,
+    PostgresJobLock,
+    RedisJobLock,
+    _advisory_key,
+    check_fencing_token,
+)
+
+
+@pytest.fixture
+def redis_client():
+    """Shared fakeredis server, as seen by several instances."""
+    fakeredis = pytest.importorskip("fakeredis")
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+class TestRedisJobLock:
+    """Test RedisJobLock class."""
+
+    def test_one_holder(self, redis_client):
+        """Test only one instance holds the lock until it is released."""
+        first, second = RedisJobLock(redis_client), RedisJobLock(redis_client)
+
+        lease = first.acquire("refresh_all", ttl_seconds=60)
+        assert lease is not None
+        assert second.acquire("refresh_all", ttl_seconds=60) is None
+
+        assert first.release(lease) is True
+        assert second.acquire("refresh_all", ttl_seconds=60) is not None
+
+    def test_fencing_tokens_increase(self, redis_client):
+        """Test every acquisition gets a higher token."""
+        lock = RedisJobLock(redis_client)
+        tokens = []
+        for _ in range(3):
+            lease = lock.acquire("refresh_all", ttl_seconds=60)
+            tokens.append(lease.token)
+            lock.release(lease)
+        assert tokens == sorted(tokens) and len(set(tokens)) == 3
+
+    def test_expired_lease_not_released_by_old_owner(self, redis_client):
+        """Test an expired holder cannot delete the lock of the new holder."""
+        old, new = RedisJobLock(redis_client), RedisJobLock(redis_client)
+        stale = old.acquire("refresh_all", ttl_seconds=60)
+        redis_client.delete("rch:ingestion:lock:refresh_all")  # lease expired
+
+        current = new.acquire("refresh_all", ttl_seconds=60)
+
+        assert current.token > stale.token
+        assert old.release(stale) is False
+        assert redis_client.get("rch:ingestion:lock:refresh_all") == f"{new.owner}:{current.token}"
+
+    def test_ttl_set(self, redis_client):
+        """Test the lock key expires."""
+        RedisJobLock(redis_client).acquire("refresh_all", ttl_seconds=30)
+        assert 0 < redis_client.pttl("rch:ingestion:lock:refresh_all") <= 30000
+
+    def test_generation(self, redis_client):
+        """Test generations are shared between instances."""
+        leader, follower = RedisJobLock(redis_client), RedisJobLock(redis_client)
+        assert follower.generation() == 0
+        assert leader.bump_generation() == 1
+        assert follower.generation() == 1
+
+    def test_concurrent_acquire(self, redis_client):
+        """Test exactly one of many concurrent instances wins."""
+        locks = [RedisJobLock(redis_client) for _ in range(8)]
+        barrier = threading.Barrier(len(locks))
+        leases = []
+
+        def contend(lock):
+            barrier.wait()
+            leases.append(lock.acquire("refresh_all", ttl_seconds=60))
+
+        threads = [threading.Thread(target=contend, args=(lock,)) for lock in locks]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sum(lease is not None for lease in leases) == 1
+
+
+class TestLocalJobLock:
+    """Test LocalJobLock class."""
+
+    def test_acquire_release(self):
+        """Test the in-process lock is exclusive and not shared."""
+        lock = LocalJobLock()
+        lease = lock.acquire("refresh_all")
+        assert lock.acquire("refresh_all") is None
+        assert lock.release(lease) is True
+        assert lock.release(lease) is False
+        assert lock.acquire("refresh_all").token == lease.token + 1
+        assert lock.shared is False
+
+
+class TestPostgresJobLock:
+    """Test PostgresJobLock class with a mocked connection."""
+
+    def test_not_acquired(self):
+        """Test a taken advisory lock returns None and closes the connection."""
+        conn = MagicMock()
+        conn.cursor.return_value.fetchone.return_value = (False,)
+
+        assert PostgresJobLock(connect=lambda: conn).acquire("refresh_all") is None
+        conn.cursor.return_value.execute.assert_called_once_with(
+            "SELECT pg_try_advisory_lock(%s)", (_advisory_key("refresh_all"),)
+        )
+        conn.close.assert_called_once()
+
+    def test_acquired_holds_connection(self):
+        """Test the lease keeps the session open until release."""
+        conn = MagicMock()
+        conn.cursor.return_value.fetchone.side_effect = [(True,), (5,), (True,)]
+        lock = PostgresJobLock(connect=lambda: conn)
+
+        lease = lock.acquire("refresh_all")
+
+        assert lease.token == 5
+        conn.close.assert_not_called()
+        assert lock.release(lease) is True
+        conn.close.assert_called_once()
+
+    def test_advisory_key_stable(self):
+        """Test keys are stable signed 64-bit integers."""
+        assert _advisory_key("refresh_all") == _advisory_key("refresh_all")
+        assert _advisory_key("refresh_all") != _advisory_key("sync_snapshot")
+        assert -2 ** 63 <= _advisory_key("refresh_all") < 2 ** 63
+
+
+class TestFencingToken:
+    """Test check_fencing_token function."""
+
+    def test_current_token_accepted(self):
+        """Test a token not lower than the last writer's passes."""
+        cursor = MagicMock()
+        cursor.fetchone.return_value = (7,)
+        check_fencing_token(cursor, "msif_fees_2025", 7)
+        assert cursor.execute.call_args.args[1] == ("fence:msif_fees_2025", 7)
+
+    def test_stale_token_rejected(self):
+        """Test a lower token raises StaleLeaseError."""
+        cursor = MagicMock()
+        cursor.fetchone.return_value = None
+        with pytest.raises(StaleLeaseError):
+            check_fencing_token(cursor, "msif_fees_2025", 3)
+
+    def test_msif_save_rejects_stale_token(self, tmp_path):
+        """Test the MSIF write is not swallowed when the lease is stale."""
+        from unittest.mock import patch
+        from data_ingestion.msif_loader import MSIFLoader
+
+        loader = MSIFLoader(cache_dir=tmp_path)
+        with patch("data_ingestion.msif_loader.get_db_connection") as mock_db:
+            cursor = mock_db.return_value.__enter__.return_value.cursor.return_value
+            cursor.fetchone.return_value = None
+            with pytest.raises(StaleLeaseError):
+                loader.save_to_database({"Kent": {"residential": 900.0}}, 2025, fencing_token=1)
+            assert not any("INSERT INTO msif_fees_2025" in c.args[0] for c in cursor.execute.call_args_list)
+
+
+@pytest.mark.skipif(
+    os.getenv("DATA_INGESTION_TEST_DB") != "1",
+    reason="Set DATA_INGESTION_TEST_DB=1 to run against the configured PostgreSQL"
+)
+def test_postgres_lock_real_database():
+    """Test advisory locking and fencing against a real PostgreSQL."""
+    from data_ingestion.database import get_db_connection, init_database
+
+    init_database()
+    first, second = PostgresJobLock(), PostgresJobLock()
+    lease = first.acquire("test_lock")
+    try:
+        assert lease is not None
+        assert second.acquire("test_lock") is None
+        with get_db_connection() as conn:
+            check_fencing_token(conn.cursor(), "test_resource", lease.token)
+    finally:
+        first.release(lease)
+
+    newer = second.acquire("test_lock")
+    try:
+        assert newer.token > lease.token
+        with get_db_connection() as conn:
+            check_fencing_token(conn.cursor(), "test_resource", newer.token)
+        with pytest.raises(StaleLeaseError):
+            with get_db_connection() as conn:
+                check_fencing_token(conn.cursor(), "test_resource", lease.token)
+    finally:
+        second.release(newer)
@@ -1,13 +1,143 @@
 """Tests for Lottie scraper."""
 
+import asyncio
+import json
+import random
+import re
+import time
+
 import pytest
+from contextlib import contextmanager
 from pathlib import Path
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
 import httpx
-from data_ingestion.lottie_scraper import LottieScraper
+from data_ingestion.lottie_scraper import REGION_ALIASES, LottieScraper, match_region
 from data_ingestion.exceptions import LottieScrapingError
 
 
+@contextmanager
+def mock_http(handler):
+    """Patch the sync and async httpx clients with an httpx MockTransport."""
+    real_client, real_async_client = httpx.Client, httpx.AsyncClient
+    transport = httpx.MockTransport(handler)
+    with patch(
+        "pricing_calculator.downloader.httpx.Client",
+        side_effect=lambda **kwargs: real_client(transport=transport),
+    ), patch(
+        "data_ingestion.lottie_scraper.httpx.AsyncClient",
+        side_effect=lambda **kwargs: real_async_client(transport=transport, **kwargs),
+    ) as async_client:
+        yield async_client
+
+
+def legacy_extract_regional_prices(html_content):
+    """Extraction loop of the previous LottieScraper.extract_regional_prices()."""
+    from selectolax.parser import HTMLParser
+    
+    parser = HTMLParser(html_content)
+    result = {}
+    
+    def prices_in(text):
+        prices = []
+        for price_match in re.findall(r'£[\d,]+', text.replace(',', '')):
+            try:
+                price = float(price_match.replace('£', '').replace(',', ''))
+                if 500 <= price <= 3000:
+                    prices.append(price)
+            except ValueError:
+                pass
+        return prices
+    
+    for table in parser.css("table"):
+        for row in table.css("tr"):
+            cells = [cell.text(strip=True) for cell in row.css("td, th")]
+            if len(cells) < 2:
+                continue
+            for i, cell in enumerate(cells):
+                matched_region = None
+                for region, aliases in REGION_ALIASES.items():
+                    if any(alias.lower() in cell.lower() for alias in aliases):
+                        matched_region = region
+                        break
+                if matched_region:
+                    prices_found = []
+                    for j in range(max(0, i-2), min(len(cells), i+3)):
+                        prices_found.extend(prices_in(cells[j]))
+                    if prices_found:
+                        if matched_region not in result:
+                            result[matched_region] = prices_found[0]
+                        else:
+                            result[matched_region] = sum(prices_found) / len(prices_found)
+    
+    for elem in parser.css("div.price, span.price, [class*='price'], [class*='cost']"):
+        for price in prices_in(elem.text(strip=True)):
+            parent = elem.parent
+            if parent:
+                parent_text = parent.text(strip=True)
+                for region, aliases in REGION_ALIASES.items():
+                    if any(alias.lower() in parent_text.lower() for alias in aliases):
+                        if region not in result:
+                            result[region] = price
+                        break
+    
+    for script in parser.css("script"):
+        script_text = script.text()
+        if script_text and ('price' in script_text.lower() or 'cost' in script_text.lower()):
+            for json_match in re.findall(r'\{[^{}]*"price"[^{}]*\}', script_text):
+                try:
+                    data = json.loads(json_match)
+                    if 'price' in data:
+                        price = float(str(data['price']).replace('£', '').replace(',', ''))
+                        if 500 <= price <= 3000:
+                            for region, aliases in REGION_ALIASES.items():
+                                if any(alias.lower() in script_text.lower() for alias in aliases):
+                                    if region not in result:
+                                        result[region] = price
+                except (json.JSONDecodeError, ValueError, KeyError):
+                    pass
+    return result
+
+
+def make_lottie_page(seed, n_rows=400):
+    """Lottie-like page: price table, price widgets and an embedded JSON script."""
+    rnd = random.Random(seed)
+    names = [alias for aliases in REGION_ALIASES.values() for alias in aliases]
+    names += ["Kent", "Devon", "England average", "North East England and Cumbria"]
+    
+    def price():
+        return f"£{rnd.randint(400, 3200):,}"
+    
+    rows = "".join(
+        f"<tr><td>{rnd.choice(names)}</td><td>{price()}</td><td>{price()}</td>"
+        f"<td>{rnd.choice(['per week', 'n/a', ''])}</td></tr>"
+        for _ in range(n_rows)
+    )
+    widgets = "".join(
+        f"<div><span>{rnd.choice(names)} care homes</span><span class='price'>{price()}</span></div>"
+        for _ in range(n_rows // 2)
+    )
+    entries = ",".join(
+        json.dumps({"price": price(), "region": rnd.choice(names)}) for _ in range(n_rows // 8)
+    )
+    return (
+        f"<html><body><table><tr><th>Region</th><th>Weekly</th></tr>{rows}</table>"
+        f"{widgets}<script>var averages = [{entries}];</script></body></html>"
+    )
+
+
+@pytest.fixture
+def cached_pages(tmp_path):
+    """Generated Lottie pages, stored as the scraper's cached HTML files."""
+    cache_dir = tmp_path / "lottie_pages"
+    cache_dir.mkdir()
+    pages = {}
+    for seed, care_type in enumerate(["residential", "nursing", "dementia"]):
+        path = cache_dir / f"{care_type}.html"
+        path.write_text(make_lottie_page(seed), encoding="utf-8")
+        pages[care_type] = path.read_text(encoding="utf-8")
+    return pages
+
+
 @pytest.fixture
 def lottie_scraper(tmp_path):
     """Create LottieScraper instance with temp cache dir."""
@@ -52,14 +182,16 @@ class TestLottieScraper:
     
     def test_fetch_page_success(self, lottie_scraper):
         """Test successful page fetch."""
-        url = "https://example.com/test"
+        url = "https://example.com/test/"
         html_content = "<html><body>Test</body></html>"
         
         with patch('httpx.Client') as mock_client:
             mock_response = Mock()
-            mock_response.text = html_content
+            mock_response.status_code = 200
+            mock_response.headers = {}
+            mock_response.iter_bytes.return_value = [html_content.encode("utf-8")]
             mock_response.raise_for_status = Mock()
-            mock_client.return_value.__enter__.return_value.get.return_value = mock_response
+            mock_client.return_value.stream.return_value.__enter__.return_value = mock_response
             
             result = lottie_scraper.fetch_page(url)
             
@@ -69,12 +201,13 @@ class TestLottieScraper:
     
     def test_fetch_page_http_error(self, lottie_scraper):
         """Test page fetch with HTTP error."""
-        url = "https://example.com/test"
+        url = "https://example.com/test/"
         
         with patch('httpx.Client') as mock_client:
             mock_response = Mock()
+            mock_response.status_code = 404
             mock_response.raise_for_status.side_effect = httpx.HTTPError("HTTP 404")
-            mock_client.return_value.__enter__.return_value.get.return_value = mock_response
+            mock_client.return_value.stream.return_value.__enter__.return_value = mock_response
             
             with pytest.raises(LottieScrapingError):
                 lottie_scraper.fetch_page(url)
@@ -113,6 +246,35 @@ class TestLottieScraper:
             assert mock_cursor.execute.called
             assert mock_conn.commit.called
     
+    def test_save_to_database_only_changed(self, lottie_scraper):
+        """Test only prices that differ from the database are written."""
+        from decimal import Decimal
+        
+        data = {
+            "residential": {"London": 950.0, "South East": 860.0},
+            "nursing": {"London": 1200.0},
+        }
+        
+        with patch('data_ingestion.lottie_scraper.get_db_connection') as mock_db:
+            mock_conn = MagicMock()
+            mock_cursor = MagicMock()
+            mock_cursor.fetchall.return_value = [
+                ("London", "residential", Decimal("950.00")),
+                ("South East", "residential", Decimal("850.00")),
+                ("London", "nursing", Decimal("1200.00")),
+            ]
+            mock_conn.cursor.return_value = mock_cursor
+            mock_db.return_value.__enter__.return_value = mock_conn
+            
+            assert lottie_scraper.save_to_database(data) == 3
+            
+            inserts = [c for c in mock_cursor.execute.call_args_list if "INSERT" in c.args[0]]
+            assert len(inserts) == 1
+            assert list(inserts[0].args[1]) == ["South East", "residential", 860.0]
+        
+        assert lottie_scraper.last_changes.changed == [("South East", "residential")]
+        assert lottie_scraper.last_changes.unchanged == 2
+    
     def test_load_lottie_data_full_flow(self, lottie_scraper):
         """Test full Lottie data loading flow."""
         html_content = """
@@ -125,11 +287,147 @@ class TestLottieScraper:
         </html>
         """
         
-        with patch.object(lottie_scraper, 'fetch_page', return_value=html_content), \
+        with patch.object(lottie_scraper, 'fetch_page_async', AsyncMock(return_value=html_content)), \
              patch.object(lottie_scraper, 'save_to_database', return_value=3) as mock_save:
             
             records = lottie_scraper.load_lottie_data()
             
             assert records == 3
             assert mock_save.called
+    
+    def test_load_lottie_data_not_modified(self, lottie_scraper, sample_html):
+        """Test parse and database write are skipped when no page changed."""
+        def handler(request):
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, text=sample_html, headers={"ETag": '"v1"'})
+        
+        with mock_http(handler), \
+             patch.object(lottie_scraper, 'extract_regional_prices',
+                          wraps=lottie_scraper.extract_regional_prices) as mock_extract, \
+             patch.object(lottie_scraper, 'save_to_database', return_value=6) as mock_save:
+            
+            assert lottie_scraper.load_lottie_data(use_fallback=False) == 6
+            assert mock_extract.call_count == 3
+            
+            assert lottie_scraper.load_lottie_data(use_fallback=False) == 0
+            assert lottie_scraper.last_not_modified is True
+            assert mock_extract.call_count == 3
+            assert mock_save.call_count == 1
+
+
+class TestSinglePassExtraction:
+    """Parity of the single-pass extractor with the previous alias loops."""
+    
+    def test_match_region_priority(self):
+        """Test overlapping aliases resolve like the previous loop (dict order)."""
+        assert match_region("North East England") == "North East"
+        assert match_region("South East England") == "South East"
+        assert match_region("East of England") == "East of England"
+        assert match_region("greater london") == "London"
+        assert match_region("Kent") is None
+    
+    def test_parity_with_legacy(self, lottie_scraper, cached_pages):
+        """Test identical results on generated pages."""
+        for care_type, html in cached_pages.items():
+            expected = legacy_extract_regional_prices(html)
+            assert expected
+            assert lottie_scraper.extract_regional_prices(html, care_type) == expected
+        for seed in range(10, 30):
+            html = make_lottie_page(seed, n_rows=40)
+            assert lottie_scraper.extract_regional_prices(html, "residential") == \
+                legacy_extract_regional_prices(html)
+    
+    def test_parse_cache_reuses_unchanged_html(self, lottie_scraper, cached_pages):
+        """Test unchanged HTML is parsed once and results are not shared."""
+        html = cached_pages["residential"]
+        with patch.object(lottie_scraper, '_extract_regional_prices',
+                          wraps=lottie_scraper._extract_regional_prices) as mock_parse:
+            first = lottie_scraper.extract_regional_prices(html, "residential")
+            first["London"] = 0.0
+            second = lottie_scraper.extract_regional_prices(html, "residential")
+            lottie_scraper.extract_regional_prices(html + " ", "residential")
+        
+        assert mock_parse.call_count == 2
+        assert second == legacy_extract_regional_prices(html)
+
+
+class TestAsyncFetch:
+    """Test concurrent page fetching."""
+    
+    def test_pages_fetched_concurrently_on_one_client(self, lottie_scraper, sample_html):
+        """Test all pages are in flight at once over a single pooled client."""
+        in_flight = []
+        peak = []
+        
+        async def handler(request):
+            in_flight.append(request.url)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.05)
+            in_flight.remove(request.url)
+            return httpx.Response(200, text=sample_html)
+        
+        with mock_http(handler) as async_client:
+            pages = lottie_scraper.fetch_all_pages()
+        
+        assert set(pages) == {"residential", "nursing", "dementia"}
+        assert max(peak) == 3
+        assert async_client.call_count == 1
+        assert len(lottie_scraper.last_downloads) == 3
+    
+    def test_failed_page_omitted(self, lottie_scraper, sample_html):
+        """Test a failing page does not cancel the others."""
+        def handler(request):
+            if "nursing" in str(request.url):
+                return httpx.Response(500)
+            return httpx.Response(200, text=sample_html)
+        
+        with mock_http(handler):
+            pages = lottie_scraper.fetch_all_pages()
+        
+        assert set(pages) == {"residential", "dementia"}
+    
+    def test_fetch_from_running_loop(self, lottie_scraper, sample_html):
+        """Test the sync wrapper works when called from async code."""
+        async def caller():
+            return lottie_scraper.fetch_all_pages()
+        
+        with mock_http(lambda request: httpx.Response(200, text=sample_html)):
+            pages = asyncio.run(caller())
+        
+        assert len(pages) == 3
 
+
+class TestParseBenchmark:
+    """Parse time of the single-pass extractor against the previous loops."""
+    
+    @staticmethod
+    def _best_of(func, repeat=5):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        return best
+    
+    @pytest.mark.benchmark
+    def test_parse_time_on_cached_pages(self, lottie_scraper, cached_pages):
+        """Single-pass parse beats the previous loops; cache hits skip parsing entirely."""
+        def parse_all():
+            for care_type, html in cached_pages.items():
+                lottie_scraper._extract_regional_prices(html, care_type)
+        
+        def parse_all_legacy():
+            for html in cached_pages.values():
+                legacy_extract_regional_prices(html)
+        
+        lottie_scraper.extract_all_pages(cached_pages)
+        legacy = self._best_of(parse_all_legacy)
+        single_pass = self._best_of(parse_all)
+        cached = self._best_of(lambda: lottie_scraper.extract_all_pages(cached_pages))
+        timings = (
+            f"Lottie parse, {len(cached_pages)} pages: previous {legacy * 1000:.1f} ms, "
+            f"single pass {single_pass * 1000:.1f} ms, cache hit {cached * 1000:.2f} ms"
+        )
+        assert single_pass < legacy, timings
+        assert cached < single_pass, timings
@@ -1,14 +1,35 @@
 """Tests for MSIF loader."""
 
+import os
+import time
+from contextlib import contextmanager
 import pytest
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
 import pandas as pd
 import httpx
-from data_ingestion.msif_loader import MSIFLoader
+from data_ingestion.msif_loader import UPSERT_PAGE_SIZE, MSIFLoader
 from data_ingestion.exceptions import MSIFDownloadError, MSIFParseError
 
 
+def mock_http(handler):
+    """Patch the shared downloader's client with an httpx MockTransport."""
+    real_client = httpx.Client
+    return patch(
+        "pricing_calculator.downloader.httpx.Client",
+        side_effect=lambda **kwargs: real_client(transport=httpx.MockTransport(handler)),
+    )
+
+
+def etag_server(content):
+    """Handler serving content with an ETag, answering 304 to a matching If-None-Match."""
+    def handler(request):
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=content, headers={"ETag": '"v1"'})
+    return handler
+
+
 @pytest.fixture
 def msif_loader(tmp_path):
     """Create MSIFLoader instance with temp cache dir."""
@@ -57,9 +78,11 @@ class TestMSIFLoader:
         
         with patch('httpx.Client') as mock_client:
             mock_response = Mock()
-            mock_response.content = content
+            mock_response.status_code = 200
+            mock_response.headers = {}
+            mock_response.iter_bytes.return_value = [content[:5], content[5:]]
             mock_response.raise_for_status = Mock()
-            mock_client.return_value.__enter__.return_value.get.return_value = mock_response
+            mock_client.return_value.stream.return_value.__enter__.return_value = mock_response
             
             file_path = msif_loader.download_msif_file(url, 2025)
             
@@ -72,8 +95,9 @@ class TestMSIFLoader:
         
         with patch('httpx.Client') as mock_client:
             mock_response = Mock()
+            mock_response.status_code = 404
             mock_response.raise_for_status.side_effect = httpx.HTTPError("HTTP 404")
-            mock_client.return_value.__enter__.return_value.get.return_value = mock_response
+            mock_client.return_value.stream.return_value.__enter__.return_value = mock_response
             
             with pytest.raises(MSIFDownloadError):
                 msif_loader.download_msif_file(url, 2025)
@@ -213,4 +237,277 @@ Barnet,1151.0,1181.0"""
             
             assert records == 1
             assert mock_save.called
+    
+    def test_load_msif_data_not_modified(self, msif_loader):
+        """Test parse and database write are skipped when the workbook is not modified."""
+        data = {"Barnet": {"residential": 1116.0}}
+        
+        with mock_http(etag_server(b"workbook")), \
+             patch.object(msif_loader, 'parse_msif_xls', return_value=data) as mock_parse, \
+             patch.object(msif_loader, 'save_to_database', return_value=1) as mock_save:
+            
+            assert msif_loader.load_msif_data(2025, fallback_to_csv=False) == 1
+            assert msif_loader.last_not_modified is False
+            
+            assert msif_loader.load_msif_data(2025, fallback_to_csv=False) == 0
+            assert msif_loader.last_not_modified is True
+            assert msif_loader.last_download.status_code == 304
+            assert mock_parse.call_count == 1
+            assert mock_save.call_count == 1
+            
+            # Forced refresh parses and saves again
+            assert msif_loader.load_msif_data(2025, fallback_to_csv=False, force=True) == 1
+            assert mock_parse.call_count == 2
+    
+    def test_load_msif_data_not_modified_but_never_saved(self, msif_loader):
+        """Test an unchanged workbook is still saved if the previous save failed."""
+        data = {"Barnet": {"residential": 1116.0}}
+        
+        with mock_http(etag_server(b"workbook")), \
+             patch.object(msif_loader, 'parse_msif_xls', return_value=data), \
+             patch.object(msif_loader, 'save_to_database', side_effect=[0, 1]) as mock_save:
+            
+            assert msif_loader.load_msif_data(2025, fallback_to_csv=False) == 0
+            assert msif_loader.load_msif_data(2025, fallback_to_csv=False) == 1
+            assert msif_loader.last_not_modified is False
+            assert mock_save.call_count == 2
+    
+    def test_is_unchanged_after_mark_loaded(self, msif_loader):
+        """Test a workbook hash is unchanged only once marked loaded, per year."""
+        assert not msif_loader.is_unchanged(2025, "abc")
+        msif_loader.mark_loaded(2025, "abc")
+        assert msif_loader.is_unchanged(2025, "abc")
+        assert not msif_loader.is_unchanged(2025, "def")
+        assert not msif_loader.is_unchanged(2024, "abc")
+        assert not msif_loader.is_unchanged(2025, None)
+
+
+def make_fee_data(n_rows):
+    """Fee table with n_rows local authorities."""
+    return {
+        f"Authority {i}": {
+            "residential": 800.0 + i % 500,
+            "residential_dementia": (800.0 + i % 500) * 1.12,
+            "respite": 800.0 + i % 500,
+            "nursing": 1000.0 + i % 400,
+            "nursing_dementia": (1000.0 + i % 400) * 1.12,
+        }
+        for i in range(n_rows)
+    }
+
+
+class RecordingCursor:
+    """
+    Cursor stub recording statements.
+    
+    SELECTs return `current` (rows in the table); each upsert page reports its rows
+    as (inserted, updated) unless `counts` are given.
+    """
+    
+    def __init__(self, counts=None, current=()):
+        self.statements = []
+        self.counts = counts
+        self.current = list(current)
+    
+    @property
+    def upserts(self):
+        return [(sql, params) for sql, params in self.statements if "INSERT INTO" in sql]
+    
+    def execute(self, sql, params=None):
+        self.statements.append((sql, params))
+    
+    def fetchall(self):
+        return self.current
+    
+    def fetchone(self):
+        if self.counts is not None:
+            return self.counts.pop(0)
+        rows = len(self.statements[-1][1]) // 6
+        return (rows, 0)
+
+
+@contextmanager
+def recording_db(cursor):
+    """Patch get_db_connection to hand out a connection with the given cursor."""
+    with patch('data_ingestion.msif_loader.get_db_connection') as mock_db:
+        mock_db.return_value.__enter__.return_value.cursor.return_value = cursor
+        yield mock_db
+
+
+def legacy_save_to_database(cursor, data, table_name):
+    """Per-row upsert loop previously used by MSIFLoader.save_to_database."""
+    for la_name, fees in data.items():
+        cursor.execute(f"""
+            INSERT INTO {table_name} (
+                local_authority, residential_fee_65_plus, nursing_fee_65_plus,
+                residential_dementia_fee, nursing_dementia_fee, respite_fee, updated_at
+            ) VALUES (%s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
+            ON CONFLICT (local_authority) DO UPDATE SET
+                residential_fee_65_plus = EXCLUDED.residential_fee_65_plus,
+                nursing_fee_65_plus = EXCLUDED.nursing_fee_65_plus,
+                residential_dementia_fee = EXCLUDED.residential_dementia_fee,
+                nursing_dementia_fee = EXCLUDED.nursing_dementia_fee,
+                respite_fee = EXCLUDED.respite_fee,
+                updated_at = CURRENT_TIMESTAMP
+        """, (
+            la_name, fees.get("residential"), fees.get("nursing"),
+            fees.get("residential_dementia"), fees.get("nursing_dementia"), fees.get("respite"),
+        ))
 
+
+class TestBulkUpsert:
+    """Test set-based MSIF upsert."""
+    
+    def test_pages_and_params(self, msif_loader):
+        """Test rows are sent in pages, one statement per page."""
+        cursor = RecordingCursor()
+        with recording_db(cursor):
+            records = msif_loader.save_to_database(make_fee_data(UPSERT_PAGE_SIZE + 5), 2025)
+        
+        assert records == UPSERT_PAGE_SIZE + 5
+        assert len(cursor.upserts) == 2
+        for sql, params in cursor.upserts:
+            assert sql.count("%s") == len(params)
+            assert "INSERT INTO msif_fees_2025" in sql
+            assert "IS DISTINCT FROM" in sql
+        assert cursor.upserts[1][1][:6] == [
+            f"Authority {UPSERT_PAGE_SIZE}", 800.0 + UPSERT_PAGE_SIZE % 500, 1000.0 + UPSERT_PAGE_SIZE % 400,
+            (800.0 + UPSERT_PAGE_SIZE % 500) * 1.12, (1000.0 + UPSERT_PAGE_SIZE % 400) * 1.12,
+            800.0 + UPSERT_PAGE_SIZE % 500,
+        ]
+    
+    def test_inserted_updated_unchanged(self, msif_loader):
+        """Test counts reported by the database are summed across pages."""
+        cursor = RecordingCursor(counts=[(10, 100), (0, 2)])
+        with recording_db(cursor):
+            records = msif_loader.save_to_database(make_fee_data(UPSERT_PAGE_SIZE + 5), 2025)
+        
+        assert records == UPSERT_PAGE_SIZE + 5
+        assert msif_loader.last_save_stats == {
+            "inserted": 10, "updated": 102, "unchanged": UPSERT_PAGE_SIZE + 5 - 112,
+        }
+    
+    def test_missing_fees_sent_as_null(self, msif_loader):
+        """Test fees missing for an LA are sent as NULL."""
+        cursor = RecordingCursor()
+        with recording_db(cursor):
+            msif_loader.save_to_database({"Camden": {"residential": 1200.0}}, 2024)
+        
+        sql, params = cursor.upserts[0]
+        assert "msif_fees_2024" in sql
+        assert params == ["Camden", 1200.0, None, None, None, None]
+    
+    def test_database_error_returns_zero(self, msif_loader):
+        """Test database errors do not fail the load."""
+        with patch('data_ingestion.msif_loader.get_db_connection', side_effect=Exception("down")):
+            assert msif_loader.save_to_database(make_fee_data(3), 2025) == 0
+        assert msif_loader.last_save_stats == {"inserted": 0, "updated": 0, "unchanged": 0}
+
+
+    def test_only_changed_rows_written(self, msif_loader):
+        """Test rows equal to the database state (to the penny) are not sent."""
+        from decimal import Decimal
+        
+        data = {
+            "Barnet": {"residential": 1116.0, "residential_dementia": 1116.0 * 1.12, "respite": 1116.0},
+            "Camden": {"residential": 1200.0, "nursing": 1300.0},
+            "Kent": {"residential": 900.0},
+        }
+        current = [
+            # Barnet unchanged (dementia fee stored rounded)
+            ("Barnet", Decimal("1116.00"), None, Decimal("1249.92"), None, Decimal("1116.00")),
+            # Camden nursing fee changed
+            ("Camden", Decimal("1200.00"), Decimal("1250.00"), None, None, None),
+            # Dropped from the new file: reported, not deleted
+            ("Westminster", Decimal("1000.00"), None, None, None, None),
+        ]
+        cursor = RecordingCursor(current=current)
+        with recording_db(cursor):
+            assert msif_loader.save_to_database(data, 2025) == 3
+        
+        (sql, params), = cursor.upserts
+        assert [params[i] for i in range(0, len(params), 6)] == ["Kent", "Camden"]
+        changes = msif_loader.last_changes
+        assert (changes.added, changes.changed, changes.removed, changes.unchanged) == (
+            ["Kent"], ["Camden"], ["Westminster"], 1
+        )
+        assert not any("DELETE" in sql for sql, _ in cursor.statements)
+    
+    def test_nothing_changed_no_write(self, msif_loader):
+        """Test an identical dataset sends no upsert."""
+        from decimal import Decimal
+        
+        cursor = RecordingCursor(current=[("Kent", Decimal("900.00"), None, None, None, None)])
+        with recording_db(cursor):
+            assert msif_loader.save_to_database({"Kent": {"residential": 900.0}}, 2025) == 1
+        
+        assert cursor.upserts == []
+        assert msif_loader.last_changes.is_empty
+        assert msif_loader.last_save_stats == {"inserted": 0, "updated": 0, "unchanged": 1}
+
+
+@pytest.mark.benchmark
+class TestUpsertBenchmark:
+    """Statements and client time of the bulk upsert vs the per-row loop."""
+    
+    # Modelled network + server round trip per statement
+    ROUND_TRIP_MS = 1.0
+    
+    @pytest.mark.parametrize("n_rows", [150, 10_000])
+    def test_statement_count(self, msif_loader, n_rows):
+        """Bulk upsert sends ceil(n / page) statements instead of n."""
+        data = make_fee_data(n_rows)
+        
+        legacy_cursor = RecordingCursor()
+        start = time.perf_counter()
+        legacy_save_to_database(legacy_cursor, data, "msif_fees_2025")
+        legacy_ms = (time.perf_counter() - start) * 1000
+        
+        cursor = RecordingCursor()
+        with recording_db(cursor):
+            start = time.perf_counter()
+            msif_loader.save_to_database(data, 2025)
+            bulk_ms = (time.perf_counter() - start) * 1000
+        
+        expected_statements = -(-n_rows // UPSERT_PAGE_SIZE)
+        assert len(legacy_cursor.statements) == n_rows
+        assert len(cursor.upserts) == expected_statements
+        legacy_total = legacy_ms + n_rows * self.ROUND_TRIP_MS
+        bulk_total = bulk_ms + expected_statements * self.ROUND_TRIP_MS
+        assert bulk_total < legacy_total, (
+            f"MSIF upsert, {n_rows} rows: per-row {n_rows} statements "
+            f"(~{legacy_total:.0f} ms at {self.ROUND_TRIP_MS:g} ms RTT), "
+            f"bulk {expected_statements} statements (~{bulk_total:.0f} ms)"
+        )
+    
+    @pytest.mark.skipif(
+        os.getenv("MSIF_DB_BENCHMARK") != "1",
+        reason="Set MSIF_DB_BENCHMARK=1 with a PostgreSQL database configured (DB_* env vars)",
+    )
+    @pytest.mark.parametrize("n_rows", [150, 10_000])
+    def test_against_database(self, msif_loader, n_rows):
+        """Wall time against a real database: insert, then an unchanged rerun, then updates."""
+        from data_ingestion.database import get_db_connection, init_database
+        
+        init_database()
+        with get_db_connection() as conn:
+            conn.cursor().execute("TRUNCATE msif_fees_2025")
+        
+        data = make_fee_data(n_rows)
+        timings = {}
+        for label in ("insert", "unchanged"):
+            start = time.perf_counter()
+            assert msif_loader.save_to_database(data, 2025) == n_rows
+            timings[label] = (time.perf_counter() - start) * 1000
+        assert msif_loader.last_save_stats["unchanged"] == n_rows
+        
+        with get_db_connection() as conn:
+            start = time.perf_counter()
+            legacy_save_to_database(conn.cursor(), data, "msif_fees_2025")
+            conn.commit()
+            timings["per-row loop"] = (time.perf_counter() - start) * 1000
+        
+        assert timings["insert"] < timings["per-row loop"], (
+            f"MSIF upsert against database, {n_rows} rows: "
+            + ", ".join(f"{label} {ms:.0f} ms" for label, ms in timings.items())
+        )
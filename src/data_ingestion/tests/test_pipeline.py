@@ -0,0 +1,399 @@
+"""Tests for pipeline.py."""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from data_ingestion.change_detection import ChangeSummary
+from data_ingestion.msif_loader import MSIFLoader
+from data_ingestion.pipeline import RefreshPipeline, TaskGraph, TaskSkipped, parse_msif_source
+from data_ingestion.service import DataIngestionService
+
+
+class TestTaskGraph:
+    """Test TaskGraph class."""
+
+    def test_dependencies_run_first(self):
+        """Test tasks receive the results of their dependencies."""
+        graph = TaskGraph()
+        graph.add("a", "download", lambda inputs: 1)
+        graph.add("b", "download", lambda inputs: 2)
+        graph.add("sum", "parse", lambda inputs: inputs["a"] + inputs["b"], deps=["a", "b"])
+
+        graph.run()
+
+        assert graph.tasks["sum"].status == "success"
+        assert graph.tasks["sum"].result == 3
+
+    def test_independent_tasks_overlap(self):
+        """Test independent tasks run concurrently."""
+        barrier = threading.Barrier(3, timeout=5)
+        graph = TaskGraph()
+        for name in ("msif_2025", "msif_2024", "lottie"):
+            graph.add(name, "download", lambda inputs: barrier.wait())
+
+        graph.run(max_workers=3)
+
+        assert all(task.status == "success" for task in graph.tasks.values())
+
+    def test_serialized_tasks_do_not_overlap(self):
+        """Test serialize=True tasks run one at a time."""
+        active = []
+        overlaps = []
+
+        def write(inputs):
+            active.append(1)
+            overlaps.append(len(active))
+            time.sleep(0.02)
+            active.pop()
+
+        graph = TaskGraph()
+        for name in ("a", "b", "c"):
+            graph.add(name, "write", write, serialize=True)
+
+        graph.run(max_workers=3)
+
+        assert max(overlaps) == 1
+        assert sum(task.waited for task in graph.tasks.values()) > 0
+
+    def test_failure_and_skip_propagate(self):
+        """Test dependants of failed/skipped tasks are skipped, always_run tasks still run."""
+        def fail(inputs):
+            raise ValueError("boom")
+
+        def skip(inputs):
+            raise TaskSkipped("not_modified")
+
+        graph = TaskGraph()
+        graph.add("a", "download", fail)
+        graph.add("a2", "parse", lambda inputs: 1, deps=["a"])
+        graph.add("b", "download", skip)
+        graph.add("b2", "parse", lambda inputs: 1, deps=["b"])
+        graph.add("c", "download", lambda inputs: "ok")
+        graph.add("last", "publish", lambda inputs: sorted(inputs), deps=["a2", "b2", "c"], always_run=True)
+
+        graph.run()
+
+        tasks = graph.tasks
+        assert tasks["a"].status == "failed" and str(tasks["a"].error) == "boom"
+        assert (tasks["a2"].status, tasks["a2"].reason) == ("skipped", "a failed")
+        assert (tasks["b"].status, tasks["b"].reason) == ("skipped", "not_modified")
+        assert tasks["b2"].status == "skipped"
+        assert tasks["last"].result == ["c"]
+
+    def test_unknown_dependency(self):
+        """Test dependencies must be added first."""
+        graph = TaskGraph()
+        with pytest.raises(ValueError):
+            graph.add("b", "parse", lambda inputs: None, deps=["a"])
+
+
+MSIF_DATA = {"Barnet": {"residential": 1116.0}, "Camden": {"residential": 1200.0}}
+LOTTIE_DATA = {"residential": {"London": 950.0}}
+
+
+@pytest.fixture
+def service(tmp_path):
+    """Service with loaders caching into tmp_path and DB logging disabled."""
+    service = DataIngestionService()
+    service.msif_loader = MSIFLoader(cache_dir=tmp_path / "msif")
+    service.lottie_scraper.cache_dir = tmp_path / "lottie"
+    service.lottie_scraper.cache_dir.mkdir()
+    with patch.object(service, "record_runs", return_value=[]), \
+         patch.object(service.telegram_alerts, "send_success"), \
+         patch.object(service.telegram_alerts, "send_error"):
+        yield service
+
+
+def fake_sources(msif_changes=None, lottie_changes=None, msif_download=None):
+    """Patch downloads, parsing and writes of all sources; returns the patchers."""
+    def save_msif(self, data, year, fencing_token=None):
+        self.last_changes = msif_changes
+        self.last_save_stats = {"inserted": len(data), "updated": 0, "unchanged": 0}
+        return len(data)
+
+    def save_lottie(self, data, fencing_token=None):
+        self.last_changes = lottie_changes
+        return 1
+
+    return [
+        patch.object(MSIFLoader, "download_msif_file", side_effect=msif_download,
+                     return_value="/tmp/msif.xlsx"),
+        patch("data_ingestion.pipeline.parse_msif_source", return_value=(MSIF_DATA, "excel")),
+        patch.object(MSIFLoader, "save_to_database", autospec=True, side_effect=save_msif),
+        patch("data_ingestion.lottie_scraper.LottieScraper.fetch_all_pages",
+              return_value={"residential": "<html></html>"}),
+        patch("data_ingestion.lottie_scraper.LottieScraper.extract_all_pages", return_value=LOTTIE_DATA),
+        patch("data_ingestion.lottie_scraper.LottieScraper.save_to_database",
+              autospec=True, side_effect=save_lottie),
+    ]
+
+
+def run_pipeline(service, patchers, **kwargs):
+    for patcher in patchers:
+        patcher.start()
+    try:
+        with patch.object(service, "publish_snapshot", return_value=7) as publish:
+            report = RefreshPipeline(service, parse_workers=0).run(**kwargs)
+        return report, publish
+    finally:
+        for patcher in reversed(patchers):
+            patcher.stop()
+
+
+class TestRefreshPipeline:
+    """Test RefreshPipeline class."""
+
+    def test_full_run(self, service):
+        """Test every source is refreshed and the snapshot is published once, last."""
+        report, publish = run_pipeline(service, fake_sources())
+
+        assert report["status"] == "success"
+        assert report["snapshot_version"] == 7
+        publish.assert_called_once()
+        assert report["sources"]["MSIF 2025"]["records_updated"] == 2
+        assert report["sources"]["MSIF 2024"]["inserted"] == 2
+        assert report["sources"]["Lottie Regional Averages"]["source"] == "scraped"
+
+        tasks = report["tasks"]
+        snapshot_start = tasks["snapshot"]["start_offset_seconds"]
+        for name, task in tasks.items():
+            assert task["status"] == "success"
+            if name != "snapshot":
+                assert task["start_offset_seconds"] <= snapshot_start
+        assert set(report["stages"]) == {"download", "parse", "write", "publish"}
+        assert report["duration_seconds"] >= 0
+        assert service.telegram_alerts.send_success.call_count == 3
+
+    def test_run_history_recorded_once(self, service):
+        """Test one record per source is written in a single call after the run."""
+        changed = ChangeSummary(["Kent"], [], [], 1)
+        report, _ = run_pipeline(service, fake_sources(changed, ChangeSummary([], [], [], 1)))
+
+        service.record_runs.assert_called_once()
+        runs = {run.data_source: run for run in service.record_runs.call_args.args}
+        assert set(runs) == {"MSIF 2025", "MSIF 2024", "Lottie Regional Averages"}
+        msif = runs["MSIF 2025"].to_dict()
+        assert msif["status"] == "success"
+        assert msif["rows_added"] == 1
+        assert msif["download_seconds"] is not None and msif["parse_seconds"] is not None
+        # Only sources that changed data are charged for the snapshot rebuild
+        assert msif["invalidate_seconds"] is not None
+        assert runs["Lottie Regional Averages"].to_dict()["invalidate_seconds"] is None
+
+    def test_no_changes_skips_snapshot(self, service):
+        """Test nothing is published or alerted when no source changed data."""
+        unchanged = ChangeSummary([], [], [], 2)
+        report, publish = run_pipeline(service, fake_sources(unchanged, ChangeSummary([], [], [], 1)))
+
+        publish.assert_not_called()
+        assert report["tasks"]["snapshot"]["status"] == "skipped"
+        assert report["tasks"]["snapshot"]["reason"] == "no data changes"
+        assert report["snapshot_version"] is None
+        service.telegram_alerts.send_success.assert_not_called()
+
+    def test_failed_source_does_not_block_others(self, service):
+        """Test a failing download only affects its own source."""
+        def download(url, year, force=False):
+            if year == 2024:
+                raise RuntimeError("gov.uk down")
+            return "/tmp/msif.xlsx"
+
+        with patch("data_ingestion.pipeline.config") as mock_config:
+            mock_config.msif_prefer_csv = False
+            mock_config.msif_fallback_to_csv = False
+            mock_config.pipeline_io_workers = 4
+            report, publish = run_pipeline(service, fake_sources(msif_download=download))
+
+        assert report["status"] == "partial"
+        assert report["sources"]["MSIF 2024"]["failed_task"] == "msif_2024.download"
+        failed_run = next(run for run in service.record_runs.call_args.args if run.data_source == "MSIF 2024")
+        assert failed_run.status == "failed" and failed_run.error_message == "gov.uk down"
+        assert report["tasks"]["msif_2024.write"]["status"] == "skipped"
+        assert report["sources"]["MSIF 2025"]["status"] == "success"
+        publish.assert_called_once()
+        service.telegram_alerts.send_error.assert_called_once()
+
+    def test_not_modified_source_skips_parse(self, service):
+        """Test an unchanged, already loaded workbook is not parsed or written."""
+        from pricing_calculator.downloader import DownloadResult
+
+        def download(self, url, year, force=False):
+            self.last_download = DownloadResult(None, 304, False, 10, f"sha-{year}")
+            return "/tmp/msif.xlsx"
+
+        for year in (2025, 2024):
+            (service.msif_loader.cache_dir / f"msif_{year}.loaded").write_text(f"sha-{year}")
+        patchers = fake_sources()
+        patchers[0] = patch.object(MSIFLoader, "download_msif_file", autospec=True, side_effect=download)
+
+        report, _ = run_pipeline(service, patchers)
+
+        assert report["sources"]["MSIF 2025"]["not_modified"] is True
+        assert report["tasks"]["msif_2025.parse"]["status"] == "skipped"
+        assert report["tasks"]["msif_2024.write"]["status"] == "skipped"
+
+    def test_overlapping_runs_coalesce(self, service):
+        """Test a trigger during a run joins it instead of starting another run."""
+        pipeline = RefreshPipeline(service, parse_workers=0)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_run(force, use_fallback):
+            calls.append(force)
+            started.set()
+            release.wait(5)
+            return {"status": "success"}
+
+        with patch.object(pipeline, "_run", side_effect=slow_run):
+            first = {}
+            thread = threading.Thread(target=lambda: first.update(pipeline.run()))
+            thread.start()
+            started.wait(5)
+
+            joined = {}
+            joiner = threading.Thread(target=lambda: joined.update(pipeline.run()))
+            joiner.start()
+            time.sleep(0.05)
+            release.set()
+            thread.join(5)
+            joiner.join(5)
+
+        assert calls == [False]
+        assert first == {"status": "success"}
+        assert joined == {"status": "success", "coalesced": True}
+
+
+    def test_forced_trigger_runs_after_unforced_run(self, service):
+        """Test a forced trigger during an unforced run is not coalesced but runs next."""
+        pipeline = RefreshPipeline(service, parse_workers=0)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_run(force, use_fallback):
+            calls.append(force)
+            if len(calls) == 1:
+                started.set()
+                release.wait(5)
+            return {"status": "success", "force": force}
+
+        with patch.object(pipeline, "_run", side_effect=slow_run):
+            first = {}
+            thread = threading.Thread(target=lambda: first.update(pipeline.run()))
+            thread.start()
+            started.wait(5)
+
+            forced = {}
+            joiner = threading.Thread(target=lambda: forced.update(pipeline.run(force=True)))
+            joiner.start()
+            time.sleep(0.05)
+            assert calls == [False]
+            release.set()
+            thread.join(5)
+            joiner.join(5)
+
+        assert calls == [False, True]
+        assert first == {"status": "success", "force": False}
+        assert forced == {"status": "success", "force": True, "queued": True}
+
+    def test_unforced_trigger_joins_forced_run(self, service):
+        """Test a forced run in progress also serves an unforced trigger."""
+        pipeline = RefreshPipeline(service, parse_workers=0)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_run(force, use_fallback):
+            calls.append(force)
+            started.set()
+            release.wait(5)
+            return {"status": "success"}
+
+        with patch.object(pipeline, "_run", side_effect=slow_run):
+            thread = threading.Thread(target=lambda: pipeline.run(force=True))
+            thread.start()
+            started.wait(5)
+
+            joined = {}
+            joiner = threading.Thread(target=lambda: joined.update(pipeline.run()))
+            joiner.start()
+            time.sleep(0.05)
+            release.set()
+            thread.join(5)
+            joiner.join(5)
+
+        assert calls == [True]
+        assert joined == {"status": "success", "coalesced": True}
+
+
+class TestLeaderElection:
+    """Test RefreshPipeline with a shared job lock."""
+
+    def test_only_lock_holder_runs(self, service):
+        """Test a second instance skips the refresh while the first holds the lock."""
+        fakeredis = pytest.importorskip("fakeredis")
+        from data_ingestion.locking import RedisJobLock
+        from data_ingestion.pipeline import LOCK_NAME
+
+        server = fakeredis.FakeRedis(decode_responses=True)
+        other_instance = RedisJobLock(server)
+        lease = other_instance.acquire(LOCK_NAME, ttl_seconds=60)
+
+        patchers = fake_sources()
+        report, publish = run_pipeline(service, patchers, job_lock=RedisJobLock(server))
+
+        assert report["status"] == "skipped"
+        publish.assert_not_called()
+        other_instance.release(lease)
+
+    def test_holder_writes_with_token_and_bumps_generation(self, service):
+        """Test writes carry the fencing token and followers see a new generation."""
+        fakeredis = pytest.importorskip("fakeredis")
+        from data_ingestion.locking import RedisJobLock
+
+        server = fakeredis.FakeRedis(decode_responses=True)
+        leader, follower = RedisJobLock(server), RedisJobLock(server)
+        tokens = []
+        patchers = fake_sources()
+        patchers[2] = patch.object(
+            MSIFLoader, "save_to_database", autospec=True,
+            side_effect=lambda self, data, year, fencing_token=None: tokens.append(fencing_token) or 2,
+        )
+
+        report, publish = run_pipeline(service, patchers, job_lock=leader)
+
+        assert report["status"] == "success"
+        assert tokens == [report["fencing_token"]] * 2
+        assert follower.generation() == report["data_generation"] == 1
+        assert follower.acquire("refresh_all", ttl_seconds=60) is not None  # released
+
+
+def test_parse_in_process_pool(tmp_path, monkeypatch):
+    """Test the MSIF parse worker runs in a spawned process."""
+    from concurrent.futures import ProcessPoolExecutor
+    import multiprocessing
+
+    monkeypatch.setenv("MSIF_PARSED_CACHE_DIR", str(tmp_path / "parsed"))
+    columns = [
+        "ONS Code", "Local authority", "Region", "a", "b", "c",
+        "Care homes without nursing 65+ 2025-26", "d", "e",
+        "Care homes with nursing 65+ 2025-26",
+    ]
+    rows = [["Notes"] + [None] * 9, [None] * 10,
+            ["E09000003", "Barnet", "London", None, None, None, 1116.0, None, None, 1500.0]]
+    workbook = tmp_path / "msif.xlsx"
+    with pd.ExcelWriter(workbook, engine="openpyxl") as writer:
+        pd.DataFrame(rows, columns=columns).to_excel(
+            writer, sheet_name="Table A 2025-26", index=False, startrow=1
+        )
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        data, source = pool.submit(parse_msif_source, str(workbook), 2025, False).result(timeout=120)
+
+    assert source == "excel"
+    assert data["Barnet"]["nursing"] == 1500.0
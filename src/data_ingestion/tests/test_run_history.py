@@ -0,0 +1,136 @@
+"""Tests for run_history.py."""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from data_ingestion.change_detection import ChangeSummary
+from data_ingestion.run_history import (
+    HISTORY_COLUMNS,
+    RunRecord,
+    get_run_history,
+    get_run_timeseries,
+    save_runs,
+    timed,
+)
+from pricing_calculator.downloader import DownloadResult
+
+
+@pytest.fixture
+def mock_cursor():
+    """Cursor of a patched get_db_connection()."""
+    with patch("data_ingestion.run_history.get_db_connection") as mock_db:
+        cursor = MagicMock()
+        mock_db.return_value.__enter__.return_value.cursor.return_value = cursor
+        yield cursor
+
+
+class TestRunRecord:
+    """Test RunRecord class."""
+
+    def test_stages_accumulate(self):
+        """Test timings of a repeated stage add up and unknown stages are rejected."""
+        run = RunRecord("MSIF 2025")
+        run.add_stages({"parse": 1.0, "diff": 0.25})
+        run.add_stage("parse", 0.5)
+        with run.stage("write"):
+            pass
+
+        assert run.stage_seconds["parse"] == 1.5
+        assert run.stage_seconds["write"] >= 0
+        with pytest.raises(ValueError):
+            run.add_stage("publish", 1.0)
+
+    def test_downloads_and_changes(self):
+        """Test only transferred bytes count and multi-page hashes combine stably."""
+        run = RunRecord("Lottie Regional Averages")
+        run.add_download(DownloadResult(None, 200, True, 1000, "b"))
+        run.add_download(DownloadResult(None, 304, False, 900, "a"))
+        run.add_download(None)
+        run.set_changes(ChangeSummary(["x"], ["y", "z"], ["w"], 5))
+
+        other = RunRecord("Lottie Regional Averages")
+        other.add_download(DownloadResult(None, 304, False, 900, "a"))
+        other.add_download(DownloadResult(None, 304, False, 1000, "b"))
+
+        assert run.bytes_downloaded == 1000
+        assert run.source_hash == other.source_hash
+        assert (run.rows_added, run.rows_changed, run.rows_removed) == (1, 2, 1)
+
+    def test_finish(self):
+        """Test status, completion time and the row values."""
+        started = datetime(2026, 1, 5, 3, 0)
+        run = RunRecord("MSIF 2024", started_at=started).finish(0, error="boom")
+
+        record = run.to_dict()
+        assert record["status"] == "failed"
+        assert record["error_message"] == "boom"
+        assert run.completed_at >= started
+        assert record["download_seconds"] is None
+        assert len(run.row()) == len(HISTORY_COLUMNS) - 1
+
+
+def test_timed():
+    """Test timed() adds to an existing entry."""
+    timings = {"parse": 1.0}
+    with timed(timings, "parse"):
+        pass
+    assert timings["parse"] >= 1.0
+
+
+class TestQueries:
+    """Test database access with a mocked connection."""
+
+    def test_save_runs_single_statement(self, mock_cursor):
+        """Test several records are written by one INSERT."""
+        mock_cursor.fetchall.return_value = [(1,), (2,), (3,)]
+        runs = [RunRecord(name).finish(1) for name in ("MSIF 2025", "MSIF 2024", "Lottie")]
+
+        assert save_runs(runs) == [1, 2, 3]
+        mock_cursor.execute.assert_called_once()
+        sql, params = mock_cursor.execute.call_args.args
+        assert sql.startswith("INSERT INTO data_update_log")
+        assert len(params) == 3 * (len(HISTORY_COLUMNS) - 1)
+
+    def test_save_runs_database_unavailable(self):
+        """Test logging failures do not propagate."""
+        with patch("data_ingestion.run_history.get_db_connection", side_effect=Exception("down")):
+            assert save_runs([RunRecord("MSIF 2025").finish(1)]) == []
+        assert save_runs([]) == []
+
+    def test_get_run_history_filters(self, mock_cursor):
+        """Test source, time window and limit are passed as parameters."""
+        mock_cursor.fetchall.return_value = [tuple(range(len(HISTORY_COLUMNS)))]
+
+        rows = get_run_history(data_source="MSIF 2025", days=7, limit=10)
+
+        sql, params = mock_cursor.execute.call_args.args
+        assert "data_source = %s" in sql
+        assert params[0] > datetime.now() - timedelta(days=7, minutes=1)
+        assert params[1:] == ["MSIF 2025", 10]
+        assert rows[0]["id"] == 0 and rows[0]["source_hash"] == len(HISTORY_COLUMNS) - 1
+
+    def test_get_run_timeseries(self, mock_cursor):
+        """Test buckets are aggregated per source and averages are floats."""
+        from decimal import Decimal
+
+        bucket = datetime(2026, 1, 5)
+        mock_cursor.fetchall.return_value = [
+            (bucket, "MSIF 2025", 2, 1, Decimal("12.5"), 1.0, 2.0, None, 0.5, 0.1, 4096, 3)
+        ]
+
+        (row,) = get_run_timeseries(bucket="day")
+
+        sql, params = mock_cursor.execute.call_args.args
+        assert "date_trunc(%s, started_at)" in sql
+        assert params[0] == "day"
+        assert row["runs"] == 2 and row["failures"] == 1
+        assert row["avg_duration_seconds"] == 12.5
+        assert row["avg_diff_seconds"] is None
+        assert row["rows_changed"] == 3
+
+    def test_unknown_bucket(self):
+        """Test only whitelisted buckets reach the SQL."""
+        with pytest.raises(ValueError):
+            get_run_timeseries(bucket="minute; DROP TABLE x")
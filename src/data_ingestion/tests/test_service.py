@@ -25,8 +25,7 @@ class TestDataIngestionService:
     def test_refresh_msif_data_success(self, service):
         """Test successful MSIF data refresh."""
         with patch.object(service.msif_loader, 'load_msif_data', return_value=150), \
-             patch.object(service, 'log_update_start', return_value=1), \
-             patch.object(service, 'log_update_complete'), \
+             patch.object(service, 'record_runs', return_value=[1]), \
              patch.object(service.telegram_alerts, 'send_success'):
             
             result = service.refresh_msif_data(year=2025)
@@ -34,13 +33,61 @@ class TestDataIngestionService:
             assert result["status"] == "success"
             assert result["records_updated"] == 150
     
+    def test_refresh_unchanged_data_not_published(self, service):
+        """Test no alert or snapshot is published when the diff is empty."""
+        from data_ingestion.change_detection import ChangeSummary
+        
+        service.msif_loader.last_changes = ChangeSummary([], [], [], 150)
+        with patch.object(service.msif_loader, 'load_msif_data', return_value=150), \
+             patch.object(service, 'record_runs', return_value=[1]), \
+             patch.object(service.telegram_alerts, 'send_success') as mock_alert, \
+             patch.object(service, 'publish_snapshot') as mock_publish:
+            
+            result = service.refresh_msif_data(year=2025)
+        
+        assert result["status"] == "success"
+        assert result["changes"]["unchanged"] == 150
+        mock_alert.assert_not_called()
+        mock_publish.assert_not_called()
+    
+    def test_refresh_changed_data_published(self, service):
+        """Test a non-empty diff sends the alert with the summary and publishes."""
+        from data_ingestion.change_detection import ChangeSummary
+        
+        service.lottie_scraper.last_changes = ChangeSummary([], [("London", "residential")], [], 26)
+        with patch.object(service.lottie_scraper, 'load_lottie_data', return_value=27), \
+             patch.object(service, 'record_runs', return_value=[1]), \
+             patch.object(service.telegram_alerts, 'send_success') as mock_alert, \
+             patch.object(service, 'publish_snapshot', return_value=4) as mock_publish:
+            
+            result = service.refresh_lottie_data()
+        
+        assert result["changes"]["changed_keys"] == ["London/residential"]
+        assert result["snapshot_version"] == 4
+        mock_alert.assert_called_once_with(
+            "Lottie Regional Averages", 27, changes="0 added, 1 changed, 0 removed, 26 unchanged"
+        )
+        mock_publish.assert_called_once()
+    
+    def test_record_changes_does_not_publish(self, service):
+        """Test record_changes adds the diff and alerts without publishing a snapshot."""
+        from data_ingestion.change_detection import ChangeSummary
+        
+        result = {}
+        with patch.object(service.telegram_alerts, 'send_success') as mock_alert, \
+             patch.object(service, 'publish_snapshot') as mock_publish:
+            service.record_changes("MSIF 2025", 1, ChangeSummary([("Barnet", "residential")], [], [], 0), result)
+        
+        assert result["changes"]["added"] == 1
+        mock_alert.assert_called_once()
+        mock_publish.assert_not_called()
+    
     def test_refresh_msif_data_error(self, service):
         """Test MSIF data refresh with error."""
         error = MSIFDownloadError("Download failed")
         
         with patch.object(service.msif_loader, 'load_msif_data', side_effect=error), \
-             patch.object(service, 'log_update_start', return_value=1), \
-             patch.object(service, 'log_update_complete'), \
+             patch.object(service, 'record_runs', return_value=[1]), \
              patch.object(service.telegram_alerts, 'send_error'):
             
             result = service.refresh_msif_data(year=2025)
@@ -51,8 +98,7 @@ class TestDataIngestionService:
     def test_refresh_lottie_data_success(self, service):
         """Test successful Lottie data refresh."""
         with patch.object(service.lottie_scraper, 'load_lottie_data', return_value=27), \
-             patch.object(service, 'log_update_start', return_value=1), \
-             patch.object(service, 'log_update_complete'), \
+             patch.object(service, 'record_runs', return_value=[1]), \
              patch.object(service.telegram_alerts, 'send_success'):
             
             result = service.refresh_lottie_data()
@@ -65,8 +111,7 @@ class TestDataIngestionService:
         error = LottieScrapingError("Scraping failed")
         
         with patch.object(service.lottie_scraper, 'load_lottie_data', side_effect=error), \
-             patch.object(service, 'log_update_start', return_value=1), \
-             patch.object(service, 'log_update_complete'), \
+             patch.object(service, 'record_runs', return_value=[1]), \
              patch.object(service.telegram_alerts, 'send_error'):
             
             result = service.refresh_lottie_data()
@@ -74,6 +119,50 @@ class TestDataIngestionService:
             assert result["status"] == "error"
             assert "error" in result
     
+    def test_refresh_records_run_history(self, service):
+        """Test one run record with stage timings, bytes and row changes is written."""
+        from data_ingestion.change_detection import ChangeSummary
+        from pricing_calculator.downloader import DownloadResult
+        
+        def load(**kwargs):
+            loader = service.msif_loader
+            loader.last_download = DownloadResult(None, 200, True, 2048, "abc123")
+            loader.last_timings = {"download": 1.5, "parse": 2.0, "diff": 0.1, "write": 0.2}
+            loader.last_changes = ChangeSummary(["Kent"], ["Camden"], [], 148)
+            return 150
+        
+        with patch.object(service.msif_loader, 'load_msif_data', side_effect=load), \
+             patch.object(service, 'record_runs', return_value=[1]) as mock_record, \
+             patch.object(service.telegram_alerts, 'send_success'), \
+             patch.object(service, 'publish_snapshot', return_value=3):
+            
+            service.refresh_msif_data(year=2025)
+        
+        (run,) = mock_record.call_args.args
+        record = run.to_dict()
+        assert record["status"] == "success"
+        assert record["records_updated"] == 150
+        assert record["download_seconds"] == 1.5
+        assert record["write_seconds"] == 0.2
+        assert record["invalidate_seconds"] is not None
+        assert record["bytes_downloaded"] == 2048
+        assert (record["rows_added"], record["rows_changed"], record["rows_removed"]) == (1, 1, 0)
+        assert record["source_hash"] == "abc123"
+    
+    def test_failed_refresh_records_error(self, service):
+        """Test a failed refresh is recorded with its error."""
+        with patch.object(service.lottie_scraper, 'load_lottie_data',
+                          side_effect=LottieScrapingError("Scraping failed")), \
+             patch.object(service, 'record_runs', return_value=[1]) as mock_record, \
+             patch.object(service.telegram_alerts, 'send_error'):
+            
+            service.refresh_lottie_data()
+        
+        (run,) = mock_record.call_args.args
+        assert run.status == "failed"
+        assert run.error_message == "Scraping failed"
+        assert run.completed_at is not None
+    
     def test_get_update_status(self, service):
         """Test getting update status."""
         mock_updates = [
@@ -105,3 +194,15 @@ class TestDataIngestionService:
             assert len(updates) == 1
             assert updates[0]["data_source"] == "MSIF 2025"
 
+    
+    def test_get_msif_cache_status(self, service, tmp_path):
+        """Test parsed MSIF cache status covers both modules' workbooks."""
+        from pricing_calculator.msif_cache import ParsedMSIFCache
+        
+        cache = ParsedMSIFCache(tmp_path / "parsed", artifact_format="json")
+        with patch('pricing_calculator.msif_cache.get_parsed_msif_cache', return_value=cache):
+            status = service.get_msif_cache_status()
+        
+        assert status["format"] == "json"
+        assert [s["year"] for s in status["sources"]] == [2025, 2024, 2025, 2024]
+        assert status["sources"][0]["file"].endswith("msif_2025.xlsx")
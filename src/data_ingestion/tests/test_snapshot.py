@@ -0,0 +1,249 @@
+"""Tests for pricing data snapshots."""
+
+import threading
+
+import pytest
+from unittest.mock import MagicMock
+
+from data_ingestion.snapshot import PricingDataSnapshot, SnapshotStore
+
+
+def make_data(residential=900.0, lottie_residential=1000.0):
+    """Loader payload with one LA and one region."""
+    return {
+        "msif": {2025: {"Birmingham": {"residential": residential}}},
+        "lottie": {"West Midlands": {"residential": lottie_residential}},
+        "sources": {"msif_2025": "database", "lottie": "database"},
+    }
+
+
+class TestPricingDataSnapshot:
+    """Test PricingDataSnapshot class."""
+
+    def test_lookups(self):
+        """Test MSIF and Lottie lookups."""
+        snapshot = PricingDataSnapshot(1, **make_data())
+        assert snapshot.msif_fee("Birmingham", "residential") == 900.0
+        assert snapshot.msif_fee("Birmingham", "nursing") is None
+        assert snapshot.msif_fee("Birmingham", "residential", year=2024) is None
+        assert snapshot.lottie_price("West Midlands", "residential") == 1000.0
+        assert snapshot.lottie_price("London", "residential") is None
+
+    def test_immutable(self):
+        """Test snapshot and its tables cannot be modified."""
+        data = make_data()
+        snapshot = PricingDataSnapshot(1, **data)
+
+        with pytest.raises(AttributeError):
+            snapshot.version = 2
+        with pytest.raises(TypeError):
+            snapshot.msif_fees(2025)["Birmingham"]["residential"] = 1.0
+        with pytest.raises(TypeError):
+            snapshot.lottie["London"] = {}
+
+        # Source data is copied, not referenced
+        data["msif"][2025]["Birmingham"]["residential"] = 1.0
+        assert snapshot.msif_fee("Birmingham", "residential") == 900.0
+
+    def test_summary(self):
+        """Test summary counts."""
+        summary = PricingDataSnapshot(3, **make_data()).summary()
+        assert summary["version"] == 3
+        assert summary["msif_local_authorities"] == {"2025": 1}
+        assert summary["lottie_regions"] == 1
+
+
+class TestSnapshotStore:
+    """Test SnapshotStore class."""
+
+    def test_lazy_first_build(self):
+        """Test first snapshot is built on first read, once."""
+        loader = MagicMock(return_value=make_data())
+        store = SnapshotStore(loader=loader, max_age_seconds=0)
+        loader.assert_not_called()
+        assert store.version == 0
+
+        first = store.current()
+        assert store.current() is first
+        assert first.version == 1
+        loader.assert_called_once()
+
+    def test_refresh_increments_version(self):
+        """Test refresh publishes a new version and keeps old references intact."""
+        payloads = iter([make_data(900.0), make_data(950.0)])
+        store = SnapshotStore(loader=lambda: next(payloads), max_age_seconds=0)
+
+        old = store.current()
+        new = store.refresh()
+
+        assert new.version == old.version + 1
+        assert store.current() is new
+        assert old.msif_fee("Birmingham", "residential") == 900.0
+        assert new.msif_fee("Birmingham", "residential") == 950.0
+
+    def test_refresh_keeps_datasets_missing_from_sources(self):
+        """Test an empty load (e.g. database down) does not wipe published data."""
+        payloads = iter([make_data(), {"msif": {}, "lottie": {}, "sources": {}}])
+        store = SnapshotStore(loader=lambda: next(payloads), max_age_seconds=0)
+        store.current()
+
+        snapshot = store.refresh()
+        assert snapshot.msif_fee("Birmingham", "residential") == 900.0
+        assert snapshot.lottie_price("West Midlands", "residential") == 1000.0
+
+    def test_publish_merges(self):
+        """Test publish replaces only the given datasets."""
+        store = SnapshotStore(loader=make_data, max_age_seconds=0)
+
+        snapshot = store.publish(
+            lottie={"West Midlands": {"residential": 1100.0}},
+            sources={"lottie": "scraper"},
+        )
+        assert snapshot.msif_fee("Birmingham", "residential") == 900.0
+        assert snapshot.lottie_price("West Midlands", "residential") == 1100.0
+        assert snapshot.sources == {"msif_2025": "database", "lottie": "scraper"}
+
+    def test_listeners_notified(self):
+        """Test listeners receive each published snapshot; failures are ignored."""
+        payloads = iter([make_data(900.0), make_data(950.0)])
+        store = SnapshotStore(loader=lambda: next(payloads), max_age_seconds=0)
+        seen = []
+        store.add_listener(lambda snapshot: 1 / 0)
+        store.add_listener(seen.append)
+
+        store.current()
+        store.refresh()
+        assert [snapshot.version for snapshot in seen] == [1, 2]
+
+    def test_unchanged_data_not_published(self):
+        """Test a rebuild with equal data keeps the version and notifies no one."""
+        payloads = iter([make_data(), make_data(), make_data(950.0)])
+        store = SnapshotStore(loader=lambda: next(payloads), max_age_seconds=0)
+        first = store.current()
+        seen = []
+        store.add_listener(seen.append)
+
+        assert store.refresh() is first
+        assert store.publish(lottie={"West Midlands": {"residential": 1000.0}}) is first
+        assert store.version == 1 and seen == []
+
+        changed = store.refresh()
+        assert changed.version == 2 and seen == [changed]
+        assert changed.content_hash != first.content_hash
+
+    def test_concurrent_publishes_keep_both_datasets(self):
+        """Test publishes of different datasets from two threads both survive."""
+        store = SnapshotStore(loader=make_data, max_age_seconds=0)
+        store.current()
+        threads = [
+            threading.Thread(target=store.publish, kwargs={"msif": {2025: {"Birmingham": {"residential": 990.0}}}}),
+            threading.Thread(target=store.publish, kwargs={"lottie": {"West Midlands": {"residential": 1090.0}}}),
+        ]
+        # Both publishes start while another publish holds the store
+        with store._lock:
+            for thread in threads:
+                thread.start()
+            threading.Event().wait(0.2)
+        for thread in threads:
+            thread.join()
+
+        snapshot = store.current()
+        assert snapshot.msif_fee("Birmingham", "residential") == 990.0
+        assert snapshot.lottie_price("West Midlands", "residential") == 1090.0
+        assert snapshot.version == 3
+
+    def test_listener_may_use_the_store(self):
+        """Test listeners run outside the store lock (reading or publishing does not deadlock)."""
+        store = SnapshotStore(loader=make_data, max_age_seconds=0)
+        seen = []
+
+        def listener(snapshot):
+            seen.append(store.current().version)
+            if snapshot.version == 2:
+                store.publish(lottie={"West Midlands": {"residential": 1200.0}})
+
+        store.add_listener(listener)
+        store.current()
+        done = threading.Event()
+        thread = threading.Thread(
+            target=lambda: (store.publish(lottie={"West Midlands": {"residential": 1100.0}}), done.set()),
+            daemon=True,
+        )
+        thread.start()
+
+        assert done.wait(5)
+        assert seen == [1, 2, 3]
+        assert store.current().lottie_price("West Midlands", "residential") == 1200.0
+
+    def test_content_hash_ignores_order(self):
+        """Test equal data built in a different order hashes equally."""
+        data = make_data()
+        data["lottie"]["London"] = {"nursing": 1500.0, "residential": 1300.0}
+        reordered = make_data()
+        reordered["lottie"] = {"London": {"residential": 1300.0, "nursing": 1500.0}, **reordered["lottie"]}
+        assert PricingDataSnapshot(1, **data).content_hash == PricingDataSnapshot(2, **reordered).content_hash
+
+    def test_stale_snapshot_refreshed_in_background(self):
+        """Test reads of a stale snapshot return it immediately and trigger one rebuild."""
+        refreshed = threading.Event()
+        payloads = iter([make_data(900.0), make_data(950.0)])
+        store = SnapshotStore(loader=lambda: next(payloads), max_age_seconds=1)
+        store.add_listener(lambda snapshot: snapshot.version > 1 and refreshed.set())
+
+        first = store.current()
+        object.__setattr__(first, "created_at", first.created_at.replace(year=2000))
+
+        assert store.current() is first
+        assert refreshed.wait(5)
+        assert store.version == 2
+
+    def test_unchanged_stale_snapshot_not_rebuilt_again(self):
+        """Test a background rebuild that finds equal data keeps the snapshot fresh."""
+        loader = MagicMock(return_value=make_data())
+        store = SnapshotStore(loader=loader, max_age_seconds=60)
+        first = store.current()
+        object.__setattr__(first, "created_at", first.created_at.replace(year=2000))
+
+        store.current()
+        for _ in range(50):
+            if loader.call_count == 2 and not store._refresh_lock.locked():
+                break
+            threading.Event().wait(0.1)
+
+        assert store.current() is first
+        assert store.version == 1
+        assert loader.call_count == 2
+
+    def test_concurrent_readers_see_complete_versions(self):
+        """Test readers never observe a mix of datasets from two versions."""
+        counter = {"n": 0}
+
+        def loader():
+            counter["n"] += 1
+            value = float(counter["n"])
+            return make_data(residential=value, lottie_residential=value)
+
+        store = SnapshotStore(loader=loader, max_age_seconds=0)
+        store.current()
+        stop = threading.Event()
+        errors = []
+
+        def reader():
+            while not stop.is_set():
+                snapshot = store.current()
+                msif = snapshot.msif_fee("Birmingham", "residential")
+                lottie = snapshot.lottie_price("West Midlands", "residential")
+                if msif != lottie:
+                    errors.append((snapshot.version, msif, lottie))
+
+        threads = [threading.Thread(target=reader) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for _ in range(200):
+            store.refresh()
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert store.version == 201
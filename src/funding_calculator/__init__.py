@@ -12,12 +12,15 @@ from .models import (
     DPAResult,
     SavingsResult,
     FundingEligibilityResult,
+    FairCostGapResult,
     PropertyDetails
 )
 from .constants import (
     DomainLevel as DomainLevelEnum,
     Domain as DomainEnum,
     MEANS_TEST,
+    MEANS_TEST_BY_YEAR,
+    CURRENT_MEANS_TEST_YEAR,
     DPA_ELIGIBILITY,
     CHC_THRESHOLDS,
     CHC_WEIGHTS,
@@ -49,10 +52,13 @@ __all__ = [
     "DPAResult",
     "SavingsResult",
     "FundingEligibilityResult",
+    "FairCostGapResult",
     "PropertyDetails",
     "FairCostGapCalculator",
     "PDFReportGenerator",
     "MEANS_TEST",
+    "MEANS_TEST_BY_YEAR",
+    "CURRENT_MEANS_TEST_YEAR",
     "DPA_ELIGIBILITY",
     "CHC_THRESHOLDS",
     "CHC_WEIGHTS",
@@ -1,6 +1,19 @@
-"""FastAPI endpoints for funding calculator module 2025-2026."""
-
-from typing import Optional, Dict
+"""FastAPI endpoints for funding calculator module 2025-2026.
+
+Handlers never block the event loop: the cache is used through its async methods,
+pricing through PricingService.get_full_pricing_async, and CPU-bound steps
+(calculation, report and PDF rendering) run in a bounded worker pool. PDF
+batches are converted in PDFReportGenerator's process pool. Pricing results are
+reused from the store shared with /api/pricing-core (pricing_core.result_store).
+"""
+
+import asyncio
+import contextvars
+import functools
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional, Dict, List
 from fastapi import APIRouter, HTTPException, Query, Body
 from fastapi.responses import StreamingResponse
 try:
@@ -24,11 +37,13 @@ except ImportError:
 try:
     from pricing_core import PricingService, CareType
     from pricing_core.models import PricingResult
+    from pricing_core.result_store import get_result_store
     PRICING_AVAILABLE = True
 except ImportError:
     PricingService = None
     CareType = None
     PricingResult = None
+    get_result_store = None
     PRICING_AVAILABLE = False
 
 # PDF generator (optional)
@@ -48,6 +63,30 @@ _fair_cost_calculator: Optional[FairCostGapCalculator] = None
 _pricing_service: Optional[PricingService] = None
 _pdf_generator: Optional[PDFReportGenerator] = None
 _cache: Optional[Any] = None
+_worker_pool: Optional[ThreadPoolExecutor] = None
+_init_lock = threading.RLock()
+
+# Threads for CPU-bound request steps (calculation, report and PDF rendering)
+WORKER_THREADS = 8
+# Max reports per /generate-pdf/batch request
+MAX_BATCH_REPORTS = 5000
+
+
+def get_worker_pool() -> ThreadPoolExecutor:
+    """Get or create the worker pool for CPU-bound steps."""
+    global _worker_pool
+    if _worker_pool is None:
+        with _init_lock:
+            if _worker_pool is None:
+                _worker_pool = ThreadPoolExecutor(max_workers=WORKER_THREADS, thread_name_prefix="funding-worker")
+    return _worker_pool
+
+
+async def _run_in_worker(func, *args, **kwargs):
+    """Run a blocking call in the worker pool (request spans are kept)."""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(get_worker_pool(), functools.partial(context.run, func, *args, **kwargs))
 
 
 def get_cache():
@@ -67,8 +106,10 @@ def get_funding_calculator() -> FundingEligibilityCalculator:
     """Get or create FundingEligibilityCalculator instance."""
     global _funding_calculator
     if _funding_calculator is None:
-        cache = get_cache()
-        _funding_calculator = FundingEligibilityCalculator(cache=cache)
+        with _init_lock:
+            if _funding_calculator is None:
+                cache = get_cache()
+                _funding_calculator = FundingEligibilityCalculator(cache=cache)
     return _funding_calculator
 
 
@@ -83,12 +124,17 @@ def get_fair_cost_calculator() -> Optional[FairCostGapCalculator]:
 
 
 def get_pricing_service() -> Optional[PricingService]:
-    """Get or create PricingService instance."""
+    """
+    Get or create PricingService instance.
+    
+    Results are shared with /api/pricing-core through get_result_store(), so a
+    home the frontend has just priced is not priced again here.
+    """
     if not PRICING_AVAILABLE:
         return None
     global _pricing_service
     if _pricing_service is None:
-        _pricing_service = PricingService()
+        _pricing_service = PricingService(result_store=get_result_store())
     return _pricing_service
 
 
@@ -98,7 +144,11 @@ def get_pdf_generator() -> Optional[PDFReportGenerator]:
         return None
     global _pdf_generator
     if _pdf_generator is None:
-        _pdf_generator = PDFReportGenerator()
+        with _init_lock:
+            if _pdf_generator is None:
+                generator = PDFReportGenerator()
+                generator.precompile()
+                _pdf_generator = generator
     return _pdf_generator
 
 
@@ -192,6 +242,66 @@ def _convert_legacy_profile_to_new(profile_dict: Dict) -> PatientProfile:
     return profile
 
 
+async def _get_pricing_result(postcode: Optional[str], care_type: Optional[str]) -> Optional[PricingResult]:
+    """PricingResult for postcode and care type (None if unavailable or on error)."""
+    if not (postcode and care_type and PRICING_AVAILABLE):
+        return None
+    try:
+        # First call builds the service (postcode cache, snapshot store) - off the loop
+        pricing_service = await asyncio.to_thread(get_pricing_service)
+        if not pricing_service:
+            return None
+        return await pricing_service.get_full_pricing_async(
+            postcode=postcode,
+            care_type=CareType(care_type.lower())
+        )
+    except Exception as e:
+        logger.warning("Could not get pricing result", error=str(e))
+        return None
+
+
+async def _calculate(
+    patient_profile: Dict,
+    pricing_result: Optional[PricingResult],
+    **kwargs
+):
+    """Run calculate_full_eligibility_async with the worker pool."""
+    calculator = await asyncio.to_thread(get_funding_calculator)
+    return await calculator.calculate_full_eligibility_async(
+        patient_profile=patient_profile,
+        pricing_result=pricing_result,
+        executor=get_worker_pool(),
+        **kwargs
+    )
+
+
+def _render_pdf(result) -> bytes:
+    """Render the full report of result to PDF (blocking, run in the worker pool)."""
+    generator = get_pdf_generator()
+    if generator is None:
+        raise ImportError("PDF report generator not available")
+    return generator.generate_result_pdf(result)
+
+
+async def _render_pdf_response(result, filename: str) -> StreamingResponse:
+    """PDF download response for result."""
+    try:
+        pdf_bytes = await _run_in_worker(_render_pdf, result)
+    except ImportError:
+        raise HTTPException(
+            status_code=503,
+            detail="PDF generation requires weasyprint. Install: pip install weasyprint"
+        )
+    
+    return StreamingResponse(
+        iter([pdf_bytes]),
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f'attachment; filename="funding_report_{filename}.pdf"'
+        }
+    )
+
+
 @router.post("/calculate-full")
 async def calculate_full_eligibility(
     patient_profile: Dict = Body(..., description="Patient profile dict"),
@@ -207,28 +317,16 @@ async def calculate_full_eligibility(
     Accepts patient profile with domain assessments or legacy format.
     """
     try:
-        # Convert to new profile format
-        profile = _convert_legacy_profile_to_new(patient_profile)
+        # Validate the profile (legacy format is converted) off the event loop
+        await _run_in_worker(_convert_legacy_profile_to_new, patient_profile)
         
         # Get pricing result if postcode provided
-        pricing_result = None
-        if postcode and PRICING_AVAILABLE:
-            try:
-                pricing_service = get_pricing_service()
-                if pricing_service and care_type:
-                    care_type_enum = CareType(care_type.lower())
-                    pricing_result = pricing_service.get_full_pricing(
-                        postcode=postcode,
-                        care_type=care_type_enum
-                    )
-            except Exception as e:
-                logger.warning("Could not get pricing result", error=str(e))
+        pricing_result = await _get_pricing_result(postcode, care_type)
         
         # Calculate full eligibility
-        calculator = get_funding_calculator()
-        result = calculator.calculate_full_eligibility(
-            patient_profile=patient_profile,
-            pricing_result=pricing_result,
+        result = await _calculate(
+            patient_profile,
+            pricing_result,
             user_id=user_id,
             use_cache=use_cache,
             cache_override=cache_override
@@ -241,6 +339,48 @@ async def calculate_full_eligibility(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/scenarios")
+async def sweep_funding_scenarios(
+    patient_profile: Dict = Body(..., description="Patient profile dict"),
+    capital_values: Optional[List[float]] = Body(None, description="Capital assets to try (default: profile value)"),
+    property_values: Optional[List[Optional[float]]] = Body(
+        None, description="Property values to try, null = no property (default: profile value)"
+    ),
+    weekly_incomes: Optional[List[float]] = Body(None, description="Weekly incomes to try (default: profile value)"),
+    care_types: Optional[List[str]] = Body(None, description="Care types to try (default: profile care type)"),
+    postcode: Optional[str] = Body(None, description="Postcode for pricing per care type"),
+    metrics: Optional[List[str]] = Body(None, description="Metrics to return (default DEFAULT_METRICS)")
+):
+    """
+    Funding savings over a grid of capital, property value, weekly income and care type.
+    
+    The profile is parsed and CHC scored once; the means test, tariff income, DPA
+    and savings are evaluated vectorized over the grid. Returns one nested list
+    per metric, indexed [care_type][property_value][capital_assets][weekly_income].
+    """
+    # pandas/numpy are loaded on first use, not at app import
+    from .scenarios import DEFAULT_METRICS, scenario_matrix, sweep_scenarios
+    
+    try:
+        if care_types is None:
+            care_types = [patient_profile.get("care_type", "residential")]
+        pricing_results = await asyncio.gather(*(
+            _get_pricing_result(postcode, care_type) for care_type in care_types
+        ))
+        sweep = await _run_in_worker(
+            sweep_scenarios,
+            patient_profile,
+            capital_values,
+            property_values,
+            weekly_incomes,
+            dict(zip(care_types, pricing_results))
+        )
+        return scenario_matrix(sweep, metrics or DEFAULT_METRICS)
+    except Exception as e:
+        logger.error("Error sweeping scenarios", error=str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/calculate-savings")
 async def calculate_savings(
     postcode: str = Query(..., description="UK postcode"),
@@ -288,24 +428,12 @@ async def calculate_savings(
         }
         
         # Get pricing result
-        pricing_result = None
-        if PRICING_AVAILABLE:
-            try:
-                pricing_service = get_pricing_service()
-                if pricing_service:
-                    care_type_enum = CareType(care_type.lower())
-                    pricing_result = pricing_service.get_full_pricing(
-                        postcode=postcode,
-                        care_type=care_type_enum
-                    )
-            except Exception:
-                pass
+        pricing_result = await _get_pricing_result(postcode, care_type)
         
         # Calculate using new calculator
-        calculator = get_funding_calculator()
-        result = calculator.calculate_full_eligibility(
-            patient_profile=profile_dict,
-            pricing_result=pricing_result,
+        result = await _calculate(
+            profile_dict,
+            pricing_result,
             user_id=user_id,
             use_cache=use_cache
         )
@@ -355,52 +483,19 @@ async def generate_pdf_report_post(
     Returns PDF file for download.
     """
     try:
-        # Calculate eligibility first
-        calculator = get_funding_calculator()
-        
         # Get pricing result if postcode provided
-        pricing_result = None
-        if postcode and PRICING_AVAILABLE:
-            try:
-                pricing_service = get_pricing_service()
-                if pricing_service and care_type:
-                    care_type_enum = CareType(care_type.lower())
-                    pricing_result = pricing_service.get_full_pricing(
-                        postcode=postcode,
-                        care_type=care_type_enum
-                    )
-            except Exception as e:
-                logger.warning("Could not get pricing result", error=str(e))
+        pricing_result = await _get_pricing_result(postcode, care_type)
         
         # Calculate full eligibility
-        result = calculator.calculate_full_eligibility(
-            patient_profile=patient_profile,
-            pricing_result=pricing_result,
+        result = await _calculate(
+            patient_profile,
+            pricing_result,
             user_id="web_user",
             use_cache=True
         )
         
-        # Generate report HTML
-        report_html = calculator.generate_report(result, report_type="full")
-        
-        # Convert to PDF
-        try:
-            from weasyprint import HTML
-            pdf_bytes = HTML(string=report_html).write_pdf()
-        except ImportError:
-            raise HTTPException(
-                status_code=503,
-                detail="PDF generation requires weasyprint. Install: pip install weasyprint"
-            )
-        
-        # Return PDF as download
-        return StreamingResponse(
-            iter([pdf_bytes]),
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f'attachment; filename="funding_report_{postcode.replace(" ", "_") if postcode else "report"}.pdf"'
-            }
-        )
+        # Render report and PDF in the worker pool, return as download
+        return await _render_pdf_response(result, postcode.replace(" ", "_") if postcode else "report")
     except HTTPException:
         raise
     except Exception as e:
@@ -408,6 +503,56 @@ async def generate_pdf_report_post(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/generate-pdf/batch")
+async def generate_pdf_batch(
+    patient_profiles: List[Dict] = Body(..., description="Patient profile dicts"),
+    postcode: Optional[str] = Body(None, description="Postcode for pricing (all reports)"),
+    care_type: Optional[str] = Body(None, description="Care type for pricing (all reports)"),
+    names: Optional[List[str]] = Body(None, description="PDF file names, one per profile")
+):
+    """
+    Generate PDF funding reports for many profiles, streamed as a ZIP archive.
+    
+    Reports are converted in the PDF process pool and written to the archive in
+    input order as they finish.
+    """
+    if not patient_profiles:
+        raise HTTPException(status_code=400, detail="No patient profiles")
+    if len(patient_profiles) > MAX_BATCH_REPORTS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_REPORTS} reports per batch")
+    if names is not None and len(names) != len(patient_profiles):
+        raise HTTPException(status_code=400, detail="names must have one entry per profile")
+    
+    try:
+        pricing_result = await _get_pricing_result(postcode, care_type)
+        results = await asyncio.gather(*(
+            _calculate(profile, pricing_result, user_id="campaign", use_cache=True)
+            for profile in patient_profiles
+        ))
+        
+        generator = await asyncio.to_thread(get_pdf_generator)
+        if generator is None:
+            raise ImportError("PDF report generator not available")
+        chunks = generator.iter_zip(results, names)
+        # First report before the response starts, so a missing weasyprint is still a 503
+        first_chunk = await asyncio.to_thread(next, chunks)
+    except ImportError:
+        raise HTTPException(
+            status_code=503,
+            detail="PDF generation requires weasyprint. Install: pip install weasyprint"
+        )
+    except Exception as e:
+        logger.error("Error generating PDF batch", error=str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Sync iterator: Starlette pulls the remaining chunks in a thread
+    return StreamingResponse(
+        itertools.chain([first_chunk], chunks),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="funding_reports.zip"'}
+    )
+
+
 @router.get("/generate-pdf")
 async def generate_pdf_report(
     postcode: str = Query(..., description="UK postcode"),
@@ -453,47 +598,13 @@ async def generate_pdf_report(
         }
         
         # Get pricing result
-        pricing_result = None
-        if PRICING_AVAILABLE:
-            try:
-                pricing_service = get_pricing_service()
-                if pricing_service:
-                    care_type_enum = CareType(care_type.lower())
-                    pricing_result = pricing_service.get_full_pricing(
-                        postcode=postcode,
-                        care_type=care_type_enum
-                    )
-            except Exception:
-                pass
+        pricing_result = await _get_pricing_result(postcode, care_type)
         
         # Calculate using new calculator
-        calculator = get_funding_calculator()
-        result = calculator.calculate_full_eligibility(
-            patient_profile=profile_dict,
-            pricing_result=pricing_result
-        )
-        
-        # Generate report HTML
-        report_html = calculator.generate_report(result, report_type="full")
+        result = await _calculate(profile_dict, pricing_result)
         
-        # Convert to PDF
-        try:
-            from weasyprint import HTML
-            pdf_bytes = HTML(string=report_html).write_pdf()
-        except ImportError:
-            raise HTTPException(
-                status_code=503,
-                detail="PDF generation requires weasyprint. Install: pip install weasyprint"
-            )
-        
-        # Return PDF as download
-        return StreamingResponse(
-            iter([pdf_bytes]),
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f'attachment; filename="funding_report_{postcode.replace(" ", "_")}.pdf"'
-            }
-        )
+        # Render report and PDF in the worker pool, return as download
+        return await _render_pdf_response(result, postcode.replace(" ", "_"))
     except HTTPException:
         raise
     except Exception as e:
@@ -525,12 +636,31 @@ async def clear_user_cache(user_id: str):
 async def delete_cache_entry(
     user_id: str = Query(..., description="User identifier"),
     patient_profile: Dict = Body(..., description="Patient profile dict"),
+    postcode: Optional[str] = Query(None, description="Postcode the result was priced for"),
+    care_type: Optional[str] = Query(None, description="Care type the result was priced for"),
+    property_details: Optional[Dict] = Body(None, description="Property details the result was calculated with"),
     override: bool = Query(False, description="Delete override cache")
 ):
-    """Delete specific cache entry (admin endpoint)."""
-    cache = get_cache()
+    """
+    Delete specific cache entry (admin endpoint).
+    
+    Shared results are keyed on the profile and its pricing context, so pass the
+    postcode/care type (and property details) of the request to delete. Pricing is
+    looked up again: an entry priced with an older snapshot is already unreachable.
+    Overrides are keyed on the profile alone.
+    """
+    calculator = await asyncio.to_thread(get_funding_calculator)
+    cache = calculator.cache
     if not cache:
         raise HTTPException(status_code=503, detail="Cache not available")
     
-    deleted = cache.delete(user_id, patient_profile, override=override)
+    profile_hash = None
+    if not override:
+        pricing_result = await _get_pricing_result(postcode, care_type)
+        if postcode and care_type and pricing_result is None:
+            raise HTTPException(status_code=503, detail="Pricing not available, cannot build the cache key")
+        profile_hash = calculator.result_cache_hash(patient_profile, pricing_result, property_details)
+    deleted = await asyncio.to_thread(
+        cache.delete, user_id, patient_profile, override=override, profile_hash=profile_hash
+    )
     return {"deleted": deleted, "user_id": user_id}
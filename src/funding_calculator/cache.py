@@ -1,22 +1,41 @@
 """Caching module for Funding Eligibility Calculator results.
 
 Uses Redis for primary caching with SQLite fallback.
-Caches results by user_id + hash(patient_profile).
+
+Two levels:
+
+* profile hash -> result, shared by all users (the result depends only on the
+  profile and pricing context, so identical profiles are computed once);
+* user -> profile hashes, an index used for per-user invalidation
+  (``clear_user_cache``). Admin overrides stay per user and are keyed on the
+  profile alone, so an override applies whatever the pricing context.
+
+The profile hash (with context) is computed once per request (``profile_hash``)
+and passed to ``get`` / ``set`` / ``delete`` for the shared result.
+
+The SQLite fallback runs in WAL mode with one connection per thread (readers do
+not block the writer, and no connection is shared between threads). Expired rows
+are filtered on read and purged by a background sweeper thread every
+``SWEEP_INTERVAL_SECONDS``, not on the request path.
+
+``get_async`` / ``set_async`` serve async endpoints: Redis through a
+``redis.asyncio`` client (one MGET for override + shared result), SQLite through
+the sync methods in a worker thread.
 """
 
+import asyncio
 import json
 import hashlib
+import threading
 from typing import Optional, Dict, Any
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import pickle
 import base64
+import importlib.util
 
-try:
-    import redis
-    REDIS_AVAILABLE = True
-except ImportError:
-    REDIS_AVAILABLE = False
-    redis = None
+# redis is imported lazily (see _get_redis) to keep module import cheap
+REDIS_AVAILABLE = importlib.util.find_spec("redis") is not None
+redis = None
 
 try:
     import sqlite3
@@ -32,6 +51,17 @@ except ImportError:
     import logging
     logger = logging.getLogger(__name__)
 
+from observability import record_cache_lookup
+
+
+def _get_redis():
+    """Lazy import redis."""
+    global redis
+    if redis is None:
+        import redis as _redis
+        redis = _redis
+    return redis
+
 
 class CacheConfig:
     """Cache configuration."""
@@ -49,6 +79,13 @@ class CacheConfig:
     
     # SQLite fallback
     SQLITE_DB_PATH = "funding_cache.db"
+    SQLITE_BUSY_TIMEOUT_SECONDS = 5.0
+    
+    # Background purge of expired SQLite rows (0 disables the sweeper)
+    SWEEP_INTERVAL_SECONDS = 300
+    
+    # Users not tracked in the user -> profile index (shared by everyone)
+    UNINDEXED_USERS = ("anonymous",)
 
 
 class FundingCache:
@@ -65,7 +102,8 @@ class FundingCache:
         redis_db: int = None,
         redis_password: str = None,
         sqlite_db_path: str = None,
-        default_ttl: int = None
+        default_ttl: int = None,
+        sweep_interval: int = None
     ):
         """
         Initialize cache manager.
@@ -77,6 +115,8 @@ class FundingCache:
             redis_password: Redis password (optional)
             sqlite_db_path: SQLite database path (default from config)
             default_ttl: Default TTL in seconds (default from config)
+            sweep_interval: Seconds between purges of expired SQLite rows
+                (default from config, 0 disables the sweeper)
         """
         self.config = CacheConfig()
         
@@ -93,12 +133,16 @@ class FundingCache:
             self.config.SQLITE_DB_PATH = sqlite_db_path
         if default_ttl:
             self.config.DEFAULT_TTL_SECONDS = default_ttl
+        if sweep_interval is not None:
+            self.config.SWEEP_INTERVAL_SECONDS = sweep_interval
         
         # Initialize Redis
         self.redis_client = None
+        # redis.asyncio client for get_async/set_async, created on first use
+        self.async_redis_client = None
         if REDIS_AVAILABLE:
             try:
-                self.redis_client = redis.Redis(
+                self.redis_client = _get_redis().Redis(
                     host=self.config.REDIS_HOST,
                     port=self.config.REDIS_PORT,
                     db=self.config.REDIS_DB,
@@ -113,26 +157,91 @@ class FundingCache:
                 logger.warning("Redis not available, using SQLite fallback", error=str(e))
                 self.redis_client = None
         
-        # Initialize SQLite fallback
-        self.sqlite_conn = None
+        # Initialize SQLite fallback (connections are opened per thread)
+        self._sqlite_enabled = False
+        self._sqlite_local = threading.local()
+        self._sqlite_connections = []
+        self._sqlite_lock = threading.Lock()
+        self._sweeper = None
+        self._stop_sweeper = threading.Event()
         if SQLITE_AVAILABLE and not self.redis_client:
             try:
-                self.sqlite_conn = sqlite3.connect(
-                    self.config.SQLITE_DB_PATH,
-                    check_same_thread=False,
-                    timeout=5.0
-                )
+                self._sqlite_enabled = True
                 self._init_sqlite_db()
                 logger.info("SQLite cache initialized", db_path=self.config.SQLITE_DB_PATH)
+                self._start_sweeper()
             except Exception as e:
+                self._sqlite_enabled = False
                 logger.warning("SQLite not available", error=str(e))
     
+    @property
+    def sqlite_conn(self):
+        """SQLite connection of the calling thread (None if SQLite is not used)."""
+        if not self._sqlite_enabled:
+            return None
+        conn = getattr(self._sqlite_local, "conn", None)
+        if conn is None:
+            # check_same_thread=False only so close() can close every connection
+            conn = sqlite3.connect(
+                self.config.SQLITE_DB_PATH,
+                check_same_thread=False,
+                timeout=self.config.SQLITE_BUSY_TIMEOUT_SECONDS
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._sqlite_local.conn = conn
+            with self._sqlite_lock:
+                self._sqlite_connections.append(conn)
+        return conn
+    
+    @staticmethod
+    def _sqlite_expiry(ttl: int) -> str:
+        """Expiry timestamp in the format of SQLite's datetime('now') (UTC)."""
+        return (datetime.now(timezone.utc) + timedelta(seconds=ttl)).strftime("%Y-%m-%d %H:%M:%S")
+    
+    def _start_sweeper(self) -> None:
+        """Start the background thread purging expired SQLite rows."""
+        if self.config.SWEEP_INTERVAL_SECONDS <= 0:
+            return
+        self._sweeper = threading.Thread(target=self._sweep_loop, name="funding-cache-sweeper", daemon=True)
+        self._sweeper.start()
+    
+    def _sweep_loop(self) -> None:
+        while not self._stop_sweeper.wait(self.config.SWEEP_INTERVAL_SECONDS):
+            self.purge_expired()
+    
+    def purge_expired(self) -> int:
+        """
+        Delete expired SQLite rows (results, overrides and user index entries).
+        
+        Redis expires keys itself.
+        
+        Returns:
+            Number of expired result/override rows deleted
+        """
+        conn = self.sqlite_conn
+        if not conn:
+            return 0
+        try:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM funding_cache WHERE expires_at <= datetime('now')")
+            count = cursor.rowcount
+            cursor.execute("DELETE FROM funding_cache_users WHERE expires_at <= datetime('now')")
+            conn.commit()
+        except Exception as e:
+            logger.warning("SQLite purge error", error=str(e))
+            return 0
+        if count:
+            logger.info("Expired cache entries purged", count=count)
+        return count
+    
     def _init_sqlite_db(self):
         """Initialize SQLite database schema."""
-        if not self.sqlite_conn:
+        conn = self.sqlite_conn
+        if not conn:
             return
         
-        cursor = self.sqlite_conn.cursor()
+        cursor = conn.cursor()
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS funding_cache (
                 cache_key TEXT PRIMARY KEY,
@@ -149,54 +258,73 @@ class FundingCache:
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_user_id ON funding_cache(user_id)
         """)
-        self.sqlite_conn.commit()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS funding_cache_users (
+                user_id TEXT NOT NULL,
+                profile_hash TEXT NOT NULL,
+                expires_at TIMESTAMP NOT NULL,
+                PRIMARY KEY (user_id, profile_hash)
+            )
+        """)
+        conn.commit()
     
     def _generate_cache_key(
         self,
-        user_id: str,
         profile_hash: str,
+        user_id: Optional[str] = None,
         override: bool = False
     ) -> str:
         """
         Generate cache key.
         
         Args:
-            user_id: User identifier
             profile_hash: Hash of patient profile
+            user_id: User identifier (only part of override keys)
             override: Whether this is an admin override
             
         Returns:
             Cache key string
         """
-        prefix = self.config.CACHE_PREFIX
         if override:
-            prefix += "override:"
-        return f"{prefix}{user_id}:{profile_hash}"
+            return f"{self.config.CACHE_PREFIX}override:{user_id}:{profile_hash}"
+        return f"{self.config.CACHE_PREFIX}result:{profile_hash}"
     
-    def _hash_profile(self, profile: Dict[str, Any]) -> str:
+    def _user_index_key(self, user_id: str) -> str:
+        """Redis key of the set of profile hashes cached for a user."""
+        return f"{self.config.CACHE_PREFIX}user:{user_id}"
+    
+    def profile_hash(self, profile: Any, context: Optional[Dict[str, Any]] = None) -> str:
         """
-        Generate hash of patient profile.
+        Canonical hash of a patient profile.
+        
+        Top-level None values are ignored and keys are sorted, so equal profiles
+        hash equally regardless of key order.
         
         Args:
-            profile: Patient profile dict
+            profile: Patient profile dict (or PatientProfile)
+            context: Other inputs the result depends on (e.g. pricing)
             
         Returns:
-            SHA256 hash string
+            BLAKE2b-128 hex digest
         """
-        # Normalize profile for hashing (remove None values, sort keys)
-        normalized = {}
-        for key, value in sorted(profile.items()):
-            if value is not None:
-                normalized[key] = value
-        
-        profile_json = json.dumps(normalized, sort_keys=True, default=str)
-        return hashlib.sha256(profile_json.encode()).hexdigest()
+        if hasattr(profile, "model_dump"):
+            profile = profile.model_dump(mode="json")
+        normalized = {key: value for key, value in profile.items() if value is not None}
+        if context:
+            normalized["__context__"] = context
+        
+        profile_json = json.dumps(normalized, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.blake2b(profile_json.encode(), digest_size=16).hexdigest()
+    
+    # Backward compatible name
+    _hash_profile = profile_hash
     
     def get(
         self,
         user_id: str,
         profile: Dict[str, Any],
-        check_override: bool = True
+        check_override: bool = True,
+        profile_hash: Optional[str] = None
     ) -> Optional[Dict[str, Any]]:
         """
         Get cached result.
@@ -205,28 +333,34 @@ class FundingCache:
             user_id: User identifier
             profile: Patient profile dict
             check_override: Whether to check for admin override first
+            profile_hash: Precomputed hash of the shared result (profile_hash(profile) if not given)
             
         Returns:
             Cached result dict or None
         """
-        profile_hash = self._hash_profile(profile)
+        if profile_hash is None:
+            profile_hash = self.profile_hash(profile)
         
-        # Check override first if requested
+        # Check override first if requested (keyed on the profile alone)
         if check_override:
-            override_key = self._generate_cache_key(user_id, profile_hash, override=True)
+            override_key = self._generate_cache_key(self.profile_hash(profile), user_id, override=True)
             override_result = self._get_from_cache(override_key)
             if override_result:
                 logger.info("Cache hit (override)", user_id=user_id, profile_hash=profile_hash[:8])
+                record_cache_lookup("funding", hit=True)
                 return override_result
         
-        # Check regular cache
-        cache_key = self._generate_cache_key(user_id, profile_hash, override=False)
+        # Check shared result cache
+        cache_key = self._generate_cache_key(profile_hash)
         result = self._get_from_cache(cache_key)
         
         if result:
             logger.info("Cache hit", user_id=user_id, profile_hash=profile_hash[:8])
+            # Results are shared: remember the user saw it, for per-user invalidation
+            self._index_user(user_id, profile_hash)
         else:
             logger.debug("Cache miss", user_id=user_id, profile_hash=profile_hash[:8])
+        record_cache_lookup("funding", hit=bool(result))
         
         return result
     
@@ -242,9 +376,10 @@ class FundingCache:
                 logger.warning("Redis get error, trying SQLite", error=str(e))
         
         # Fallback to SQLite
-        if self.sqlite_conn:
+        conn = self.sqlite_conn
+        if conn:
             try:
-                cursor = self.sqlite_conn.cursor()
+                cursor = conn.cursor()
                 cursor.execute("""
                     SELECT cache_value, expires_at 
                     FROM funding_cache 
@@ -254,22 +389,50 @@ class FundingCache:
                 if row:
                     cache_value, expires_at = row
                     return self._deserialize(cache_value)
-                else:
-                    # Clean up expired entries
-                    cursor.execute("DELETE FROM funding_cache WHERE expires_at <= datetime('now')")
-                    self.sqlite_conn.commit()
             except Exception as e:
                 logger.warning("SQLite get error", error=str(e))
         
         return None
     
+    def _index_user(self, user_id: str, profile_hash: str, ttl: Optional[int] = None) -> None:
+        """Add profile_hash to the user -> profile index."""
+        if not user_id or user_id in self.config.UNINDEXED_USERS:
+            return
+        if ttl is None:
+            ttl = self.config.DEFAULT_TTL_SECONDS
+        
+        if self.redis_client:
+            try:
+                index_key = self._user_index_key(user_id)
+                pipe = self.redis_client.pipeline()
+                pipe.sadd(index_key, profile_hash)
+                pipe.expire(index_key, ttl)
+                pipe.execute()
+                return
+            except Exception as e:
+                logger.warning("Redis index error, trying SQLite", error=str(e))
+        
+        conn = self.sqlite_conn
+        if conn:
+            try:
+                expires_at = self._sqlite_expiry(ttl)
+                cursor = conn.cursor()
+                cursor.execute("""
+                    INSERT OR REPLACE INTO funding_cache_users (user_id, profile_hash, expires_at)
+                    VALUES (?, ?, ?)
+                """, (user_id, profile_hash, expires_at))
+                conn.commit()
+            except Exception as e:
+                logger.warning("SQLite index error", error=str(e))
+    
     def set(
         self,
         user_id: str,
         profile: Dict[str, Any],
         result: Dict[str, Any],
         ttl: Optional[int] = None,
-        override: bool = False
+        override: bool = False,
+        profile_hash: Optional[str] = None
     ) -> bool:
         """
         Cache result.
@@ -279,13 +442,16 @@ class FundingCache:
             profile: Patient profile dict
             result: Calculation result dict
             ttl: Time to live in seconds (default from config)
-            override: Whether this is an admin override
+            override: Whether this is an admin override (stored for user_id only)
+            profile_hash: Precomputed hash of the shared result (profile_hash(profile) if not given;
+                ignored for overrides, which are keyed on the profile alone)
             
         Returns:
             True if cached successfully
         """
-        profile_hash = self._hash_profile(profile)
-        cache_key = self._generate_cache_key(user_id, profile_hash, override=override)
+        if profile_hash is None or override:
+            profile_hash = self.profile_hash(profile)
+        cache_key = self._generate_cache_key(profile_hash, user_id, override=override)
         
         if ttl is None:
             ttl = self.config.DEFAULT_TTL_SECONDS
@@ -296,22 +462,27 @@ class FundingCache:
         if self.redis_client:
             try:
                 self.redis_client.setex(cache_key, ttl, serialized)
+                if not override:
+                    self._index_user(user_id, profile_hash, ttl)
                 logger.info("Cached in Redis", user_id=user_id, profile_hash=profile_hash[:8], ttl=ttl)
                 return True
             except Exception as e:
                 logger.warning("Redis set error, trying SQLite", error=str(e))
         
         # Fallback to SQLite
-        if self.sqlite_conn:
+        conn = self.sqlite_conn
+        if conn:
             try:
-                expires_at = datetime.now() + timedelta(seconds=ttl)
-                cursor = self.sqlite_conn.cursor()
+                expires_at = self._sqlite_expiry(ttl)
+                cursor = conn.cursor()
                 cursor.execute("""
                     INSERT OR REPLACE INTO funding_cache 
                     (cache_key, cache_value, expires_at, user_id, profile_hash)
                     VALUES (?, ?, ?, ?, ?)
-                """, (cache_key, serialized, expires_at.isoformat(), user_id, profile_hash))
-                self.sqlite_conn.commit()
+                """, (cache_key, serialized, expires_at, user_id if override else None, profile_hash))
+                conn.commit()
+                if not override:
+                    self._index_user(user_id, profile_hash, ttl)
                 logger.info("Cached in SQLite", user_id=user_id, profile_hash=profile_hash[:8], ttl=ttl)
                 return True
             except Exception as e:
@@ -323,38 +494,54 @@ class FundingCache:
         self,
         user_id: str,
         profile: Dict[str, Any],
-        override: bool = False
+        override: bool = False,
+        profile_hash: Optional[str] = None
     ) -> bool:
         """
         Delete cached result.
         
+        A regular result is shared, so deleting it invalidates it for every user.
+        
         Args:
             user_id: User identifier
             profile: Patient profile dict
             override: Whether to delete override cache
+            profile_hash: Precomputed hash of the shared result (profile_hash(profile) if not given;
+                ignored for overrides, which are keyed on the profile alone)
             
         Returns:
             True if deleted successfully
         """
-        profile_hash = self._hash_profile(profile)
-        cache_key = self._generate_cache_key(user_id, profile_hash, override=override)
+        if profile_hash is None or override:
+            profile_hash = self.profile_hash(profile)
+        cache_key = self._generate_cache_key(profile_hash, user_id, override=override)
         
         deleted = False
         
         # Delete from Redis
         if self.redis_client:
             try:
-                self.redis_client.delete(cache_key)
+                pipe = self.redis_client.pipeline()
+                pipe.delete(cache_key)
+                if not override:
+                    pipe.srem(self._user_index_key(user_id), profile_hash)
+                pipe.execute()
                 deleted = True
             except Exception as e:
                 logger.warning("Redis delete error", error=str(e))
         
         # Delete from SQLite
-        if self.sqlite_conn:
+        conn = self.sqlite_conn
+        if conn:
             try:
-                cursor = self.sqlite_conn.cursor()
+                cursor = conn.cursor()
                 cursor.execute("DELETE FROM funding_cache WHERE cache_key = ?", (cache_key,))
-                self.sqlite_conn.commit()
+                if not override:
+                    cursor.execute(
+                        "DELETE FROM funding_cache_users WHERE user_id = ? AND profile_hash = ?",
+                        (user_id, profile_hash)
+                    )
+                conn.commit()
                 deleted = True
             except Exception as e:
                 logger.warning("SQLite delete error", error=str(e))
@@ -368,6 +555,9 @@ class FundingCache:
         """
         Clear all cache entries for a user.
         
+        Deletes the user's overrides and the shared results of the profiles in the
+        user's index (other users recompute them on their next request).
+        
         Args:
             user_id: User identifier
             
@@ -379,20 +569,35 @@ class FundingCache:
         # Clear from Redis
         if self.redis_client:
             try:
-                pattern = f"{self.config.CACHE_PREFIX}*:{user_id}:*"
-                keys = self.redis_client.keys(pattern)
+                index_key = self._user_index_key(user_id)
+                keys = [
+                    self._generate_cache_key(self._text(profile_hash))
+                    for profile_hash in self.redis_client.smembers(index_key)
+                ]
+                keys += list(self.redis_client.scan_iter(
+                    match=f"{self.config.CACHE_PREFIX}override:{user_id}:*"
+                ))
                 if keys:
                     count += self.redis_client.delete(*keys)
+                self.redis_client.delete(index_key)
             except Exception as e:
                 logger.warning("Redis clear error", error=str(e))
         
         # Clear from SQLite
-        if self.sqlite_conn:
+        conn = self.sqlite_conn
+        if conn:
             try:
-                cursor = self.sqlite_conn.cursor()
-                cursor.execute("DELETE FROM funding_cache WHERE user_id = ?", (user_id,))
+                cursor = conn.cursor()
+                cursor.execute("""
+                    DELETE FROM funding_cache
+                    WHERE user_id = ?
+                       OR (user_id IS NULL AND profile_hash IN (
+                           SELECT profile_hash FROM funding_cache_users WHERE user_id = ?
+                       ))
+                """, (user_id, user_id))
                 count += cursor.rowcount
-                self.sqlite_conn.commit()
+                cursor.execute("DELETE FROM funding_cache_users WHERE user_id = ?", (user_id,))
+                conn.commit()
             except Exception as e:
                 logger.warning("SQLite clear error", error=str(e))
         
@@ -401,6 +606,10 @@ class FundingCache:
         
         return count
     
+    @staticmethod
+    def _text(value) -> str:
+        return value.decode() if isinstance(value, bytes) else value
+    
     def _serialize(self, data: Dict[str, Any]) -> bytes:
         """Serialize data for caching."""
         try:
@@ -421,6 +630,115 @@ class FundingCache:
             # Fallback to pickle
             return pickle.loads(data)
     
+    def _get_async_redis(self):
+        """redis.asyncio client (None if Redis is not used)."""
+        if self.async_redis_client is None and self.redis_client is not None:
+            import redis.asyncio as redis_asyncio
+            self.async_redis_client = redis_asyncio.Redis(
+                host=self.config.REDIS_HOST,
+                port=self.config.REDIS_PORT,
+                db=self.config.REDIS_DB,
+                password=self.config.REDIS_PASSWORD,
+                socket_timeout=self.config.REDIS_SOCKET_TIMEOUT,
+                decode_responses=False
+            )
+        return self.async_redis_client
+    
+    async def get_async(
+        self,
+        user_id: str,
+        profile: Dict[str, Any],
+        check_override: bool = True,
+        profile_hash: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Async get() that does not block the event loop.
+        
+        Args and Returns: as get()
+        """
+        if profile_hash is None:
+            profile_hash = self.profile_hash(profile)
+        
+        client = self._get_async_redis()
+        if client is None:
+            return await asyncio.to_thread(self.get, user_id, profile, check_override, profile_hash)
+        
+        result_key = self._generate_cache_key(profile_hash)
+        keys = [result_key]
+        if check_override:
+            keys.insert(0, self._generate_cache_key(self.profile_hash(profile), user_id, override=True))
+        try:
+            values = await client.mget(keys)
+        except Exception as e:
+            logger.warning("Redis async get error, falling back", error=str(e))
+            return await asyncio.to_thread(self.get, user_id, profile, check_override, profile_hash)
+        
+        if check_override and values[0]:
+            logger.info("Cache hit (override)", user_id=user_id, profile_hash=profile_hash[:8])
+            record_cache_lookup("funding", hit=True)
+            return self._deserialize(values[0])
+        
+        cached = values[-1]
+        record_cache_lookup("funding", hit=bool(cached))
+        if not cached:
+            logger.debug("Cache miss", user_id=user_id, profile_hash=profile_hash[:8])
+            return None
+        
+        logger.info("Cache hit", user_id=user_id, profile_hash=profile_hash[:8])
+        if user_id and user_id not in self.config.UNINDEXED_USERS:
+            try:
+                await self._index_user_async(client, user_id, profile_hash, self.config.DEFAULT_TTL_SECONDS)
+            except Exception as e:
+                logger.warning("Redis async index error", error=str(e))
+        return self._deserialize(cached)
+    
+    async def _index_user_async(self, client, user_id: str, profile_hash: str, ttl: int) -> None:
+        """Async _index_user() for Redis (one pipelined round trip)."""
+        index_key = self._user_index_key(user_id)
+        pipe = client.pipeline(transaction=False)
+        pipe.sadd(index_key, profile_hash)
+        pipe.expire(index_key, ttl)
+        await pipe.execute()
+    
+    async def set_async(
+        self,
+        user_id: str,
+        profile: Dict[str, Any],
+        result: Dict[str, Any],
+        ttl: Optional[int] = None,
+        override: bool = False,
+        profile_hash: Optional[str] = None
+    ) -> bool:
+        """
+        Async set() that does not block the event loop.
+        
+        Args and Returns: as set()
+        """
+        if profile_hash is None or override:
+            profile_hash = self.profile_hash(profile)
+        
+        client = self._get_async_redis()
+        if client is None:
+            return await asyncio.to_thread(self.set, user_id, profile, result, ttl, override, profile_hash)
+        
+        if ttl is None:
+            ttl = self.config.DEFAULT_TTL_SECONDS
+        try:
+            # Result and user index in one round trip
+            pipe = client.pipeline(transaction=False)
+            pipe.setex(self._generate_cache_key(profile_hash, user_id, override=override), ttl, self._serialize(result))
+            if not override and user_id and user_id not in self.config.UNINDEXED_USERS:
+                index_key = self._user_index_key(user_id)
+                pipe.sadd(index_key, profile_hash)
+                pipe.expire(index_key, ttl)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning("Redis async set error, falling back", error=str(e))
+            return await asyncio.to_thread(self.set, user_id, profile, result, ttl, override, profile_hash)
+        
+        logger.info("Cached in Redis", user_id=user_id, profile_hash=profile_hash[:8], ttl=ttl)
+        return True
+    
     def get_stats(self) -> Dict[str, Any]:
         """
         Get cache statistics.
@@ -445,9 +763,10 @@ class FundingCache:
                 pass
         
         # SQLite stats
-        if self.sqlite_conn:
+        conn = self.sqlite_conn
+        if conn:
             try:
-                cursor = self.sqlite_conn.cursor()
+                cursor = conn.cursor()
                 cursor.execute("SELECT COUNT(*) FROM funding_cache WHERE expires_at > datetime('now')")
                 stats["sqlite_keys"] = cursor.fetchone()[0]
             except Exception:
@@ -463,9 +782,18 @@ class FundingCache:
             except Exception:
                 pass
         
-        if self.sqlite_conn:
+        # Stop the sweeper, then close the connections of all threads
+        self._stop_sweeper.set()
+        if self._sweeper is not None:
+            self._sweeper.join(timeout=self.config.SQLITE_BUSY_TIMEOUT_SECONDS)
+            self._sweeper = None
+        
+        self._sqlite_enabled = False
+        with self._sqlite_lock:
+            connections, self._sqlite_connections = self._sqlite_connections, []
+        for conn in connections:
             try:
-                self.sqlite_conn.close()
+                conn.close()
             except Exception:
                 pass
 
@@ -4,7 +4,10 @@ Based on NHS National Framework 2022 (current 2025), MSIF 2025-2026, Care Act 20
 Back-tested on 1200 cases 2024-2025.
 """
 
-from typing import Dict, Optional, Any
+import asyncio
+import contextvars
+import functools
+from typing import Dict, Optional, Any, Union
 from datetime import datetime
 try:
     import structlog
@@ -12,6 +15,7 @@ try:
 except ImportError:
     import logging
     logger = logging.getLogger(__name__)
+from observability import span, timed
 from .models import (
     PatientProfile,
     DomainAssessment,
@@ -24,11 +28,10 @@ from .models import (
 )
 from .constants import (
     Domain,
-    DomainLevel,
-    MEANS_TEST,
+    CURRENT_MEANS_TEST_YEAR,
+    MEANS_TEST_BY_YEAR,
     DPA_ELIGIBILITY,
-    CHC_THRESHOLDS,
-    CHC_WEIGHTS
+    CHC_THRESHOLDS
 )
 from .utils import (
     calculate_chc_base_score,
@@ -36,7 +39,8 @@ from .utils import (
     calculate_tariff_income,
     assess_property_for_means_test,
     calculate_chc_probability_range,
-    count_domain_levels
+    means_test_year as resolve_means_test_year,
+    score_domain_levels
 )
 
 # Import PricingResult type
@@ -61,16 +65,24 @@ class FundingEligibilityCalculator:
     - Redis caching with SQLite fallback
     """
     
-    def __init__(self, cache: Optional[Any] = None):
+    def __init__(self, cache: Optional[Any] = None, means_test_year: Union[str, int, None] = None):
         """
         Initialize calculator.
         
         Args:
             cache: Optional FundingCache instance for caching results
+            means_test_year: Means-test year, e.g. "2025-26" (default
+                CURRENT_MEANS_TEST_YEAR)
+                
+        Raises:
+            CalculationError: On an unknown means-test year
         """
         self.logger = logger
         self.cache = cache
+        self.means_test_year = resolve_means_test_year(means_test_year)
+        self.means_test = MEANS_TEST_BY_YEAR[self.means_test_year]
     
+    @timed("funding.chc")
     def calculate_chc_probability(
         self,
         profile: PatientProfile
@@ -88,16 +100,17 @@ class FundingEligibilityCalculator:
         
         assessments = profile.domain_assessments
         
-        # Count domain levels
-        priority_count = count_domain_levels(assessments, DomainLevel.PRIORITY)
-        severe_count = count_domain_levels(assessments, DomainLevel.SEVERE)
-        high_count = count_domain_levels(assessments, DomainLevel.HIGH)
+        # Count domain levels (one pass, shared by score, bonuses, range and factors)
+        counts = score_domain_levels(assessments)
+        priority_count = counts.priority
+        severe_count = counts.severe
+        high_count = counts.high
         
         # Calculate base score
-        base_score = calculate_chc_base_score(assessments)
+        base_score = calculate_chc_base_score(assessments, counts)
         
         # Calculate bonuses
-        bonuses = calculate_chc_bonuses(assessments, profile)
+        bonuses = calculate_chc_bonuses(assessments, profile, counts)
         bonus_total = sum(bonuses.values())
         
         # Get probability range
@@ -128,23 +141,13 @@ class FundingEligibilityCalculator:
         reasoning = f"CHC probability {final_prob}% based on: {', '.join(reasoning_parts)}."
         
         # Key factors
-        key_factors = []
-        for domain, assessment in assessments.items():
-            if assessment.level in [DomainLevel.PRIORITY, DomainLevel.SEVERE]:
-                key_factors.append(f"{domain.value}: {assessment.level.value}")
+        key_factors = counts.key_factors()
         
         if profile.has_primary_health_need:
             key_factors.append("Primary health need identified")
         
         # Domain scores
-        domain_scores = {}
-        for domain, assessment in assessments.items():
-            if assessment.level == DomainLevel.PRIORITY:
-                domain_scores[domain.value] = CHC_WEIGHTS[DomainLevel.PRIORITY]
-            elif assessment.level == DomainLevel.SEVERE:
-                domain_scores[domain.value] = CHC_WEIGHTS[DomainLevel.SEVERE]
-            elif assessment.level == DomainLevel.HIGH:
-                domain_scores[domain.value] = CHC_WEIGHTS[DomainLevel.HIGH]
+        domain_scores = counts.domain_scores()
         
         return CHCEligibilityResult(
             probability_percent=int(final_prob),
@@ -156,13 +159,14 @@ class FundingEligibilityCalculator:
             threshold_category=category
         )
     
+    @timed("funding.la_support")
     def calculate_la_support(
         self,
         profile: PatientProfile,
         dpa_eligible: bool
     ) -> LASupportResult:
         """
-        Calculate Local Authority support using means test 2025-2026.
+        Calculate Local Authority support using the means test of self.means_test_year.
         
         Args:
             profile: Patient profile
@@ -183,18 +187,19 @@ class FundingEligibilityCalculator:
         total_capital = profile.capital_assets + property_assessment["value_counted"]
         
         # Calculate tariff income
-        tariff_income = calculate_tariff_income(total_capital)
+        tariff_income = calculate_tariff_income(total_capital, self.means_test)
         
         # Calculate weekly contribution
-        pea = MEANS_TEST["personal_expenses_allowance"]
+        means_test = self.means_test
+        pea = means_test["personal_expenses_allowance"]
         weekly_contribution = None
         is_fully_funded = False
         top_up_probability = 0
         full_support_probability = 0
         
-        if total_capital < MEANS_TEST["upper_capital_limit"]:
+        if total_capital < means_test["upper_capital_limit"]:
             # Below upper limit - LA may fund
-            if total_capital < MEANS_TEST["lower_capital_limit"]:
+            if total_capital < means_test["lower_capital_limit"]:
                 # Below lower limit - fully funded
                 is_fully_funded = True
                 full_support_probability = 100
@@ -235,6 +240,7 @@ class FundingEligibilityCalculator:
             reasoning=reasoning
         )
     
+    @timed("funding.dpa")
     def calculate_dpa_eligibility(
         self,
         profile: PatientProfile
@@ -295,6 +301,7 @@ class FundingEligibilityCalculator:
             weekly_charge=weekly_charge
         )
     
+    @timed("funding.savings")
     def calculate_all_savings(
         self,
         profile: PatientProfile,
@@ -387,9 +394,14 @@ class FundingEligibilityCalculator:
         """
         self.logger.info("Calculating full funding eligibility", user_id=user_id, use_cache=use_cache)
         
-        # Check cache first
+        # Check cache first (profile hashed once, shared by get and set)
+        profile_hash = None
         if use_cache and self.cache:
-            cached_result = self.cache.get(user_id, patient_profile, check_override=cache_override)
+            with span("funding.cache_get"):
+                profile_hash = self.result_cache_hash(patient_profile, pricing_result, property_details)
+                cached_result = self.cache.get(
+                    user_id, patient_profile, check_override=cache_override, profile_hash=profile_hash
+                )
             if cached_result:
                 self.logger.info("Returning cached result", user_id=user_id)
                 # Reconstruct result from cached dict
@@ -447,7 +459,7 @@ class FundingEligibilityCalculator:
             savings_result
         )
         
-        return FundingEligibilityResult(
+        result = FundingEligibilityResult(
             patient_profile=profile,
             chc_eligibility=chc_result,
             la_support=la_result,
@@ -455,6 +467,110 @@ class FundingEligibilityCalculator:
             savings=savings_result,
             recommendations=recommendations
         )
+        
+        if profile_hash is not None:
+            with span("funding.cache_set"):
+                self.cache.set(user_id, patient_profile, result.as_dict(), profile_hash=profile_hash)
+        
+        return result
+    
+    async def calculate_full_eligibility_async(
+        self,
+        patient_profile: Dict,
+        pricing_result: Optional[PricingResult] = None,
+        property_details: Optional[Dict] = None,
+        user_id: str = "anonymous",
+        use_cache: bool = True,
+        cache_override: bool = False,
+        executor=None
+    ) -> FundingEligibilityResult:
+        """
+        Async calculate_full_eligibility for use inside an event loop.
+        
+        Cache lookups and writes use FundingCache.get_async/set_async; the
+        profile hash and the calculation itself run in executor.
+        
+        Args:
+            patient_profile, pricing_result, property_details, user_id, use_cache,
+            cache_override: as calculate_full_eligibility
+            executor: Executor for the calculation (default: the loop's default executor)
+            
+        Returns:
+            FundingEligibilityResult
+        """
+        loop = asyncio.get_running_loop()
+        profile_hash = None
+        if use_cache and self.cache:
+            with span("funding.cache_get"):
+                # Hashing serializes the whole profile: keep it off the loop too
+                profile_hash = await loop.run_in_executor(
+                    executor,
+                    self.result_cache_hash,
+                    patient_profile,
+                    pricing_result,
+                    property_details
+                )
+                cached_result = await self.cache.get_async(
+                    user_id, patient_profile, check_override=cache_override, profile_hash=profile_hash
+                )
+            if cached_result:
+                self.logger.info("Returning cached result", user_id=user_id)
+                return FundingEligibilityResult(**cached_result)
+        
+        # copy_context keeps request spans (Server-Timing) across the thread hop
+        context = contextvars.copy_context()
+        result = await loop.run_in_executor(
+            executor,
+            functools.partial(
+                context.run,
+                self.calculate_full_eligibility,
+                patient_profile,
+                pricing_result=pricing_result,
+                property_details=property_details,
+                user_id=user_id,
+                use_cache=False
+            )
+        )
+        
+        if profile_hash is not None:
+            with span("funding.cache_set"):
+                await self.cache.set_async(user_id, patient_profile, result.as_dict(), profile_hash=profile_hash)
+        
+        return result
+    
+    def result_cache_hash(
+        self,
+        patient_profile: Dict,
+        pricing_result: Optional[PricingResult] = None,
+        property_details: Optional[Dict] = None
+    ) -> str:
+        """
+        Cache key hash of the shared result for these calculation inputs.
+        
+        Args:
+            patient_profile: Patient profile dict
+            pricing_result: PricingResult the result was calculated with
+            property_details: Property details the result was calculated with
+            
+        Returns:
+            profile_hash of the profile with its pricing/property/year context
+        """
+        return self.cache.profile_hash(patient_profile, self._cache_context(pricing_result, property_details))
+    
+    def _cache_context(
+        self,
+        pricing_result: Optional[PricingResult],
+        property_details: Optional[Dict]
+    ) -> Optional[Dict]:
+        """Inputs besides the profile that the cached result depends on."""
+        context = {}
+        if self.means_test_year != CURRENT_MEANS_TEST_YEAR:
+            context["means_test_year"] = self.means_test_year
+        if pricing_result is not None:
+            context["pricing"] = [pricing_result.final_price_gbp, pricing_result.msif_lower_bound_gbp]
+        if property_details:
+            context["property"] = property_details
+        return context or None
     
     def _generate_recommendations(
         self,
@@ -0,0 +1,309 @@
+"""Columnar funding eligibility for cohorts of anonymised profiles.
+
+``calculate_full_eligibility`` builds a pydantic ``PatientProfile`` with nested
+``DomainAssessment`` objects per case, which dominates the run time when thousands
+of profiles are scored (e.g. calibrating against the 1200 back-tested cases).
+``calculate_cohort_eligibility`` takes the same inputs as columns of a pandas
+DataFrame (or an Arrow table) and computes CHC probability, DPA eligibility, the
+LA means test, tariff income and savings as NumPy operations. The rules mirror the
+scalar engine in calculator.py / utils.py; tests/test_cohort.py checks parity.
+
+Input columns (missing columns take the PatientProfile defaults):
+
+* one column per ``Domain`` value (``"breathing"``, ``"cognition"``, ...) holding a
+  ``DomainLevel`` value; null = domain not assessed;
+* boolean flags named as the PatientProfile fields (``has_peg_feeding``, ...);
+* ``capital_assets``, ``weekly_income``, ``is_permanent_care``;
+* ``property_value`` (null = no property), ``property_is_main_residence``,
+  ``property_has_qualifying_relative``;
+* ``final_price_gbp`` and ``msif_lower_bound_gbp`` from the PricingResult of the
+  case (null = no pricing result, as ``pricing_result=None`` in the scalar engine);
+* ``means_test_year`` (``"2025-26"``, ...; null = current year) to assess each case
+  under that year's thresholds (means_test.py).
+"""
+
+from typing import Dict, Iterable, Union
+
+import numpy as np
+import pandas as pd
+
+from observability import timed
+from .constants import (
+    CHC_BONUSES,
+    CHC_THRESHOLDS,
+    CHC_WEIGHTS,
+    DOMAIN_GROUPS,
+    DPA_ELIGIBILITY,
+    Domain,
+    DomainLevel,
+)
+from .exceptions import InvalidPatientProfileError
+from .means_test import assess_means_test
+from .models import PatientProfile
+from .utils import LEVEL_INDEX
+
+# Domain level columns, in Domain order
+DOMAIN_COLUMNS = [domain.value for domain in Domain]
+
+UNPREDICTABILITY_FLAGS = ["has_unpredictable_needs", "has_fluctuating_condition", "has_high_risk_behaviours"]
+COMPLEX_THERAPY_FLAGS = [
+    "has_peg_feeding", "has_tracheostomy", "requires_injections", "requires_ventilator", "requires_dialysis",
+]
+
+# Boolean columns and their PatientProfile / PropertyDetails defaults
+FLAG_DEFAULTS = {
+    "has_primary_health_need": False,
+    "requires_nursing_care": False,
+    **{flag: False for flag in COMPLEX_THERAPY_FLAGS},
+    **{flag: False for flag in UNPREDICTABILITY_FLAGS},
+    "is_permanent_care": True,
+    "property_is_main_residence": True,
+    "property_has_qualifying_relative": False,
+}
+
+# Savings defaults when a case has no pricing result (as calculate_all_savings)
+DEFAULT_EXPECTED_PRICE = 1000.0
+DEFAULT_MSIF_LOWER = 800.0
+
+# Threshold categories in the order calculate_chc_probability_range checks them
+_CATEGORIES = ["very_high", "high", "moderate", "low"]
+
+_LEVEL_CODES = {level.value: index for level, index in LEVEL_INDEX.items()}
+_PRIORITY = LEVEL_INDEX[DomainLevel.PRIORITY]
+_SEVERE = LEVEL_INDEX[DomainLevel.SEVERE]
+_HIGH = LEVEL_INDEX[DomainLevel.HIGH]
+_GROUP_COLUMNS = {
+    group: [DOMAIN_COLUMNS.index(domain.value) for domain in domains]
+    for group, domains in DOMAIN_GROUPS.items()
+}
+
+
+def profiles_to_frame(profiles: Iterable[Union[PatientProfile, Dict]]) -> pd.DataFrame:
+    """
+    Flatten patient profiles into the columns of calculate_cohort_eligibility.
+
+    Args:
+        profiles: PatientProfile objects or dicts accepted by PatientProfile
+
+    Returns:
+        DataFrame with one row per profile
+    """
+    rows = []
+    for profile in profiles:
+        if isinstance(profile, dict):
+            profile = PatientProfile(**profile)
+        row = {column: None for column in DOMAIN_COLUMNS}
+        for domain, assessment in profile.domain_assessments.items():
+            row[domain.value] = assessment.level.value
+        for flag in FLAG_DEFAULTS:
+            if hasattr(profile, flag):
+                row[flag] = getattr(profile, flag)
+        row["capital_assets"] = profile.capital_assets
+        row["weekly_income"] = profile.weekly_income
+        if profile.property is not None:
+            row["property_value"] = profile.property.value
+            row["property_is_main_residence"] = profile.property.is_main_residence
+            row["property_has_qualifying_relative"] = profile.property.has_qualifying_relative
+        else:
+            row["property_value"] = np.nan
+        rows.append(row)
+    return pd.DataFrame(rows, columns=list(dict.fromkeys(
+        DOMAIN_COLUMNS + list(FLAG_DEFAULTS) + ["capital_assets", "weekly_income", "property_value"]
+    )))
+
+
+def _as_frame(data) -> pd.DataFrame:
+    """DataFrame of data (pandas DataFrame or pyarrow Table / RecordBatch)."""
+    if isinstance(data, pd.DataFrame):
+        return data
+    if hasattr(data, "to_pandas"):
+        return data.to_pandas()
+    raise TypeError(f"Expected a pandas DataFrame or Arrow table, got {type(data).__name__}")
+
+
+def _flag(frame: pd.DataFrame, column: str) -> np.ndarray:
+    if column not in frame:
+        return np.full(len(frame), FLAG_DEFAULTS[column], dtype=bool)
+    return frame[column].fillna(FLAG_DEFAULTS[column]).to_numpy(dtype=bool)
+
+
+def _number(frame: pd.DataFrame, column: str, default: float = np.nan) -> np.ndarray:
+    if column not in frame:
+        return np.full(len(frame), default, dtype=float)
+    return pd.to_numeric(frame[column], errors="raise").to_numpy(dtype=float, na_value=default)
+
+
+def _level_codes(frame: pd.DataFrame) -> np.ndarray:
+    """(rows, domains) matrix of LEVEL_INDEX codes; -1 = not assessed."""
+    codes = np.full((len(frame), len(DOMAIN_COLUMNS)), -1, dtype=np.int8)
+    for i, column in enumerate(DOMAIN_COLUMNS):
+        if column not in frame:
+            continue
+        values = frame[column]
+        column_codes = values.map(_LEVEL_CODES)
+        unknown = column_codes.isna() & values.notna()
+        if unknown.any():
+            raise InvalidPatientProfileError(
+                f"Unknown level(s) in column {column!r}: {sorted(set(values[unknown].astype(str)))}"
+            )
+        codes[:, i] = column_codes.fillna(-1).to_numpy()
+    return codes
+
+
+def _chc(frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """CHC probability columns (calculate_chc_probability)."""
+    codes = _level_codes(frame)
+    priority = (codes == _PRIORITY).sum(axis=1)
+    severe = (codes == _SEVERE).sum(axis=1)
+    high = (codes == _HIGH).sum(axis=1)
+
+    bonus = np.zeros(len(frame), dtype=np.int64)
+    critical_severe = (codes[:, _GROUP_COLUMNS["critical_domains"]] == _SEVERE).sum(axis=1)
+    bonus += np.where(critical_severe >= 2, CHC_BONUSES["multiple_severe"], 0)
+    unpredictable = np.logical_or.reduce([_flag(frame, flag) for flag in UNPREDICTABILITY_FLAGS])
+    bonus += np.where(unpredictable, CHC_BONUSES["unpredictability"], 0)
+    behavioural_high = (codes[:, _GROUP_COLUMNS["behavioural_domains"]] == _HIGH).sum(axis=1)
+    bonus += np.where(behavioural_high >= 3, CHC_BONUSES["multiple_high"], 0)
+    complex_therapies = np.logical_or.reduce([_flag(frame, flag) for flag in COMPLEX_THERAPY_FLAGS])
+    bonus += np.where(complex_therapies, CHC_BONUSES["complex_therapies"], 0)
+
+    # Category conditions, first match wins (calculate_chc_probability_range)
+    conditions = [
+        (priority >= 1) | (severe >= 2) | ((severe >= 1) & (high >= 4)),
+        (severe >= 1) & (high >= 2) & (high <= 3),
+        high >= 5,
+    ]
+    choice = np.select(conditions, [0, 1, 2], default=3)
+    minimum = np.array([CHC_THRESHOLDS[c]["min"] for c in _CATEGORIES])[choice]
+    maximum = np.array([CHC_THRESHOLDS[c]["max"] for c in _CATEGORIES])[choice]
+
+    probability = np.minimum(98, (minimum + maximum) // 2 + bonus)
+    probability = np.clip(probability, minimum, maximum)
+
+    base_score = (
+        np.where(priority > 0, CHC_WEIGHTS[DomainLevel.PRIORITY], 0)
+        + severe * CHC_WEIGHTS[DomainLevel.SEVERE]
+        + high * CHC_WEIGHTS[DomainLevel.HIGH]
+    )
+    return {
+        "priority_count": priority,
+        "severe_count": severe,
+        "high_count": high,
+        "chc_base_score": base_score,
+        "chc_bonus_total": bonus,
+        "chc_probability": probability.astype(np.int64),
+        "chc_category": np.array(_CATEGORIES, dtype=object)[choice],
+        "chc_likely_eligible": probability >= 70,
+    }
+
+
+def _funding(frame: pd.DataFrame, chc_probability: np.ndarray) -> Dict[str, np.ndarray]:
+    """DPA, means test and savings columns given the CHC probability of each row."""
+    capital = _number(frame, "capital_assets", 0.0)
+    income = _number(frame, "weekly_income", 0.0)
+    property_value = _number(frame, "property_value")
+    if (capital < 0).any() or (income < 0).any() or (property_value < 0).any():
+        raise InvalidPatientProfileError("Financial values cannot be negative")
+
+    # DPA (calculate_dpa_eligibility)
+    has_property = ~np.isnan(property_value)
+    qualifying_relative = has_property & _flag(frame, "property_has_qualifying_relative")
+    dpa = (
+        _flag(frame, "is_permanent_care")
+        & has_property
+        & _flag(frame, "property_is_main_residence")
+        & (np.nan_to_num(property_value) > DPA_ELIGIBILITY["property_value_threshold"])
+        & (capital < DPA_ELIGIBILITY["non_property_capital_threshold"])
+        & ~qualifying_relative
+    )
+
+    # Means test (assess_property_for_means_test, calculate_la_support)
+    property_counted = np.where(has_property & ~dpa & ~qualifying_relative, property_value, 0.0)
+    total_capital = capital + property_counted
+    year = frame["means_test_year"].to_numpy() if "means_test_year" in frame.columns else None
+    means_test = assess_means_test(total_capital, income, year)
+    top_up = means_test["top_up_probability"]
+
+    # Savings (calculate_all_savings)
+    expected = _number(frame, "final_price_gbp")
+    msif_lower = _number(frame, "msif_lower_bound_gbp")
+    no_pricing = np.isnan(expected)
+    msif_lower = np.where(
+        no_pricing,
+        DEFAULT_MSIF_LOWER,
+        np.where(np.isnan(msif_lower) | (msif_lower == 0), expected * 0.8, msif_lower),
+    )
+    expected = np.where(no_pricing, DEFAULT_EXPECTED_PRICE, expected)
+    weekly_gap = expected - msif_lower
+    chc_share = chc_probability / 100.0
+    la_share = top_up / 100.0
+    combined = np.minimum(1.0, chc_share + la_share * (1 - chc_share))
+    weekly_savings = weekly_gap * combined
+    annual_savings = weekly_savings * 52
+
+    return {
+        "dpa_eligible": dpa,
+        "capital_assessed": total_capital,
+        "tariff_income": means_test["tariff_income"],
+        "la_top_up_probability": top_up,
+        "la_full_support_probability": means_test["full_support_probability"],
+        "la_fully_funded": means_test["fully_funded"],
+        "weekly_contribution": means_test["weekly_contribution"],
+        "weekly_gap": weekly_gap,
+        "combined_probability": combined,
+        "weekly_savings": weekly_savings,
+        "annual_savings": annual_savings,
+        "five_year_savings": annual_savings * 5,
+        "lifetime_savings": annual_savings * 10,
+    }
+
+
+@timed("funding.cohort")
+def calculate_cohort_eligibility(data) -> pd.DataFrame:
+    """
+    Calculate funding eligibility for a cohort of profiles in one vectorized pass.
+
+    Args:
+        data: pandas DataFrame or pyarrow Table with the columns described in the
+            module docstring (one row per profile)
+
+    Returns:
+        DataFrame indexed like data with level counts, chc_probability,
+        chc_category, chc_likely_eligible, dpa_eligible, capital_assessed,
+        tariff_income, la_top_up_probability, la_full_support_probability,
+        la_fully_funded, weekly_contribution (NaN where the scalar engine returns
+        None), weekly_gap, combined_probability and weekly/annual/five-year/lifetime
+        savings
+
+    Raises:
+        InvalidPatientProfileError: On unknown domain levels or negative financials
+        CalculationError: On an unknown means_test_year
+    """
+    frame = _as_frame(data)
+    result: Dict[str, np.ndarray] = _chc(frame)
+    result.update(_funding(frame, result["chc_probability"]))
+    return pd.DataFrame(result, index=frame.index)
+
+
+def cohort_summary(result: pd.DataFrame) -> Dict[str, float]:
+    """
+    Aggregate figures of a calculate_cohort_eligibility result.
+
+    Args:
+        result: Result of calculate_cohort_eligibility
+
+    Returns:
+        Dictionary with case count, mean CHC probability, share likely CHC
+        eligible, share DPA eligible, share fully LA funded and mean annual savings
+    """
+    if result.empty:
+        return {"cases": 0}
+    return {
+        "cases": int(len(result)),
+        "mean_chc_probability": float(result["chc_probability"].mean()),
+        "chc_likely_eligible_share": float(result["chc_likely_eligible"].mean()),
+        "dpa_eligible_share": float(result["dpa_eligible"].mean()),
+        "la_fully_funded_share": float(result["la_fully_funded"].mean()),
+        "mean_annual_savings": float(result["annual_savings"].mean()),
+    }
+
@@ -86,15 +86,25 @@ CHC_THRESHOLDS = {
     }
 }
 
-# Means Test thresholds 2025-2026 (LAC(DHSC)(2025)1)
-MEANS_TEST = {
-    "upper_capital_limit": 23_250,      # £23,250 - fully self-funding
-    "lower_capital_limit": 14_250,      # £14,250 - below this, no tariff income
-    "tariff_income_rate": 250,          # £1/week per £250 (or part) above £14,250
-    "personal_expenses_allowance": 28.25,  # £28.25/week (2025-2026)
-    "minimum_income_guarantee": 189.60,    # £189.60/week (2025-2026)
+# Means Test thresholds by financial year (LAC(DHSC) circular of each year).
+# Add a year here once its figures are checked against the circular; later
+# years use the latest table, earlier ones are rejected.
+MEANS_TEST_BY_YEAR = {
+    # LAC(DHSC)(2025)1
+    "2025-26": {
+        "upper_capital_limit": 23_250,      # £23,250 - fully self-funding
+        "lower_capital_limit": 14_250,      # £14,250 - below this, no tariff income
+        "tariff_income_rate": 250,          # £1/week per £250 (or part) above £14,250
+        "personal_expenses_allowance": 28.25,  # £28.25/week (2025-2026)
+        "minimum_income_guarantee": 189.60,    # £189.60/week (2025-2026)
+    },
 }
 
+CURRENT_MEANS_TEST_YEAR = "2025-26"
+
+# Means Test thresholds 2025-2026 (LAC(DHSC)(2025)1)
+MEANS_TEST = MEANS_TEST_BY_YEAR[CURRENT_MEANS_TEST_YEAR]
+
 # Property disregard rules
 PROPERTY_DISREGARD = {
     "dpa_eligible": True,  # Disregarded if DPA eligible
@@ -1,11 +1,15 @@
 """Fair Cost Gap calculator with emotional text generation."""
 
+from functools import lru_cache
 from typing import Optional
 import structlog
 from .models import FairCostGapResult
 
 logger = structlog.get_logger(__name__)
 
+# Rendered HTML / Markdown blocks kept per (weekly, yearly, five-year) gap
+BLOCK_CACHE_SIZE = 1024
+
 
 class FairCostGapCalculator:
     """Calculate and format Fair Cost Gap for reports."""
@@ -57,13 +61,14 @@ class FairCostGapCalculator:
     ) -> str:
         """Generate emotional text based on gap size and tone."""
         
-        if weekly < 50:
+        # Band limits are inclusive (£50/week is a small gap)
+        if weekly <= 50:
             gap_level = "small"
             impact = "minimal"
-        elif weekly < 150:
+        elif weekly <= 150:
             gap_level = "moderate"
             impact = "noticeable"
-        elif weekly < 300:
+        elif weekly <= 300:
             gap_level = "significant"
             impact = "substantial"
         else:
@@ -95,8 +100,17 @@ class FairCostGapCalculator:
         return text
     
     def _generate_html_block(self, weekly: float, yearly: float, five_year: float) -> str:
-        """Generate HTML block for report insertion."""
-        return f"""
+        """Generate HTML block for report insertion (cached per amounts)."""
+        return _html_block(weekly, yearly, five_year)
+    
+    def _generate_markdown_block(self, weekly: float, yearly: float, five_year: float) -> str:
+        """Generate Markdown block for report insertion (cached per amounts)."""
+        return _markdown_block(weekly, yearly, five_year)
+
+
+@lru_cache(maxsize=BLOCK_CACHE_SIZE)
+def _html_block(weekly: float, yearly: float, five_year: float) -> str:
+    return f"""
 <div class="fair-cost-gap-block" style="background-color: #fff3cd; border-left: 4px solid #ffc107; padding: 20px; margin: 20px 0;">
     <h3 style="color: #856404; margin-top: 0;">Fair Cost Gap Analysis</h3>
     <div style="display: flex; justify-content: space-around; margin: 20px 0;">
@@ -118,10 +132,11 @@ class FairCostGapCalculator:
     </p>
 </div>
 """
-    
-    def _generate_markdown_block(self, weekly: float, yearly: float, five_year: float) -> str:
-        """Generate Markdown block for report insertion."""
-        return f"""
+
+
+@lru_cache(maxsize=BLOCK_CACHE_SIZE)
+def _markdown_block(weekly: float, yearly: float, five_year: float) -> str:
+    return f"""
 ## Fair Cost Gap Analysis
 
 | Period | Amount |
@@ -132,4 +147,3 @@ class FairCostGapCalculator:
 
 > This represents the difference between the quoted price and the MSIF 2025-2026 fair cost benchmark.
 """
-
@@ -0,0 +1,132 @@
+"""Vectorized LA means test over arrays of capital and income.
+
+``calculate_tariff_income`` and ``calculate_la_support`` assess one person against
+the current year's thresholds. Historical recalculations and projections need the
+same rules for many people and years at once: here the thresholds of
+``MEANS_TEST_BY_YEAR`` become parameter arrays (one entry per row, looked up by
+year) and tariff income is the closed form ``ceil((capital - lower) / rate)``, so a
+whole cohort is assessed in a few NumPy operations. Results match the scalar
+functions row for row (tests/test_means_test.py).
+
+Years are anything ``utils.means_test_year`` accepts ("2025-26", "2025/26", 2025);
+years after the latest table use the latest thresholds.
+"""
+
+from typing import Dict
+
+import numpy as np
+
+from .constants import MEANS_TEST_BY_YEAR
+from .utils import means_test_year
+
+# Threshold names, as in MEANS_TEST
+MEANS_TEST_FIELDS = (
+    "upper_capital_limit",
+    "lower_capital_limit",
+    "tariff_income_rate",
+    "personal_expenses_allowance",
+    "minimum_income_guarantee",
+)
+
+# LA support probabilities in the tariff band (calculate_la_support)
+TARIFF_BAND_TOP_UP_PROBABILITY = 70
+TARIFF_BAND_FULL_SUPPORT_PROBABILITY = 30
+
+_YEARS = sorted(MEANS_TEST_BY_YEAR)
+_TABLE = {
+    field: np.array([MEANS_TEST_BY_YEAR[year][field] for year in _YEARS], dtype=float)
+    for field in MEANS_TEST_FIELDS
+}
+
+
+def means_test_parameters(year=None, size: int = 1) -> Dict[str, np.ndarray]:
+    """
+    Means-test thresholds as arrays, one entry per row.
+
+    Args:
+        year: One year for all rows, or an array of years (one per row; None
+            entries = current year); default CURRENT_MEANS_TEST_YEAR
+        size: Number of rows when year is a single value
+
+    Returns:
+        {field: float array} for each of MEANS_TEST_FIELDS
+
+    Raises:
+        CalculationError: On an unknown or malformed year
+    """
+    if year is None or isinstance(year, (str, int)):
+        row = _YEARS.index(means_test_year(year))
+        return {field: np.full(size, values[row]) for field, values in _TABLE.items()}
+
+    # Resolve each distinct year once, then gather
+    rows: Dict[object, int] = {}
+    index = np.empty(len(year), dtype=np.intp)
+    for i, value in enumerate(year):
+        if value != value:  # NaN from a missing column value
+            value = None
+        if value not in rows:
+            rows[value] = _YEARS.index(means_test_year(value))
+        index[i] = rows[value]
+    return {field: values[index] for field, values in _TABLE.items()}
+
+
+def tariff_income(capital, year=None) -> np.ndarray:
+    """
+    Tariff income per week for each capital amount (calculate_tariff_income).
+
+    Args:
+        capital: Assessed capital (array-like)
+        year: Year or array of years (see means_test_parameters)
+
+    Returns:
+        Float array: £1 per rate (or part) above the lower capital limit
+    """
+    capital = np.asarray(capital, dtype=float)
+    params = means_test_parameters(year, capital.size)
+    return _tariff_income(capital.reshape(-1), params).reshape(capital.shape)
+
+
+def _tariff_income(capital: np.ndarray, params: Dict[str, np.ndarray]) -> np.ndarray:
+    excess = capital - params["lower_capital_limit"]
+    return np.where(excess > 0, np.ceil(excess / params["tariff_income_rate"]), 0.0)
+
+
+def assess_means_test(capital, weekly_income, year=None) -> Dict[str, np.ndarray]:
+    """
+    LA means test for arrays of capital and income (calculate_la_support).
+
+    Args:
+        capital: Assessed capital, property already counted or disregarded
+        weekly_income: Weekly income, same length as capital
+        year: Year or array of years (see means_test_parameters)
+
+    Returns:
+        {"tariff_income", "fully_funded", "tariff_band", "weekly_contribution"
+        (NaN outside the tariff band, where the scalar engine returns None),
+        "top_up_probability", "full_support_probability"}
+
+    Raises:
+        CalculationError: On an unknown or malformed year
+    """
+    capital = np.asarray(capital, dtype=float).reshape(-1)
+    income = np.broadcast_to(np.asarray(weekly_income, dtype=float), capital.shape)
+    params = means_test_parameters(year, capital.size)
+
+    tariff = _tariff_income(capital, params)
+    fully_funded = capital < params["lower_capital_limit"]
+    tariff_band = ~fully_funded & (capital < params["upper_capital_limit"])
+    contribution = np.where(
+        tariff_band,
+        np.maximum(0, income + tariff - params["personal_expenses_allowance"]),
+        np.nan,
+    )
+    return {
+        "tariff_income": tariff,
+        "fully_funded": fully_funded,
+        "tariff_band": tariff_band,
+        "weekly_contribution": contribution,
+        "top_up_probability": np.where(tariff_band, TARIFF_BAND_TOP_UP_PROBABILITY, 0),
+        "full_support_probability": np.select(
+            [fully_funded, tariff_band], [100, TARIFF_BAND_FULL_SUPPORT_PROBABILITY], default=0
+        ),
+    }
@@ -116,6 +116,17 @@ class SavingsResult(BaseModel):
     breakdown: Dict[str, float] = Field(default_factory=dict, description="Savings breakdown by source")
 
 
+class FairCostGapResult(BaseModel):
+    """Fair Cost Gap (quoted price above the MSIF benchmark) with report blocks."""
+    
+    weekly_gap: float = Field(..., description="Weekly gap in GBP")
+    yearly_gap: float = Field(..., description="Yearly gap in GBP (52 weeks)")
+    five_year_gap: float = Field(..., description="5-year gap in GBP")
+    emotional_text: str = Field(..., description="Report text in the requested tone")
+    report_block_html: str = Field(..., description="HTML block for reports")
+    report_block_markdown: str = Field(..., description="Markdown block for reports")
+
+
 class FundingEligibilityResult(BaseModel):
     """Complete funding eligibility calculation result."""
     
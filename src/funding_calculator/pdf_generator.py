@@ -1,44 +1,354 @@
-"""PDF report generator using Jinja templates."""
+"""PDF report generator using Jinja templates.
 
+Templates are compiled through a Jinja bytecode cache on disk, so a new process
+(API worker, PDF worker) loads compiled templates instead of parsing them again;
+``precompile()`` fills the cache at startup. Jinja checks template mtimes
+(``auto_reload``) and the bytecode cache is keyed by the source checksum, so an
+edited template is recompiled.
+
+Rendered text is kept in a bounded ``RenderCache`` keyed by (template, template
+version, context hash), so rendering the same result again returns the cached
+fragment; editing a template invalidates its fragments (render_cache.py).
+
+HTML→PDF (WeasyPrint) is CPU-bound. Batches (``iter_pdfs``, ``write_batch``,
+``iter_zip``) render HTML in the calling thread and convert it in a bounded
+process pool, with at most ``BATCH_WINDOW_PER_WORKER`` reports per worker in
+flight.
+"""
+
+import importlib.util
+import io
+import itertools
+import multiprocessing
+import os
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 import structlog
-from jinja2 import Environment, FileSystemLoader, select_autoescape
-from .models import FundingEligibilityResult, FairCostGapResult
+from .models import FairCostGapResult, FundingEligibilityResult
+from .render_cache import RENDER_CACHE_SIZE, RenderCache, context_hash, source_version
 
 logger = structlog.get_logger(__name__)
 
-# Try to import weasyprint for PDF generation
-try:
-    from weasyprint import HTML
-    WEASYPRINT_AVAILABLE = True
-except ImportError:
-    WEASYPRINT_AVAILABLE = False
-    HTML = None
+# Try to find weasyprint for PDF generation (imported on first generate_pdf call)
+WEASYPRINT_AVAILABLE = importlib.util.find_spec("weasyprint") is not None
+HTML = None
+
+# Template for FundingEligibilityResult reports (context: FundingEligibilityResult.as_dict())
+FULL_REPORT_TEMPLATE = "full_report.html"
+TEASER_REPORT_TEMPLATE = "teaser_report.txt"
+
+# Processes for batch HTML→PDF conversion
+PDF_WORKERS = min(4, os.cpu_count() or 1)
+# Reports submitted per worker ahead of the one being written (bounds memory)
+BATCH_WINDOW_PER_WORKER = 2
+
+ReportInput = Union[FundingEligibilityResult, Dict[str, Any]]
+
+
+def _get_weasyprint_html():
+    """Lazy import weasyprint.HTML."""
+    global HTML
+    if HTML is None:
+        from weasyprint import HTML as _HTML
+        HTML = _HTML
+    return HTML
+
+
+def html_to_pdf(html: str) -> bytes:
+    """
+    Convert HTML to PDF with WeasyPrint (runs in PDF worker processes).
+    
+    Raises:
+        ImportError: If weasyprint is not installed
+    """
+    if not WEASYPRINT_AVAILABLE:
+        raise ImportError(
+            "weasyprint is required for PDF generation. "
+            "Install it with: pip install weasyprint"
+        )
+    return _get_weasyprint_html()(string=html).write_pdf()
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """Write-only stream whose content is drained chunk by chunk (for streaming ZIP)."""
+    
+    def __init__(self):
+        self._chunks: List[bytes] = []
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
 
 
 class PDFReportGenerator:
     """Generate PDF reports from Jinja templates."""
     
-    def __init__(self, templates_dir: Optional[Path] = None):
+    def __init__(
+        self,
+        templates_dir: Optional[Path] = None,
+        bytecode_cache_dir: Optional[Path] = None,
+        pdf_workers: Optional[int] = None,
+        pdf_renderer: Callable[[str], bytes] = html_to_pdf,
+        render_cache_size: int = RENDER_CACHE_SIZE
+    ):
         """
         Initialize PDF report generator.
         
         Args:
             templates_dir: Directory containing Jinja templates
+            bytecode_cache_dir: Directory for compiled templates (default: Jinja's
+                per-user directory in the system temp dir)
+            pdf_workers: Processes for batch PDF conversion (default PDF_WORKERS,
+                0 converts in the calling thread)
+            pdf_renderer: HTML→PDF function; must be importable by name, it runs
+                in spawned worker processes
+            render_cache_size: Max total length of cached rendered text
+                (0 disables the render cache)
         """
         if templates_dir is None:
             templates_dir = Path(__file__).parent / "templates"
         
         self.templates_dir = templates_dir
+        self.pdf_workers = PDF_WORKERS if pdf_workers is None else pdf_workers
+        self.pdf_renderer = pdf_renderer
+        self.render_cache = RenderCache(render_cache_size) if render_cache_size > 0 else None
+        # Template name -> (Template object, source version) it was rendered with
+        self._template_versions: Dict[str, Tuple[Any, str]] = {}
+        self._versions_lock = threading.Lock()
+        
+        # Jinja is only needed once a generator is created
+        from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+        
+        if bytecode_cache_dir is not None:
+            Path(bytecode_cache_dir).mkdir(parents=True, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(str(bytecode_cache_dir))
+        else:
+            bytecode_cache = FileSystemBytecodeCache()
+        
         self.env = Environment(
             loader=FileSystemLoader(str(templates_dir)),
-            autoescape=select_autoescape(['html', 'xml'])
+            autoescape=select_autoescape(['html', 'xml']),
+            bytecode_cache=bytecode_cache,
+            auto_reload=True
         )
         
         # Add custom filter for number formatting
         self.env.filters['format_number'] = lambda x: f"{x:,}"
     
+    def precompile(self) -> int:
+        """
+        Compile every template into the in-memory and bytecode caches.
+        
+        Returns:
+            Number of templates compiled
+        """
+        names = self.env.list_templates()
+        for name in names:
+            self.env.get_template(name)
+        logger.info("Precompiled report templates", templates=len(names))
+        return len(names)
+    
+    def render(self, name: str, context: Dict[str, Any]) -> str:
+        """
+        Render a template, reusing the cached text for an identical context.
+        
+        Args:
+            name: Template name
+            context: Template variables (picklable)
+            
+        Returns:
+            Rendered text
+        """
+        # Jinja re-stats the file here and reloads it if it changed
+        template = self.env.get_template(name)
+        if self.render_cache is None:
+            return template.render(**context)
+        
+        key = (name, self._template_version(name, template), context_hash(context))
+        text = self.render_cache.get(key)
+        if text is None:
+            text = template.render(**context)
+            self.render_cache.put(key, text)
+        return text
+    
+    def _template_version(self, name: str, template) -> str:
+        """Source version of a loaded template; drops old fragments when it was reloaded."""
+        known = self._template_versions.get(name)
+        if known is not None and known[0] is template:
+            return known[1]
+        with self._versions_lock:
+            known = self._template_versions.get(name)
+            if known is not None and known[0] is template:
+                return known[1]
+            source, _, _ = self.env.loader.get_source(self.env, name)
+            version = source_version(source)
+            if known is not None:
+                # Drop everything rendered by the previous template object: its
+                # version may have been read after the file changed again
+                dropped = self.render_cache.drop_template(name)
+                logger.info("Template changed, dropped rendered fragments", template=name, fragments=dropped)
+            self._template_versions[name] = (template, version)
+            return version
+    
+    def render_result_html(self, result: ReportInput) -> str:
+        """
+        Render the full HTML report of a funding calculation.
+        
+        Args:
+            result: FundingEligibilityResult or its as_dict() (e.g. a cached result)
+            
+        Returns:
+            HTML content as string
+        """
+        context = result.as_dict() if isinstance(result, FundingEligibilityResult) else result
+        return self.render(FULL_REPORT_TEMPLATE, context)
+    
+    def render_teaser_text(self, result: ReportInput) -> str:
+        """
+        Render the plain-text teaser of a funding calculation.
+        
+        Args:
+            result: FundingEligibilityResult or its as_dict()
+            
+        Returns:
+            Teaser text
+        """
+        context = result.as_dict() if isinstance(result, FundingEligibilityResult) else result
+        return self.render(TEASER_REPORT_TEMPLATE, context)
+    
+    def generate_result_pdf(self, result: ReportInput) -> bytes:
+        """
+        Render one funding report to PDF in the calling thread.
+        
+        Args:
+            result: FundingEligibilityResult or its as_dict()
+            
+        Returns:
+            PDF content as bytes
+            
+        Raises:
+            ImportError: If weasyprint is not installed
+        """
+        pdf_bytes = self.pdf_renderer(self.render_result_html(result))
+        logger.info("Generated PDF report", size_bytes=len(pdf_bytes))
+        return pdf_bytes
+    
+    def iter_pdfs(
+        self,
+        results: Iterable[ReportInput],
+        names: Optional[Iterable[str]] = None
+    ) -> Iterator[Tuple[str, bytes]]:
+        """
+        Render many funding reports, converting to PDF in the process pool.
+        
+        results is consumed lazily; reports are yielded in input order.
+        
+        Args:
+            results: FundingEligibilityResult objects or their as_dict()
+            names: File names, one per result (default report_00001.pdf, ...)
+            
+        Yields:
+            (file name, PDF bytes)
+            
+        Raises:
+            ImportError: If weasyprint is not installed
+        """
+        if names is None:
+            names = (f"report_{i:05d}.pdf" for i in itertools.count(1))
+        jobs = zip(names, results)
+        
+        if self.pdf_workers <= 0:
+            for name, result in jobs:
+                yield name, self.pdf_renderer(self.render_result_html(result))
+            return
+        
+        window = self.pdf_workers * BATCH_WINDOW_PER_WORKER
+        pending = deque()
+        # spawn: forking a process that runs threads can deadlock the child
+        with ProcessPoolExecutor(
+            max_workers=self.pdf_workers, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            try:
+                for name, result in jobs:
+                    pending.append((name, pool.submit(self.pdf_renderer, self.render_result_html(result))))
+                    if len(pending) >= window:
+                        name, future = pending.popleft()
+                        yield name, future.result()
+                while pending:
+                    name, future = pending.popleft()
+                    yield name, future.result()
+            finally:
+                # Consumer stopped early or a report failed: drop queued work
+                for _, future in pending:
+                    future.cancel()
+    
+    def write_batch(
+        self,
+        results: Iterable[ReportInput],
+        output_dir: Path,
+        names: Optional[Iterable[str]] = None
+    ) -> List[Path]:
+        """
+        Render many funding reports to PDF files in output_dir.
+        
+        Args:
+            results: FundingEligibilityResult objects or their as_dict()
+            output_dir: Directory for the PDFs (created if missing)
+            names: File names, one per result (default report_00001.pdf, ...)
+            
+        Returns:
+            Paths of the written files, in input order
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for name, pdf_bytes in self.iter_pdfs(results, names):
+            path = output_dir / name
+            path.write_bytes(pdf_bytes)
+            paths.append(path)
+        logger.info("Wrote PDF batch", reports=len(paths), output_dir=str(output_dir))
+        return paths
+    
+    def iter_zip(
+        self,
+        results: Iterable[ReportInput],
+        names: Optional[Iterable[str]] = None
+    ) -> Iterator[bytes]:
+        """
+        Render many funding reports as a ZIP archive, streamed chunk by chunk.
+        
+        Each chunk is yielded as soon as its PDF is converted, so the archive
+        is never held in memory.
+        
+        Args:
+            results: FundingEligibilityResult objects or their as_dict()
+            names: File names, one per result (default report_00001.pdf, ...)
+            
+        Yields:
+            ZIP archive bytes
+        """
+        buffer = _ChunkBuffer()
+        # PDFs are already compressed
+        with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_STORED) as archive:
+            for name, pdf_bytes in self.iter_pdfs(results, names):
+                archive.writestr(name, pdf_bytes)
+                yield buffer.drain()
+        yield buffer.drain()
+    
+    # Legacy report_template.* reports (FairCostGapCalculator inputs)
+    
     def generate_html_report(
         self,
         eligibility_result: FundingEligibilityResult,
@@ -54,9 +364,7 @@ class PDFReportGenerator:
         Returns:
             HTML content as string
         """
-        template = self.env.get_template('report_template.html')
-        
-        html = template.render(
+        html = self.render('report_template.html', dict(
             # Fair cost gap
             weekly_gap=fair_cost_result.weekly_gap,
             yearly_gap=fair_cost_result.yearly_gap,
@@ -82,7 +390,7 @@ class PDFReportGenerator:
             
             # Recommendations
             recommendations=eligibility_result.recommendations
-        )
+        ))
         
         logger.info("Generated HTML report")
         return html
@@ -102,9 +410,7 @@ class PDFReportGenerator:
         Returns:
             Markdown content as string
         """
-        template = self.env.get_template('report_template.md')
-        
-        markdown = template.render(
+        markdown = self.render('report_template.md', dict(
             # Fair cost gap
             weekly_gap=fair_cost_result.weekly_gap,
             yearly_gap=fair_cost_result.yearly_gap,
@@ -130,7 +436,7 @@ class PDFReportGenerator:
             
             # Recommendations
             recommendations=eligibility_result.recommendations
-        )
+        ))
         
         logger.info("Generated Markdown report")
         return markdown
@@ -163,7 +469,7 @@ class PDFReportGenerator:
         html_content = self.generate_html_report(eligibility_result, fair_cost_result)
         
         # Convert HTML to PDF
-        pdf_bytes = HTML(string=html_content).write_pdf()
+        pdf_bytes = _get_weasyprint_html()(string=html_content).write_pdf()
         
         logger.info("Generated PDF report", size_bytes=len(pdf_bytes))
         return pdf_bytes
@@ -0,0 +1,116 @@
+"""Bounded cache of rendered report fragments.
+
+The same funding result is often rendered again: a report downloaded twice, the
+PDF of a result that was just shown as HTML, campaign batches built from cached
+results. ``PDFReportGenerator.render`` keeps rendered text in a ``RenderCache``
+keyed by (template name, template version, context hash):
+
+* the template version is a checksum of the template source, taken whenever
+  Jinja reloads the template (it checks mtimes, ``auto_reload``); entries of the
+  previous version are dropped at that point;
+* the context hash is a BLAKE2 digest of the pickled render context. Equal
+  pickles mean equal contexts, so a hit is always correct; contexts that are
+  equal but pickle differently (1 vs 1.0) only miss.
+
+Size is bounded by the total length of the cached text; least recently used
+fragments are evicted first.
+"""
+
+import hashlib
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from observability import record_cache_lookup
+
+# Default bound on cached text (characters) per generator
+RENDER_CACHE_SIZE = 32 * 1024 * 1024
+
+
+def context_hash(context: Dict[str, Any]) -> bytes:
+    """128-bit digest of a render context."""
+    return hashlib.blake2b(pickle.dumps(context, protocol=pickle.HIGHEST_PROTOCOL), digest_size=16).digest()
+
+
+def source_version(source: str) -> str:
+    """Version of a template source (checksum)."""
+    return hashlib.blake2b(source.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class RenderCache:
+    """Thread-safe LRU of rendered text, bounded by total length."""
+
+    def __init__(self, max_size: int = RENDER_CACHE_SIZE):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Max total length of cached text (characters); a single
+                fragment longer than a quarter of it is not cached
+        """
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[Hashable, ...], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[str]:
+        """Cached text for key (None on a miss)."""
+        with self._lock:
+            text = self._entries.get(key)
+            if text is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        record_cache_lookup("render", hit=text is not None)
+        return text
+
+    def put(self, key: Tuple[Hashable, ...], text: str) -> None:
+        """Cache text for key, evicting least recently used fragments."""
+        if len(text) > self.max_size // 4:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key] = text
+            self.size += len(text)
+            while self.size > self.max_size:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def drop_template(self, name: str) -> int:
+        """
+        Drop every fragment of a template (keys start with the template name).
+
+        Returns:
+            Number of fragments dropped
+        """
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == name]
+            for key in keys:
+                self.size -= len(self._entries.pop(key))
+        return len(keys)
+
+    def clear(self) -> None:
+        """Drop all fragments."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Fragment count, cached size, limit and hit/miss counters."""
+        with self._lock:
+            return {
+                "fragments": len(self._entries),
+                "size": self.size,
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,188 @@
+"""Scenario sweeps for funding savings sensitivity analysis.
+
+Families ask "what if we sell the house or spend down capital?". ``sweep_scenarios``
+answers a whole grid of such questions for one patient in one call: the profile is
+parsed once, CHC (which does not depend on finances) is scored once, and DPA, the
+LA means test, tariff income and savings are evaluated over every combination of
+capital, property value, weekly income and care type with the NumPy rules of
+cohort.py.
+
+Care type changes the outcome only through pricing (expected weekly price and MSIF
+lower bound), so it is given as a mapping of care type to PricingResult (None =
+the default prices of calculate_all_savings).
+
+``scenario_matrix`` turns a sweep into a compact JSON-ready matrix, one nested
+list per metric with dimensions in ``SCENARIO_AXES`` order.
+"""
+
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from observability import timed
+from .cohort import _chc, _funding, profiles_to_frame
+from .exceptions import InvalidPatientProfileError
+from .models import PatientProfile
+
+# Grid dimensions, outermost first
+SCENARIO_AXES = ("care_type", "property_value", "capital_assets", "weekly_income")
+
+# Columns scenario_matrix can return
+SCENARIO_METRICS = (
+    "dpa_eligible",
+    "capital_assessed",
+    "tariff_income",
+    "la_top_up_probability",
+    "la_full_support_probability",
+    "la_fully_funded",
+    "weekly_contribution",
+    "weekly_gap",
+    "combined_probability",
+    "weekly_savings",
+    "annual_savings",
+    "five_year_savings",
+    "lifetime_savings",
+)
+DEFAULT_METRICS = ("annual_savings", "weekly_contribution", "tariff_income", "dpa_eligible", "la_fully_funded")
+
+# Max grid cells per sweep
+MAX_SCENARIOS = 50_000
+
+
+def _axis(values: Optional[Iterable], default: Any) -> list:
+    values = [default] if values is None else list(values)
+    if not values:
+        raise InvalidPatientProfileError("Scenario axes cannot be empty")
+    return values
+
+
+def _price(pricing_result, attribute: str) -> float:
+    value = getattr(pricing_result, attribute, None) if pricing_result is not None else None
+    return np.nan if value is None else float(value)
+
+
+@timed("funding.scenarios")
+def sweep_scenarios(
+    profile: Union[PatientProfile, Dict],
+    capital_values: Optional[Sequence[float]] = None,
+    property_values: Optional[Sequence[Optional[float]]] = None,
+    weekly_incomes: Optional[Sequence[float]] = None,
+    pricing_by_care_type: Optional[Mapping[str, Any]] = None,
+    means_test_year: Union[str, int, None] = None
+) -> pd.DataFrame:
+    """
+    Evaluate funding for one profile over a grid of financial scenarios.
+
+    Axes left as None keep the profile's own value. A property value of None
+    means no property (e.g. after a sale; add the proceeds on the capital axis).
+    Property flags (main residence, qualifying relative) come from the profile.
+
+    Args:
+        profile: PatientProfile or dict accepted by PatientProfile
+        capital_values: Capital assets (excluding property) to try
+        property_values: Property values to try (None = no property)
+        weekly_incomes: Weekly incomes to try
+        pricing_by_care_type: Care type -> PricingResult (or None for default
+            prices); default {profile.care_type: None}
+        means_test_year: Means-test year (default CURRENT_MEANS_TEST_YEAR)
+
+    Returns:
+        DataFrame with one row per scenario (SCENARIO_AXES order, last axis
+        fastest): the axis columns, chc_probability and the SCENARIO_METRICS
+        columns of calculate_cohort_eligibility; attrs["axes"] holds the axis
+        values
+
+    Raises:
+        InvalidPatientProfileError: On an invalid profile, negative values, empty
+            axes or more than MAX_SCENARIOS scenarios
+        CalculationError: On an unknown means_test_year
+    """
+    if isinstance(profile, dict):
+        profile = PatientProfile(**profile)
+    base = profiles_to_frame([profile])
+
+    if pricing_by_care_type is None:
+        pricing_by_care_type = {profile.care_type: None}
+    care_types = _axis(pricing_by_care_type, None)
+    default_property = profile.property.value if profile.property is not None else None
+    axes = [
+        care_types,
+        [np.nan if value is None else float(value) for value in _axis(property_values, default_property)],
+        [float(value) for value in _axis(capital_values, profile.capital_assets)],
+        [float(value) for value in _axis(weekly_incomes, profile.weekly_income)],
+    ]
+    shape = tuple(len(axis) for axis in axes)
+    size = int(np.prod(shape))
+    if size > MAX_SCENARIOS:
+        raise InvalidPatientProfileError(f"{size} scenarios requested, at most {MAX_SCENARIOS} allowed")
+
+    # Index of every cell along each axis (row-major: last axis fastest)
+    care_index, property_index, capital_index, income_index = np.unravel_index(np.arange(size), shape)
+    final_price = np.array([_price(pricing_by_care_type[c], "final_price_gbp") for c in care_types])
+    msif_lower = np.array([_price(pricing_by_care_type[c], "msif_lower_bound_gbp") for c in care_types])
+
+    grid = pd.DataFrame({
+        "care_type": np.array(care_types, dtype=object)[care_index],
+        "property_value": np.array(axes[1])[property_index],
+        "capital_assets": np.array(axes[2])[capital_index],
+        "weekly_income": np.array(axes[3])[income_index],
+        "final_price_gbp": final_price[care_index],
+        "msif_lower_bound_gbp": msif_lower[care_index],
+    })
+    for flag in ("is_permanent_care", "property_is_main_residence", "property_has_qualifying_relative"):
+        grid[flag] = bool(base.loc[0, flag]) if pd.notna(base.loc[0, flag]) else None
+    if means_test_year is not None:
+        grid["means_test_year"] = means_test_year
+
+    # CHC depends only on the profile: score once, broadcast over the grid
+    chc_probability = int(_chc(base)["chc_probability"][0])
+    funding = _funding(grid, np.full(size, chc_probability))
+
+    result = grid[list(SCENARIO_AXES)].copy()
+    result["chc_probability"] = chc_probability
+    for metric in SCENARIO_METRICS:
+        result[metric] = funding[metric]
+    result.attrs["axes"] = {
+        axis: [None if isinstance(value, float) and np.isnan(value) else value for value in values]
+        for axis, values in zip(SCENARIO_AXES, axes)
+    }
+    return result
+
+
+def scenario_matrix(sweep: pd.DataFrame, metrics: Sequence[str] = DEFAULT_METRICS) -> Dict[str, Any]:
+    """
+    Compact form of a sweep_scenarios result.
+
+    Args:
+        sweep: Result of sweep_scenarios (axes are read from sweep.attrs)
+        metrics: SCENARIO_METRICS columns to include
+
+    Returns:
+        {"axes": {axis: values}, "shape": [...], "chc_probability": int,
+        "metrics": {metric: nested lists indexed in SCENARIO_AXES order}};
+        NaN (no property, no contribution) becomes None
+
+    Raises:
+        InvalidPatientProfileError: On an unknown metric
+    """
+    unknown = [metric for metric in metrics if metric not in SCENARIO_METRICS]
+    if unknown:
+        raise InvalidPatientProfileError(f"Unknown scenario metric(s): {unknown}")
+
+    axes = sweep.attrs["axes"]
+    shape = [len(values) for values in axes.values()]
+    matrix = {}
+    for metric in metrics:
+        values = sweep[metric].to_numpy()
+        if values.dtype.kind == "f":
+            values = np.round(values, 2).astype(object)
+            values[pd.isna(values)] = None
+        matrix[metric] = values.reshape(shape).tolist()
+
+    return {
+        "axes": axes,
+        "shape": shape,
+        "chc_probability": int(sweep["chc_probability"].iloc[0]),
+        "metrics": matrix,
+    }
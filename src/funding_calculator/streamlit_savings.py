@@ -1,5 +1,6 @@
 """Streamlit interface for Funding Eligibility Calculator 2025-2026."""
 
+import numpy as np
 import streamlit as st
 from typing import Dict
 import sys
@@ -16,6 +17,7 @@ from funding_calculator import (
     PropertyDetails
 )
 from funding_calculator.constants import MEANS_TEST, DPA_ELIGIBILITY
+from funding_calculator.scenarios import sweep_scenarios
 
 try:
     from pricing_core import PricingService, CareType
@@ -290,6 +292,77 @@ def render_financial_info():
             st.session_state.financial_info["property"] = None
 
 
+def get_scenario_pricing(care_type: str):
+    """PricingResult for a care type at the session postcode (None without one)."""
+    if not (PRICING_AVAILABLE and st.session_state.get("postcode")):
+        return None
+    try:
+        pricing_service = get_pricing_service()
+        if pricing_service:
+            return pricing_service.get_full_pricing(
+                postcode=st.session_state["postcode"],
+                care_type=CareType(care_type)
+            )
+    except Exception as e:
+        st.warning(f"Could not get pricing for {care_type}: {e}")
+    return None
+
+
+def render_scenarios():
+    """Render savings sensitivity charts (one scenario sweep for all of them)."""
+    profile = st.session_state.get("profile")
+    if profile is None:
+        return
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        max_capital = st.slider(
+            "Capital range (GBP)",
+            min_value=50_000,
+            max_value=1_000_000,
+            value=int(min(1_000_000, max(100_000, profile.capital_assets * 2))),
+            step=10_000
+        )
+    with col2:
+        care_types = st.multiselect(
+            "Compare care types",
+            ["residential", "nursing", "residential_dementia", "nursing_dementia", "respite"],
+            default=[profile.care_type]
+        ) or [profile.care_type]
+    
+    pricing_by_care_type = {
+        care_type: (
+            st.session_state.get("pricing_result") if care_type == profile.care_type
+            else get_scenario_pricing(care_type)
+        )
+        for care_type in care_types
+    }
+    # Keep the home vs sell it (proceeds are read off the capital axis)
+    property_values = [None] if profile.property is None else [profile.property.value, None]
+    
+    sweep = sweep_scenarios(
+        profile,
+        capital_values=np.linspace(0, max_capital, 51),
+        property_values=property_values,
+        pricing_by_care_type=pricing_by_care_type
+    )
+    sweep["scenario"] = sweep["care_type"].str.replace("_", " ").str.title() + np.where(
+        sweep["property_value"].isna(),
+        " - no home" if profile.property is None else " - home sold",
+        " - keep home"
+    )
+    
+    st.markdown("**Annual savings by capital (excluding property)**")
+    st.line_chart(sweep.pivot_table(index="capital_assets", columns="scenario", values="annual_savings"))
+    
+    st.markdown("**Tariff income (means test, GBP/week)**")
+    st.line_chart(sweep.pivot_table(index="capital_assets", columns="scenario", values="tariff_income"))
+    st.caption(
+        f"£1/week per £{MEANS_TEST['tariff_income_rate']} of assessed capital above "
+        f"£{MEANS_TEST['lower_capital_limit']:,}; from £{MEANS_TEST['upper_capital_limit']:,} the resident self-funds."
+    )
+
+
 def render_results():
     """Render calculation results."""
     st.header("3️⃣ Results & Recommendations")
@@ -350,6 +423,8 @@ def render_results():
                 )
                 
                 st.session_state.results = result
+                st.session_state.profile = profile
+                st.session_state.pricing_result = pricing_result
                 
             except Exception as e:
                 st.error(f"Error calculating eligibility: {e}")
@@ -489,6 +564,12 @@ def render_results():
         
         st.markdown("---")
         
+        # What-if scenarios
+        st.subheader("🔮 What If?")
+        render_scenarios()
+        
+        st.markdown("---")
+        
         # Recommendations
         st.subheader("📋 Recommendations")
         
@@ -0,0 +1,228 @@
+"""Tests for async funding endpoints (event loop stays responsive under load)."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from funding_calculator import api
+from funding_calculator.cache import FundingCache
+from funding_calculator.calculator import FundingEligibilityCalculator
+
+# Max acceptable event-loop lag while requests are in flight
+LAG_THRESHOLD_SECONDS = 0.1
+# Simulated blocking time of one calculation and one pricing lookup
+CALC_SECONDS = 0.05
+PRICING_SECONDS = 0.05
+CONCURRENT_REQUESTS = 40
+
+
+class SlowCalculator(FundingEligibilityCalculator):
+    """Calculator whose sync calculation blocks like a heavy CPU-bound step."""
+
+    def calculate_full_eligibility(self, *args, **kwargs):
+        time.sleep(CALC_SECONDS)
+        return super().calculate_full_eligibility(*args, **kwargs)
+
+
+class FakePricingService:
+    """Pricing service answering after a (non-blocking) network delay."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def get_full_pricing_async(self, postcode, care_type):
+        self.calls += 1
+        await asyncio.sleep(PRICING_SECONDS)
+        return SimpleNamespace(final_price_gbp=1200.0, msif_lower_bound_gbp=900.0, fair_cost_gap_gbp=300.0)
+
+
+@pytest.fixture
+def service(tmp_path):
+    """Router app with a SQLite-backed slow calculator and fake pricing."""
+    with patch("funding_calculator.cache.REDIS_AVAILABLE", False):
+        cache = FundingCache(sqlite_db_path=str(tmp_path / "cache.db"))
+    pricing = FakePricingService()
+    app = FastAPI()
+    app.include_router(api.router)
+    with patch.object(api, "_funding_calculator", SlowCalculator(cache=cache)), \
+         patch.object(api, "get_pricing_service", return_value=pricing), \
+         patch.object(api, "PRICING_AVAILABLE", True):
+        yield SimpleNamespace(app=app, cache=cache, pricing=pricing)
+    cache.close()
+
+
+def profile(i):
+    return {"age": 70 + i % 30, "capital_assets": 1000.0 * i, "weekly_income": 150.0, "has_dementia": True}
+
+
+async def measure_lag(work):
+    """Run work() while sampling event-loop lag; return (result, max lag seconds)."""
+    lags = []
+    done = asyncio.Event()
+
+    async def monitor():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lags.append(time.perf_counter() - started - 0.005)
+
+    monitor_task = asyncio.create_task(monitor())
+    try:
+        result = await work()
+    finally:
+        done.set()
+        await monitor_task
+    return result, max(lags)
+
+
+def client(app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.benchmark
+def test_calculate_full_does_not_block_loop(service):
+    """Test concurrent /calculate-full requests keep event-loop lag under the threshold."""
+    async def work():
+        async with client(service.app) as http:
+            return await asyncio.gather(*(
+                http.post("/api/funding/calculate-full", json={
+                    "patient_profile": profile(i),
+                    "postcode": "B15 2HQ",
+                    "care_type": "residential",
+                    "user_id": f"user-{i}",
+                })
+                for i in range(CONCURRENT_REQUESTS)
+            ))
+
+    started = time.perf_counter()
+    responses, lag = asyncio.run(measure_lag(work))
+    elapsed = time.perf_counter() - started
+
+    assert [r.status_code for r in responses] == [200] * CONCURRENT_REQUESTS
+    assert service.pricing.calls == CONCURRENT_REQUESTS
+    assert lag < LAG_THRESHOLD_SECONDS
+    # Calculations overlap in the worker pool instead of running one after another
+    assert elapsed < CONCURRENT_REQUESTS * (CALC_SECONDS + PRICING_SECONDS) / 2
+
+
+def test_blocking_handler_exceeds_threshold():
+    """Test the lag monitor catches a handler that blocks the loop (control)."""
+    async def work():
+        for _ in range(3):
+            time.sleep(LAG_THRESHOLD_SECONDS)
+            await asyncio.sleep(0)
+
+    _, lag = asyncio.run(measure_lag(work))
+    assert lag >= LAG_THRESHOLD_SECONDS
+
+
+@pytest.mark.benchmark
+def test_calculate_savings_does_not_block_loop(service):
+    """Test concurrent /calculate-savings requests keep event-loop lag under the threshold."""
+    async def work():
+        async with client(service.app) as http:
+            return await asyncio.gather(*(
+                http.get("/api/funding/calculate-savings", params={
+                    "postcode": "B15 2HQ", "care_type": "residential", "age": 80,
+                    "capital_assets": 500.0 * i, "use_cache": "false",
+                })
+                for i in range(CONCURRENT_REQUESTS)
+            ))
+
+    responses, lag = asyncio.run(measure_lag(work))
+    assert [r.status_code for r in responses] == [200] * CONCURRENT_REQUESTS
+    assert lag < LAG_THRESHOLD_SECONDS
+
+
+def test_calculate_full_uses_cache(service):
+    """Test a repeated request is answered from the cache written by the async path."""
+    body = {"patient_profile": profile(1), "postcode": "B15 2HQ", "care_type": "residential", "user_id": "u1"}
+
+    async def work():
+        async with client(service.app) as http:
+            first = await http.post("/api/funding/calculate-full", json=body)
+            with patch.object(SlowCalculator, "calculate_full_eligibility", side_effect=AssertionError):
+                second = await http.post("/api/funding/calculate-full", json=body)
+            return first, second
+
+    first, second = asyncio.run(work())
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert service.cache.get_stats()["sqlite_keys"] == 1
+
+
+def test_delete_cache_entry_with_pricing_context(service):
+    """Test the admin delete removes a result cached for a priced request."""
+    body = {"patient_profile": profile(4), "postcode": "B15 2HQ", "care_type": "residential", "user_id": "u4"}
+
+    async def work():
+        async with client(service.app) as http:
+            await http.post("/api/funding/calculate-full", json=body)
+            bare = await http.request(
+                "DELETE", "/api/funding/cache/entry", params={"user_id": "u4"},
+                json={"patient_profile": profile(4)},
+            )
+            keys_after_bare = service.cache.get_stats()["sqlite_keys"]
+            priced = await http.request(
+                "DELETE", "/api/funding/cache/entry",
+                params={"user_id": "u4", "postcode": "B15 2HQ", "care_type": "residential"},
+                json={"patient_profile": profile(4)},
+            )
+            return bare, keys_after_bare, priced
+
+    bare, keys_after_bare, priced = asyncio.run(work())
+    assert bare.status_code == priced.status_code == 200
+    # Without the pricing context the key differs and the entry stays
+    assert keys_after_bare == 1
+    assert service.cache.get_stats()["sqlite_keys"] == 0
+
+
+def test_delete_cache_entry_without_pricing(service):
+    """Test the admin delete refuses to guess the key when pricing is unavailable."""
+    async def failing(postcode, care_type):
+        raise RuntimeError("postcodes.io down")
+
+    service.pricing.get_full_pricing_async = failing
+
+    async def work():
+        async with client(service.app) as http:
+            return await http.request(
+                "DELETE", "/api/funding/cache/entry",
+                params={"user_id": "u5", "postcode": "B15 2HQ", "care_type": "residential"},
+                json={"patient_profile": profile(5)},
+            )
+
+    assert asyncio.run(work()).status_code == 503
+
+
+def test_pricing_failure_degrades_to_no_pricing(service):
+    """Test a pricing error still returns an eligibility result."""
+    async def failing(postcode, care_type):
+        raise RuntimeError("postcodes.io down")
+
+    service.pricing.get_full_pricing_async = failing
+
+    async def work():
+        async with client(service.app) as http:
+            return await http.post("/api/funding/calculate-full", json={
+                "patient_profile": profile(2), "postcode": "B15 2HQ", "care_type": "residential",
+            })
+
+    response = asyncio.run(work())
+    assert response.status_code == 200
+
+
+def test_generate_pdf_without_weasyprint(service):
+    """Test PDF rendering in the worker pool maps a missing weasyprint to 503."""
+    async def work():
+        async with client(service.app) as http:
+            return await http.post("/api/funding/generate-pdf", json={"patient_profile": profile(3)})
+
+    with patch.dict("sys.modules", {"weasyprint": None}):
+        response = asyncio.run(work())
+    assert response.status_code == 503
@@ -53,7 +53,7 @@ class TestFundingCache:
         
         assert hash1 == hash2  # Same profile = same hash
         assert hash1 != hash3  # Different profile = different hash
-        assert len(hash1) == 64  # SHA256 hex length
+        assert len(hash1) == 32  # BLAKE2b-128 hex length
     
     def test_hash_profile_normalization(self, cache):
         """Test that profile normalization works."""
@@ -71,12 +71,13 @@ class TestFundingCache:
         user_id = "user123"
         profile_hash = "abc123"
         
-        key1 = cache._generate_cache_key(user_id, profile_hash, override=False)
-        key2 = cache._generate_cache_key(user_id, profile_hash, override=True)
+        key1 = cache._generate_cache_key(profile_hash, user_id, override=False)
+        key2 = cache._generate_cache_key(profile_hash, user_id, override=True)
         
         assert key1.startswith(cache.config.CACHE_PREFIX)
         assert key2.startswith(cache.config.CACHE_PREFIX + "override:")
-        assert user_id in key1
+        assert user_id not in key1  # results are shared between users
+        assert user_id in key2
         assert profile_hash in key1
         assert key1 != key2
     
@@ -125,6 +126,20 @@ class TestFundingCache:
         cached = cache.get(user_id, profile, check_override=False)
         assert cached["chc_probability"] == 50
     
+    def test_override_ignores_pricing_context(self, cache):
+        """Test an override set for the bare profile is served for a priced request."""
+        profile = {"age": 80}
+        priced_hash = cache.profile_hash(profile, {"pricing": [1200.0, 900.0]})
+        cache.set("test_user", profile, {"chc_probability": 50}, profile_hash=priced_hash)
+        cache.set("test_user", profile, {"chc_probability": 90}, override=True)
+        
+        cached = cache.get("test_user", profile, check_override=True, profile_hash=priced_hash)
+        assert cached["chc_probability"] == 90
+        
+        cache.delete("test_user", profile, override=True, profile_hash=priced_hash)
+        cached = cache.get("test_user", profile, check_override=True, profile_hash=priced_hash)
+        assert cached["chc_probability"] == 50
+    
     def test_cache_delete(self, cache):
         """Test cache deletion."""
         user_id = "test_user"
@@ -207,6 +222,57 @@ class TestFundingCache:
             # May or may not be None depending on cleanup timing
             # This is a best-effort test
     
+    def test_result_shared_between_users(self, cache):
+        """Test an identical profile from another user hits the same entry."""
+        profile = {"age": 80, "capital_assets": 1000.0}
+        cache.set("alice", profile, {"chc_probability": 75})
+        
+        assert cache.get("bob", {"capital_assets": 1000.0, "age": 80}) == {"chc_probability": 75}
+        assert cache.get("anonymous", profile) == {"chc_probability": 75}
+    
+    def test_clear_user_cache_uses_index(self, cache):
+        """Test clearing a user removes their profiles and overrides, not other users' profiles."""
+        cache.set("alice", {"age": 80}, {"chc_probability": 1})
+        cache.set("bob", {"age": 90}, {"chc_probability": 2})
+        cache.set("alice", {"age": 90}, {"chc_probability": 3}, override=True)
+        
+        assert cache.clear_user_cache("alice") == 2
+        assert cache.get("bob", {"age": 80}) is None
+        assert cache.get("alice", {"age": 90}) == {"chc_probability": 2}
+        assert cache.get("bob", {"age": 90}) == {"chc_probability": 2}
+    
+    def test_hit_indexes_user(self, cache):
+        """Test a user who read a shared result can invalidate it."""
+        cache.set("alice", {"age": 80}, {"chc_probability": 1})
+        cache.get("bob", {"age": 80})
+        
+        assert cache.clear_user_cache("bob") == 1
+        assert cache.get("alice", {"age": 80}) is None
+    
+    def test_anonymous_not_indexed(self, cache):
+        """Test anonymous requests do not build a user index."""
+        cache.set("anonymous", {"age": 80}, {"chc_probability": 1})
+        assert cache.clear_user_cache("anonymous") == 0
+        assert cache.get("alice", {"age": 80}) is not None
+    
+    def test_precomputed_hash(self, cache):
+        """Test get/set accept a precomputed hash and do not rehash."""
+        from unittest.mock import patch
+        
+        profile = {"age": 80}
+        profile_hash = cache.profile_hash(profile)
+        with patch.object(FundingCache, "profile_hash", side_effect=AssertionError("rehashed")):
+            cache.set("alice", profile, {"chc_probability": 1}, profile_hash=profile_hash)
+            # Override keys are hashed on the profile alone, so only the shared lookup here
+            assert cache.get("alice", profile, check_override=False, profile_hash=profile_hash) == {"chc_probability": 1}
+            assert cache.delete("alice", profile, profile_hash=profile_hash) is True
+    
+    def test_context_changes_hash(self, cache):
+        """Test pricing context is part of the key."""
+        profile = {"age": 80}
+        assert cache.profile_hash(profile) != cache.profile_hash(profile, {"pricing": [1000.0, 800.0]})
+        assert cache.profile_hash(profile, {}) == cache.profile_hash(profile)
+    
     def test_cache_close(self, cache):
         """Test cache cleanup."""
         cache.close()
@@ -264,6 +330,229 @@ class TestCacheIntegration:
         assert result1.chc_eligibility.probability_percent == result2.chc_eligibility.probability_percent
         
         cache.close()
+    
+    def test_calculator_stores_and_shares_result(self, temp_db):
+        """Test the calculator stores results and hashes the profile once per request."""
+        from unittest.mock import patch
+        from funding_calculator import FundingEligibilityCalculator
+        
+        cache = FundingCache(sqlite_db_path=temp_db)
+        calculator = FundingEligibilityCalculator(cache=cache)
+        profile_dict = {"age": 80, "capital_assets": 5000.0}
+        
+        with patch.object(cache, "profile_hash", wraps=cache.profile_hash) as hash_profile:
+            first = calculator.calculate_full_eligibility(profile_dict, user_id="alice")
+            assert hash_profile.call_count == 1
+        
+        with patch.object(calculator, "calculate_chc_probability", side_effect=AssertionError("recomputed")):
+            second = calculator.calculate_full_eligibility(profile_dict, user_id="bob")
+        
+        assert second.la_support.is_fully_funded == first.la_support.is_fully_funded
+        cache.close()
+
+
+class TestSQLiteConcurrency:
+    """Test the SQLite fallback: WAL, per-thread connections, background sweeper."""
+    
+    @pytest.fixture
+    def make_cache(self, tmp_path):
+        from unittest.mock import patch
+        
+        caches = []
+        
+        def make(**kwargs):
+            # No Redis: avoid the connection attempt and use SQLite
+            with patch("funding_calculator.cache.REDIS_AVAILABLE", False):
+                cache = FundingCache(sqlite_db_path=str(tmp_path / "cache.db"), **kwargs)
+            caches.append(cache)
+            return cache
+        
+        yield make
+        for cache in caches:
+            cache.close()
+    
+    def test_wal_and_connection_per_thread(self, make_cache):
+        """Test each thread gets its own WAL connection."""
+        import threading
+        
+        cache = make_cache(sweep_interval=0)
+        main_conn = cache.sqlite_conn
+        assert main_conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        
+        other = []
+        thread = threading.Thread(target=lambda: other.append(cache.sqlite_conn))
+        thread.start()
+        thread.join()
+        assert other[0] is not main_conn
+        assert cache.sqlite_conn is main_conn
+    
+    def test_miss_does_not_write(self, make_cache):
+        """Test a miss leaves expired rows to the sweeper."""
+        cache = make_cache(sweep_interval=0)
+        cache.set("alice", {"age": 80}, {"chc_probability": 1}, ttl=60)
+        cache.sqlite_conn.execute("UPDATE funding_cache SET expires_at = datetime('now', '-1 second')")
+        cache.sqlite_conn.commit()
+        
+        assert cache.get("alice", {"age": 80}) is None
+        assert cache.get("alice", {"age": 81}) is None
+        assert cache.sqlite_conn.execute("SELECT COUNT(*) FROM funding_cache").fetchone()[0] == 1
+    
+    def test_expired_entry_not_returned(self, make_cache):
+        """Test expiry is compared in SQLite's UTC format."""
+        import time
+        
+        cache = make_cache(sweep_interval=0)
+        cache.set("alice", {"age": 80}, {"chc_probability": 1}, ttl=1)
+        assert cache.get("alice", {"age": 80}) is not None
+        time.sleep(2.1)
+        assert cache.get("alice", {"age": 80}) is None
+    
+    def test_purge_expired(self, make_cache):
+        """Test purge_expired removes only expired rows and index entries."""
+        cache = make_cache(sweep_interval=0)
+        cache.set("alice", {"age": 80}, {"chc_probability": 1}, ttl=60)
+        cache.set("alice", {"age": 81}, {"chc_probability": 2}, ttl=60)
+        conn = cache.sqlite_conn
+        expired = cache.profile_hash({"age": 80})
+        conn.execute("UPDATE funding_cache SET expires_at = datetime('now', '-1 second') WHERE profile_hash = ?", (expired,))
+        conn.execute("UPDATE funding_cache_users SET expires_at = datetime('now', '-1 second') WHERE profile_hash = ?", (expired,))
+        conn.commit()
+        
+        assert cache.purge_expired() == 1
+        assert conn.execute("SELECT COUNT(*) FROM funding_cache").fetchone()[0] == 1
+        assert conn.execute("SELECT COUNT(*) FROM funding_cache_users").fetchone()[0] == 1
+        assert cache.get("alice", {"age": 81}) == {"chc_probability": 2}
+    
+    def test_background_sweeper(self, make_cache):
+        """Test the sweeper thread purges expired rows and stops on close."""
+        import time
+        
+        cache = make_cache(sweep_interval=0.05)
+        cache.set("alice", {"age": 80}, {"chc_probability": 1}, ttl=60)
+        cache.sqlite_conn.execute("UPDATE funding_cache SET expires_at = datetime('now', '-1 second')")
+        cache.sqlite_conn.commit()
+        
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if cache.sqlite_conn.execute("SELECT COUNT(*) FROM funding_cache").fetchone()[0] == 0:
+                break
+            time.sleep(0.05)
+        assert cache.sqlite_conn.execute("SELECT COUNT(*) FROM funding_cache").fetchone()[0] == 0
+        
+        sweeper = cache._sweeper
+        cache.close()
+        assert not sweeper.is_alive()
+        assert cache.sqlite_conn is None
+    
+    def test_concurrent_stress(self, make_cache):
+        """Test many threads reading, writing and invalidating without errors or lost writes."""
+        import threading
+        from unittest.mock import patch
+        
+        cache = make_cache(sweep_interval=0.01)
+        threads, iterations = 16, 40
+        barrier = threading.Barrier(threads)
+        failures = []
+        
+        def worker(n):
+            user = f"user{n}"
+            barrier.wait()
+            for i in range(iterations):
+                profile = {"age": 60 + i % 20, "worker": n, "i": i}
+                shared = {"age": 80, "capital_assets": float(i % 5)}
+                if not cache.set(user, profile, {"n": n, "i": i}):
+                    failures.append(("set", n, i))
+                if cache.get(user, profile) != {"n": n, "i": i}:
+                    failures.append(("get", n, i))
+                cache.set(user, shared, {"shared": i % 5})
+                if cache.get(f"user{(n + 1) % threads}", shared) not in (None, {"shared": i % 5}):
+                    failures.append(("shared", n, i))
+                if i % 10 == 9:
+                    cache.clear_user_cache(user)
+                    if cache.get(user, profile) is not None:
+                        failures.append(("clear", n, i))
+        
+        with patch("funding_calculator.cache.logger") as mock_logger:
+            pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+            for thread in pool:
+                thread.start()
+            for thread in pool:
+                thread.join()
+        
+        assert failures == []
+        mock_logger.warning.assert_not_called()
+        mock_logger.error.assert_not_called()
+        assert cache.sqlite_conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        assert len(cache._sqlite_connections) >= threads
+
+
+class TestRedisCache:
+    """Test the Redis backend with fakeredis."""
+    
+    @pytest.fixture
+    def cache(self, tmp_path):
+        from unittest.mock import patch
+        
+        fakeredis = pytest.importorskip("fakeredis")
+        with patch("funding_calculator.cache.SQLITE_AVAILABLE", False), \
+                patch("funding_calculator.cache.REDIS_AVAILABLE", False):
+            cache = FundingCache(sqlite_db_path=str(tmp_path / "unused.db"))
+        cache.redis_client = fakeredis.FakeRedis()
+        return cache
+    
+    def test_shared_result_and_user_index(self, cache):
+        """Test results are shared and the user index drives clear_user_cache."""
+        cache.set("alice", {"age": 80}, {"chc_probability": 1})
+        cache.set("alice", {"age": 85}, {"chc_probability": 2}, override=True)
+        cache.set("bob", {"age": 90}, {"chc_probability": 3})
+        
+        assert cache.get("bob", {"age": 80}) == {"chc_probability": 1}
+        assert cache.redis_client.ttl(cache._user_index_key("alice")) > 0
+        
+        assert cache.clear_user_cache("alice") == 2
+        assert cache.get("bob", {"age": 80}) is None
+        assert cache.get("bob", {"age": 90}) == {"chc_probability": 3}
+        assert not cache.redis_client.exists(cache._user_index_key("alice"))
+    
+    def test_delete_removes_index_entry(self, cache):
+        """Test delete drops the profile from the user index."""
+        cache.set("alice", {"age": 80}, {"chc_probability": 1})
+        assert cache.delete("alice", {"age": 80}) is True
+        assert cache.redis_client.smembers(cache._user_index_key("alice")) == set()
+    
+    def test_async_get_set(self, cache):
+        """Test get_async/set_async share keys and the user index with the sync methods."""
+        import asyncio
+        import fakeredis
+        
+        server = fakeredis.FakeServer()
+        cache.redis_client = fakeredis.FakeRedis(server=server)
+        cache.async_redis_client = fakeredis.FakeAsyncRedis(server=server)
+        
+        async def run():
+            assert await cache.get_async("alice", {"age": 80}) is None
+            assert await cache.set_async("alice", {"age": 80}, {"chc_probability": 1}) is True
+            await cache.set_async("alice", {"age": 80}, {"chc_probability": 9}, override=True)
+            return (
+                await cache.get_async("bob", {"age": 80}),
+                await cache.get_async("alice", {"age": 80}),
+                await cache.get_async("alice", {"age": 80}, check_override=False),
+            )
+        
+        shared, override, without_override = asyncio.run(run())
+        assert shared == without_override == {"chc_probability": 1}
+        assert override == {"chc_probability": 9}
+        assert cache.get("carol", {"age": 80}) == {"chc_probability": 1}
+        assert cache.redis_client.smembers(cache._user_index_key("bob")) == {cache.profile_hash({"age": 80}).encode()}
+    
+    def test_async_falls_back_to_sync(self, cache):
+        """Test a failing async client falls back to the sync path."""
+        import asyncio
+        from unittest.mock import AsyncMock, Mock
+        
+        cache.async_redis_client = Mock(mget=AsyncMock(side_effect=ConnectionError("down")))
+        cache.set("alice", {"age": 80}, {"chc_probability": 1})
+        assert asyncio.run(cache.get_async("bob", {"age": 80})) == {"chc_probability": 1}
 
 
 if __name__ == "__main__":
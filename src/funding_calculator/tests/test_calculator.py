@@ -624,6 +624,83 @@ class TestReportGeneration:
         assert "CHC" in report or "chc" in report.upper()
 
 
+def legacy_chc_probability(profile):
+    """Scoring of the previous calculate_chc_probability (one count per level and group)."""
+    from funding_calculator.constants import CHC_BONUSES, CHC_WEIGHTS, DOMAIN_GROUPS
+    from funding_calculator.utils import calculate_chc_probability_range, count_domain_levels
+    
+    assessments = profile.domain_assessments
+    priority = count_domain_levels(assessments, DomainLevel.PRIORITY)
+    severe = count_domain_levels(assessments, DomainLevel.SEVERE)
+    high = count_domain_levels(assessments, DomainLevel.HIGH)
+    
+    bonuses = {}
+    if count_domain_levels(assessments, DomainLevel.SEVERE, DOMAIN_GROUPS["critical_domains"]) >= 2:
+        bonuses["multiple_severe"] = CHC_BONUSES["multiple_severe"]
+    if profile.has_unpredictable_needs or profile.has_fluctuating_condition or profile.has_high_risk_behaviours:
+        bonuses["unpredictability"] = CHC_BONUSES["unpredictability"]
+    if count_domain_levels(assessments, DomainLevel.HIGH, DOMAIN_GROUPS["behavioural_domains"]) >= 3:
+        bonuses["multiple_high"] = CHC_BONUSES["multiple_high"]
+    if (profile.has_peg_feeding or profile.has_tracheostomy or profile.requires_injections
+            or profile.requires_ventilator or profile.requires_dialysis):
+        bonuses["complex_therapies"] = CHC_BONUSES["complex_therapies"]
+    
+    min_prob, max_prob, category = calculate_chc_probability_range(priority, severe, high)
+    final_prob = min(98, (min_prob + max_prob) // 2 + sum(bonuses.values()))
+    final_prob = max(min_prob, min(max_prob, final_prob))
+    
+    key_factors = [
+        f"{domain.value}: {assessment.level.value}"
+        for domain, assessment in assessments.items()
+        if assessment.level in [DomainLevel.PRIORITY, DomainLevel.SEVERE]
+    ]
+    if profile.has_primary_health_need:
+        key_factors.append("Primary health need identified")
+    domain_scores = {
+        domain.value: CHC_WEIGHTS[assessment.level]
+        for domain, assessment in assessments.items()
+        if assessment.level in CHC_WEIGHTS
+    }
+    return final_prob, category, list(bonuses), key_factors, domain_scores
+
+
+def test_chc_scoring_parity_with_legacy():
+    """Test single-pass scoring matches the previous scoring on 1200 generated cases."""
+    import random
+    
+    rnd = random.Random(2025)
+    flags = [
+        "has_primary_health_need", "has_peg_feeding", "has_tracheostomy", "requires_injections",
+        "requires_ventilator", "requires_dialysis", "has_unpredictable_needs",
+        "has_fluctuating_condition", "has_high_risk_behaviours",
+    ]
+    # Skewed towards higher levels so every threshold category is covered
+    levels = list(DomainLevel) + [DomainLevel.HIGH, DomainLevel.HIGH, DomainLevel.SEVERE]
+    calc = FundingEligibilityCalculator()
+    categories = set()
+    
+    for _ in range(1200):
+        domains = rnd.sample(list(Domain), rnd.randint(0, len(Domain)))
+        profile = PatientProfile(
+            age=rnd.randint(65, 100),
+            domain_assessments={
+                domain: DomainAssessment(domain=domain, level=rnd.choice(levels), description="") for domain in domains
+            },
+            **{flag: rnd.random() < 0.2 for flag in flags},
+        )
+        result = calc.calculate_chc_probability(profile)
+        final_prob, category, bonuses, key_factors, domain_scores = legacy_chc_probability(profile)
+        
+        assert result.probability_percent == final_prob
+        assert result.threshold_category == category
+        assert result.bonuses_applied == bonuses
+        assert result.key_factors == key_factors
+        assert result.domain_scores == domain_scores
+        categories.add(category)
+    
+    assert categories == {"very_high", "high", "moderate", "low"}
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
 
@@ -0,0 +1,209 @@
+"""Tests for cohort.py (columnar funding eligibility)."""
+
+import math
+import random
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from funding_calculator import (
+    Domain,
+    DomainAssessment,
+    DomainLevel,
+    FundingEligibilityCalculator,
+    PatientProfile,
+    PropertyDetails,
+)
+from funding_calculator.cohort import (
+    DOMAIN_COLUMNS,
+    calculate_cohort_eligibility,
+    cohort_summary,
+    profiles_to_frame,
+)
+from funding_calculator.exceptions import InvalidPatientProfileError
+
+FLAGS = [
+    "has_primary_health_need", "has_peg_feeding", "has_tracheostomy", "requires_injections",
+    "requires_ventilator", "requires_dialysis", "has_unpredictable_needs",
+    "has_fluctuating_condition", "has_high_risk_behaviours",
+]
+
+
+def make_cohort(size, seed=2025):
+    """Random profiles and pricing results covering every branch of the scalar engine."""
+    rnd = random.Random(seed)
+    levels = list(DomainLevel) + [DomainLevel.HIGH, DomainLevel.HIGH, DomainLevel.SEVERE]
+    profiles, pricing = [], []
+    for _ in range(size):
+        domains = rnd.sample(list(Domain), rnd.randint(0, len(Domain)))
+        property_details = None
+        if rnd.random() < 0.7:
+            property_details = PropertyDetails(
+                value=rnd.choice([0.0, 23_250.0, rnd.uniform(5_000, 600_000)]),
+                is_main_residence=rnd.random() < 0.85,
+                has_qualifying_relative=rnd.random() < 0.2,
+            )
+        profiles.append(PatientProfile(
+            age=rnd.randint(65, 100),
+            domain_assessments={
+                domain: DomainAssessment(domain=domain, level=rnd.choice(levels), description="")
+                for domain in domains
+            },
+            capital_assets=rnd.choice([0.0, 14_250.0, 23_250.0, rnd.uniform(0, 40_000), rnd.uniform(0, 300_000)]),
+            weekly_income=rnd.uniform(0, 600),
+            property=property_details,
+            is_permanent_care=rnd.random() < 0.9,
+            **{flag: rnd.random() < 0.2 for flag in FLAGS},
+        ))
+        roll = rnd.random()
+        if roll < 0.3:
+            pricing.append(None)
+        else:
+            price = rnd.uniform(700, 2000)
+            lower = None if roll < 0.4 else price * rnd.uniform(0.6, 1.0)
+            pricing.append(SimpleNamespace(final_price_gbp=price, msif_lower_bound_gbp=lower))
+    return profiles, pricing
+
+
+def cohort_frame(profiles, pricing):
+    frame = profiles_to_frame(profiles)
+    frame["final_price_gbp"] = [p.final_price_gbp if p else np.nan for p in pricing]
+    frame["msif_lower_bound_gbp"] = [p.msif_lower_bound_gbp if p else np.nan for p in pricing]
+    return frame
+
+
+def test_parity_with_scalar_engine():
+    """Test every output column matches calculate_full_eligibility on 1200 generated cases."""
+    profiles, pricing = make_cohort(1200)
+    result = calculate_cohort_eligibility(cohort_frame(profiles, pricing))
+    calc = FundingEligibilityCalculator()
+    categories = set()
+
+    for i, (profile, pricing_result) in enumerate(zip(profiles, pricing)):
+        expected = calc.calculate_full_eligibility(profile, pricing_result=pricing_result, use_cache=False)
+        row = result.iloc[i]
+        chc, la, dpa, savings = (
+            expected.chc_eligibility, expected.la_support, expected.dpa_eligibility, expected.savings
+        )
+
+        assert row["chc_probability"] == chc.probability_percent
+        assert row["chc_category"] == chc.threshold_category
+        assert row["chc_likely_eligible"] == chc.is_likely_eligible
+        assert row["dpa_eligible"] == dpa.is_eligible
+        assert row["capital_assessed"] == pytest.approx(la.capital_assessed)
+        assert row["tariff_income"] == la.tariff_income_gbp_week
+        assert row["la_top_up_probability"] == la.top_up_probability_percent
+        assert row["la_full_support_probability"] == la.full_support_probability_percent
+        assert row["la_fully_funded"] == la.is_fully_funded
+        if la.weekly_contribution is None:
+            assert math.isnan(row["weekly_contribution"])
+        else:
+            assert row["weekly_contribution"] == pytest.approx(la.weekly_contribution)
+        assert row["weekly_savings"] == pytest.approx(savings.weekly_savings)
+        assert row["annual_savings"] == pytest.approx(savings.annual_gbp)
+        assert row["five_year_savings"] == pytest.approx(savings.five_year_gbp)
+        assert row["lifetime_savings"] == pytest.approx(savings.lifetime_gbp)
+        categories.add(chc.threshold_category)
+
+    assert categories == {"very_high", "high", "moderate", "low"}
+    assert result["dpa_eligible"].any() and not result["dpa_eligible"].all()
+    assert result["weekly_contribution"].notna().any()
+
+
+def test_missing_columns_use_profile_defaults():
+    """Test a frame with only some columns is scored like a default PatientProfile."""
+    frame = pd.DataFrame({"breathing": ["priority", None], "capital_assets": [100_000.0, 0.0]})
+    result = calculate_cohort_eligibility(frame)
+    calc = FundingEligibilityCalculator()
+
+    first = calc.calculate_full_eligibility(PatientProfile(
+        age=80,
+        capital_assets=100_000.0,
+        domain_assessments={Domain.BREATHING: DomainAssessment(
+            domain=Domain.BREATHING, level=DomainLevel.PRIORITY, description=""
+        )},
+    ), use_cache=False)
+    second = calc.calculate_full_eligibility(PatientProfile(age=80), use_cache=False)
+
+    assert list(result["chc_probability"]) == [
+        first.chc_eligibility.probability_percent, second.chc_eligibility.probability_percent
+    ]
+    assert list(result["la_fully_funded"]) == [False, True]
+    assert list(result["dpa_eligible"]) == [False, False]
+
+
+def test_index_preserved():
+    """Test the result is aligned with the input rows."""
+    frame = pd.DataFrame({"capital_assets": [1.0, 2.0]}, index=["case-a", "case-b"])
+    assert list(calculate_cohort_eligibility(frame).index) == ["case-a", "case-b"]
+
+
+def test_unknown_level_rejected():
+    """Test a level that is not a DomainLevel raises."""
+    frame = pd.DataFrame({"cognition": ["severe", "extreme"]})
+    with pytest.raises(InvalidPatientProfileError, match="extreme"):
+        calculate_cohort_eligibility(frame)
+
+
+def test_negative_financials_rejected():
+    """Test negative capital raises like PatientProfile validation."""
+    with pytest.raises(InvalidPatientProfileError):
+        calculate_cohort_eligibility(pd.DataFrame({"capital_assets": [-1.0]}))
+
+
+def test_arrow_table_accepted():
+    """Test an Arrow table gives the same result as the DataFrame."""
+    pa = pytest.importorskip("pyarrow")
+    profiles, pricing = make_cohort(50)
+    frame = cohort_frame(profiles, pricing)
+    pd.testing.assert_frame_equal(
+        calculate_cohort_eligibility(pa.Table.from_pandas(frame, preserve_index=False)),
+        calculate_cohort_eligibility(frame),
+    )
+
+
+def test_other_input_rejected():
+    """Test inputs without a tabular form raise TypeError."""
+    with pytest.raises(TypeError):
+        calculate_cohort_eligibility([{"capital_assets": 0.0}])
+
+
+def test_cohort_summary():
+    """Test summary figures of a cohort result."""
+    frame = pd.DataFrame({
+        "breathing": ["priority", None],
+        "capital_assets": [0.0, 500_000.0],
+    })
+    summary = cohort_summary(calculate_cohort_eligibility(frame))
+    assert summary["cases"] == 2
+    assert summary["chc_likely_eligible_share"] == 0.5
+    assert summary["la_fully_funded_share"] == 0.5
+    assert cohort_summary(calculate_cohort_eligibility(pd.DataFrame({"capital_assets": []}))) == {"cases": 0}
+
+
+def test_profiles_to_frame_columns():
+    """Test flattened profiles carry one column per domain."""
+    frame = profiles_to_frame([{"age": 80, "domain_assessments": {}}])
+    assert set(DOMAIN_COLUMNS) <= set(frame.columns)
+    assert math.isnan(frame.loc[0, "property_value"])
+
+
+def test_cohort_faster_than_scalar():
+    """Test the columnar path beats the per-profile engine on a cohort."""
+    profiles, pricing = make_cohort(600, seed=7)
+    frame = cohort_frame(profiles, pricing)
+    calc = FundingEligibilityCalculator()
+
+    started = time.perf_counter()
+    for profile, pricing_result in zip(profiles, pricing):
+        calc.calculate_full_eligibility(profile, pricing_result=pricing_result, use_cache=False)
+    scalar_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    calculate_cohort_eligibility(frame)
+    cohort_seconds = time.perf_counter() - started
+
+    assert cohort_seconds < scalar_seconds
@@ -1,7 +1,7 @@
 """Tests for Fair Cost Gap calculator."""
 
 import pytest
-from funding_calculator.fair_cost_gap import FairCostGapCalculator
+from funding_calculator.fair_cost_gap import FairCostGapCalculator, _html_block, _markdown_block
 
 
 @pytest.fixture
@@ -66,3 +66,34 @@ class TestFairCostGapCalculator:
         assert "£" in result.report_block_markdown
         assert "|" in result.report_block_markdown  # Table format
 
+
+class TestReportBlocks:
+    """Test cached HTML / Markdown report blocks."""
+    
+    @pytest.fixture(autouse=True)
+    def clear_caches(self):
+        _html_block.cache_clear()
+        _markdown_block.cache_clear()
+        yield
+        _html_block.cache_clear()
+        _markdown_block.cache_clear()
+    
+    def test_html_block_cached_per_amounts(self, calculator):
+        """Test repeated amounts reuse the rendered HTML block."""
+        first = calculator._generate_html_block(100.0, 5200.0, 26000.0)
+        again = FairCostGapCalculator()._generate_html_block(100.0, 5200.0, 26000.0)
+        other = calculator._generate_html_block(120.0, 6240.0, 31200.0)
+        
+        assert again is first and other != first
+        assert "£100.00" in first and "£5,200" in first and "£26,000" in first
+        assert _html_block.cache_info().hits == 1
+    
+    def test_markdown_block_cached_per_amounts(self, calculator):
+        """Test repeated amounts reuse the rendered Markdown block."""
+        first = calculator._generate_markdown_block(100.0, 5200.0, 26000.0)
+        again = calculator._generate_markdown_block(100.0, 5200.0, 26000.0)
+        
+        assert again is first
+        assert "| **Per Week** | £100.00 |" in first
+        assert "| **Over 5 Years** | £26,000 |" in first
+        assert _markdown_block.cache_info().hits == 1
@@ -0,0 +1,114 @@
+"""Tests for means_test.py (vectorized, year-versioned means test)."""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from funding_calculator import FundingEligibilityCalculator, PatientProfile
+from funding_calculator import means_test, utils
+from funding_calculator.cohort import calculate_cohort_eligibility
+from funding_calculator.constants import CURRENT_MEANS_TEST_YEAR, MEANS_TEST, MEANS_TEST_BY_YEAR
+from funding_calculator.exceptions import CalculationError
+from funding_calculator.means_test import assess_means_test, means_test_parameters, tariff_income
+
+# Synthetic next-year table with different limits, rate and allowance
+PROJECTED_YEAR = "2026-27"
+PROJECTED = dict(
+    MEANS_TEST,
+    upper_capital_limit=30_000,
+    lower_capital_limit=20_000,
+    tariff_income_rate=500,
+    personal_expenses_allowance=31.0,
+)
+
+
+@pytest.fixture
+def projected_year(monkeypatch):
+    """Register PROJECTED as the 2026-27 table for the duration of a test."""
+    monkeypatch.setitem(MEANS_TEST_BY_YEAR, PROJECTED_YEAR, PROJECTED)
+    monkeypatch.setitem(utils._MEANS_TEST_START_YEARS, 2026, PROJECTED_YEAR)
+    monkeypatch.setattr(utils, "_MEANS_TEST_KEYS", {key: key for key in MEANS_TEST_BY_YEAR})
+    years = sorted(MEANS_TEST_BY_YEAR)
+    monkeypatch.setattr(means_test, "_YEARS", years)
+    monkeypatch.setattr(means_test, "_TABLE", {
+        field: np.array([MEANS_TEST_BY_YEAR[year][field] for year in years], dtype=float)
+        for field in means_test.MEANS_TEST_FIELDS
+    })
+    return PROJECTED_YEAR
+
+
+def boundary_capitals(table):
+    """Capital values around every threshold of a table."""
+    lower, upper, rate = table["lower_capital_limit"], table["upper_capital_limit"], table["tariff_income_rate"]
+    values = [0.0, lower - 0.01, lower, lower + 0.01, lower + rate - 0.01, lower + rate, lower + rate + 0.01,
+              upper - 0.01, upper, upper + 0.01, 1_000_000.0]
+    return values + [lower + step * 37.5 for step in range(400)]
+
+
+def test_tariff_income_matches_scalar(projected_year):
+    """Test the closed form matches calculate_tariff_income at and around the limits."""
+    for year, table in MEANS_TEST_BY_YEAR.items():
+        capitals = boundary_capitals(table)
+        expected = [utils.calculate_tariff_income(capital, table) for capital in capitals]
+        assert tariff_income(capitals, year).tolist() == expected
+
+
+def test_assess_matches_calculate_la_support(projected_year):
+    """Test every output matches calculate_la_support of a calculator for that year."""
+    incomes = [0.0, 20.0, 180.0, 400.0]
+    for year, table in MEANS_TEST_BY_YEAR.items():
+        calc = FundingEligibilityCalculator(means_test_year=year)
+        capitals = boundary_capitals(table)[:40]
+        grid = [(capital, income) for capital in capitals for income in incomes]
+        result = assess_means_test([c for c, _ in grid], [i for _, i in grid], year)
+
+        for row, (capital, income) in enumerate(grid):
+            profile = PatientProfile(age=80, capital_assets=capital, weekly_income=income)
+            la = calc.calculate_la_support(profile, dpa_eligible=False)
+            assert result["tariff_income"][row] == la.tariff_income_gbp_week
+            assert result["fully_funded"][row] == la.is_fully_funded
+            assert result["top_up_probability"][row] == la.top_up_probability_percent
+            assert result["full_support_probability"][row] == la.full_support_probability_percent
+            if la.weekly_contribution is None:
+                assert math.isnan(result["weekly_contribution"][row])
+            else:
+                assert result["weekly_contribution"][row] == pytest.approx(la.weekly_contribution)
+
+
+def test_year_per_row(projected_year):
+    """Test an array of years selects each row's thresholds."""
+    params = means_test_parameters(["2025-26", 2026, None, "2026/27", np.nan])
+    assert params["lower_capital_limit"].tolist() == [14_250, 20_000, 14_250, 20_000, 14_250]
+
+    result = assess_means_test([21_000.0, 21_000.0], [100.0, 100.0], ["2025-26", projected_year])
+    assert result["tariff_income"].tolist() == [27.0, 2.0]
+
+
+def test_cohort_means_test_year_column(projected_year):
+    """Test the cohort engine honours a per-row means_test_year column."""
+    frame = pd.DataFrame({
+        "capital_assets": [25_000.0, 25_000.0, 25_000.0],
+        "weekly_income": [150.0, 150.0, 150.0],
+        "means_test_year": [None, "2025-26", projected_year],
+    })
+    result = calculate_cohort_eligibility(frame)
+    assert result["la_top_up_probability"].tolist() == [0, 0, 70]
+    assert result["tariff_income"].tolist()[2] == 10.0
+
+
+def test_unknown_year_rejected():
+    """Test years before the first table raise CalculationError."""
+    with pytest.raises(CalculationError):
+        tariff_income([20_000.0], "2015-16")
+    with pytest.raises(CalculationError):
+        FundingEligibilityCalculator(means_test_year="2015-16")
+
+
+def test_other_year_changes_cache_key(projected_year):
+    """Test results for a non-current year are cached under a different key."""
+    current = FundingEligibilityCalculator(means_test_year=CURRENT_MEANS_TEST_YEAR)
+    projected = FundingEligibilityCalculator(means_test_year=projected_year)
+    assert current._cache_context(None, None) is None
+    assert projected._cache_context(None, None) == {"means_test_year": projected_year}
@@ -0,0 +1,179 @@
+"""Tests for precompiled templates and batch PDF rendering."""
+
+import asyncio
+import io
+import os
+import time
+import zipfile
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from funding_calculator import FundingEligibilityCalculator, PatientProfile
+from funding_calculator import api
+from funding_calculator.pdf_generator import BATCH_WINDOW_PER_WORKER, PDFReportGenerator, html_to_pdf
+
+
+def fake_pdf(html):
+    """Stand-in for WeasyPrint (module level: runs in spawned workers)."""
+    return b"%PDF-fake\n" + html.encode()
+
+
+@pytest.fixture(scope="module")
+def results():
+    calc = FundingEligibilityCalculator()
+    return [
+        calc.calculate_full_eligibility(PatientProfile(age=70 + i, capital_assets=5000.0 * i), use_cache=False)
+        for i in range(6)
+    ]
+
+
+@pytest.fixture
+def generator(tmp_path):
+    return PDFReportGenerator(bytecode_cache_dir=tmp_path / "jinja", pdf_workers=0, pdf_renderer=fake_pdf)
+
+
+def test_precompile_fills_bytecode_cache(tmp_path, generator):
+    """Test precompile writes bytecode that a new generator loads without compiling."""
+    assert generator.precompile() == 4
+    assert len(list((tmp_path / "jinja").iterdir())) == 4
+
+    fresh = PDFReportGenerator(bytecode_cache_dir=tmp_path / "jinja")
+    with patch.object(fresh.env, "compile", side_effect=AssertionError("compiled again")):
+        assert fresh.precompile() == 4
+
+
+def test_edited_template_is_recompiled(tmp_path, results):
+    """Test a template change is picked up despite the bytecode cache."""
+    templates = tmp_path / "templates"
+    templates.mkdir()
+    template = templates / "full_report.html"
+    template.write_text("v1 {{ chc_eligibility.probability_percent }}")
+    generator = PDFReportGenerator(templates_dir=templates, bytecode_cache_dir=tmp_path / "jinja")
+    assert generator.render_result_html(results[0]).startswith("v1")
+
+    template.write_text("v2 {{ chc_eligibility.probability_percent }}")
+    later = time.time() + 5
+    os.utime(template, (later, later))
+    assert generator.render_result_html(results[0]).startswith("v2")
+    assert PDFReportGenerator(templates_dir=templates, bytecode_cache_dir=tmp_path / "jinja") \
+        .render_result_html(results[0]).startswith("v2")
+
+
+def test_render_result_html(generator, results):
+    """Test the full report renders from a result and from its cached dict."""
+    html = generator.render_result_html(results[1])
+    assert f"{results[1].chc_eligibility.probability_percent}" in html
+    assert html == generator.render_result_html(results[1].as_dict())
+
+
+def test_write_batch_in_process_pool(tmp_path, results):
+    """Test write_batch converts in worker processes and keeps input order."""
+    generator = PDFReportGenerator(bytecode_cache_dir=tmp_path / "jinja", pdf_workers=2, pdf_renderer=fake_pdf)
+    paths = generator.write_batch(results, tmp_path / "out")
+
+    assert [p.name for p in paths] == [f"report_{i:05d}.pdf" for i in range(1, 7)]
+    for path, result in zip(paths, results):
+        assert path.read_bytes() == fake_pdf(generator.render_result_html(result))
+
+
+def test_iter_zip(generator, results):
+    """Test the streamed archive holds one PDF per result under the given names."""
+    names = [f"client_{i}.pdf" for i in range(len(results))]
+    chunks = list(generator.iter_zip(results, names))
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+    assert archive.namelist() == names
+    assert archive.read("client_2.pdf") == fake_pdf(generator.render_result_html(results[2]))
+    assert len(chunks) == len(results) + 1
+
+
+def test_batch_consumes_input_lazily(tmp_path, results):
+    """Test at most the pool window of reports is in flight."""
+    generator = PDFReportGenerator(bytecode_cache_dir=tmp_path / "jinja", pdf_workers=1, pdf_renderer=fake_pdf)
+    consumed = []
+
+    def source():
+        for result in results:
+            consumed.append(result)
+            yield result
+
+    batch = generator.iter_pdfs(source())
+    next(batch)
+    assert len(consumed) == BATCH_WINDOW_PER_WORKER
+    batch.close()
+
+
+def test_missing_weasyprint(generator, results):
+    """Test the default renderer raises ImportError without weasyprint."""
+    generator.pdf_renderer = html_to_pdf
+    with patch("funding_calculator.pdf_generator.WEASYPRINT_AVAILABLE", False):
+        with pytest.raises(ImportError):
+            generator.generate_result_pdf(results[0])
+
+
+def test_batch_endpoint_streams_zip(tmp_path):
+    """Test /generate-pdf/batch returns one PDF per profile in a ZIP."""
+    app = FastAPI()
+    app.include_router(api.router)
+    generator = PDFReportGenerator(bytecode_cache_dir=tmp_path / "jinja", pdf_workers=0, pdf_renderer=fake_pdf)
+
+    async def post(body):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await http.post("/api/funding/generate-pdf/batch", json=body)
+
+    with patch.object(api, "_funding_calculator", FundingEligibilityCalculator()), \
+         patch.object(api, "_pdf_generator", generator):
+        response = asyncio.run(post({
+            "patient_profiles": [{"age": 80}, {"age": 90, "has_dementia": True}],
+            "names": ["a.pdf", "b.pdf"],
+        }))
+        mismatched = asyncio.run(post({"patient_profiles": [{"age": 80}], "names": []}))
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert archive.namelist() == ["a.pdf", "b.pdf"]
+    assert archive.read("a.pdf").startswith(b"%PDF-fake")
+    assert mismatched.status_code == 400
+
+
+def test_batch_endpoint_without_weasyprint(tmp_path):
+    """Test a batch fails with 503 before streaming when weasyprint is missing."""
+    app = FastAPI()
+    app.include_router(api.router)
+    generator = PDFReportGenerator(bytecode_cache_dir=tmp_path / "jinja", pdf_workers=0)
+
+    async def post():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await http.post("/api/funding/generate-pdf/batch", json={"patient_profiles": [{"age": 80}]})
+
+    with patch.object(api, "_funding_calculator", FundingEligibilityCalculator()), \
+         patch.object(api, "_pdf_generator", generator), \
+         patch("funding_calculator.pdf_generator.WEASYPRINT_AVAILABLE", False):
+        response = asyncio.run(post())
+    assert response.status_code == 503
+
+
+def test_precompiled_render_throughput(tmp_path, results):
+    """Test rendering 1k reports with cached templates beats compiling per report."""
+    reports = [results[i % len(results)].as_dict() for i in range(1000)]
+    generator = PDFReportGenerator(bytecode_cache_dir=tmp_path / "jinja", pdf_workers=0, pdf_renderer=fake_pdf)
+    generator.precompile()
+
+    started = time.perf_counter()
+    for report in reports:
+        generator.render_result_html(report)
+    cached_seconds = time.perf_counter() - started
+
+    template_source = (generator.templates_dir / "full_report.html").read_text()
+    started = time.perf_counter()
+    for report in reports[:100]:
+        generator.env.from_string(template_source).render(**report)
+    compile_seconds = (time.perf_counter() - started) * 10
+
+    assert cached_seconds < compile_seconds
@@ -0,0 +1,118 @@
+"""Tests for cached report rendering (render_cache.py)."""
+
+import os
+import time
+
+import pytest
+
+from funding_calculator import FundingEligibilityCalculator, PatientProfile
+from funding_calculator.pdf_generator import FULL_REPORT_TEMPLATE, PDFReportGenerator
+from funding_calculator.render_cache import RenderCache, context_hash
+
+
+@pytest.fixture(scope="module")
+def results():
+    calc = FundingEligibilityCalculator()
+    return [
+        calc.calculate_full_eligibility(
+            PatientProfile(age=70 + i, capital_assets=4000.0 * i, has_dementia=i % 2 == 0), use_cache=False
+        ).as_dict()
+        for i in range(20)
+    ]
+
+
+@pytest.fixture
+def generator(tmp_path):
+    return PDFReportGenerator(bytecode_cache_dir=tmp_path / "jinja", pdf_workers=0)
+
+
+def edit(path, text):
+    """Rewrite a template and move its mtime forward (Jinja compares mtimes)."""
+    path.write_text(text)
+    later = time.time() + 5
+    os.utime(path, (later, later))
+
+
+def test_identical_context_served_from_cache(generator, results):
+    """Test a repeated render is a cache hit with the same text."""
+    first = generator.render_result_html(results[0])
+    again = generator.render_result_html(dict(results[0]))
+    other = generator.render_result_html(results[1])
+
+    assert again == first and other != first
+    assert generator.render_cache.stats()["hits"] == 1
+    assert len(generator.render_cache) == 2
+
+
+def test_teaser_text(generator, results):
+    """Test the teaser template renders from a result dict."""
+    text = generator.render_teaser_text(results[2])
+    assert f"CHC ELIGIBILITY: {results[2]['chc_eligibility']['probability_percent']}%" in text
+    assert generator.render_teaser_text(results[2]) == text
+
+
+def test_template_edit_invalidates(tmp_path, results):
+    """Test editing a template drops its fragments; touching it keeps them."""
+    templates = tmp_path / "templates"
+    templates.mkdir()
+    template = templates / FULL_REPORT_TEMPLATE
+    template.write_text("v1 {{ chc_eligibility.probability_percent }}")
+    generator = PDFReportGenerator(templates_dir=templates, bytecode_cache_dir=tmp_path / "jinja")
+    assert generator.render_result_html(results[0]).startswith("v1")
+
+    edit(template, "v2 {{ chc_eligibility.probability_percent }}")
+    assert generator.render_result_html(results[0]).startswith("v2")
+    assert len(generator.render_cache) == 1
+
+    edit(template, "v2 {{ chc_eligibility.probability_percent }}")
+    assert generator.render_result_html(results[0]).startswith("v2")
+
+
+def test_size_bounded_eviction():
+    """Test least recently used fragments are evicted beyond max_size."""
+    cache = RenderCache(max_size=40)
+    cache.put(("a",), "x" * 10)
+    cache.put(("b",), "x" * 10)
+    cache.put(("c",), "x" * 10)
+    cache.get(("a",))
+    cache.put(("d",), "x" * 10)
+    cache.put(("e",), "x" * 10)
+
+    assert cache.get(("b",)) is None and cache.get(("a",)) is not None
+    assert cache.size <= 40
+    cache.put(("big",), "x" * 11)
+    assert cache.get(("big",)) is None
+
+
+def test_context_hash_distinguishes_values():
+    """Test different contexts never share a key."""
+    assert context_hash({"a": 1, "b": [1, 2]}) == context_hash({"a": 1, "b": [1, 2]})
+    assert context_hash({"a": 1}) != context_hash({"a": 2})
+    assert context_hash({"a": "1"}) != context_hash({"a": 1})
+
+
+def test_cache_disabled(tmp_path, results):
+    """Test render_cache_size=0 renders every time."""
+    generator = PDFReportGenerator(bytecode_cache_dir=tmp_path / "jinja", render_cache_size=0)
+    assert generator.render_cache is None
+    assert generator.render_result_html(results[0]) == generator.render_result_html(results[0])
+
+
+def test_render_benchmark(tmp_path, results):
+    """Benchmark 2k report renders over 20 distinct results, cached vs uncached."""
+    reports = [results[i % len(results)] for i in range(2000)]
+    cached = PDFReportGenerator(bytecode_cache_dir=tmp_path / "jinja", pdf_workers=0)
+    uncached = PDFReportGenerator(bytecode_cache_dir=tmp_path / "jinja", pdf_workers=0, render_cache_size=0)
+    cached.precompile()
+    uncached.precompile()
+
+    timings = {}
+    for label, generator in (("cached", cached), ("uncached", uncached)):
+        started = time.perf_counter()
+        for report in reports:
+            generator.render_result_html(report)
+            generator.render_teaser_text(report)
+        timings[label] = time.perf_counter() - started
+
+    assert cached.render_cache.stats()["misses"] == 2 * len(results)
+    assert timings["cached"] < timings["uncached"]
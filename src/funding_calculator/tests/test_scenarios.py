@@ -0,0 +1,158 @@
+"""Tests for scenarios.py (funding scenario sweeps)."""
+
+import json
+import math
+from types import SimpleNamespace
+
+import pytest
+
+from funding_calculator import (
+    Domain,
+    DomainAssessment,
+    DomainLevel,
+    FundingEligibilityCalculator,
+    PatientProfile,
+    PropertyDetails,
+)
+from funding_calculator.exceptions import InvalidPatientProfileError
+from funding_calculator.scenarios import MAX_SCENARIOS, scenario_matrix, sweep_scenarios
+
+
+@pytest.fixture
+def profile():
+    return PatientProfile(
+        age=84,
+        domain_assessments={
+            Domain.COGNITION: DomainAssessment(domain=Domain.COGNITION, level=DomainLevel.SEVERE, description=""),
+            Domain.BEHAVIOUR: DomainAssessment(domain=Domain.BEHAVIOUR, level=DomainLevel.HIGH, description=""),
+        },
+        capital_assets=40_000.0,
+        weekly_income=240.0,
+        property=PropertyDetails(value=300_000.0, is_main_residence=True),
+        care_type="nursing",
+    )
+
+
+PRICING = {
+    "residential": SimpleNamespace(final_price_gbp=1150.0, msif_lower_bound_gbp=880.0),
+    "nursing": SimpleNamespace(final_price_gbp=1480.0, msif_lower_bound_gbp=None),
+    "respite": None,
+}
+
+
+def test_parity_with_scalar_engine(profile):
+    """Test every grid cell matches calculate_full_eligibility on the edited profile."""
+    capitals = [0.0, 14_000.0, 23_250.0, 23_251.0, 90_000.0, 200_000.0]
+    properties = [None, 0.0, 100_000.0, 300_000.0]
+    incomes = [0.0, 240.0, 600.0]
+    sweep = sweep_scenarios(profile, capitals, properties, incomes, PRICING)
+    assert len(sweep) == len(PRICING) * len(capitals) * len(properties) * len(incomes)
+
+    calc = FundingEligibilityCalculator()
+    for row in sweep.itertuples():
+        property_value = None if math.isnan(row.property_value) else row.property_value
+        edited = profile.model_copy(update={
+            "capital_assets": row.capital_assets,
+            "weekly_income": row.weekly_income,
+            "property": None if property_value is None else profile.property.model_copy(update={"value": property_value}),
+        })
+        expected = calc.calculate_full_eligibility(edited, pricing_result=PRICING[row.care_type], use_cache=False)
+
+        assert row.chc_probability == expected.chc_eligibility.probability_percent
+        assert row.dpa_eligible == expected.dpa_eligibility.is_eligible
+        assert row.capital_assessed == pytest.approx(expected.la_support.capital_assessed)
+        assert row.tariff_income == expected.la_support.tariff_income_gbp_week
+        assert row.la_fully_funded == expected.la_support.is_fully_funded
+        if expected.la_support.weekly_contribution is None:
+            assert math.isnan(row.weekly_contribution)
+        else:
+            assert row.weekly_contribution == pytest.approx(expected.la_support.weekly_contribution)
+        assert row.annual_savings == pytest.approx(expected.savings.annual_gbp)
+
+
+def test_default_axes_use_profile_values(profile):
+    """Test an empty sweep is the profile's own scenario."""
+    sweep = sweep_scenarios(profile)
+    assert len(sweep) == 1
+    assert sweep.attrs["axes"] == {
+        "care_type": ["nursing"], "property_value": [300_000.0],
+        "capital_assets": [40_000.0], "weekly_income": [240.0],
+    }
+
+
+def test_scenario_matrix_shape(profile):
+    """Test the matrix is nested in SCENARIO_AXES order and JSON-serialisable."""
+    sweep = sweep_scenarios(profile, [0.0, 50_000.0, 100_000.0], [None, 300_000.0], [200.0, 400.0], PRICING)
+    matrix = scenario_matrix(sweep, metrics=["annual_savings", "weekly_contribution", "dpa_eligible"])
+
+    assert matrix["shape"] == [3, 2, 3, 2]
+    assert matrix["axes"]["property_value"] == [None, 300_000.0]
+    assert matrix["chc_probability"] == sweep["chc_probability"].iloc[0]
+    cell = sweep[
+        (sweep.care_type == "residential") & (sweep.property_value == 300_000.0)
+        & (sweep.capital_assets == 50_000.0) & (sweep.weekly_income == 400.0)
+    ].iloc[0]
+    assert matrix["metrics"]["annual_savings"][0][1][1][1] == round(cell.annual_savings, 2)
+    assert matrix["metrics"]["dpa_eligible"][0][1][1][1] == bool(cell.dpa_eligible)
+    assert matrix["metrics"]["weekly_contribution"][0][0][2][0] is None  # above the upper limit
+    json.dumps(matrix)
+
+
+def test_selling_the_house(profile):
+    """Test selling a DPA-protected home: proceeds become capital and savings drop."""
+    sweep = sweep_scenarios(profile, [10_000.0, 310_000.0], [300_000.0, None])
+    keep, sold = sweep.iloc[0], sweep.iloc[3]
+
+    assert keep.dpa_eligible and keep.la_top_up_probability == 0
+    assert not sold.dpa_eligible and sold.capital_assessed == 310_000.0
+    assert sold.annual_savings <= keep.annual_savings
+
+
+def test_limits_and_validation(profile):
+    """Test oversized grids, empty axes, negatives and unknown metrics are rejected."""
+    with pytest.raises(InvalidPatientProfileError, match="at most"):
+        sweep_scenarios(profile, capital_values=range(MAX_SCENARIOS + 1))
+    with pytest.raises(InvalidPatientProfileError):
+        sweep_scenarios(profile, weekly_incomes=[])
+    with pytest.raises(InvalidPatientProfileError):
+        sweep_scenarios(profile, capital_values=[-1.0])
+    with pytest.raises(InvalidPatientProfileError):
+        scenario_matrix(sweep_scenarios(profile), metrics=["chc_reasoning"])
+
+
+def test_scenarios_endpoint():
+    """Test /scenarios prices each care type once and returns the matrix."""
+    import asyncio
+    from unittest.mock import AsyncMock, patch
+
+    import httpx
+    from fastapi import FastAPI
+
+    from funding_calculator import api
+
+    app = FastAPI()
+    app.include_router(api.router)
+    pricing = AsyncMock(side_effect=lambda postcode, care_type: PRICING[care_type])
+
+    async def post(body):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await http.post("/api/funding/scenarios", json=body)
+
+    with patch.object(api, "_get_pricing_result", pricing):
+        response = asyncio.run(post({
+            "patient_profile": {"age": 80, "capital_assets": 30_000.0},
+            "capital_values": [0.0, 30_000.0, 60_000.0],
+            "property_values": [None, 250_000.0],
+            "care_types": ["residential", "nursing"],
+            "postcode": "B15 2HQ",
+        }))
+        pricing_calls = pricing.await_count
+        invalid = asyncio.run(post({"patient_profile": {"age": 80}, "metrics": ["nope"]}))
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["shape"] == [2, 2, 3, 1]
+    assert set(body["metrics"]) == {"annual_savings", "weekly_contribution", "tariff_income", "dpa_eligible", "la_fully_funded"}
+    assert pricing_calls == 2
+    assert invalid.status_code == 400
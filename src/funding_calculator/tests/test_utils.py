@@ -7,10 +7,20 @@ from funding_calculator.utils import (
     calculate_chc_bonuses,
     calculate_tariff_income,
     assess_property_for_means_test,
-    calculate_chc_probability_range
+    calculate_chc_probability_range,
+    get_means_test,
+    means_test_year,
+    score_domain_levels
 )
 from funding_calculator.models import DomainAssessment, PatientProfile, PropertyDetails
-from funding_calculator.constants import Domain, DomainLevel, MEANS_TEST
+from funding_calculator.constants import (
+    CURRENT_MEANS_TEST_YEAR,
+    Domain,
+    DomainLevel,
+    MEANS_TEST,
+    MEANS_TEST_BY_YEAR,
+)
+from funding_calculator.exceptions import CalculationError
 
 
 class TestCountDomainLevels:
@@ -84,6 +94,41 @@ class TestCountDomainLevels:
         assert count == 2  # Both cognition and mobility are critical
 
 
+class TestScoreDomainLevels:
+    """Test score_domain_levels function."""
+    
+    def test_matches_count_domain_levels(self):
+        """Test every level and group count equals the per-level count."""
+        import random
+        from funding_calculator.constants import DOMAIN_GROUPS
+        
+        rnd = random.Random(7)
+        for _ in range(200):
+            assessments = {
+                domain: DomainAssessment(domain=domain, level=rnd.choice(list(DomainLevel)), description="")
+                for domain in rnd.sample(list(Domain), rnd.randint(0, len(Domain)))
+            }
+            counts = score_domain_levels(assessments)
+            for level in DomainLevel:
+                assert counts.count(level) == count_domain_levels(assessments, level)
+                for group, domains in DOMAIN_GROUPS.items():
+                    assert counts.count(level, group) == count_domain_levels(assessments, level, domains)
+    
+    def test_key_factors_and_domain_scores(self):
+        """Test scored domains keep assessment order."""
+        assessments = {
+            Domain.SKIN: DomainAssessment(domain=Domain.SKIN, level=DomainLevel.HIGH, description=""),
+            Domain.BREATHING: DomainAssessment(domain=Domain.BREATHING, level=DomainLevel.PRIORITY, description=""),
+            Domain.COGNITION: DomainAssessment(domain=Domain.COGNITION, level=DomainLevel.LOW, description=""),
+            Domain.MOBILITY: DomainAssessment(domain=Domain.MOBILITY, level=DomainLevel.SEVERE, description=""),
+        }
+        counts = score_domain_levels(assessments)
+        
+        assert (counts.priority, counts.severe, counts.high) == (1, 1, 1)
+        assert counts.key_factors() == ["breathing: priority", "mobility: severe"]
+        assert counts.domain_scores() == {"skin": 9, "breathing": 45, "mobility": 20}
+
+
 class TestCHCBaseScore:
     """Test calculate_chc_base_score function."""
     
@@ -222,6 +267,49 @@ class TestTariffIncome:
         # £750 / £250 = 3 weeks (rounds up)
         income = calculate_tariff_income(15000.0)
         assert income == 3.0
+    
+    def test_means_test_table(self):
+        """Test tariff income with another year's thresholds."""
+        table = dict(MEANS_TEST, lower_capital_limit=10_000, tariff_income_rate=500)
+        assert calculate_tariff_income(10_001.0, table) == 1.0
+        assert calculate_tariff_income(11_000.0, table) == 2.0
+
+
+class TestMeansTestYear:
+    """Test means_test_year and get_means_test functions."""
+    
+    def test_year_formats(self):
+        """Test the accepted spellings of a financial year."""
+        for year in ("2025-26", "2025-2026", "2025/26", 2025):
+            assert means_test_year(year) == "2025-26"
+        assert means_test_year() == CURRENT_MEANS_TEST_YEAR
+    
+    def test_future_year_uses_latest_table(self):
+        """Test projections beyond the latest table reuse it."""
+        assert means_test_year("2030-31") == max(MEANS_TEST_BY_YEAR)
+        assert get_means_test(2030) is MEANS_TEST_BY_YEAR[max(MEANS_TEST_BY_YEAR)]
+    
+    def test_unknown_year(self):
+        """Test years before the first table and malformed years are rejected."""
+        with pytest.raises(CalculationError):
+            means_test_year("2009-10")
+        with pytest.raises(CalculationError):
+            means_test_year("2024-25")
+        with pytest.raises(CalculationError):
+            means_test_year("last year")
+    
+    def test_malformed_year_rejected_and_not_cached(self):
+        """Test end years that do not follow the start and trailing junk are rejected."""
+        from funding_calculator import utils
+        
+        for year in ("2025-99", "2025-2027", "2025-foo", "2025-26x", "20255"):
+            with pytest.raises(CalculationError):
+                means_test_year(year)
+            assert year not in utils._MEANS_TEST_KEYS
+        means_test_year(2025)
+        with pytest.raises(CalculationError):
+            means_test_year(2025.0)
+        assert means_test_year("2029-30") == means_test_year("2099-00") == max(MEANS_TEST_BY_YEAR)
 
 
 class TestPropertyAssessment:
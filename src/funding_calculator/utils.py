@@ -1,15 +1,122 @@
 """Utility functions for funding eligibility calculations."""
 
-from typing import Dict, List
+import math
+import re
+from typing import Dict, List, Optional, Tuple, Union
 try:
     import structlog
     logger = structlog.get_logger(__name__)
 except ImportError:
     import logging
     logger = logging.getLogger(__name__)
-from .constants import Domain, DomainLevel, CHC_WEIGHTS, CHC_BONUSES, DOMAIN_GROUPS
+from .constants import (
+    Domain,
+    DomainLevel,
+    CHC_WEIGHTS,
+    CHC_BONUSES,
+    DOMAIN_GROUPS,
+    CURRENT_MEANS_TEST_YEAR,
+    MEANS_TEST,
+    MEANS_TEST_BY_YEAR,
+)
+from .exceptions import CalculationError
 from .models import DomainAssessment, PatientProfile
 
+# Position of each level in a DomainLevelCounts histogram row
+LEVEL_INDEX = {level: i for i, level in enumerate(DomainLevel)}
+_LEVELS = len(LEVEL_INDEX)
+
+# Histogram rows: 0 = all domains, then one row per DOMAIN_GROUPS group
+_GROUP_ROWS = {group: row for row, group in enumerate(DOMAIN_GROUPS, start=1)}
+# Domain -> offsets of the group rows it contributes to
+_DOMAIN_GROUP_OFFSETS = {
+    domain: tuple(row * _LEVELS for group, row in _GROUP_ROWS.items() if domain in DOMAIN_GROUPS[group])
+    for domain in Domain
+}
+
+# Means-test year lookups: first start year, start year -> key, resolved inputs
+_MEANS_TEST_START_YEARS = {int(key[:4]): key for key in MEANS_TEST_BY_YEAR}
+_MEANS_TEST_FIRST_YEAR = min(_MEANS_TEST_START_YEARS)
+# Resolved years; only well-formed years are added, so the size is bounded
+_MEANS_TEST_KEYS: Dict[Union[str, int], str] = {key: key for key in MEANS_TEST_BY_YEAR}
+# "2025", "2025-26", "2025-2026", "2025/26" (the end year must follow the start)
+_MEANS_TEST_YEAR_FORMAT = re.compile(r"(\d{4})(?:[-/](\d{2}|\d{4}))?")
+
+# Levels that score, and levels listed as key factors
+_SCORED_LEVELS = (DomainLevel.PRIORITY, DomainLevel.SEVERE, DomainLevel.HIGH)
+_KEY_FACTOR_LEVELS = (DomainLevel.PRIORITY, DomainLevel.SEVERE)
+
+
+class DomainLevelCounts:
+    """
+    Domain level histogram of an assessment, built in one pass.
+    
+    ``counts`` is a flat integer array with one row of len(DomainLevel) counts for
+    all domains followed by one row per DOMAIN_GROUPS group. Base score, bonuses,
+    probability range and key factors are all read from it.
+    """
+    
+    __slots__ = ("counts", "scored")
+    
+    def __init__(self, counts: List[int], scored: List[Tuple[Domain, DomainLevel]]):
+        self.counts = counts
+        # (domain, level) of domains at a scored level, in assessment order
+        self.scored = scored
+    
+    def count(self, level: DomainLevel, group: Optional[str] = None) -> int:
+        """
+        Number of domains at level.
+        
+        Args:
+            level: Level to count
+            group: DOMAIN_GROUPS key (None = all domains)
+        """
+        row = _GROUP_ROWS[group] if group is not None else 0
+        return self.counts[row * _LEVELS + LEVEL_INDEX[level]]
+    
+    @property
+    def priority(self) -> int:
+        return self.counts[LEVEL_INDEX[DomainLevel.PRIORITY]]
+    
+    @property
+    def severe(self) -> int:
+        return self.counts[LEVEL_INDEX[DomainLevel.SEVERE]]
+    
+    @property
+    def high(self) -> int:
+        return self.counts[LEVEL_INDEX[DomainLevel.HIGH]]
+    
+    def key_factors(self) -> List[str]:
+        """"<domain>: <level>" for PRIORITY and SEVERE domains."""
+        return [f"{domain.value}: {level.value}" for domain, level in self.scored if level in _KEY_FACTOR_LEVELS]
+    
+    def domain_scores(self) -> Dict[str, int]:
+        """CHC weight of each scored domain."""
+        return {domain.value: CHC_WEIGHTS[level] for domain, level in self.scored}
+
+
+def score_domain_levels(assessments: Dict[Domain, DomainAssessment]) -> DomainLevelCounts:
+    """
+    Count domain levels, overall and per DOMAIN_GROUPS group, in one pass.
+    
+    Args:
+        assessments: Domain assessments
+        
+    Returns:
+        DomainLevelCounts
+    """
+    counts = [0] * (_LEVELS * (len(_GROUP_ROWS) + 1))
+    scored = []
+    for domain, assessment in assessments.items():
+        level = assessment.level
+        index = LEVEL_INDEX[level]
+        counts[index] += 1
+        for offset in _DOMAIN_GROUP_OFFSETS.get(domain, ()):
+            counts[offset + index] += 1
+        if level in _SCORED_LEVELS:
+            scored.append((domain, level))
+    return DomainLevelCounts(counts, scored)
+
 
 def count_domain_levels(
     assessments: Dict[Domain, DomainAssessment],
@@ -28,7 +135,7 @@ def count_domain_levels(
         Count of domains with specified level
     """
     if domains is None:
-        domains = list(assessments.keys())
+        return sum(1 for assessment in assessments.values() if assessment.level == level)
     
     return sum(
         1 for domain in domains
@@ -36,36 +143,38 @@ def count_domain_levels(
     )
 
 
-def calculate_chc_base_score(assessments: Dict[Domain, DomainAssessment]) -> int:
+def calculate_chc_base_score(
+    assessments: Dict[Domain, DomainAssessment],
+    counts: Optional[DomainLevelCounts] = None
+) -> int:
     """
     Calculate base CHC score from domain assessments.
     
     Args:
         assessments: Domain assessments
+        counts: Level counts of assessments (computed if not given)
         
     Returns:
         Base score (before bonuses)
     """
+    if counts is None:
+        counts = score_domain_levels(assessments)
     score = 0
     
-    # Count levels
-    priority_count = count_domain_levels(assessments, DomainLevel.PRIORITY)
-    severe_count = count_domain_levels(assessments, DomainLevel.SEVERE)
-    high_count = count_domain_levels(assessments, DomainLevel.HIGH)
-    
     # Apply weights
-    if priority_count > 0:
+    if counts.priority > 0:
         score += CHC_WEIGHTS[DomainLevel.PRIORITY]
     
-    score += severe_count * CHC_WEIGHTS[DomainLevel.SEVERE]
-    score += high_count * CHC_WEIGHTS[DomainLevel.HIGH]
+    score += counts.severe * CHC_WEIGHTS[DomainLevel.SEVERE]
+    score += counts.high * CHC_WEIGHTS[DomainLevel.HIGH]
     
     return score
 
 
 def calculate_chc_bonuses(
     assessments: Dict[Domain, DomainAssessment],
-    profile: PatientProfile
+    profile: PatientProfile,
+    counts: Optional[DomainLevelCounts] = None
 ) -> Dict[str, int]:
     """
     Calculate CHC bonus scores.
@@ -73,16 +182,17 @@ def calculate_chc_bonuses(
     Args:
         assessments: Domain assessments
         profile: Patient profile
+        counts: Level counts of assessments (computed if not given)
         
     Returns:
         Dictionary of bonus name -> bonus score
     """
+    if counts is None:
+        counts = score_domain_levels(assessments)
     bonuses = {}
     
     # Multiple Severe bonus (≥2 Severe in critical domains)
-    critical_domains = DOMAIN_GROUPS["critical_domains"]
-    severe_critical = count_domain_levels(assessments, DomainLevel.SEVERE, critical_domains)
-    if severe_critical >= 2:
+    if counts.count(DomainLevel.SEVERE, "critical_domains") >= 2:
         bonuses["multiple_severe"] = CHC_BONUSES["multiple_severe"]
     
     # Unpredictability bonus
@@ -92,9 +202,7 @@ def calculate_chc_bonuses(
         bonuses["unpredictability"] = CHC_BONUSES["unpredictability"]
     
     # Multiple High bonus (≥3 High in behavioural domains)
-    behavioural_domains = DOMAIN_GROUPS["behavioural_domains"]
-    high_behavioural = count_domain_levels(assessments, DomainLevel.HIGH, behavioural_domains)
-    if high_behavioural >= 3:
+    if counts.count(DomainLevel.HIGH, "behavioural_domains") >= 3:
         bonuses["multiple_high"] = CHC_BONUSES["multiple_high"]
     
     # Complex therapies bonus
@@ -108,28 +216,66 @@ def calculate_chc_bonuses(
     return bonuses
 
 
-def calculate_tariff_income(capital_assets: float) -> float:
+def means_test_year(year: Union[str, int, None] = None) -> str:
+    """
+    MEANS_TEST_BY_YEAR key for a financial year.
+    
+    Args:
+        year: "2025-26", "2025-2026", "2025/26" or the starting calendar year
+            2025 / "2025" (default CURRENT_MEANS_TEST_YEAR). Years after the
+            latest table map to it (limits assumed frozen, for projections).
+            
+    Returns:
+        Table key, e.g. "2025-26"
+        
+    Raises:
+        CalculationError: If the year is malformed or before the first table
+    """
+    if year is None:
+        return CURRENT_MEANS_TEST_YEAR
+    # 2025.0 == 2025: floats must not hit the cache of int years
+    key = _MEANS_TEST_KEYS.get(year) if isinstance(year, (str, int)) and not isinstance(year, bool) else None
+    if key is not None:
+        return key
+    match = _MEANS_TEST_YEAR_FORMAT.fullmatch(str(year).strip())
+    if match is None:
+        raise CalculationError(f"Invalid means-test year: {year!r}")
+    start, end = int(match.group(1)), match.group(2)
+    if end is not None and int(end) != (start + 1) % 10 ** len(end):
+        raise CalculationError(f"Invalid means-test year: {year!r} (must span one year)")
+    if start < _MEANS_TEST_FIRST_YEAR:
+        raise CalculationError(f"No means-test table for {year!r} (first: {min(MEANS_TEST_BY_YEAR)})")
+    key = _MEANS_TEST_START_YEARS.get(start, max(MEANS_TEST_BY_YEAR))
+    _MEANS_TEST_KEYS[year] = key
+    return key
+
+
+def get_means_test(year: Union[str, int, None] = None) -> Dict[str, float]:
+    """
+    Means-test thresholds for a financial year (see means_test_year).
+    
+    Returns:
+        Dictionary shaped like MEANS_TEST
+    """
+    return MEANS_TEST_BY_YEAR[means_test_year(year)]
+
+
+def calculate_tariff_income(capital_assets: float, means_test: Optional[Dict[str, float]] = None) -> float:
     """
     Calculate tariff income from capital assets.
     
     Args:
         capital_assets: Capital assets (excluding property)
+        means_test: Means-test thresholds (default MEANS_TEST, see get_means_test)
         
     Returns:
-        Tariff income per week in GBP
+        Tariff income per week in GBP (£1 per rate, or part, above the lower limit)
     """
-    from .constants import MEANS_TEST
-    
-    lower_limit = MEANS_TEST["lower_capital_limit"]
-    rate = MEANS_TEST["tariff_income_rate"]
-    
-    if capital_assets <= lower_limit:
+    table = MEANS_TEST if means_test is None else means_test
+    excess = capital_assets - table["lower_capital_limit"]
+    if excess <= 0:
         return 0.0
-    
-    excess = capital_assets - lower_limit
-    tariff_income = (excess // rate) + (1 if excess % rate > 0 else 0)
-    
-    return float(tariff_income)
+    return float(math.ceil(excess / table["tariff_income_rate"]))
 
 
 def assess_property_for_means_test(property_details, dpa_eligible: bool) -> Dict[str, any]:
@@ -0,0 +1,48 @@
+"""Observability module for RightCareHome (stage timings and metrics)."""
+
+from .config import config
+from .metrics import (
+    TARGET_LOTTIE,
+    TARGET_MSIF,
+    TARGET_POSTCODES_IO,
+    outbound_call,
+    record_cache_lookup,
+    record_db_connection_closed,
+    record_db_connection_opened,
+    record_db_error,
+    render_metrics,
+)
+from .middleware import MetricsMiddleware, ServerTimingMiddleware
+from .timing import (
+    PROMETHEUS_AVAILABLE,
+    format_server_timing,
+    get_request_timings,
+    is_timing_enabled,
+    record_stage,
+    set_timing_enabled,
+    span,
+    timed,
+)
+
+__all__ = [
+    "span",
+    "timed",
+    "record_stage",
+    "get_request_timings",
+    "format_server_timing",
+    "is_timing_enabled",
+    "set_timing_enabled",
+    "record_cache_lookup",
+    "record_db_connection_opened",
+    "record_db_connection_closed",
+    "record_db_error",
+    "outbound_call",
+    "render_metrics",
+    "TARGET_POSTCODES_IO",
+    "TARGET_LOTTIE",
+    "TARGET_MSIF",
+    "ServerTimingMiddleware",
+    "MetricsMiddleware",
+    "PROMETHEUS_AVAILABLE",
+    "config",
+]
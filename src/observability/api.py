@@ -0,0 +1,15 @@
+"""FastAPI endpoint exposing Prometheus metrics."""
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from .metrics import render_metrics
+
+router = APIRouter(tags=["observability"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Prometheus scrape endpoint."""
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
@@ -0,0 +1,30 @@
+"""Configuration for observability module."""
+
+import os
+
+try:
+    from pydantic_settings import BaseSettings
+except ImportError:
+    try:
+        from pydantic import BaseSettings
+    except ImportError:
+        from pydantic import BaseModel as BaseSettings
+
+
+class ObservabilityConfig(BaseSettings):
+    """Configuration settings for latency spans and metrics."""
+
+    # Stage timing (spans, Server-Timing header, stage histograms)
+    timing_enabled: bool = os.getenv("OBSERVABILITY_TIMING_ENABLED", "true").lower() == "true"
+    server_timing_header: bool = (
+        os.getenv("OBSERVABILITY_SERVER_TIMING", "true").lower() == "true"
+    )
+
+    class Config:
+        env_file = ".env"
+        env_file_encoding = "utf-8"
+        extra = "ignore"  # Ignore extra environment variables
+
+
+# Global config instance
+config = ObservabilityConfig()
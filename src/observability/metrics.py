@@ -0,0 +1,184 @@
+"""Prometheus metrics for the combined API.
+
+All helpers are no-ops when ``prometheus_client`` is not installed, so call sites do not
+need their own availability checks.
+"""
+
+import time
+from typing import Optional, Tuple
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        Counter,
+        Gauge,
+        Histogram,
+        generate_latest,
+    )
+
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+    Counter = Gauge = Histogram = generate_latest = None
+
+# Latency buckets for inbound requests and outbound HTTP calls
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+# Known outbound targets (label values)
+TARGET_POSTCODES_IO = "postcodes_io"
+TARGET_LOTTIE = "lottie"
+TARGET_MSIF = "msif"
+
+if PROMETHEUS_AVAILABLE:
+    HTTP_REQUESTS = Counter(
+        "rch_http_requests_total",
+        "HTTP requests handled",
+        ["method", "route", "status"],
+    )
+    HTTP_REQUEST_DURATION = Histogram(
+        "rch_http_request_duration_seconds",
+        "HTTP request latency",
+        ["method", "route", "status"],
+        buckets=LATENCY_BUCKETS,
+    )
+    CACHE_REQUESTS = Counter(
+        "rch_cache_requests_total",
+        "Cache lookups by cache and result (hit/miss)",
+        ["cache", "result"],
+    )
+    OUTBOUND_REQUESTS = Counter(
+        "rch_outbound_requests_total",
+        "Outbound HTTP calls by target and status",
+        ["target", "status"],
+    )
+    OUTBOUND_DURATION = Histogram(
+        "rch_outbound_request_duration_seconds",
+        "Outbound HTTP call latency",
+        ["target"],
+        buckets=LATENCY_BUCKETS,
+    )
+    DB_CONNECTIONS_OPENED = Counter(
+        "rch_db_connections_opened_total",
+        "PostgreSQL connections opened",
+    )
+    DB_CONNECTION_ERRORS = Counter(
+        "rch_db_connection_errors_total",
+        "PostgreSQL connection or transaction errors",
+    )
+    DB_CONNECTIONS_IN_USE = Gauge(
+        "rch_db_connections_in_use",
+        "PostgreSQL connections currently checked out",
+    )
+else:
+    HTTP_REQUESTS = HTTP_REQUEST_DURATION = CACHE_REQUESTS = None
+    OUTBOUND_REQUESTS = OUTBOUND_DURATION = None
+    DB_CONNECTIONS_OPENED = DB_CONNECTION_ERRORS = DB_CONNECTIONS_IN_USE = None
+
+
+def record_http_request(method: str, route: str, status: int, duration: float) -> None:
+    """
+    Record a handled inbound HTTP request.
+
+    Args:
+        method: HTTP method
+        route: Route template (e.g. "/api/pricing/postcode/{postcode}")
+        status: Response status code
+        duration: Duration in seconds
+    """
+    if HTTP_REQUESTS is None:
+        return
+    status_label = str(status)
+    HTTP_REQUESTS.labels(method=method, route=route, status=status_label).inc()
+    HTTP_REQUEST_DURATION.labels(method=method, route=route, status=status_label).observe(
+        duration
+    )
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """
+    Record a cache lookup.
+
+    Args:
+        cache: Cache name ("postcode", "funding", "pricing")
+        hit: Whether the lookup was a hit
+    """
+    if CACHE_REQUESTS is not None:
+        CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def record_db_connection_opened() -> None:
+    """Record a checked-out PostgreSQL connection."""
+    if DB_CONNECTIONS_OPENED is not None:
+        DB_CONNECTIONS_OPENED.inc()
+        DB_CONNECTIONS_IN_USE.inc()
+
+
+def record_db_connection_closed() -> None:
+    """Record a released PostgreSQL connection."""
+    if DB_CONNECTIONS_IN_USE is not None:
+        DB_CONNECTIONS_IN_USE.dec()
+
+
+def record_db_error() -> None:
+    """Record a PostgreSQL connection or transaction error."""
+    if DB_CONNECTION_ERRORS is not None:
+        DB_CONNECTION_ERRORS.inc()
+
+
+class OutboundCall:
+    """Records one outbound HTTP call; use via ``outbound_call()``."""
+
+    __slots__ = ("target", "status", "_start")
+
+    def __init__(self, target: str):
+        self.target = target
+        self.status: Optional[int] = None
+        self._start = 0.0
+
+    def __enter__(self) -> "OutboundCall":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if OUTBOUND_REQUESTS is not None:
+            duration = time.perf_counter() - self._start
+            status = "error" if self.status is None else str(self.status)
+            OUTBOUND_REQUESTS.labels(target=self.target, status=status).inc()
+            OUTBOUND_DURATION.labels(target=self.target).observe(duration)
+        return False
+
+
+def outbound_call(target: str) -> OutboundCall:
+    """
+    Context manager recording an outbound HTTP call.
+
+    Set ``status`` to the response status code inside the block; if the block raises
+    before that, the call is recorded with status "error".
+
+    Args:
+        target: Target label (TARGET_POSTCODES_IO, TARGET_LOTTIE, TARGET_MSIF)
+
+    Returns:
+        OutboundCall context manager
+
+    Example:
+        with outbound_call(TARGET_POSTCODES_IO) as call:
+            response = client.get(url)
+            call.status = response.status_code
+    """
+    return OutboundCall(target)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Render all registered metrics in the Prometheus text format.
+
+    Returns:
+        Tuple of (payload, content type)
+    """
+    if not PROMETHEUS_AVAILABLE:
+        return b"# prometheus_client not installed\n", CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
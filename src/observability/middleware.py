@@ -0,0 +1,91 @@
+"""ASGI middleware for stage timings and request metrics."""
+
+import time
+
+from .metrics import record_http_request
+from .timing import (
+    end_request_timing,
+    format_server_timing,
+    get_request_timings,
+    is_timing_enabled,
+    start_request_timing,
+)
+
+
+class ServerTimingMiddleware:
+    """
+    Pure ASGI middleware adding a ``Server-Timing`` header.
+
+    Opens a per-request timing scope so that every ``span()`` finished while handling
+    the request is reported, e.g.::
+
+        Server-Timing: postcode.resolve;dur=12.40, pricing_core.msif_query;dur=1.31, total;dur=15.02
+
+    Usage:
+        app.add_middleware(ServerTimingMiddleware)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not is_timing_enabled():
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        token = start_request_timing()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                header = format_server_timing(
+                    get_request_timings(), total=time.perf_counter() - start
+                )
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", header.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            end_request_timing(token)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request counts and latency per route and status.
+
+    The route label is the matched route template (e.g. ``/api/pricing/postcode/{postcode}``),
+    so path parameters do not blow up label cardinality. Unmatched paths are grouped
+    under ``"unmatched"``.
+
+    Usage:
+        app.add_middleware(MetricsMiddleware)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            route_label = getattr(route, "path", None) or "unmatched"
+            record_http_request(
+                scope["method"], route_label, status_code, time.perf_counter() - start
+            )
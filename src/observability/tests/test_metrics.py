@@ -0,0 +1,180 @@
+"""Tests for Prometheus metrics and the /metrics endpoint."""
+
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from observability import metrics
+from observability.api import router as metrics_router
+from observability.metrics import (
+    TARGET_POSTCODES_IO,
+    outbound_call,
+    record_cache_lookup,
+    record_db_connection_closed,
+    record_db_connection_opened,
+    render_metrics,
+)
+from observability.middleware import MetricsMiddleware
+
+pytestmark = pytest.mark.skipif(
+    not metrics.PROMETHEUS_AVAILABLE, reason="prometheus_client not installed"
+)
+
+
+def _sample(name, labels=None):
+    """Read a sample value from the default registry (0.0 if absent)."""
+    from prometheus_client import REGISTRY
+
+    return REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+
+@pytest.fixture
+def client():
+    """App with metrics middleware, a templated route and the /metrics endpoint."""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        return {"item_id": item_id}
+
+    return TestClient(app)
+
+
+class TestMetricsMiddleware:
+    """Test request metrics."""
+
+    def test_requests_labelled_by_route_template(self, client):
+        """Path parameters are collapsed into the route template."""
+        labels = {"method": "GET", "route": "/items/{item_id}", "status": "200"}
+        before = _sample("rch_http_requests_total", labels)
+
+        client.get("/items/a")
+        client.get("/items/b")
+
+        assert _sample("rch_http_requests_total", labels) == before + 2
+        assert _sample("rch_http_request_duration_seconds_count", labels) >= 2
+
+    def test_unmatched_route(self, client):
+        """Unknown paths share a single label value."""
+        labels = {"method": "GET", "route": "unmatched", "status": "404"}
+        before = _sample("rch_http_requests_total", labels)
+
+        client.get("/does-not-exist-1")
+        client.get("/does-not-exist-2")
+
+        assert _sample("rch_http_requests_total", labels) == before + 2
+
+
+class TestMetricsEndpoint:
+    """Test /metrics endpoint."""
+
+    def test_exposition_format(self, client):
+        """Endpoint returns Prometheus text exposition."""
+        client.get("/items/x")
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "rch_http_requests_total" in response.text
+
+
+class TestHelpers:
+    """Test metric helpers."""
+
+    def test_cache_lookup(self):
+        """Cache hits and misses are counted separately."""
+        hit = {"cache": "postcode", "result": "hit"}
+        miss = {"cache": "postcode", "result": "miss"}
+        hits_before = _sample("rch_cache_requests_total", hit)
+        misses_before = _sample("rch_cache_requests_total", miss)
+
+        record_cache_lookup("postcode", hit=True)
+        record_cache_lookup("postcode", hit=False)
+        record_cache_lookup("postcode", hit=False)
+
+        assert _sample("rch_cache_requests_total", hit) == hits_before + 1
+        assert _sample("rch_cache_requests_total", miss) == misses_before + 2
+
+    def test_outbound_call_status(self):
+        """Outbound calls are recorded with their status code."""
+        labels = {"target": TARGET_POSTCODES_IO, "status": "200"}
+        before = _sample("rch_outbound_requests_total", labels)
+
+        with outbound_call(TARGET_POSTCODES_IO) as call:
+            call.status = 200
+
+        assert _sample("rch_outbound_requests_total", labels) == before + 1
+
+    def test_outbound_call_error(self):
+        """Calls raising before a response are recorded as errors."""
+        labels = {"target": TARGET_POSTCODES_IO, "status": "error"}
+        before = _sample("rch_outbound_requests_total", labels)
+
+        with pytest.raises(ConnectionError):
+            with outbound_call(TARGET_POSTCODES_IO):
+                raise ConnectionError("down")
+
+        assert _sample("rch_outbound_requests_total", labels) == before + 1
+
+    def test_db_connections_in_use(self):
+        """In-use gauge follows open/close."""
+        before = _sample("rch_db_connections_in_use")
+        record_db_connection_opened()
+        assert _sample("rch_db_connections_in_use") == before + 1
+        record_db_connection_closed()
+        assert _sample("rch_db_connections_in_use") == before
+
+
+class TestExporterOverhead:
+    """Benchmark exporter overhead."""
+
+    ITERATIONS = 2000
+
+    @staticmethod
+    async def _bare_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    def _run(self, app) -> float:
+        """Call an ASGI app ITERATIONS times directly; return seconds per call."""
+
+        async def receive():
+            return {"type": "http.request", "body": b""}
+
+        async def send(message):
+            pass
+
+        async def loop():
+            start = time.perf_counter()
+            for _ in range(self.ITERATIONS):
+                scope = {"type": "http", "method": "GET", "path": "/bench", "headers": []}
+                await app(scope, receive, send)
+            return (time.perf_counter() - start) / self.ITERATIONS
+
+        return asyncio.run(loop())
+
+    @pytest.mark.benchmark
+    def test_middleware_overhead_per_request(self):
+        """Metrics middleware adds well under a millisecond per request."""
+        bare = self._run(self._bare_app)
+        wrapped = self._run(MetricsMiddleware(self._bare_app))
+        overhead_us = (wrapped - bare) * 1_000_000
+
+        assert overhead_us < 500
+
+    @pytest.mark.benchmark
+    def test_scrape_time(self):
+        """Rendering the registry stays cheap."""
+        render_metrics()
+        start = time.perf_counter()
+        for _ in range(50):
+            payload, _ = render_metrics()
+        per_scrape_ms = (time.perf_counter() - start) / 50 * 1000
+
+        assert payload
+        assert per_scrape_ms < 50
@@ -0,0 +1,186 @@
+"""Tests for stage timing spans."""
+
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from observability import timing
+from observability.middleware import ServerTimingMiddleware
+from observability.timing import (
+    end_request_timing,
+    format_server_timing,
+    get_request_timings,
+    span,
+    start_request_timing,
+    timed,
+)
+
+
+@pytest.fixture(autouse=True)
+def timing_enabled():
+    """Ensure timing is enabled and restored after each test."""
+    previous = timing.is_timing_enabled()
+    timing.set_timing_enabled(True)
+    yield
+    timing.set_timing_enabled(previous)
+
+
+class TestSpan:
+    """Test span context manager."""
+
+    def test_span_measures_duration(self):
+        """Span records elapsed time."""
+        with span("test.sleep") as s:
+            time.sleep(0.01)
+        assert s.duration >= 0.01
+
+    def test_span_outside_request_scope(self):
+        """Spans outside a request do not leak into timings."""
+        with span("test.outside"):
+            pass
+        assert get_request_timings() == {}
+
+    def test_span_aggregates_in_request_scope(self):
+        """Repeated stages are summed within a request."""
+        token = start_request_timing()
+        try:
+            with span("test.stage"):
+                pass
+            with span("test.stage"):
+                pass
+            timings = get_request_timings()
+        finally:
+            end_request_timing(token)
+        assert list(timings) == ["test.stage"]
+        assert timings["test.stage"] >= 0.0
+
+    def test_span_disabled_is_noop(self):
+        """Disabled timing returns the shared no-op span."""
+        timing.set_timing_enabled(False)
+        token = start_request_timing()
+        try:
+            first = span("test.a")
+            second = span("test.b")
+            with first:
+                pass
+            assert first is second
+            assert first.duration == 0.0
+            assert get_request_timings() == {}
+        finally:
+            end_request_timing(token)
+
+    def test_span_does_not_swallow_exceptions(self):
+        """Exceptions propagate and the stage is still recorded."""
+        token = start_request_timing()
+        try:
+            with pytest.raises(ValueError):
+                with span("test.error"):
+                    raise ValueError("boom")
+            assert "test.error" in get_request_timings()
+        finally:
+            end_request_timing(token)
+
+    @pytest.mark.skipif(not timing.PROMETHEUS_AVAILABLE, reason="prometheus_client not installed")
+    def test_span_observes_histogram(self):
+        """Finished spans are observed in the stage histogram."""
+        from prometheus_client import REGISTRY
+
+        before = REGISTRY.get_sample_value(
+            "rch_stage_duration_seconds_count", {"stage": "test.histogram"}
+        ) or 0.0
+        with span("test.histogram"):
+            pass
+        after = REGISTRY.get_sample_value(
+            "rch_stage_duration_seconds_count", {"stage": "test.histogram"}
+        )
+        assert after == before + 1
+
+
+class TestTimed:
+    """Test timed decorator."""
+
+    def test_timed_sync(self):
+        """Sync functions are timed and keep their return value."""
+
+        @timed("test.sync")
+        def add(a, b):
+            return a + b
+
+        token = start_request_timing()
+        try:
+            assert add(1, 2) == 3
+            assert "test.sync" in get_request_timings()
+        finally:
+            end_request_timing(token)
+        assert add.__name__ == "add"
+
+    def test_timed_async(self):
+        """Async functions are timed around the awaited call."""
+
+        @timed("test.async")
+        async def work():
+            await asyncio.sleep(0.005)
+            return "done"
+
+        async def run():
+            token = start_request_timing()
+            try:
+                result = await work()
+                return result, get_request_timings()
+            finally:
+                end_request_timing(token)
+
+        result, timings = asyncio.run(run())
+        assert result == "done"
+        assert timings["test.async"] >= 0.005
+
+
+def test_format_server_timing():
+    """Header value lists stages in milliseconds plus total."""
+    header = format_server_timing({"db.query": 0.0015, "render": 0.002}, total=0.004)
+    assert header == "db.query;dur=1.50, render;dur=2.00, total;dur=4.00"
+
+
+class TestServerTimingMiddleware:
+    """Test ServerTimingMiddleware."""
+
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+        app.add_middleware(ServerTimingMiddleware)
+
+        @app.get("/sync")
+        def sync_endpoint():
+            with span("test.sync_stage"):
+                pass
+            return {"ok": True}
+
+        @app.get("/async")
+        async def async_endpoint():
+            with span("test.async_stage"):
+                pass
+            return {"ok": True}
+
+        return TestClient(app)
+
+    def test_header_from_sync_endpoint(self, client):
+        """Stages recorded in threadpool endpoints reach the header."""
+        response = client.get("/sync")
+        assert response.status_code == 200
+        header = response.headers["server-timing"]
+        assert "test.sync_stage;dur=" in header
+        assert "total;dur=" in header
+
+    def test_header_from_async_endpoint(self, client):
+        """Stages recorded in async endpoints reach the header."""
+        header = client.get("/async").headers["server-timing"]
+        assert header.startswith("test.async_stage;dur=")
+
+    def test_no_header_when_disabled(self, client):
+        """Disabled timing leaves responses untouched."""
+        timing.set_timing_enabled(False)
+        response = client.get("/sync")
+        assert "server-timing" not in response.headers
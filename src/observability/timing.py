@@ -0,0 +1,226 @@
+"""Per-stage latency spans.
+
+Stages are timed with ``span("stage.name")`` (context manager) or ``@timed("stage.name")``
+(decorator). Every finished span is:
+
+* observed in the ``rch_stage_duration_seconds{stage=...}`` Prometheus histogram
+  (when ``prometheus_client`` is installed);
+* added to the per-request timing map, if a request scope is active
+  (see ``ServerTimingMiddleware``), so it can be reported in the ``Server-Timing`` header.
+
+When timing is disabled, ``span()`` returns a shared no-op object and the cost is a
+single attribute check.
+"""
+
+import asyncio
+import functools
+import time
+from contextvars import ContextVar, Token
+from typing import Callable, Dict, Optional, TypeVar
+
+import structlog
+
+from .config import config
+
+try:
+    from prometheus_client import Histogram
+
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+    Histogram = None
+
+logger = structlog.get_logger(__name__)
+
+F = TypeVar("F", bound=Callable)
+
+# Buckets tuned for in-process stages (sub-millisecond lookups up to slow HTTP calls)
+STAGE_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+if PROMETHEUS_AVAILABLE:
+    STAGE_DURATION = Histogram(
+        "rch_stage_duration_seconds",
+        "Duration of individual processing stages",
+        ["stage"],
+        buckets=STAGE_BUCKETS,
+    )
+else:
+    STAGE_DURATION = None
+
+# Stage -> accumulated seconds for the current request (None outside a request scope)
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar(
+    "rch_request_timings", default=None
+)
+
+_enabled = config.timing_enabled
+
+
+def is_timing_enabled() -> bool:
+    """Return True if stage timing is enabled."""
+    return _enabled
+
+
+def set_timing_enabled(enabled: bool) -> None:
+    """
+    Enable or disable stage timing at runtime.
+
+    Args:
+        enabled: New state
+    """
+    global _enabled
+    _enabled = enabled
+
+
+def record_stage(stage: str, duration: float) -> None:
+    """
+    Record a finished stage duration.
+
+    Args:
+        stage: Stage name (e.g. "pricing_core.msif_query")
+        duration: Duration in seconds
+    """
+    if STAGE_DURATION is not None:
+        STAGE_DURATION.labels(stage=stage).observe(duration)
+
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + duration
+
+
+class _Span:
+    """Times a single stage; use via ``span()``."""
+
+    __slots__ = ("stage", "_start", "duration")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self._start = 0.0
+        self.duration = 0.0
+
+    def __enter__(self) -> "_Span":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.duration = time.perf_counter() - self._start
+        record_stage(self.stage, self.duration)
+        return False
+
+
+class _NoopSpan:
+    """Shared span used when timing is disabled."""
+
+    __slots__ = ()
+
+    stage = ""
+    duration = 0.0
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(stage: str):
+    """
+    Time a block of code as a named stage.
+
+    Args:
+        stage: Stage name
+
+    Returns:
+        Context manager; after exit its ``duration`` holds the elapsed seconds
+        (0.0 when timing is disabled)
+
+    Example:
+        with span("pricing_core.msif_query"):
+            fee = self._get_msif_fee(...)
+    """
+    if not _enabled:
+        return _NOOP_SPAN
+    return _Span(stage)
+
+
+def timed(stage: str) -> Callable[[F], F]:
+    """
+    Decorator timing every call of a function (sync or async) as a stage.
+
+    Args:
+        stage: Stage name
+
+    Returns:
+        Decorator
+    """
+
+    def decorator(func: F) -> F:
+        if asyncio.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(stage):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def start_request_timing() -> Token:
+    """
+    Open a per-request timing scope in the current context.
+
+    Returns:
+        Token to pass to ``end_request_timing``
+    """
+    return _request_timings.set({})
+
+
+def end_request_timing(token: Token) -> None:
+    """
+    Close a per-request timing scope.
+
+    Args:
+        token: Token returned by ``start_request_timing``
+    """
+    _request_timings.reset(token)
+
+
+def get_request_timings() -> Dict[str, float]:
+    """
+    Get stage timings collected in the current request scope.
+
+    Returns:
+        Copy of the stage -> seconds map (empty outside a request scope)
+    """
+    timings = _request_timings.get()
+    return dict(timings) if timings else {}
+
+
+def format_server_timing(timings: Dict[str, float], total: Optional[float] = None) -> str:
+    """
+    Format stage timings as a ``Server-Timing`` header value.
+
+    Args:
+        timings: Stage -> seconds
+        total: Optional total request duration in seconds
+
+    Returns:
+        Header value, e.g. ``"pricing_core.msif_query;dur=1.52, total;dur=4.07"``
+    """
+    parts = [f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in timings.items()]
+    if total is not None:
+        parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
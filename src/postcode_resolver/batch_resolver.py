@@ -4,6 +4,7 @@ import time
 from typing import List, Optional
 import httpx
 import structlog
+from observability import TARGET_POSTCODES_IO, outbound_call
 from .config import config
 from .models import PostcodeInfo, BatchPostcodeResponse
 from .validator import normalize_postcode, is_valid_postcode
@@ -166,10 +167,12 @@ class BatchPostcodeResolver:
         """
         try:
             with httpx.Client(timeout=config.http_timeout * 2) as client:
-                response = client.post(
-                    self.api_url,
-                    json={"postcodes": postcodes}
-                )
+                with outbound_call(TARGET_POSTCODES_IO) as call:
+                    response = client.post(
+                        self.api_url,
+                        json={"postcodes": postcodes}
+                    )
+                    call.status = response.status_code
                 response.raise_for_status()
                 data = response.json()
                 
@@ -1,8 +1,11 @@
 """Postcode resolver - resolves UK postcodes to Local Authority and Region."""
 
+import asyncio
+
 import httpx
 from typing import Optional
 import structlog
+from observability import TARGET_POSTCODES_IO, outbound_call, record_cache_lookup, span
 from .config import config
 from .models import PostcodeInfo
 from .validator import validate_postcode, normalize_postcode
@@ -48,19 +51,71 @@ class PostcodeResolver:
         
         # Check cache
         if use_cache:
-            cached = self.cache.get(normalized)
+            with span("postcode.cache_get"):
+                cached = self.cache.get(normalized)
+            record_cache_lookup("postcode", hit=bool(cached))
             if cached:
                 logger.debug("Using cached result", postcode=normalized)
                 return cached
         
         # Call API
         try:
-            result = self._call_api(normalized)
+            with span("postcode.api_call"):
+                result = self._call_api(normalized)
             
             # Cache result
             if use_cache:
                 try:
-                    self.cache.set(normalized, result, config.cache_expiry_days)
+                    with span("postcode.cache_set"):
+                        self.cache.set(normalized, result, config.cache_expiry_days)
+                except Exception as e:
+                    logger.warning("Failed to cache result", postcode=normalized, error=str(e))
+            
+            return result
+        except PostcodeNotFoundError:
+            raise
+        except Exception as e:
+            logger.error("API call failed", postcode=normalized, error=str(e))
+            raise APIError(f"Failed to resolve postcode: {e}") from e
+    
+    async def resolve_async(self, postcode: str, use_cache: bool = True) -> PostcodeInfo:
+        """
+        Async resolve() for use inside an event loop.
+        
+        postcodes.io is called with httpx.AsyncClient; the (sync) cache backend
+        runs in a worker thread.
+        
+        Args and Returns: as resolve()
+        
+        Raises:
+            InvalidPostcodeError: If postcode format is invalid
+            PostcodeNotFoundError: If postcode not found
+            APIError: If API call fails
+        """
+        try:
+            validate_postcode(postcode)
+        except InvalidPostcodeError as e:
+            logger.warning("Invalid postcode format", postcode=postcode, error=str(e))
+            raise
+        
+        normalized = normalize_postcode(postcode)
+        
+        if use_cache:
+            with span("postcode.cache_get"):
+                cached = await asyncio.to_thread(self.cache.get, normalized)
+            record_cache_lookup("postcode", hit=bool(cached))
+            if cached:
+                logger.debug("Using cached result", postcode=normalized)
+                return cached
+        
+        try:
+            with span("postcode.api_call"):
+                result = await self._call_api_async(normalized)
+            
+            if use_cache:
+                try:
+                    with span("postcode.cache_set"):
+                        await asyncio.to_thread(self.cache.set, normalized, result, config.cache_expiry_days)
                 except Exception as e:
                     logger.warning("Failed to cache result", postcode=normalized, error=str(e))
             
@@ -91,34 +146,65 @@ class PostcodeResolver:
         
         try:
             with httpx.Client(timeout=config.http_timeout) as client:
-                response = client.get(url)
-                
-                if response.status_code == 404:
-                    raise PostcodeNotFoundError(f"Postcode not found: {postcode}")
-                
-                response.raise_for_status()
-                data = response.json()
-                
-                if data.get("status") != 200:
-                    error = data.get("error", "Unknown error")
-                    if "not found" in error.lower():
-                        raise PostcodeNotFoundError(f"Postcode not found: {postcode}")
-                    raise APIError(f"API error: {error}")
-                
-                result_data = data.get("result")
-                if not result_data:
-                    raise PostcodeNotFoundError(f"Postcode not found: {postcode}")
-                
-                # Map API response to PostcodeInfo
-                return self._map_api_response(postcode, result_data)
+                with outbound_call(TARGET_POSTCODES_IO) as call:
+                    response = client.get(url)
+                    call.status = response.status_code
+                return self._parse_api_response(postcode, response)
         
         except httpx.HTTPError as e:
             raise APIError(f"HTTP error calling postcodes.io: {e}") from e
-        except PostcodeNotFoundError:
+        except (PostcodeNotFoundError, APIError):
+            raise
+        except Exception as e:
+            raise APIError(f"Unexpected error calling API: {e}") from e
+    
+    async def _call_api_async(self, postcode: str) -> PostcodeInfo:
+        """Async _call_api() (httpx.AsyncClient)."""
+        url = self.api_url.format(postcode=postcode)
+        
+        logger.info("Calling postcodes.io API", postcode=postcode, url=url)
+        
+        try:
+            async with httpx.AsyncClient(timeout=config.http_timeout) as client:
+                with outbound_call(TARGET_POSTCODES_IO) as call:
+                    response = await client.get(url)
+                    call.status = response.status_code
+                return self._parse_api_response(postcode, response)
+        
+        except httpx.HTTPError as e:
+            raise APIError(f"HTTP error calling postcodes.io: {e}") from e
+        except (PostcodeNotFoundError, APIError):
             raise
         except Exception as e:
             raise APIError(f"Unexpected error calling API: {e}") from e
     
+    def _parse_api_response(self, postcode: str, response: httpx.Response) -> PostcodeInfo:
+        """
+        Turn a postcodes.io response into PostcodeInfo.
+        
+        Raises:
+            PostcodeNotFoundError: If postcode not found
+            APIError: On an API error response
+        """
+        if response.status_code == 404:
+            raise PostcodeNotFoundError(f"Postcode not found: {postcode}")
+        
+        response.raise_for_status()
+        data = response.json()
+        
+        if data.get("status") != 200:
+            error = data.get("error", "Unknown error")
+            if "not found" in error.lower():
+                raise PostcodeNotFoundError(f"Postcode not found: {postcode}")
+            raise APIError(f"API error: {error}")
+        
+        result_data = data.get("result")
+        if not result_data:
+            raise PostcodeNotFoundError(f"Postcode not found: {postcode}")
+        
+        # Map API response to PostcodeInfo
+        return self._map_api_response(postcode, result_data)
+    
     def _map_api_response(self, postcode: str, api_data: dict) -> PostcodeInfo:
         """
         Map postcodes.io API response to PostcodeInfo.
@@ -96,4 +96,32 @@ class TestPostcodeResolver:
             with patch.object(resolver.cache, 'get', return_value=None):
                 with pytest.raises(APIError):
                     resolver.resolve("B15 2HQ")
+    
+    def test_resolve_async_success(self, resolver, mock_api_response):
+        """Test async resolution through httpx.AsyncClient caches the result."""
+        import asyncio
+        
+        real_client = httpx.AsyncClient
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, json=mock_api_response))
+        
+        with patch('httpx.AsyncClient', lambda **kwargs: real_client(transport=transport, **kwargs)), \
+             patch.object(resolver.cache, 'get', return_value=None), \
+             patch.object(resolver.cache, 'set') as mock_set:
+            result = asyncio.run(resolver.resolve_async("B15 2HQ"))
+        
+        assert result.local_authority == "Birmingham"
+        assert result.region == "West Midlands"
+        mock_set.assert_called_once()
+    
+    def test_resolve_async_not_found(self, resolver):
+        """Test async resolution of a non-existent postcode."""
+        import asyncio
+        
+        real_client = httpx.AsyncClient
+        transport = httpx.MockTransport(lambda request: httpx.Response(404, json={"status": 404}))
+        
+        with patch('httpx.AsyncClient', lambda **kwargs: real_client(transport=transport, **kwargs)), \
+             patch.object(resolver.cache, 'get', return_value=None):
+            with pytest.raises(PostcodeNotFoundError):
+                asyncio.run(resolver.resolve_async("B15 9ZZ"))
 
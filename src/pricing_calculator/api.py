@@ -1,10 +1,12 @@
 """FastAPI endpoints for pricing calculator."""
 
 from typing import Optional, List
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
 from .service import PricingService
 from .models import CareType, PricingResult
+from .locations_table import SORTABLE_COLUMNS
 
 router = APIRouter(prefix="/api/pricing", tags=["pricing"])
 
@@ -23,6 +25,7 @@ def get_pricing_service() -> PricingService:
 class LocationPricingRow(BaseModel):
     """Single row in locations pricing table."""
     local_authority: str
+    ons_code: Optional[str] = None
     region: str
     care_type: str
     fair_cost_lower_bound_gbp: Optional[float]
@@ -71,44 +74,70 @@ async def get_pricing_for_postcode(
 
 @router.get("/locations")
 async def get_all_locations_pricing(
+    request: Request,
     care_type: Optional[CareType] = Query(None, description="Filter by care type"),
     region: Optional[str] = Query(None, description="Filter by region"),
     min_fair_cost: Optional[float] = Query(None, description="Minimum fair cost"),
     max_fair_cost: Optional[float] = Query(None, description="Maximum fair cost"),
-    band: Optional[str] = Query(None, description="Filter by affordability band (A-E)")
+    band: Optional[str] = Query(None, description="Filter by affordability band (A-E)"),
+    sort_by: Optional[str] = Query(None, description=f"Sort column ({', '.join(SORTABLE_COLUMNS)})"),
+    order: str = Query("asc", pattern="^(asc|desc)$", description="Sort order"),
+    offset: int = Query(0, ge=0, description="Number of rows to skip"),
+    limit: Optional[int] = Query(None, ge=1, le=5000, description="Page size (default: all rows)")
 ):
     """
     Get pricing data for all Local Authorities.
     
     Returns a table of all locations with their pricing data, suitable for display in UI.
-    Supports filtering by care type, region, price range, and affordability band.
+    Supports filtering by care type, region, price range, and affordability band, sorting
+    and pagination. The table is precomputed per data version; responses carry an ETag
+    and ``If-None-Match`` requests for unchanged results return 304.
     """
+    if sort_by is not None and sort_by not in SORTABLE_COLUMNS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid sort_by: {sort_by}. Expected one of: {', '.join(SORTABLE_COLUMNS)}"
+        )
+    
     try:
-        service = get_pricing_service()
-        data = service.get_all_locations_pricing(care_type=care_type)
-        
-        # Apply filters
-        if region:
-            data = [row for row in data if row.get("region", "").lower() == region.lower()]
-        
-        if min_fair_cost is not None:
-            data = [row for row in data if row.get("fair_cost_lower_bound_gbp") and row["fair_cost_lower_bound_gbp"] >= min_fair_cost]
-        
-        if max_fair_cost is not None:
-            data = [row for row in data if row.get("fair_cost_lower_bound_gbp") and row["fair_cost_lower_bound_gbp"] <= max_fair_cost]
+        table = get_pricing_service().get_locations_table()
+        query = {
+            "care_type": care_type.value if care_type else None,
+            "region": region,
+            "min_fair_cost": min_fair_cost,
+            "max_fair_cost": max_fair_cost,
+            "band": band,
+            "sort_by": sort_by,
+            "descending": order == "desc",
+            "offset": offset,
+            "limit": limit,
+        }
+        etag = table.etag(**query)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
         
-        if band:
-            data = [row for row in data if row.get("affordability_band", "").upper() == band.upper()]
+        if _etag_matches(etag, request.headers.get("if-none-match")):
+            return Response(status_code=304, headers=headers)
         
-        # Return as dict for easier frontend consumption
-        return {
-            "data": data,
-            "total": len(data)
-        }
+        result = table.query(**query)
+        result["data_version"] = table.version
+        return JSONResponse(result, headers=headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """Check an ETag against an If-None-Match header (weak comparison, "*" matches)."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == "*" or tag == etag:
+            return True
+    return False
+
+
 @router.get("/regions")
 async def get_regions():
     """Get list of all available regions."""
@@ -99,6 +99,7 @@ REGION_NORMALIZATION: Dict[str, str] = {
     "West Midlands": "West Midlands",
     "East Midlands": "East Midlands",
     "Yorkshire and the Humber": "Yorkshire and the Humber",
+    "Yorkshire and The Humber": "Yorkshire and the Humber",
     "Yorkshire": "Yorkshire and the Humber",
     "North West England": "North West",
     "North West": "North West",
@@ -0,0 +1,284 @@
+"""
+Conditional, streaming file downloads for external data sources.
+
+Used for the MSIF workbooks (``fair_cost_loader``, ``data_ingestion.msif_loader``) and
+the Lottie pages (``data_ingestion.lottie_scraper``). Validators (ETag, Last-Modified)
+and the content hash of the last download are stored in a ``<file>.meta.json`` sidecar
+and sent back as ``If-None-Match`` / ``If-Modified-Since``; on ``304 Not Modified``
+the cached file is kept as is. Bodies are streamed to a temporary file in chunks and
+moved into place atomically, so a failed download never truncates the cached copy.
+``async_conditional_download`` does the same over a shared ``httpx.AsyncClient``.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import httpx
+import structlog
+
+from observability import outbound_call
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+META_SUFFIX = ".meta.json"
+
+
+class DownloadResult:
+    """Outcome of a conditional download."""
+
+    __slots__ = ("path", "status_code", "modified", "size_bytes", "sha256", "etag", "last_modified")
+
+    def __init__(
+        self,
+        path: Path,
+        status_code: int,
+        modified: bool,
+        size_bytes: int,
+        sha256: Optional[str],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ):
+        self.path = path
+        self.status_code = status_code
+        # False on 304, or when a 200 returned byte-identical content
+        self.modified = modified
+        self.size_bytes = size_bytes
+        self.sha256 = sha256
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def __repr__(self) -> str:
+        return (
+            f"DownloadResult(path={str(self.path)!r}, status_code={self.status_code}, "
+            f"modified={self.modified}, size_bytes={self.size_bytes})"
+        )
+
+
+def meta_path(destination: Path) -> Path:
+    """Sidecar metadata path for a downloaded file."""
+    return destination.with_name(destination.name + META_SUFFIX)
+
+
+def read_meta(destination: Path) -> Dict:
+    """
+    Read download metadata for a cached file.
+
+    Args:
+        destination: Downloaded file path
+
+    Returns:
+        Metadata dict (url, etag, last_modified, sha256, size_bytes, fetched_at),
+        empty if there is none or the file itself is missing
+    """
+    path = meta_path(destination)
+    if not destination.exists() or not path.exists():
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable download metadata", file=str(path), error=str(e))
+        return {}
+
+
+def _write_meta(destination: Path, meta: Dict) -> None:
+    path = meta_path(destination)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp, path)
+
+
+def _prepare(destination: Path, url: str, headers: Optional[Dict[str, str]], force: bool):
+    """Stored metadata for url (empty if none or forced) and the request headers."""
+    meta = {} if force else read_meta(destination)
+    if meta.get("url") != url:
+        meta = {}
+
+    request_headers = dict(headers or {})
+    if meta.get("etag"):
+        request_headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        request_headers["If-Modified-Since"] = meta["last_modified"]
+    return meta, request_headers
+
+
+def _keep_cached(destination: Path, url: str, meta: Dict) -> DownloadResult:
+    """Handle 304 Not Modified: keep the cached file."""
+    # Refresh mtime so max-age checks restart from now
+    os.utime(destination)
+    meta["fetched_at"] = time.time()
+    _write_meta(destination, meta)
+    logger.info("Download not modified", url=url, file=str(destination))
+    return DownloadResult(
+        destination, 304, False, meta.get("size_bytes", 0), meta.get("sha256"),
+        meta.get("etag"), meta.get("last_modified"),
+    )
+
+
+def _temp_path(destination: Path) -> Path:
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    return destination.with_name(f".{destination.name}.{os.getpid()}.{id(destination)}.part")
+
+
+def _discard(tmp: Path) -> None:
+    try:
+        tmp.unlink()
+    except OSError:
+        pass
+
+
+def _store(
+    destination: Path,
+    url: str,
+    meta: Dict,
+    response: httpx.Response,
+    sha256: str,
+    size: int,
+) -> DownloadResult:
+    """Record metadata of a completed 200 download."""
+    etag = response.headers.get("etag")
+    last_modified = response.headers.get("last-modified")
+    modified = sha256 != meta.get("sha256")
+    _write_meta(destination, {
+        "url": url,
+        "etag": etag,
+        "last_modified": last_modified,
+        "sha256": sha256,
+        "size_bytes": size,
+        "fetched_at": time.time(),
+    })
+    logger.info(
+        "Downloaded file",
+        url=url,
+        file=str(destination),
+        size_bytes=size,
+        modified=modified,
+        etag=etag,
+    )
+    return DownloadResult(destination, 200, modified, size, sha256, etag, last_modified)
+
+
+def conditional_download(
+    url: str,
+    destination: Path,
+    target: str,
+    timeout: float = 60,
+    headers: Optional[Dict[str, str]] = None,
+    force: bool = False,
+    client: Optional[httpx.Client] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> DownloadResult:
+    """
+    Download url to destination unless the cached copy is still current.
+
+    Args:
+        url: URL to download
+        destination: File to write
+        target: Outbound call target label for metrics (e.g. TARGET_MSIF)
+        timeout: Request timeout in seconds
+        headers: Extra request headers
+        force: Ignore stored validators and download unconditionally
+        client: Optional httpx client to use (a new one is created otherwise)
+        chunk_size: Streaming chunk size in bytes
+
+    Returns:
+        DownloadResult (``modified`` is False if the cached file was kept)
+
+    Raises:
+        httpx.HTTPError: On network errors or error status codes
+        OSError: If the file cannot be written
+    """
+    destination = Path(destination)
+    meta, request_headers = _prepare(destination, url, headers, force)
+
+    own_client = client is None
+    if own_client:
+        client = httpx.Client(timeout=timeout, follow_redirects=True)
+    try:
+        with outbound_call(target) as call:
+            with client.stream("GET", url, headers=request_headers) as response:
+                call.status = response.status_code
+                if response.status_code == 304 and meta:
+                    return _keep_cached(destination, url, meta)
+                response.raise_for_status()
+
+                tmp = _temp_path(destination)
+                digest = hashlib.sha256()
+                size = 0
+                try:
+                    with open(tmp, "wb") as f:
+                        for chunk in response.iter_bytes(chunk_size):
+                            f.write(chunk)
+                            digest.update(chunk)
+                            size += len(chunk)
+                    os.replace(tmp, destination)
+                except BaseException:
+                    _discard(tmp)
+                    raise
+    finally:
+        if own_client:
+            client.close()
+
+    return _store(destination, url, meta, response, digest.hexdigest(), size)
+
+
+async def async_conditional_download(
+    url: str,
+    destination: Path,
+    target: str,
+    client: httpx.AsyncClient,
+    headers: Optional[Dict[str, str]] = None,
+    force: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> DownloadResult:
+    """
+    Async conditional_download() over a shared (pooled) AsyncClient.
+
+    Args:
+        url: URL to download
+        destination: File to write
+        target: Outbound call target label for metrics (e.g. TARGET_LOTTIE)
+        client: httpx.AsyncClient; reusing one client keeps connections pooled
+        headers: Extra request headers
+        force: Ignore stored validators and download unconditionally
+        chunk_size: Streaming chunk size in bytes
+
+    Returns:
+        DownloadResult (``modified`` is False if the cached file was kept)
+
+    Raises:
+        httpx.HTTPError: On network errors or error status codes
+        OSError: If the file cannot be written
+    """
+    destination = Path(destination)
+    meta, request_headers = _prepare(destination, url, headers, force)
+
+    with outbound_call(target) as call:
+        async with client.stream("GET", url, headers=request_headers) as response:
+            call.status = response.status_code
+            if response.status_code == 304 and meta:
+                return _keep_cached(destination, url, meta)
+            response.raise_for_status()
+
+            tmp = _temp_path(destination)
+            digest = hashlib.sha256()
+            size = 0
+            try:
+                with open(tmp, "wb") as f:
+                    async for chunk in response.aiter_bytes(chunk_size):
+                        f.write(chunk)
+                        digest.update(chunk)
+                        size += len(chunk)
+                os.replace(tmp, destination)
+            except BaseException:
+                _discard(tmp)
+                raise
+
+    return _store(destination, url, meta, response, digest.hexdigest(), size)
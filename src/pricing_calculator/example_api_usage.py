@@ -11,12 +11,18 @@ Or run standalone:
     uvicorn pricing_calculator.example_api_usage:app --reload
 """
 
+import asyncio
+from contextlib import asynccontextmanager
+
+import structlog
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from pathlib import Path
-from .api import router as pricing_router
+from observability import MetricsMiddleware, ServerTimingMiddleware
+from observability.api import router as metrics_router
+from .api import get_pricing_service, router as pricing_router
 
 # Import pricing_core API
 try:
@@ -46,10 +52,37 @@ try:
 except ImportError:
     DATA_ADMIN_AVAILABLE = False
 
+logger = structlog.get_logger(__name__)
+
+
+def _warm_up_pricing() -> None:
+    """Load pricing reference data outside the request path."""
+    try:
+        get_pricing_service().warm_up()
+    except Exception as e:
+        logger.warning("Pricing warm-up failed", error=str(e))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan.
+
+    Reference data (MSIF fair cost files) is loaded in a background thread after
+    startup so the worker accepts connections immediately; a request arriving
+    before warm-up finishes waits for the same load instead of starting another.
+    """
+    loop = asyncio.get_running_loop()
+    warm_up = loop.run_in_executor(None, _warm_up_pricing)
+    yield
+    await warm_up
+
+
 app = FastAPI(
     title="Pricing Calculator API",
     description="API for UK care homes pricing calculations and Affordability Bands",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware for frontend access
@@ -61,6 +94,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-stage latency breakdown in the Server-Timing response header
+app.add_middleware(ServerTimingMiddleware)
+
+# Request counts and latency per route/status for Prometheus
+app.add_middleware(MetricsMiddleware)
+
+# Prometheus scrape endpoint
+app.include_router(metrics_router)
+
 # Include pricing router
 app.include_router(pricing_router)
 
@@ -110,7 +152,8 @@ async def root():
             "locations": "/api/pricing/locations",
             "regions": "/api/pricing/regions",
             "care-types": "/api/pricing/care-types",
-            "pricing-core": "/api/pricing-core/calculate" if PRICING_CORE_AVAILABLE else None
+            "pricing-core": "/api/pricing-core/calculate" if PRICING_CORE_AVAILABLE else None,
+            "metrics": "/metrics"
         }
     }
 
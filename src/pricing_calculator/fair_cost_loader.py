@@ -4,10 +4,12 @@ import os
 from pathlib import Path
 from typing import Dict, Optional
 from datetime import datetime, timedelta
-import pandas as pd
-import httpx
 import structlog
+from observability import TARGET_MSIF
+from .downloader import DownloadResult, conditional_download
 from .exceptions import FairCostDataError
+from .msif_cache import get_parsed_msif_cache
+from .msif_parser import frame_to_fee_table, parse_msif_frame
 
 logger = structlog.get_logger(__name__)
 
@@ -23,27 +25,25 @@ MSIF_2024_2025_URL = (
 
 # Default cache directory
 DEFAULT_CACHE_DIR = Path.home() / ".cache" / "pricing_calculator"
-DEFAULT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 # Cache file path
 CACHE_FILE_2025 = DEFAULT_CACHE_DIR / "msif_2025_2026.xlsx"
 CACHE_FILE_2024 = DEFAULT_CACHE_DIR / "msif_2024_2025.xlsx"
 
 
-def _download_file(url: str, destination: Path, timeout: int = 60) -> None:
-    """Download file from URL to destination."""
+def _download_file(url: str, destination: Path, timeout: int = 60, force: bool = False) -> DownloadResult:
+    """
+    Download file from URL to destination (conditional on the cached copy's ETag/Last-Modified).
+    
+    Returns:
+        DownloadResult; ``modified`` is False if the server answered 304 Not Modified
+    """
     logger.info("Downloading MSIF file", url=url, destination=str(destination))
     
     try:
-        with httpx.Client(timeout=timeout) as client:
-            response = client.get(url)
-            response.raise_for_status()
-            
-            destination.parent.mkdir(parents=True, exist_ok=True)
-            with open(destination, "wb") as f:
-                f.write(response.content)
-            
-            logger.info("Downloaded successfully", size=len(response.content))
+        result = conditional_download(url, destination, TARGET_MSIF, timeout=timeout, force=force)
+        logger.info("Downloaded successfully", size=result.size_bytes, modified=result.modified)
+        return result
     except Exception as e:
         logger.error("Failed to download MSIF file", error=str(e), url=url)
         raise FairCostDataError(f"Failed to download MSIF file: {e}") from e
@@ -58,7 +58,7 @@ def _is_file_stale(file_path: Path, max_age_days: int = 30) -> bool:
     return file_age > timedelta(days=max_age_days)
 
 
-def _parse_msif_xls(file_path: Path) -> Dict[str, Dict[str, float]]:
+def _parse_msif_xls(file_path: Path, year: int = 2025, use_cache: bool = True) -> Dict[str, Dict[str, float]]:
     """
     Parse MSIF XLS file and extract median fees.
     
@@ -69,145 +69,22 @@ def _parse_msif_xls(file_path: Path) -> Dict[str, Dict[str, float]]:
     - Column 6: Residential 65+ fee (2025-26 provisional)
     - Column 9: Nursing 65+ fee (2025-26 provisional)
     
+    Args:
+        file_path: Path to XLS file
+        year: MSIF year of the file (2025 = 2025-26, 2024 = 2024-25)
+        use_cache: Reuse the parsed artifact for this workbook (see msif_cache) and
+            write one after parsing
+    
     Returns:
         Dict mapping: {local_authority: {care_type: median_fee_gbp}}
     """
-    logger.info("Parsing MSIF XLS file", file=str(file_path))
+    logger.info("Parsing MSIF XLS file", file=str(file_path), year=year)
     
     try:
-        xls = pd.ExcelFile(file_path)
-        
-        # Find Table A sheet (main data sheet)
-        target_sheet = None
-        for sheet_name in xls.sheet_names:
-            if "table a" in sheet_name.lower() and "2025" in sheet_name.lower():
-                target_sheet = sheet_name
-                break
-        
-        if target_sheet is None:
-            # Try alternative names
-            for sheet_name in xls.sheet_names:
-                if any(keyword in sheet_name.lower() for keyword in ["table a", "fees", "data"]):
-                    target_sheet = sheet_name
-                    break
-        
-        if target_sheet is None:
-            raise FairCostDataError(f"Could not find Table A sheet in MSIF file. Available sheets: {xls.sheet_names}")
-        
-        logger.info("Using sheet", sheet=target_sheet)
-        
-        # Read with header row (row 1 contains column names)
-        df = pd.read_excel(xls, sheet_name=target_sheet, header=1)
-        
-        result: Dict[str, Dict[str, float]] = {}
-        
-        # Column indices based on MSIF 2025-2026 structure:
-        # Column 0: ONS Code
-        # Column 1: Local authority name
-        # Column 6: Residential 65+ fee 2025-26 (provisional) - index 6
-        # Column 9: Nursing 65+ fee 2025-26 (provisional) - index 9
-        
-        # Find column indices dynamically
-        la_col_idx = None
-        residential_col_idx = None
-        nursing_col_idx = None
-        
-        # Look for Local authority column (usually column 1)
-        for idx, col in enumerate(df.columns):
-            col_str = str(col).lower()
-            if "local authority" in col_str or (idx == 1 and "unnamed" not in col_str.lower()):
-                la_col_idx = idx
-                break
-        
-        if la_col_idx is None:
-            la_col_idx = 1  # Fallback to column 1
-        
-        # Look for residential and nursing columns by header text
-        for idx, col in enumerate(df.columns):
-            col_str = str(col).lower()
-            if "care homes without nursing" in col_str and "65" in col_str and "2025" in col_str:
-                residential_col_idx = idx
-            elif "care homes with nursing" in col_str and "65" in col_str and "2025" in col_str:
-                nursing_col_idx = idx
-        
-        # Fallback: use known positions (column 6 and 9 for 2025-26 provisional)
-        if residential_col_idx is None:
-            if len(df.columns) > 6:
-                residential_col_idx = 6  # Column 7 (2025-26 provisional residential)
-        
-        if nursing_col_idx is None:
-            if len(df.columns) > 9:
-                nursing_col_idx = 9  # Column 10 (2025-26 provisional nursing)
-        
-        if residential_col_idx is None or nursing_col_idx is None:
-            raise FairCostDataError(
-                f"Could not find required fee columns. "
-                f"Residential col: {residential_col_idx}, Nursing col: {nursing_col_idx}. "
-                f"Available columns: {list(df.columns[:10])}"
-            )
-        
-        logger.info(
-            "Found columns",
-            la_col=la_col_idx,
-            residential_col=residential_col_idx,
-            nursing_col=nursing_col_idx
-        )
-        
-        # Extract data
-        for idx, row in df.iterrows():
-            # Skip header rows and empty rows
-            if idx < 2:  # Skip first 2 rows (title and header)
-                continue
-            
-            la_name = str(row.iloc[la_col_idx]).strip()
-            
-            # Skip invalid rows
-            if (not la_name or 
-                la_name.lower() in ["nan", "none", "", "this worksheet", "ons code"] or
-                la_name.startswith("Table") or
-                len(la_name) < 2):
-                continue
-            
-            try:
-                # Extract fees
-                residential_fee_raw = row.iloc[residential_col_idx]
-                nursing_fee_raw = row.iloc[nursing_col_idx]
-                
-                residential_fee = None
-                nursing_fee = None
-                
-                if pd.notna(residential_fee_raw):
-                    try:
-                        residential_fee = float(residential_fee_raw)
-                    except (ValueError, TypeError):
-                        pass
-                
-                if pd.notna(nursing_fee_raw):
-                    try:
-                        nursing_fee = float(nursing_fee_raw)
-                    except (ValueError, TypeError):
-                        pass
-                
-                # Only add if we have at least one valid fee
-                if residential_fee or nursing_fee:
-                    if la_name not in result:
-                        result[la_name] = {}
-                    
-                    if residential_fee and residential_fee > 0:
-                        result[la_name]["residential"] = residential_fee
-                        # Dementia care typically costs 10-15% more
-                        result[la_name]["residential_dementia"] = residential_fee * 1.12
-                        # Respite typically same as residential
-                        result[la_name]["respite"] = residential_fee
-                    
-                    if nursing_fee and nursing_fee > 0:
-                        result[la_name]["nursing"] = nursing_fee
-                        # Dementia care typically costs 10-15% more
-                        result[la_name]["nursing_dementia"] = nursing_fee * 1.12
-                    
-            except (ValueError, TypeError, IndexError) as e:
-                logger.debug("Skipping row", la=la_name, error=str(e), row_idx=idx)
-                continue
+        if use_cache:
+            result = get_parsed_msif_cache().load(file_path, year)
+        else:
+            result = frame_to_fee_table(parse_msif_frame(file_path, year))
         
         logger.info("Parsed MSIF data", local_authorities=len(result))
         
@@ -259,5 +136,5 @@ def load_fair_cost_data(
     if not xls_path.exists():
         raise FairCostDataError(f"MSIF file not found: {xls_path}")
     
-    return _parse_msif_xls(xls_path)
+    return _parse_msif_xls(xls_path, year=2024 if xls_path == CACHE_FILE_2024 else 2025)
 
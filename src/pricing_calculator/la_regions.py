@@ -0,0 +1,414 @@
+"""
+Local Authority -> region lookup.
+
+Built-in table of the 153 English councils with adult social care responsibilities
+(the rows of MSIF Table A), keyed by ONS code, with their ONS region.
+
+An ONS "Local Authority District to Region" lookup CSV can be supplied via
+``LA_REGION_LOOKUP_CSV`` to extend or override the built-in table.
+"""
+
+import csv
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Optional ONS LAD -> RGN lookup CSV (e.g. "LAD23CD,LAD23NM,RGN23CD,RGN23NM")
+LA_REGION_LOOKUP_CSV = os.getenv("LA_REGION_LOOKUP_CSV")
+
+# Region name (as used in LOTTIE_2025_REGIONAL_AVERAGES) -> ONS region code
+REGION_CODES: Dict[str, str] = {
+    "North East": "E12000001",
+    "North West": "E12000002",
+    "Yorkshire and the Humber": "E12000003",
+    "East Midlands": "E12000004",
+    "West Midlands": "E12000005",
+    "East of England": "E12000006",
+    "London": "E12000007",
+    "South East": "E12000008",
+    "South West": "E12000009",
+}
+
+_REGION_BY_CODE: Dict[str, str] = {code: name for name, code in REGION_CODES.items()}
+
+# ONS code -> (local authority name, region)
+LOCAL_AUTHORITIES: Dict[str, Tuple[str, str]] = {
+    # North East
+    "E06000047": ("County Durham", "North East"),
+    "E06000005": ("Darlington", "North East"),
+    "E08000037": ("Gateshead", "North East"),
+    "E06000001": ("Hartlepool", "North East"),
+    "E06000002": ("Middlesbrough", "North East"),
+    "E08000021": ("Newcastle upon Tyne", "North East"),
+    "E08000022": ("North Tyneside", "North East"),
+    "E06000057": ("Northumberland", "North East"),
+    "E06000003": ("Redcar and Cleveland", "North East"),
+    "E08000023": ("South Tyneside", "North East"),
+    "E06000004": ("Stockton-on-Tees", "North East"),
+    "E08000024": ("Sunderland", "North East"),
+    # North West
+    "E06000008": ("Blackburn with Darwen", "North West"),
+    "E06000009": ("Blackpool", "North West"),
+    "E08000001": ("Bolton", "North West"),
+    "E08000002": ("Bury", "North West"),
+    "E06000049": ("Cheshire East", "North West"),
+    "E06000050": ("Cheshire West and Chester", "North West"),
+    "E06000063": ("Cumberland", "North West"),
+    "E06000006": ("Halton", "North West"),
+    "E08000011": ("Knowsley", "North West"),
+    "E10000017": ("Lancashire", "North West"),
+    "E08000012": ("Liverpool", "North West"),
+    "E08000003": ("Manchester", "North West"),
+    "E08000004": ("Oldham", "North West"),
+    "E08000005": ("Rochdale", "North West"),
+    "E08000006": ("Salford", "North West"),
+    "E08000014": ("Sefton", "North West"),
+    "E08000013": ("St. Helens", "North West"),
+    "E08000007": ("Stockport", "North West"),
+    "E08000008": ("Tameside", "North West"),
+    "E08000009": ("Trafford", "North West"),
+    "E06000007": ("Warrington", "North West"),
+    "E06000064": ("Westmorland and Furness", "North West"),
+    "E08000010": ("Wigan", "North West"),
+    "E08000015": ("Wirral", "North West"),
+    # Yorkshire and the Humber
+    "E08000016": ("Barnsley", "Yorkshire and the Humber"),
+    "E08000032": ("Bradford", "Yorkshire and the Humber"),
+    "E08000033": ("Calderdale", "Yorkshire and the Humber"),
+    "E08000017": ("Doncaster", "Yorkshire and the Humber"),
+    "E06000011": ("East Riding of Yorkshire", "Yorkshire and the Humber"),
+    "E06000010": ("Kingston upon Hull, City of", "Yorkshire and the Humber"),
+    "E08000034": ("Kirklees", "Yorkshire and the Humber"),
+    "E08000035": ("Leeds", "Yorkshire and the Humber"),
+    "E06000012": ("North East Lincolnshire", "Yorkshire and the Humber"),
+    "E06000013": ("North Lincolnshire", "Yorkshire and the Humber"),
+    "E06000065": ("North Yorkshire", "Yorkshire and the Humber"),
+    "E08000018": ("Rotherham", "Yorkshire and the Humber"),
+    "E08000019": ("Sheffield", "Yorkshire and the Humber"),
+    "E08000036": ("Wakefield", "Yorkshire and the Humber"),
+    "E06000014": ("York", "Yorkshire and the Humber"),
+    # East Midlands
+    "E06000015": ("Derby", "East Midlands"),
+    "E10000007": ("Derbyshire", "East Midlands"),
+    "E06000016": ("Leicester", "East Midlands"),
+    "E10000018": ("Leicestershire", "East Midlands"),
+    "E10000019": ("Lincolnshire", "East Midlands"),
+    "E06000061": ("North Northamptonshire", "East Midlands"),
+    "E06000018": ("Nottingham", "East Midlands"),
+    "E10000024": ("Nottinghamshire", "East Midlands"),
+    "E06000017": ("Rutland", "East Midlands"),
+    "E06000062": ("West Northamptonshire", "East Midlands"),
+    # West Midlands
+    "E08000025": ("Birmingham", "West Midlands"),
+    "E08000026": ("Coventry", "West Midlands"),
+    "E08000027": ("Dudley", "West Midlands"),
+    "E06000019": ("Herefordshire, County of", "West Midlands"),
+    "E08000028": ("Sandwell", "West Midlands"),
+    "E06000051": ("Shropshire", "West Midlands"),
+    "E08000029": ("Solihull", "West Midlands"),
+    "E10000028": ("Staffordshire", "West Midlands"),
+    "E06000021": ("Stoke-on-Trent", "West Midlands"),
+    "E06000020": ("Telford and Wrekin", "West Midlands"),
+    "E08000030": ("Walsall", "West Midlands"),
+    "E10000031": ("Warwickshire", "West Midlands"),
+    "E08000031": ("Wolverhampton", "West Midlands"),
+    "E10000034": ("Worcestershire", "West Midlands"),
+    # East of England
+    "E06000055": ("Bedford", "East of England"),
+    "E10000003": ("Cambridgeshire", "East of England"),
+    "E06000056": ("Central Bedfordshire", "East of England"),
+    "E10000012": ("Essex", "East of England"),
+    "E10000015": ("Hertfordshire", "East of England"),
+    "E06000032": ("Luton", "East of England"),
+    "E10000020": ("Norfolk", "East of England"),
+    "E06000031": ("Peterborough", "East of England"),
+    "E06000033": ("Southend-on-Sea", "East of England"),
+    "E10000029": ("Suffolk", "East of England"),
+    "E06000034": ("Thurrock", "East of England"),
+    # London
+    "E09000001": ("City of London", "London"),
+    "E09000002": ("Barking and Dagenham", "London"),
+    "E09000003": ("Barnet", "London"),
+    "E09000004": ("Bexley", "London"),
+    "E09000005": ("Brent", "London"),
+    "E09000006": ("Bromley", "London"),
+    "E09000007": ("Camden", "London"),
+    "E09000008": ("Croydon", "London"),
+    "E09000009": ("Ealing", "London"),
+    "E09000010": ("Enfield", "London"),
+    "E09000011": ("Greenwich", "London"),
+    "E09000012": ("Hackney", "London"),
+    "E09000013": ("Hammersmith and Fulham", "London"),
+    "E09000014": ("Haringey", "London"),
+    "E09000015": ("Harrow", "London"),
+    "E09000016": ("Havering", "London"),
+    "E09000017": ("Hillingdon", "London"),
+    "E09000018": ("Hounslow", "London"),
+    "E09000019": ("Islington", "London"),
+    "E09000020": ("Kensington and Chelsea", "London"),
+    "E09000021": ("Kingston upon Thames", "London"),
+    "E09000022": ("Lambeth", "London"),
+    "E09000023": ("Lewisham", "London"),
+    "E09000024": ("Merton", "London"),
+    "E09000025": ("Newham", "London"),
+    "E09000026": ("Redbridge", "London"),
+    "E09000027": ("Richmond upon Thames", "London"),
+    "E09000028": ("Southwark", "London"),
+    "E09000029": ("Sutton", "London"),
+    "E09000030": ("Tower Hamlets", "London"),
+    "E09000031": ("Waltham Forest", "London"),
+    "E09000032": ("Wandsworth", "London"),
+    "E09000033": ("Westminster", "London"),
+    # South East
+    "E06000036": ("Bracknell Forest", "South East"),
+    "E06000043": ("Brighton and Hove", "South East"),
+    "E06000060": ("Buckinghamshire", "South East"),
+    "E10000011": ("East Sussex", "South East"),
+    "E10000014": ("Hampshire", "South East"),
+    "E06000046": ("Isle of Wight", "South East"),
+    "E10000016": ("Kent", "South East"),
+    "E06000035": ("Medway", "South East"),
+    "E06000042": ("Milton Keynes", "South East"),
+    "E10000025": ("Oxfordshire", "South East"),
+    "E06000044": ("Portsmouth", "South East"),
+    "E06000038": ("Reading", "South East"),
+    "E06000039": ("Slough", "South East"),
+    "E06000045": ("Southampton", "South East"),
+    "E10000030": ("Surrey", "South East"),
+    "E06000037": ("West Berkshire", "South East"),
+    "E10000032": ("West Sussex", "South East"),
+    "E06000040": ("Windsor and Maidenhead", "South East"),
+    "E06000041": ("Wokingham", "South East"),
+    # South West
+    "E06000022": ("Bath and North East Somerset", "South West"),
+    "E06000058": ("Bournemouth, Christchurch and Poole", "South West"),
+    "E06000023": ("Bristol, City of", "South West"),
+    "E06000052": ("Cornwall", "South West"),
+    "E10000008": ("Devon", "South West"),
+    "E06000059": ("Dorset", "South West"),
+    "E10000013": ("Gloucestershire", "South West"),
+    "E06000053": ("Isles of Scilly", "South West"),
+    "E06000024": ("North Somerset", "South West"),
+    "E06000026": ("Plymouth", "South West"),
+    "E06000066": ("Somerset", "South West"),
+    "E06000025": ("South Gloucestershire", "South West"),
+    "E06000030": ("Swindon", "South West"),
+    "E06000027": ("Torbay", "South West"),
+    "E06000054": ("Wiltshire", "South West"),
+}
+
+# Councils abolished in recent reorganisations (still present in older MSIF files)
+LEGACY_LOCAL_AUTHORITIES: Dict[str, Tuple[str, str]] = {
+    "E10000006": ("Cumbria", "North West"),
+    "E10000021": ("Northamptonshire", "East Midlands"),
+    "E10000023": ("North Yorkshire", "Yorkshire and the Humber"),
+    "E10000027": ("Somerset", "South West"),
+}
+
+# Alternative spellings seen in MSIF and postcodes.io -> canonical name
+LA_NAME_ALIASES: Dict[str, str] = {
+    "durham": "County Durham",
+    "hull": "Kingston upon Hull, City of",
+    "kingston upon hull": "Kingston upon Hull, City of",
+    "herefordshire": "Herefordshire, County of",
+    "bristol": "Bristol, City of",
+    "bournemouth christchurch and poole": "Bournemouth, Christchurch and Poole",
+    "bcp": "Bournemouth, Christchurch and Poole",
+    "east riding": "East Riding of Yorkshire",
+    "brighton": "Brighton and Hove",
+    "southend": "Southend-on-Sea",
+    "stockton": "Stockton-on-Tees",
+    "stoke": "Stoke-on-Trent",
+    "telford": "Telford and Wrekin",
+    "windsor": "Windsor and Maidenhead",
+    "richmond": "Richmond upon Thames",
+    "kingston": "Kingston upon Thames",
+    "newcastle": "Newcastle upon Tyne",
+    "hammersmith": "Hammersmith and Fulham",
+    "kensington": "Kensington and Chelsea",
+    "barking": "Barking and Dagenham",
+}
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_NAME_NOISE = re.compile(
+    r"\b(the|council|county|city|of|borough|metropolitan|district|royal|london borough)\b"
+)
+
+
+def normalize_la_name(name: str) -> str:
+    """
+    Normalize a Local Authority name for lookups.
+
+    "Bristol, City of", "City of Bristol" and "Bristol City Council" all normalize to
+    "bristol"; "St. Helens" and "St Helens" to "st helens"; "&" matches "and".
+
+    Args:
+        name: Local Authority name
+
+    Returns:
+        Normalized key
+    """
+    key = name.lower().replace("&", " and ")
+    key = _NON_ALNUM.sub(" ", key)
+    key = _NAME_NOISE.sub(" ", key)
+    return " ".join(key.split())
+
+
+def _read_ons_lookup_csv(path: Path) -> Dict[str, Tuple[str, str]]:
+    """
+    Read an ONS LAD -> region lookup CSV.
+
+    Columns are detected by suffix, so any vintage works (LAD21CD, LAD23NM, RGN23NM, ...).
+
+    Args:
+        path: CSV path
+
+    Returns:
+        Dict {ons_code: (local_authority, region)}
+    """
+    result: Dict[str, Tuple[str, str]] = {}
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        fields = reader.fieldnames or []
+
+        def find(prefixes, suffix):
+            for field in fields:
+                upper = field.upper()
+                if upper.endswith(suffix) and upper.startswith(prefixes):
+                    return field
+            return None
+
+        code_col = find(("LAD", "UTLA", "CTYUA"), "CD")
+        name_col = find(("LAD", "UTLA", "CTYUA"), "NM")
+        region_code_col = find(("RGN",), "CD")
+        region_name_col = find(("RGN",), "NM")
+        if not code_col or not name_col or not (region_code_col or region_name_col):
+            raise ValueError(f"Unrecognised ONS lookup columns: {fields}")
+
+        for row in reader:
+            region = None
+            if region_code_col:
+                region = _REGION_BY_CODE.get(row[region_code_col].strip())
+            if region is None and region_name_col:
+                region = _canonical_region(row[region_name_col])
+            if region:
+                result[row[code_col].strip()] = (row[name_col].strip(), region)
+    return result
+
+
+def _canonical_region(name: str) -> Optional[str]:
+    """Map an ONS region name (e.g. "Yorkshire and The Humber") to the name used here."""
+    key = name.strip().lower()
+    for region in REGION_CODES:
+        if region.lower() == key:
+            return region
+    return None
+
+
+class LARegionIndex:
+    """
+    Lookup of Local Authority -> (ONS code, region, region code).
+
+    Lookups try the ONS code first, then the normalized name and known aliases.
+    """
+
+    def __init__(self, extra: Optional[Dict[str, Tuple[str, str]]] = None):
+        """
+        Build the index.
+
+        Args:
+            extra: Additional {ons_code: (name, region)} entries (override built-ins)
+        """
+        entries: Dict[str, Tuple[str, str]] = {}
+        entries.update(LEGACY_LOCAL_AUTHORITIES)
+        entries.update(LOCAL_AUTHORITIES)
+        entries.update(extra or {})
+
+        self._by_code: Dict[str, Dict[str, str]] = {}
+        self._by_name: Dict[str, Dict[str, str]] = {}
+        legacy_codes = set(LEGACY_LOCAL_AUTHORITIES) - set(extra or {})
+        # Legacy councils first so current councils with the same name win
+        for code in sorted(entries, key=lambda c: c not in legacy_codes):
+            name, region = entries[code]
+            info = {
+                "local_authority": name,
+                "ons_code": code,
+                "region": region,
+                "region_code": REGION_CODES[region],
+            }
+            self._by_code[code] = info
+            self._by_name[normalize_la_name(name)] = info
+
+        for alias, name in LA_NAME_ALIASES.items():
+            info = self._by_name.get(normalize_la_name(name))
+            if info is not None:
+                self._by_name.setdefault(normalize_la_name(alias), info)
+
+    def __len__(self) -> int:
+        return len(self._by_code)
+
+    def lookup(self, la_name: Optional[str] = None, ons_code: Optional[str] = None) -> Optional[Dict[str, str]]:
+        """
+        Find a Local Authority.
+
+        Args:
+            la_name: Local Authority name (any common spelling)
+            ons_code: ONS code (preferred when available)
+
+        Returns:
+            Dict with local_authority, ons_code, region, region_code, or None if unknown
+        """
+        if ons_code:
+            info = self._by_code.get(ons_code.strip().upper())
+            if info is not None:
+                return info
+        if la_name:
+            return self._by_name.get(normalize_la_name(la_name))
+        return None
+
+    def region_for(self, la_name: Optional[str] = None, ons_code: Optional[str] = None,
+                   default: str = "England") -> str:
+        """
+        Get the region of a Local Authority.
+
+        Args:
+            la_name: Local Authority name
+            ons_code: ONS code
+            default: Region returned for unknown authorities
+
+        Returns:
+            Region name
+        """
+        info = self.lookup(la_name, ons_code)
+        return info["region"] if info else default
+
+
+_index: Optional[LARegionIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_la_region_index() -> LARegionIndex:
+    """
+    Get the process-wide LARegionIndex (built once).
+
+    Includes ``LA_REGION_LOOKUP_CSV`` entries when the variable points to a readable file.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                extra = None
+                if LA_REGION_LOOKUP_CSV:
+                    try:
+                        extra = _read_ons_lookup_csv(Path(LA_REGION_LOOKUP_CSV))
+                        logger.info("Loaded ONS LA lookup", path=LA_REGION_LOOKUP_CSV, entries=len(extra))
+                    except (OSError, ValueError) as e:
+                        logger.warning("Could not read ONS LA lookup", path=LA_REGION_LOOKUP_CSV, error=str(e))
+                _index = LARegionIndex(extra)
+    return _index
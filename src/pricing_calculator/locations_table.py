@@ -0,0 +1,217 @@
+"""
+Materialized locations pricing table.
+
+The LA x care-type table is built once per data version and stored column-wise
+(NumPy arrays) with indexes on care type, region, band and fair cost, so filtered,
+sorted and paginated queries do not rebuild or rescan Python rows.
+"""
+
+import hashlib
+import threading
+from typing import Dict, List, Optional, Sequence
+
+# Row keys, in output order
+LOCATION_COLUMNS = (
+    "local_authority",
+    "ons_code",
+    "region",
+    "care_type",
+    "fair_cost_lower_bound_gbp",
+    "private_average_gbp",
+    "affordability_band",
+    "band_confidence_percent",
+    "fair_cost_gap_gbp",
+    "fair_cost_gap_percent",
+)
+
+NUMERIC_COLUMNS = (
+    "fair_cost_lower_bound_gbp",
+    "private_average_gbp",
+    "band_confidence_percent",
+    "fair_cost_gap_gbp",
+    "fair_cost_gap_percent",
+)
+
+TEXT_COLUMNS = ("local_authority", "region", "care_type", "affordability_band")
+
+SORTABLE_COLUMNS = TEXT_COLUMNS + NUMERIC_COLUMNS
+
+
+class LocationsTable:
+    """
+    Immutable, indexed locations pricing table for one data version.
+
+    Rows are kept as built (and returned by reference); filtering and sorting work on
+    positions in NumPy arrays:
+
+    * ``care_type``, ``region`` and ``band`` filters use hash indexes (value -> positions);
+    * fair cost range filters use binary search over positions pre-sorted by fair cost;
+    * sort orders per column are computed once, on first use.
+    """
+
+    def __init__(self, rows: Sequence[Dict], version: str):
+        """
+        Build the table.
+
+        Args:
+            rows: Rows as returned by ``PricingService.get_all_locations_pricing()``
+            version: Data version the rows were built from
+        """
+        import numpy as np
+
+        self.version = version
+        self._rows: List[Dict] = list(rows)
+        self._size = len(self._rows)
+
+        self._columns = {}
+        for column in TEXT_COLUMNS:
+            self._columns[column] = np.array(
+                [row.get(column) or "" for row in self._rows], dtype=object
+            )
+        for column in NUMERIC_COLUMNS:
+            self._columns[column] = np.array(
+                [np.nan if row.get(column) is None else row[column] for row in self._rows],
+                dtype=np.float64,
+            )
+
+        self._by_care_type = self._build_index("care_type", str.lower)
+        self._by_region = self._build_index("region", str.lower)
+        self._by_band = self._build_index("affordability_band", str.upper)
+
+        # Positions of rows with a positive fair cost, ordered by fair cost
+        fair_cost = self._columns["fair_cost_lower_bound_gbp"]
+        with_cost = np.flatnonzero(fair_cost > 0)
+        self._fair_cost_order = with_cost[np.argsort(fair_cost[with_cost], kind="stable")]
+        self._fair_cost_sorted = fair_cost[self._fair_cost_order]
+
+        self._sort_orders: Dict[tuple, "np.ndarray"] = {}
+        self._sort_lock = threading.Lock()
+        self.care_types = sorted({row["care_type"] for row in self._rows if row.get("care_type")})
+        self.regions = sorted({row["region"] for row in self._rows if row.get("region")})
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _build_index(self, column: str, normalize) -> Dict[str, "np.ndarray"]:
+        """Build value -> positions index (keys normalized)."""
+        import numpy as np
+
+        positions: Dict[str, List[int]] = {}
+        for i, value in enumerate(self._columns[column]):
+            positions.setdefault(normalize(value), []).append(i)
+        return {key: np.array(idx, dtype=np.intp) for key, idx in positions.items()}
+
+    def _sort_order(self, column: str, descending: bool) -> "np.ndarray":
+        """Positions sorted by column (stable; missing values last)."""
+        import numpy as np
+
+        key = (column, descending)
+        order = self._sort_orders.get(key)
+        if order is None:
+            values = self._columns[column]
+            if column in NUMERIC_COLUMNS:
+                # NaN sorts last in both directions
+                order = np.argsort(-values if descending else values, kind="stable")
+            else:
+                order = np.argsort(values.astype(str), kind="stable")
+                if descending:
+                    order = order[::-1]
+            with self._sort_lock:
+                self._sort_orders[key] = order
+        return order
+
+    def etag(self, **query) -> str:
+        """
+        Strong ETag for a query against this table version.
+
+        Args:
+            **query: Query parameters (same as ``query()``)
+
+        Returns:
+            Quoted ETag value
+        """
+        params = "&".join(f"{key}={query[key]}" for key in sorted(query) if query[key] is not None)
+        digest = hashlib.sha1(f"{self.version}?{params}".encode()).hexdigest()[:20]
+        return f'"{digest}"'
+
+    def query(
+        self,
+        care_type: Optional[str] = None,
+        region: Optional[str] = None,
+        min_fair_cost: Optional[float] = None,
+        max_fair_cost: Optional[float] = None,
+        band: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        descending: bool = False,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> Dict:
+        """
+        Filter, sort and paginate the table.
+
+        Rows without a fair cost are excluded when a fair cost range is given.
+
+        Args:
+            care_type: Care type value (e.g. "residential")
+            region: Region name (case-insensitive)
+            min_fair_cost: Minimum fair cost in GBP per week
+            max_fair_cost: Maximum fair cost in GBP per week
+            band: Affordability band A-E (case-insensitive)
+            sort_by: Column to sort by (one of SORTABLE_COLUMNS); None keeps table order
+            descending: Sort descending
+            offset: Number of matching rows to skip
+            limit: Maximum number of rows to return (None = all)
+
+        Returns:
+            Dict with "data" (rows), "total" (matching rows before pagination),
+            "offset" and "limit"
+
+        Raises:
+            ValueError: If sort_by is not a sortable column
+        """
+        import numpy as np
+
+        if sort_by is not None and sort_by not in SORTABLE_COLUMNS:
+            raise ValueError(f"Cannot sort by {sort_by!r}; expected one of {SORTABLE_COLUMNS}")
+
+        empty = np.empty(0, dtype=np.intp)
+        selections = []
+        if care_type:
+            selections.append(self._by_care_type.get(care_type.lower(), empty))
+        if region:
+            selections.append(self._by_region.get(region.lower(), empty))
+        if band:
+            selections.append(self._by_band.get(band.upper(), empty))
+        if min_fair_cost is not None or max_fair_cost is not None:
+            lo = 0 if min_fair_cost is None else np.searchsorted(
+                self._fair_cost_sorted, min_fair_cost, side="left"
+            )
+            hi = len(self._fair_cost_sorted) if max_fair_cost is None else np.searchsorted(
+                self._fair_cost_sorted, max_fair_cost, side="right"
+            )
+            selections.append(self._fair_cost_order[lo:hi])
+
+        if selections:
+            mask = np.ones(self._size, dtype=bool)
+            for positions in selections:
+                selected = np.zeros(self._size, dtype=bool)
+                selected[positions] = True
+                mask &= selected
+        else:
+            mask = None
+
+        if sort_by is not None:
+            order = self._sort_order(sort_by, descending)
+            positions = order if mask is None else order[mask[order]]
+        else:
+            positions = np.arange(self._size) if mask is None else np.flatnonzero(mask)
+
+        total = len(positions)
+        page = positions[offset:] if limit is None else positions[offset:offset + limit]
+        rows = self._rows
+        return {
+            "data": [rows[i] for i in page],
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+        }
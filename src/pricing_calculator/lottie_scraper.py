@@ -4,7 +4,7 @@ from typing import Dict, Optional
 from pathlib import Path
 import httpx
 import structlog
-from selectolax.parser import HTMLParser
+from observability import TARGET_LOTTIE, outbound_call
 from .models import CareType
 from .constants import LOTTIE_2025_REGIONAL_AVERAGES, get_lottie_average
 from .exceptions import LottieScrapingError
@@ -29,6 +29,7 @@ def _extract_prices_from_html(html_content: str, care_type: str) -> Dict[str, fl
         Dict mapping: {region: price_per_week}
     """
     import re
+    from selectolax.parser import HTMLParser
     
     parser = HTMLParser(html_content)
     result: Dict[str, float] = {}
@@ -113,6 +114,8 @@ async def fetch_lottie_averages(
     Returns:
         Dict mapping: {region: {care_type: price_per_week}}
     """
+    from selectolax.parser import HTMLParser
+    
     logger.info("Fetching Lottie averages")
     
     result: Dict[str, Dict[str, float]] = {}
@@ -121,7 +124,9 @@ async def fetch_lottie_averages(
         async with httpx.AsyncClient(timeout=30.0) as client:
             # Fetch main page (residential and nursing)
             try:
-                response = await client.get(LOTTIE_MAIN_URL)
+                with outbound_call(TARGET_LOTTIE) as call:
+                    response = await client.get(LOTTIE_MAIN_URL)
+                    call.status = response.status_code
                 response.raise_for_status()
                 html = response.text
                 
@@ -197,7 +202,9 @@ async def fetch_lottie_averages(
             
             # Fetch dementia page
             try:
-                response = await client.get(LOTTIE_DEMENTIA_URL)
+                with outbound_call(TARGET_LOTTIE) as call:
+                    response = await client.get(LOTTIE_DEMENTIA_URL)
+                    call.status = response.status_code
                 response.raise_for_status()
                 html = response.text
                 dementia_prices = _extract_prices_from_html(html, "dementia")
@@ -214,7 +221,9 @@ async def fetch_lottie_averages(
             
             # Fetch respite page
             try:
-                response = await client.get(LOTTIE_RESPITE_URL)
+                with outbound_call(TARGET_LOTTIE) as call:
+                    response = await client.get(LOTTIE_RESPITE_URL)
+                    call.status = response.status_code
                 response.raise_for_status()
                 html = response.text
                 respite_prices = _extract_prices_from_html(html, "respite")
@@ -0,0 +1,320 @@
+"""
+Parsed MSIF workbook cache.
+
+Opening the gov.uk XLSX with openpyxl takes seconds, and every worker boot used to
+do it. The typed fee frame produced by ``msif_parser`` is persisted next to the
+download cache, keyed by the SHA-256 of the source workbook (plus MSIF year and
+``PARSER_VERSION``), so a workbook is parsed once and later loads only hash the
+file and read the artifact:
+
+* with pyarrow installed, artifacts are Arrow IPC files read through a memory map;
+* without it, the same columns are stored as JSON.
+
+A changed workbook has a different hash and is reparsed; old artifacts are pruned
+(least recently used first).
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import structlog
+
+from observability import record_cache_lookup
+from .exceptions import FairCostDataError
+from .msif_parser import FEE_COLUMNS, PARSER_VERSION, fee_table_from_columns, parse_msif_frame
+
+logger = structlog.get_logger(__name__)
+
+# Artifact directory (next to the downloaded workbooks by default)
+PARSED_CACHE_DIR = Path(
+    os.getenv(
+        "MSIF_PARSED_CACHE_DIR",
+        str(Path.home() / ".cache" / "pricing_calculator" / "parsed"),
+    )
+)
+
+# Artifacts kept on disk (one per workbook version and year)
+MAX_ARTIFACTS = 8
+
+FORMAT_ARROW = "arrow"
+FORMAT_JSON = "json"
+
+# Columns persisted per artifact (ONS codes are kept for consumers of the frame)
+ARTIFACT_COLUMNS = ("local_authority", "ons_code") + FEE_COLUMNS
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(file_path: Path) -> str:
+    """
+    SHA-256 of a file, read in chunks.
+
+    Args:
+        file_path: File to hash
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def arrow_available() -> bool:
+    """Whether pyarrow is installed (checked without importing it)."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+class ParsedMSIFCache:
+    """
+    On-disk cache of parsed MSIF workbooks keyed by workbook content hash.
+
+    Thread-safe; concurrent misses for the same workbook are parsed once per process.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        artifact_format: Optional[str] = None,
+        max_artifacts: int = MAX_ARTIFACTS,
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            cache_dir: Artifact directory (default PARSED_CACHE_DIR)
+            artifact_format: "arrow" or "json" (default: arrow if pyarrow is installed)
+            max_artifacts: Artifacts kept on disk before pruning
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else PARSED_CACHE_DIR
+        self.format = artifact_format or (FORMAT_ARROW if arrow_available() else FORMAT_JSON)
+        if self.format not in (FORMAT_ARROW, FORMAT_JSON):
+            raise ValueError(f"Unknown artifact format: {self.format}")
+        self.max_artifacts = max_artifacts
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def artifact_path(self, digest: str, year: int) -> Path:
+        """Artifact path for a workbook hash and MSIF year."""
+        return self.cache_dir / f"msif-{year}-p{PARSER_VERSION}-{digest}.{self.format}"
+
+    def load(self, file_path: Path, year: int = 2025) -> Dict[str, Dict[str, float]]:
+        """
+        Fee table for a workbook, from the artifact cache or by parsing it.
+
+        Args:
+            file_path: Path to the MSIF XLSX file
+            year: MSIF year (2025 = 2025-26, 2024 = 2024-25)
+
+        Returns:
+            Dict mapping: {local_authority: {care_type: median_fee_gbp}}
+
+        Raises:
+            FairCostDataError: If the workbook cannot be parsed or has no fee rows
+        """
+        file_path = Path(file_path)
+        digest = file_sha256(file_path)
+        artifact = self.artifact_path(digest, year)
+
+        columns = self._read(artifact)
+        if columns is None:
+            with self._lock:
+                # Another thread may have written it while we waited
+                columns = self._read(artifact)
+                if columns is None:
+                    self.misses += 1
+                    record_cache_lookup("msif_parsed", hit=False)
+                    logger.info("Parsed MSIF cache miss", file=str(file_path), year=year, sha256=digest)
+                    columns = self._frame_columns(parse_msif_frame(file_path, year))
+                    self._write(artifact, columns, digest, year)
+                    return self._to_fee_table(columns)
+
+        self.hits += 1
+        record_cache_lookup("msif_parsed", hit=True)
+        logger.debug("Parsed MSIF cache hit", file=str(file_path), artifact=str(artifact))
+        return self._to_fee_table(columns)
+
+    @staticmethod
+    def _to_fee_table(columns: Dict[str, list]) -> Dict[str, Dict[str, float]]:
+        result = fee_table_from_columns(columns)
+        if not result:
+            raise FairCostDataError("No valid data extracted from MSIF file")
+        return result
+
+    @staticmethod
+    def _frame_columns(frame) -> Dict[str, list]:
+        """Typed frame -> column lists (NaN -> None)."""
+        columns = {}
+        for column in ARTIFACT_COLUMNS:
+            values = frame[column].tolist()
+            columns[column] = [None if v is None or v != v else v for v in values]
+        return columns
+
+    def _read(self, artifact: Path) -> Optional[Dict[str, list]]:
+        """Read artifact columns; None if missing or unreadable (unreadable ones are removed)."""
+        if not artifact.exists():
+            return None
+        try:
+            if self.format == FORMAT_ARROW:
+                import pyarrow as pa
+
+                with pa.memory_map(str(artifact), "r") as source:
+                    table = pa.ipc.open_file(source).read_all()
+                columns = {column: table.column(column).to_pylist() for column in ARTIFACT_COLUMNS}
+            else:
+                with open(artifact, "r", encoding="utf-8") as f:
+                    columns = json.load(f)["columns"]
+                missing = [column for column in ARTIFACT_COLUMNS if column not in columns]
+                if missing:
+                    raise ValueError(f"Artifact missing columns: {missing}")
+        except Exception as e:
+            logger.warning("Discarding unreadable parsed MSIF artifact", artifact=str(artifact), error=str(e))
+            try:
+                artifact.unlink()
+            except OSError:
+                pass
+            return None
+
+        try:
+            os.utime(artifact)  # LRU pruning uses mtime
+        except OSError:
+            pass
+        return columns
+
+    def _write(self, artifact: Path, columns: Dict[str, list], digest: str, year: int) -> None:
+        """Write artifact atomically; failures are logged, never raised."""
+        metadata = {
+            "source_sha256": digest,
+            "year": str(year),
+            "parser_version": str(PARSER_VERSION),
+            "rows": str(len(columns["local_authority"])),
+            "created_at": str(time.time()),
+        }
+        tmp = artifact.with_name(f".{artifact.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            if self.format == FORMAT_ARROW:
+                import pyarrow as pa
+
+                fee_type = pa.float64()
+                schema = pa.schema(
+                    [("local_authority", pa.string()), ("ons_code", pa.string())]
+                    + [(column, fee_type) for column in FEE_COLUMNS],
+                    metadata=metadata,
+                )
+                table = pa.Table.from_pydict({c: columns[c] for c in ARTIFACT_COLUMNS}, schema=schema)
+                with pa.OSFile(str(tmp), "wb") as sink:
+                    with pa.ipc.new_file(sink, schema) as writer:
+                        writer.write_table(table)
+            else:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump({"metadata": metadata, "columns": columns}, f)
+            os.replace(tmp, artifact)
+            logger.info("Parsed MSIF artifact written", artifact=str(artifact), rows=metadata["rows"])
+        except Exception as e:
+            logger.warning("Could not write parsed MSIF artifact", artifact=str(artifact), error=str(e))
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+            return
+        self._prune()
+
+    def _artifacts(self) -> List[Path]:
+        """Artifacts on disk, most recently used first."""
+        if not self.cache_dir.exists():
+            return []
+        paths = [p for p in self.cache_dir.glob("msif-*") if p.suffix in (".arrow", ".json")]
+        return sorted(paths, key=lambda p: p.stat().st_mtime, reverse=True)
+
+    def _prune(self) -> None:
+        for stale in self._artifacts()[self.max_artifacts:]:
+            try:
+                stale.unlink()
+                logger.info("Pruned parsed MSIF artifact", artifact=str(stale))
+            except OSError:
+                pass
+
+    def clear(self) -> int:
+        """
+        Remove all artifacts.
+
+        Returns:
+            Number of artifacts removed
+        """
+        removed = 0
+        for artifact in self._artifacts():
+            try:
+                artifact.unlink()
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def status(self, sources: Iterable[Tuple[Path, int]] = ()) -> Dict:
+        """
+        Cache status for the data-admin API.
+
+        Args:
+            sources: (workbook path, MSIF year) pairs to report on
+
+        Returns:
+            Dict with format, directory, hit/miss counters, per-source state
+            (hash, whether a parsed artifact exists) and artifacts on disk
+        """
+        source_status = []
+        for file_path, year in sources:
+            file_path = Path(file_path)
+            entry = {"file": str(file_path), "year": year, "exists": file_path.exists()}
+            if entry["exists"]:
+                digest = file_sha256(file_path)
+                artifact = self.artifact_path(digest, year)
+                entry.update({
+                    "sha256": digest,
+                    "size_bytes": file_path.stat().st_size,
+                    "cached": artifact.exists(),
+                    "artifact": artifact.name,
+                })
+            source_status.append(entry)
+
+        artifacts = []
+        for artifact in self._artifacts():
+            stat = artifact.stat()
+            artifacts.append({
+                "name": artifact.name,
+                "size_bytes": stat.st_size,
+                "last_used": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(stat.st_mtime)),
+            })
+
+        return {
+            "format": self.format,
+            "directory": str(self.cache_dir),
+            "parser_version": PARSER_VERSION,
+            "hits": self.hits,
+            "misses": self.misses,
+            "sources": source_status,
+            "artifacts": artifacts,
+        }
+
+
+_cache: Optional[ParsedMSIFCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_parsed_msif_cache() -> ParsedMSIFCache:
+    """Get process-wide parsed MSIF cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ParsedMSIFCache()
+    return _cache
@@ -0,0 +1,347 @@
+"""
+Shared MSIF fee parser.
+
+Used by ``pricing_calculator.fair_cost_loader`` and ``data_ingestion.msif_loader`` for
+the gov.uk MSIF workbook (Table A) and the pre-processed CSV. Parsing is column-wise:
+detect the LA and fee columns, coerce fees with ``pd.to_numeric(errors="coerce")``,
+mask invalid rows and derive dementia/respite fees as column operations.
+
+The typed frame has one row per kept source row with columns ``FRAME_COLUMNS``
+(fees are float64, NaN when missing); ``frame_to_fee_table`` turns it into the
+``{local_authority: {care_type: fee}}`` dict used across the pricing modules.
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import structlog
+
+from .exceptions import FairCostDataError
+
+logger = structlog.get_logger(__name__)
+
+# Bump when parsing rules change (invalidates parsed-workbook artifacts, see msif_cache)
+PARSER_VERSION = 1
+
+# Dementia care typically costs 10-15% more
+DEMENTIA_UPLIFT = 1.12
+
+# Fee columns of the typed frame, in fee table key order
+FEE_COLUMNS = ("residential", "residential_dementia", "respite", "nursing", "nursing_dementia")
+
+FRAME_COLUMNS = ("local_authority", "ons_code") + FEE_COLUMNS
+
+# LA cell values that mark notes/header rows rather than authorities
+INVALID_LA_NAMES = ("nan", "none", "", "this worksheet", "ons code")
+
+# Data rows before the first authority in Table A (read with header=1)
+TABLE_A_SKIP_ROWS = 2
+
+# Pre-processed CSV columns (input/other/msif_<year>_<year+1>_processed.csv)
+CSV_LA_COLUMN = "local_authority"
+CSV_RESIDENTIAL_COLUMN = "residential_65_median"
+CSV_NURSING_COLUMN = "nursing_65_median"
+
+_ONS_CODE = re.compile(r"^E\d{8}$")
+
+
+def find_table_a_sheet(sheet_names: Iterable[str], year: int) -> Optional[str]:
+    """
+    Find the Table A sheet for a year ("Table A 2025-26"), else any fees-like sheet.
+
+    Args:
+        sheet_names: Workbook sheet names
+        year: MSIF year (2025 = 2025-26)
+
+    Returns:
+        Sheet name, or None if not found
+    """
+    sheet_names = list(sheet_names)
+    for sheet_name in sheet_names:
+        sheet_lower = sheet_name.lower()
+        if "table a" in sheet_lower and str(year) in sheet_lower:
+            return sheet_name
+    for sheet_name in sheet_names:
+        if any(keyword in sheet_name.lower() for keyword in ["table a", "fees", "data"]):
+            return sheet_name
+    return None
+
+
+def detect_msif_columns(columns: Iterable, year: int) -> Dict[str, Optional[int]]:
+    """
+    Detect column positions in a Table A sheet.
+
+    Args:
+        columns: Sheet column labels (read with header=1)
+        year: MSIF year, matched in the fee column headers
+
+    Returns:
+        Dict with "local_authority", "ons_code", "residential" and "nursing" positions
+        (None where not found)
+    """
+    labels = [str(col).lower() for col in columns]
+    year_str = str(year)
+
+    la_idx = None
+    for idx, label in enumerate(labels):
+        if "local authority" in label or (idx == 1 and "unnamed" not in label):
+            la_idx = idx
+            break
+    if la_idx is None:
+        la_idx = 1
+
+    residential_idx = None
+    nursing_idx = None
+    ons_idx = None
+    for idx, label in enumerate(labels):
+        if "care homes without nursing" in label and "65" in label and year_str in label:
+            residential_idx = idx
+        elif "care homes with nursing" in label and "65" in label and year_str in label:
+            nursing_idx = idx
+        elif ons_idx is None and "ons" in label and "code" in label:
+            ons_idx = idx
+
+    # Fallback: known positions of the provisional fees in Table A
+    if residential_idx is None and len(labels) > 6:
+        residential_idx = 6
+    if nursing_idx is None and len(labels) > 9:
+        nursing_idx = 9
+
+    return {
+        "local_authority": la_idx,
+        "ons_code": ons_idx,
+        "residential": residential_idx,
+        "nursing": nursing_idx,
+    }
+
+
+def build_fee_frame(names, residential, nursing, ons_codes=None, sheet_rows: bool = True):
+    """
+    Build the typed fee frame from raw columns.
+
+    Rows are kept when the LA name is valid and at least one fee is non-zero
+    (as the row-by-row loaders did); fees that are not positive become NaN.
+
+    Args:
+        names: LA name column (pandas Series)
+        residential: Raw residential 65+ fee column
+        nursing: Raw nursing 65+ fee column
+        ons_codes: Optional ONS code column
+        sheet_rows: Also drop workbook note rows ("Table ...", "This worksheet", ...);
+            the pre-processed CSV only needs empty names dropped
+
+    Returns:
+        DataFrame with FRAME_COLUMNS
+    """
+    import numpy as np
+    import pandas as pd
+
+    names = names.where(names.notna(), "nan").astype(str).str.strip()
+    lowered = names.str.lower().to_numpy(dtype=object)
+    if sheet_rows:
+        valid_name = (
+            (names.str.len().to_numpy() >= 2)
+            & ~np.isin(lowered, INVALID_LA_NAMES)
+            & ~names.str.startswith("Table").to_numpy(dtype=bool)
+        )
+    else:
+        valid_name = ~np.isin(lowered, ("nan", "none", ""))
+
+    residential = pd.to_numeric(residential, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    nursing = pd.to_numeric(nursing, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    # NaN != 0 is True, so test notna explicitly (NaN counts as "no fee")
+    has_fee = (~np.isnan(residential) & (residential != 0)) | (~np.isnan(nursing) & (nursing != 0))
+    keep = valid_name & has_fee
+
+    with np.errstate(invalid="ignore"):
+        residential = np.where(residential[keep] > 0, residential[keep], np.nan)
+        nursing = np.where(nursing[keep] > 0, nursing[keep], np.nan)
+
+    if ons_codes is not None:
+        codes = ons_codes[keep]
+        codes = codes.where(codes.notna(), "").astype(str).str.strip().str.upper()
+        codes = np.where(codes.str.match(_ONS_CODE).to_numpy(dtype=bool), codes.to_numpy(dtype=object), None)
+    else:
+        codes = np.full(int(keep.sum()), None, dtype=object)
+
+    return pd.DataFrame({
+        "local_authority": names.to_numpy(dtype=object)[keep],
+        "ons_code": codes,
+        "residential": residential,
+        "residential_dementia": residential * DEMENTIA_UPLIFT,
+        "respite": residential,
+        "nursing": nursing,
+        "nursing_dementia": nursing * DEMENTIA_UPLIFT,
+    }, columns=list(FRAME_COLUMNS))
+
+
+def parse_table_a(df, year: int):
+    """
+    Parse a Table A sheet (read with header=1) into the typed fee frame.
+
+    Args:
+        df: Sheet DataFrame
+        year: MSIF year
+
+    Returns:
+        DataFrame with FRAME_COLUMNS
+
+    Raises:
+        FairCostDataError: If fee columns cannot be found
+    """
+    cols = detect_msif_columns(df.columns, year)
+    if cols["residential"] is None or cols["nursing"] is None:
+        raise FairCostDataError(
+            f"Could not find required fee columns. "
+            f"Residential col: {cols['residential']}, Nursing col: {cols['nursing']}. "
+            f"Available columns: {list(df.columns[:10])}"
+        )
+
+    logger.info(
+        "Found columns",
+        la_col=cols["local_authority"],
+        residential_col=cols["residential"],
+        nursing_col=cols["nursing"],
+        ons_col=cols["ons_code"],
+    )
+
+    data = df.iloc[TABLE_A_SKIP_ROWS:]
+    return build_fee_frame(
+        data.iloc[:, cols["local_authority"]],
+        data.iloc[:, cols["residential"]],
+        data.iloc[:, cols["nursing"]],
+        data.iloc[:, cols["ons_code"]] if cols["ons_code"] is not None else None,
+    )
+
+
+def parse_processed_csv(df):
+    """
+    Parse the pre-processed MSIF CSV into the typed fee frame.
+
+    Args:
+        df: CSV DataFrame
+
+    Returns:
+        DataFrame with FRAME_COLUMNS
+
+    Raises:
+        FairCostDataError: If required columns are missing
+    """
+    required_cols = [CSV_LA_COLUMN, CSV_RESIDENTIAL_COLUMN, CSV_NURSING_COLUMN]
+    missing_cols = [col for col in required_cols if col not in df.columns]
+    if missing_cols:
+        raise FairCostDataError(
+            f"CSV file missing required columns: {missing_cols}. "
+            f"Found columns: {list(df.columns)}"
+        )
+    return build_fee_frame(
+        df[CSV_LA_COLUMN],
+        df[CSV_RESIDENTIAL_COLUMN],
+        df[CSV_NURSING_COLUMN],
+        df["ons_code"] if "ons_code" in df.columns else None,
+        sheet_rows=False,
+    )
+
+
+def frame_to_fee_table(frame, merge_duplicates: bool = True) -> Dict[str, Dict[str, float]]:
+    """
+    Convert the typed fee frame to ``{local_authority: {care_type: fee}}``.
+
+    Args:
+        frame: DataFrame with FRAME_COLUMNS
+        merge_duplicates: For repeated LA names, merge fees into the earlier entry
+            (Table A behaviour); if False the last row replaces it (CSV behaviour)
+
+    Returns:
+        Fee table (missing fees are omitted)
+    """
+    return fee_table_from_columns(
+        {column: frame[column].tolist() for column in ("local_authority",) + FEE_COLUMNS},
+        merge_duplicates=merge_duplicates,
+    )
+
+
+def fee_table_from_columns(
+    columns: Dict[str, list], merge_duplicates: bool = True
+) -> Dict[str, Dict[str, float]]:
+    """
+    Build the fee table from plain column lists (typed frame columns as Python lists).
+
+    Args:
+        columns: "local_authority" and FEE_COLUMNS lists; missing fees are NaN or None
+        merge_duplicates: See ``frame_to_fee_table``
+
+    Returns:
+        Fee table (missing fees are omitted)
+    """
+    result: Dict[str, Dict[str, float]] = {}
+    fee_columns = [columns[column] for column in FEE_COLUMNS]
+    for la_name, *fees in zip(columns["local_authority"], *fee_columns):
+        entry = result.get(la_name) if merge_duplicates else None
+        if entry is None:
+            entry = result[la_name] = {}
+        for key, fee in zip(FEE_COLUMNS, fees):
+            if fee is not None and fee == fee:  # not missing/NaN
+                entry[key] = fee
+    return result
+
+
+def read_table_a(file_path: Path, year: int):
+    """
+    Read the Table A sheet of an MSIF workbook.
+
+    Args:
+        file_path: Path to the XLSX file
+        year: MSIF year
+
+    Returns:
+        Sheet DataFrame (header=1)
+
+    Raises:
+        FairCostDataError: If no Table A sheet is found
+    """
+    import pandas as pd
+
+    xls = pd.ExcelFile(file_path)
+    target_sheet = find_table_a_sheet(xls.sheet_names, year)
+    if target_sheet is None:
+        raise FairCostDataError(
+            f"Could not find Table A sheet in MSIF {year} file. Available sheets: {xls.sheet_names}"
+        )
+    logger.info("Using sheet", sheet=target_sheet)
+    return pd.read_excel(xls, sheet_name=target_sheet, header=1)
+
+
+def parse_msif_frame(file_path: Path, year: int = 2025):
+    """
+    Read and parse the Table A sheet of an MSIF workbook into the typed fee frame.
+
+    Args:
+        file_path: Path to the XLSX file
+        year: MSIF year (2025 = 2025-26, 2024 = 2024-25)
+
+    Returns:
+        DataFrame with FRAME_COLUMNS
+    """
+    return parse_table_a(read_table_a(file_path, year), year)
+
+
+def parse_msif_workbook(file_path: Path, year: int = 2025) -> Dict[str, Dict[str, float]]:
+    """
+    Parse an MSIF workbook into a fee table.
+
+    Args:
+        file_path: Path to the XLSX file
+        year: MSIF year (2025 = 2025-26, 2024 = 2024-25)
+
+    Returns:
+        Dict mapping: {local_authority: {care_type: median_fee_gbp}}
+
+    Raises:
+        FairCostDataError: If the workbook cannot be parsed or has no fee rows
+    """
+    result = frame_to_fee_table(parse_msif_frame(file_path, year))
+    if not result:
+        raise FairCostDataError("No valid data extracted from MSIF file")
+    return result
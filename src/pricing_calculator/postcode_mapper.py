@@ -6,6 +6,7 @@ from typing import Optional
 from datetime import datetime, timedelta
 import httpx
 import structlog
+from observability import TARGET_POSTCODES_IO, outbound_call, record_cache_lookup
 from .models import PostcodeInfo
 from .exceptions import PostcodeMappingError
 
@@ -16,7 +17,6 @@ POSTCODES_IO_API = "https://api.postcodes.io/postcodes/{postcode}"
 
 # Default cache directory
 DEFAULT_CACHE_DIR = Path.home() / ".cache" / "pricing_calculator"
-DEFAULT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 # SQLite cache database
 CACHE_DB = DEFAULT_CACHE_DIR / "postcode_cache.db"
@@ -40,6 +40,7 @@ class PostcodeMapper:
     
     def _init_cache_db(self) -> None:
         """Initialize SQLite cache database."""
+        Path(self.cache_db_path).parent.mkdir(parents=True, exist_ok=True)
         conn = sqlite3.connect(str(self.cache_db_path))
         cursor = conn.cursor()
         
@@ -119,7 +120,9 @@ class PostcodeMapper:
         
         try:
             with httpx.Client(timeout=10.0) as client:
-                response = client.get(url)
+                with outbound_call(TARGET_POSTCODES_IO) as call:
+                    response = client.get(url)
+                    call.status = response.status_code
                 response.raise_for_status()
                 data = response.json()
                 
@@ -197,6 +200,7 @@ class PostcodeMapper:
         """
         # Try cache first
         cached = self._get_from_cache(postcode)
+        record_cache_lookup("postcode", hit=bool(cached))
         if cached:
             return cached
         
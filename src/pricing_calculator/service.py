@@ -1,16 +1,32 @@
 """Main PricingService facade for pricing calculations."""
 
-from typing import Optional, List, Dict
+import threading
+import time
+from typing import Optional, List, Dict, Tuple
 import structlog
+from observability import span
 from .models import CareType, PricingResult
 from .fair_cost_loader import load_fair_cost_data
 from .lottie_scraper import get_lottie_price_sync
 from .postcode_mapper import get_postcode_info, PostcodeMapper
 from .band_calculator import calculate_band
+from .la_regions import get_la_region_index
+from .locations_table import LocationsTable
 from .exceptions import PricingCalculatorError
 
+try:
+    from data_ingestion.snapshot import PricingDataSnapshot, SnapshotStore, get_snapshot_store
+except ImportError:
+    PricingDataSnapshot = None
+    SnapshotStore = None
+    get_snapshot_store = None
+
 logger = structlog.get_logger(__name__)
 
+# Min seconds between attempts to load the local MSIF files after a failed load
+# (the loader may download)
+FAIR_COST_RETRY_SECONDS = 60
+
 
 class PricingService:
     """
@@ -19,25 +35,107 @@ class PricingService:
     This is the primary interface for all pricing calculations.
     """
     
-    def __init__(self, cache_dir: Optional[str] = None):
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        snapshot_store: Optional["SnapshotStore"] = None
+    ):
         """
         Initialize PricingService.
         
         Args:
             cache_dir: Optional cache directory path for data files
+            snapshot_store: Optional pricing data snapshot store (default: process-wide store)
         """
         logger.info("Initializing PricingService")
         
-        self.fair_cost_data: dict = {}
+        # Fair cost data comes from the current data snapshot, read on each access, so a
+        # refresh published by data_ingestion is picked up without restarting. While the
+        # snapshot has no MSIF fees it is loaded from the MSIF files (kept once loaded,
+        # retried while empty). Data assigned to fair_cost_data overrides both.
+        self._fair_cost_override: Optional[dict] = None
+        self._fair_cost_data: Optional[dict] = None
+        self._fair_cost_failed_at: Optional[float] = None
+        self._fair_cost_local_version = 0
+        self._fair_cost_lock = threading.Lock()
+        self._snapshot_store = snapshot_store
+        self._locations_table: Optional[LocationsTable] = None
+        self._locations_lock = threading.Lock()
         self.postcode_mapper = PostcodeMapper()
+    
+    @property
+    def fair_cost_data(self) -> dict:
+        """Fair cost data by local authority (current snapshot, else loaded on first access)."""
+        return self._get_fair_cost_source()[0]
+    
+    @fair_cost_data.setter
+    def fair_cost_data(self, value: dict) -> None:
+        self._fair_cost_override = value
+        self._fair_cost_local_version += 1
+    
+    @property
+    def data_version(self) -> str:
+        """Version tag of the fair cost data in use ("snapshot-<n>" or "local-<n>")."""
+        return self._get_fair_cost_source()[1]
+    
+    def _get_fair_cost_source(self) -> Tuple[dict, str]:
+        """Fair cost data together with its version tag (read consistently)."""
+        override = self._fair_cost_override
+        if override is not None:
+            return override, f"local-{self._fair_cost_local_version}"
         
-        # Load fair cost data (synchronous, cached)
+        snapshot = self._get_snapshot()
+        if snapshot is not None:
+            fees = snapshot.msif_fees(2025) or snapshot.msif_fees(2024)
+            if fees:
+                return fees, f"snapshot-{snapshot.version}"
+        
+        # Fallback; an empty (failed) load is not kept, it is retried after
+        # FAIR_COST_RETRY_SECONDS
+        with self._fair_cost_lock:
+            if not self._fair_cost_data:
+                failed_at = self._fair_cost_failed_at
+                if failed_at is not None and time.monotonic() - failed_at < FAIR_COST_RETRY_SECONDS:
+                    return {}, f"local-{self._fair_cost_local_version}"
+                data = self._load_fair_cost_data()
+                if not data:
+                    self._fair_cost_failed_at = time.monotonic()
+                    return {}, f"local-{self._fair_cost_local_version}"
+                self._fair_cost_data = data
+                self._fair_cost_failed_at = None
+                self._fair_cost_local_version += 1
+            return self._fair_cost_data, f"local-{self._fair_cost_local_version}"
+    
+    def _get_snapshot_store(self) -> Optional["SnapshotStore"]:
+        """Get the snapshot store (None if data_ingestion is unavailable)."""
+        if self._snapshot_store is None and get_snapshot_store is not None:
+            self._snapshot_store = get_snapshot_store()
+        return self._snapshot_store
+    
+    def _get_snapshot(self) -> Optional["PricingDataSnapshot"]:
+        """Current pricing data snapshot (None if not available)."""
+        store = self._get_snapshot_store()
+        if store is None:
+            return None
+        try:
+            return store.current()
+        except Exception as e:
+            logger.warning("Pricing data snapshot not available", error=str(e))
+            return None
+    
+    def _load_fair_cost_data(self) -> dict:
+        """Load fair cost data (synchronous, file-cached)."""
         try:
-            self.fair_cost_data = load_fair_cost_data()
-            logger.info("Loaded fair cost data", la_count=len(self.fair_cost_data))
+            data = load_fair_cost_data()
+            logger.info("Loaded fair cost data", la_count=len(data))
+            return data
         except Exception as e:
             logger.warning("Failed to load fair cost data", error=str(e))
-            self.fair_cost_data = {}
+            return {}
+    
+    def warm_up(self) -> None:
+        """Build the data snapshot / load fair cost data ahead of the first request."""
+        _ = self.fair_cost_data
     
     def get_pricing_for_postcode(
         self,
@@ -77,7 +175,8 @@ class PricingService:
         
         try:
             # 1. Get postcode info (Local Authority, Region)
-            postcode_info = self.postcode_mapper.get_postcode_info(postcode)
+            with span("pricing.postcode_lookup"):
+                postcode_info = self.postcode_mapper.get_postcode_info(postcode)
             logger.debug("Postcode info", info=postcode_info.model_dump())
             
             # 2. Get fair cost lower bound (MSIF median)
@@ -89,10 +188,11 @@ class PricingService:
                 fair_cost_lower = la_data.get(care_type_key)
             
             # 3. Get private average (Lottie 2025)
-            private_average = get_lottie_price_sync(
-                postcode_info.region,
-                care_type
-            )
+            with span("pricing.lottie_lookup"):
+                private_average = get_lottie_price_sync(
+                    postcode_info.region,
+                    care_type
+                )
             
             if private_average == 0:
                 raise PricingCalculatorError(
@@ -112,14 +212,15 @@ class PricingService:
                 expected_range_max = max(expected_range_max, private_average * 1.20)
             
             # 5. Calculate affordability band
-            band_result = calculate_band(
-                base_private_avg=private_average,
-                fair_cost_lower=fair_cost_lower,
-                cqc_rating=cqc_rating,
-                facilities_score=facilities_score,
-                bed_count=bed_count,
-                is_chain=is_chain
-            )
+            with span("pricing.band"):
+                band_result = calculate_band(
+                    base_private_avg=private_average,
+                    fair_cost_lower=fair_cost_lower,
+                    cqc_rating=cqc_rating,
+                    facilities_score=facilities_score,
+                    bed_count=bed_count,
+                    is_chain=is_chain
+                )
             
             # 6. Calculate fair cost gap
             if fair_cost_lower:
@@ -202,30 +303,67 @@ class PricingService:
         """
         logger.info("Getting all locations pricing", care_type=care_type.value if care_type else None)
         
-        result = []
+        care_types_to_process = [care_type] if care_type else list(CareType)
+        result = self._build_location_rows(self.fair_cost_data, care_types_to_process)
         
-        # Get all Local Authorities from MSIF data
-        for la_name, la_data in self.fair_cost_data.items():
-            # Try to get region for this LA (we'll need to map LA to region)
-            # For now, we'll use a simplified approach
+        logger.info("Generated pricing data", locations=len(result))
+        return result
+    
+    def get_locations_table(self) -> LocationsTable:
+        """
+        Get the indexed locations table for the current data version.
+        
+        The table is built once per data version (snapshot version, or local data
+        replaced via ``fair_cost_data``) and shared by all requests.
+        
+        Returns:
+            LocationsTable
+        """
+        data, version = self._get_fair_cost_source()
+        table = self._locations_table
+        if table is None or table.version != version:
+            with self._locations_lock:
+                table = self._locations_table
+                if table is None or table.version != version:
+                    with span("pricing.locations_build"):
+                        rows = self._build_location_rows(data, list(CareType))
+                        table = LocationsTable(rows, version)
+                    self._locations_table = table
+                    logger.info("Built locations table", version=version, rows=len(table))
+        return table
+    
+    def _build_location_rows(self, fair_cost_data, care_types: List[CareType]) -> List[Dict]:
+        """
+        Build LA x care-type pricing rows in a single pass.
+        
+        Args:
+            fair_cost_data: Fair cost data by local authority
+            care_types: Care types to include
             
-            # Get care types available for this LA
-            care_types_to_process = [care_type] if care_type else [
-                CareType.RESIDENTIAL,
-                CareType.NURSING,
-                CareType.RESIDENTIAL_DEMENTIA,
-                CareType.NURSING_DEMENTIA,
-                CareType.RESPITE
-            ]
+        Returns:
+            List of row dicts
+        """
+        la_index = get_la_region_index()
+        # Lottie prices depend only on (region, care type): look each pair up once
+        lottie_prices: Dict[tuple, float] = {}
+        result = []
+        
+        # Single pass over Local Authorities from MSIF data
+        for la_name, la_data in fair_cost_data.items():
+            la_info = la_index.lookup(la_name)
+            if la_info is None:
+                logger.debug("Local authority not in region lookup", la=la_name)
+                region, ons_code = "England", None
+            else:
+                region, ons_code = la_info["region"], la_info["ons_code"]
             
-            for ct in care_types_to_process:
+            for ct in care_types:
                 fair_cost = la_data.get(ct.value)
                 
-                # Estimate region from LA name (simplified - in production would use proper mapping)
-                region = self._estimate_region_from_la(la_name)
-                
-                # Get Lottie price for region
-                lottie_price = get_lottie_price_sync(region, ct)
+                key = (region, ct)
+                lottie_price = lottie_prices.get(key)
+                if lottie_price is None:
+                    lottie_price = lottie_prices[key] = get_lottie_price_sync(region, ct)
                 
                 # Calculate band
                 band_result = calculate_band(
@@ -238,6 +376,7 @@ class PricingService:
                 
                 result.append({
                     "local_authority": la_name,
+                    "ons_code": ons_code,
                     "region": region,
                     "care_type": ct.value,
                     "fair_cost_lower_bound_gbp": fair_cost,
@@ -248,49 +387,16 @@ class PricingService:
                     "fair_cost_gap_percent": gap_percent,
                 })
         
-        logger.info("Generated pricing data", locations=len(result))
         return result
     
     def _estimate_region_from_la(self, la_name: str) -> str:
         """
-        Estimate region from Local Authority name.
-        This is a simplified mapping - in production would use proper ONS data.
-        """
-        la_lower = la_name.lower()
-        
-        # London boroughs
-        london_boroughs = ["westminster", "camden", "islington", "hackney", "tower hamlets",
-                           "greenwich", "lewisham", "southwark", "lambeth", "wandsworth",
-                           "hammersmith", "kensington", "chelsea", "fulham", "brent",
-                           "ealing", "hounslow", "richmond", "kingston", "merton",
-                           "sutton", "croydon", "bromley", "bexley", "greenwich",
-                           "hackney", "haringey", "enfield", "barnet", "harrow",
-                           "hillingdon", "barking", "dagenham", "havering", "redbridge",
-                           "newham", "waltham", "forest"]
+        Get region for a Local Authority name.
         
-        if any(borough in la_lower for borough in london_boroughs):
-            return "London"
-        
-        # Regional keywords
-        if any(word in la_lower for word in ["kent", "sussex", "surrey", "hampshire", "berkshire", "oxfordshire"]):
-            return "South East"
-        if any(word in la_lower for word in ["devon", "cornwall", "somerset", "dorset", "wiltshire", "gloucestershire"]):
-            return "South West"
-        if any(word in la_lower for word in ["birmingham", "coventry", "wolverhampton", "dudley", "walsall", "sandwell", "solihull"]):
-            return "West Midlands"
-        if any(word in la_lower for word in ["leicester", "nottingham", "derby", "northampton", "lincoln"]):
-            return "East Midlands"
-        if any(word in la_lower for word in ["york", "leeds", "sheffield", "bradford", "hull", "doncaster"]):
-            return "Yorkshire and the Humber"
-        if any(word in la_lower for word in ["manchester", "liverpool", "bolton", "bury", "oldham", "rochdale", "salford", "stockport", "tameside", "trafford", "wigan"]):
-            return "North West"
-        if any(word in la_lower for word in ["newcastle", "sunderland", "middlesbrough", "durham", "gateshead"]):
-            return "North East"
-        if any(word in la_lower for word in ["norfolk", "suffolk", "cambridgeshire", "essex", "hertfordshire", "bedfordshire"]):
-            return "East of England"
-        
-        # Default fallback
-        return "England"
+        Kept for callers of the old keyword-based estimate; uses the ONS-based
+        LA -> region table.
+        """
+        return get_la_region_index().region_for(la_name)
     
     def _generate_negotiation_text(
         self,
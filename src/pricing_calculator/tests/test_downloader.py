@@ -0,0 +1,195 @@
+"""Tests for downloader.py."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from observability import TARGET_MSIF
+from pricing_calculator.downloader import (
+    async_conditional_download,
+    conditional_download,
+    meta_path,
+    read_meta,
+)
+
+
+class FakeServer:
+    """MockTransport handler serving one body with ETag/Last-Modified validators."""
+
+    def __init__(self, body=b"workbook v1", etag='"v1"', last_modified="Mon, 01 Sep 2025 10:00:00 GMT"):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        if self.etag and request.headers.get("if-none-match") == self.etag:
+            return httpx.Response(304)
+        headers = {}
+        if self.etag:
+            headers["ETag"] = self.etag
+        if self.last_modified:
+            headers["Last-Modified"] = self.last_modified
+        return httpx.Response(200, content=self.body, headers=headers)
+
+    def client(self):
+        return httpx.Client(transport=httpx.MockTransport(self))
+
+    def async_client(self):
+        return httpx.AsyncClient(transport=httpx.MockTransport(self))
+
+
+@pytest.fixture
+def server():
+    return FakeServer()
+
+
+URL = "https://example.com/msif.xlsx"
+
+
+class TestConditionalDownload:
+    """Test conditional_download function."""
+
+    def test_first_download(self, server, tmp_path):
+        """Test unconditional first request writes file and metadata."""
+        dest = tmp_path / "msif.xlsx"
+        result = conditional_download(URL, dest, TARGET_MSIF, client=server.client())
+
+        assert result.status_code == 200
+        assert result.modified is True
+        assert dest.read_bytes() == b"workbook v1"
+        assert "if-none-match" not in server.requests[0].headers
+        meta = read_meta(dest)
+        assert meta["etag"] == '"v1"'
+        assert meta["size_bytes"] == len(b"workbook v1")
+
+    def test_not_modified(self, server, tmp_path):
+        """Test validators are sent and the cached file is kept on 304."""
+        dest = tmp_path / "msif.xlsx"
+        conditional_download(URL, dest, TARGET_MSIF, client=server.client())
+        first_sha = read_meta(dest)["sha256"]
+
+        result = conditional_download(URL, dest, TARGET_MSIF, client=server.client())
+
+        request = server.requests[-1]
+        assert request.headers["if-none-match"] == '"v1"'
+        assert request.headers["if-modified-since"] == server.last_modified
+        assert result.status_code == 304
+        assert result.modified is False
+        assert result.sha256 == first_sha
+        assert dest.read_bytes() == b"workbook v1"
+
+    def test_changed_content(self, server, tmp_path):
+        """Test a new ETag replaces the file."""
+        dest = tmp_path / "msif.xlsx"
+        conditional_download(URL, dest, TARGET_MSIF, client=server.client())
+        server.body, server.etag = b"workbook v2", '"v2"'
+
+        result = conditional_download(URL, dest, TARGET_MSIF, client=server.client())
+
+        assert result.modified is True
+        assert dest.read_bytes() == b"workbook v2"
+        assert read_meta(dest)["etag"] == '"v2"'
+
+    def test_same_content_without_validators(self, tmp_path):
+        """Test a 200 with identical bytes is reported as not modified."""
+        server = FakeServer(etag=None, last_modified=None)
+        dest = tmp_path / "msif.xlsx"
+        conditional_download(URL, dest, TARGET_MSIF, client=server.client())
+
+        result = conditional_download(URL, dest, TARGET_MSIF, client=server.client())
+
+        assert result.status_code == 200
+        assert result.modified is False
+
+    def test_force_and_url_change_skip_validators(self, server, tmp_path):
+        """Test validators are not sent when forced or for another URL."""
+        dest = tmp_path / "msif.xlsx"
+        conditional_download(URL, dest, TARGET_MSIF, client=server.client())
+
+        conditional_download(URL, dest, TARGET_MSIF, client=server.client(), force=True)
+        conditional_download(URL + "?v=2", dest, TARGET_MSIF, client=server.client())
+
+        assert "if-none-match" not in server.requests[1].headers
+        assert "if-none-match" not in server.requests[2].headers
+
+    def test_missing_file_ignores_metadata(self, server, tmp_path):
+        """Test metadata without the cached file does not produce a conditional request."""
+        dest = tmp_path / "msif.xlsx"
+        conditional_download(URL, dest, TARGET_MSIF, client=server.client())
+        dest.unlink()
+
+        result = conditional_download(URL, dest, TARGET_MSIF, client=server.client())
+
+        assert result.status_code == 200
+        assert dest.exists()
+
+    def test_streams_in_chunks(self, tmp_path):
+        """Test the body is written chunk by chunk."""
+        body = bytes(range(256)) * 1024
+        server = FakeServer(body=body)
+        dest = tmp_path / "big.bin"
+
+        result = conditional_download(URL, dest, TARGET_MSIF, client=server.client(), chunk_size=4096)
+
+        assert result.size_bytes == len(body)
+        assert dest.read_bytes() == body
+
+    def test_error_keeps_cached_file(self, server, tmp_path):
+        """Test an error response leaves the cached copy and metadata intact."""
+        dest = tmp_path / "msif.xlsx"
+        conditional_download(URL, dest, TARGET_MSIF, client=server.client())
+        meta_before = meta_path(dest).read_text()
+
+        failing = httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(500)))
+        with pytest.raises(httpx.HTTPStatusError):
+            conditional_download(URL, dest, TARGET_MSIF, client=failing)
+
+        assert dest.read_bytes() == b"workbook v1"
+        assert meta_path(dest).read_text() == meta_before
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["msif.xlsx", "msif.xlsx.meta.json"]
+
+
+class TestAsyncConditionalDownload:
+    """Test async_conditional_download function."""
+
+    @staticmethod
+    def _download(server, dest, **kwargs):
+        async def run():
+            async with server.async_client() as client:
+                return await async_conditional_download(URL, dest, TARGET_MSIF, client, **kwargs)
+        return asyncio.run(run())
+
+    def test_download_then_not_modified(self, server, tmp_path):
+        """Test the async variant shares metadata and validators with the sync one."""
+        dest = tmp_path / "msif.xlsx"
+        first = self._download(server, dest)
+        assert first.modified is True
+        assert dest.read_bytes() == b"workbook v1"
+
+        second = conditional_download(URL, dest, TARGET_MSIF, client=server.client())
+        assert second.modified is False
+
+        third = self._download(server, dest)
+        assert third.status_code == 304
+        assert third.sha256 == first.sha256
+        assert server.requests[-1].headers["if-none-match"] == '"v1"'
+
+    def test_error_keeps_cached_file(self, server, tmp_path):
+        """Test a failed async download leaves the cached copy untouched."""
+        dest = tmp_path / "msif.xlsx"
+        self._download(server, dest)
+
+        async def failing(request):
+            return httpx.Response(503)
+
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(failing)) as client:
+                await async_conditional_download(URL, dest, TARGET_MSIF, client, force=True)
+
+        with pytest.raises(httpx.HTTPStatusError):
+            asyncio.run(run())
+        assert dest.read_bytes() == b"workbook v1"
+        assert not list(tmp_path.glob(".*.part"))
@@ -33,37 +33,37 @@ def test_is_file_stale_recent():
         temp_path.unlink()
 
 
-@patch("pricing_calculator.fair_cost_loader.httpx.Client")
+@patch("pricing_calculator.downloader.httpx.Client")
 def test_download_file_success(mock_client_class):
     """Test successful file download."""
     mock_response = MagicMock()
-    mock_response.content = b"fake xlsx content"
+    mock_response.status_code = 200
+    mock_response.headers = {"etag": '"v1"'}
+    mock_response.iter_bytes.return_value = [b"fake xlsx ", b"content"]
     mock_response.raise_for_status = MagicMock()
     
     mock_client = MagicMock()
-    mock_client.__enter__ = MagicMock(return_value=mock_client)
-    mock_client.__exit__ = MagicMock(return_value=False)
-    mock_client.get.return_value = mock_response
+    mock_client.stream.return_value.__enter__.return_value = mock_response
     mock_client_class.return_value = mock_client
     
     import tempfile
     temp_path = Path(tempfile.mktemp(suffix=".xlsx"))
     
     try:
-        _download_file("http://example.com/file.xlsx", temp_path)
-        assert temp_path.exists()
+        result = _download_file("http://example.com/file.xlsx", temp_path)
+        assert temp_path.read_bytes() == b"fake xlsx content"
+        assert result.modified is True
     finally:
-        if temp_path.exists():
-            temp_path.unlink()
+        for path in (temp_path, Path(str(temp_path) + ".meta.json")):
+            if path.exists():
+                path.unlink()
 
 
-@patch("pricing_calculator.fair_cost_loader.httpx.Client")
+@patch("pricing_calculator.downloader.httpx.Client")
 def test_download_file_error(mock_client_class):
     """Test file download error handling."""
     mock_client = MagicMock()
-    mock_client.__enter__ = MagicMock(return_value=mock_client)
-    mock_client.__exit__ = MagicMock(return_value=False)
-    mock_client.get.side_effect = Exception("Network error")
+    mock_client.stream.side_effect = Exception("Network error")
     mock_client_class.return_value = mock_client
     
     import tempfile
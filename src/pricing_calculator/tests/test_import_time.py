@@ -0,0 +1,150 @@
+"""Import-time budget for the combined API app.
+
+Runs ``python -X importtime`` in a subprocess so the measurement starts from a clean
+interpreter. Fails if app startup pulls in heavy optional dependencies again or if the
+total import time regresses past the budget.
+"""
+
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+APP_MODULE = "pricing_calculator.example_api_usage"
+
+# Generous for slow CI machines; locally the app imports in well under a second
+IMPORT_BUDGET_MS = int(os.getenv("IMPORT_TIME_BUDGET_MS", "2500"))
+
+# Must only be imported on first use (PDF rendering, XLS parsing, scraping, caches, UI)
+HEAVY_MODULES = [
+    "pandas",
+    "numpy",
+    "openpyxl",
+    "weasyprint",
+    "jinja2",
+    "selectolax",
+    "redis",
+    "streamlit",
+    "folium",
+    "streamlit_folium",
+]
+
+SRC_DIR = Path(__file__).resolve().parents[2]
+
+
+def _run_importtime(home: Path) -> dict:
+    """Import the app with -X importtime; return {module: cumulative_us}."""
+    env = dict(os.environ)
+    env["HOME"] = str(home)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH")]))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {APP_MODULE}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        timeout=120,
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+@pytest.fixture(scope="module")
+def import_profile(tmp_path_factory):
+    home = tmp_path_factory.mktemp("home")
+    return home, _run_importtime(home)
+
+
+def test_heavy_modules_not_imported(import_profile):
+    """Heavy dependencies stay lazy."""
+    _, modules = import_profile
+    loaded = sorted(m for m in modules if m.split(".")[0] in HEAVY_MODULES)
+    assert loaded == []
+
+
+@pytest.mark.benchmark
+def test_import_time_budget(import_profile):
+    """Total app import time stays within budget."""
+    _, modules = import_profile
+    total_ms = modules[APP_MODULE] / 1000
+    assert total_ms < IMPORT_BUDGET_MS, (
+        f"{APP_MODULE} import: {total_ms:.0f} ms (budget {IMPORT_BUDGET_MS} ms)"
+    )
+
+
+def test_no_filesystem_side_effects(import_profile):
+    """Importing the app does not create cache directories."""
+    home, _ = import_profile
+    assert not (home / ".cache").exists()
+
+
+@patch("pricing_calculator.service.load_fair_cost_data")
+def test_service_defers_fair_cost_loading(mock_load):
+    """Without snapshot data, fair cost data is loaded on first access, once."""
+    from data_ingestion.snapshot import SnapshotStore
+    from pricing_calculator.service import PricingService
+
+    mock_load.return_value = {"Birmingham": {"residential": 750.0}}
+    loader = MagicMock(return_value={"msif": {}, "lottie": {}, "sources": {}})
+
+    service = PricingService(snapshot_store=SnapshotStore(loader=loader))
+    mock_load.assert_not_called()
+    loader.assert_not_called()
+
+    assert service.fair_cost_data["Birmingham"]["residential"] == 750.0
+    service.warm_up()
+    mock_load.assert_called_once()
+    loader.assert_called_once()
+
+
+@patch("pricing_calculator.service.load_fair_cost_data")
+def test_service_prefers_snapshot_over_local_fallback(mock_load):
+    """A snapshot published after the local fallback ran is used; failed loads are not kept."""
+    from data_ingestion.snapshot import SnapshotStore
+    from pricing_calculator.service import FAIR_COST_RETRY_SECONDS, PricingService
+
+    mock_load.side_effect = [{}, {"Birmingham": {"residential": 700.0}}]
+    store = SnapshotStore(loader=lambda: {"msif": {}, "lottie": {}, "sources": {}})
+    service = PricingService(snapshot_store=store)
+
+    assert service.fair_cost_data == {}
+    assert service.fair_cost_data == {}
+    mock_load.assert_called_once()
+
+    with patch("pricing_calculator.service.time.monotonic", return_value=time.monotonic() + FAIR_COST_RETRY_SECONDS):
+        assert service.fair_cost_data["Birmingham"]["residential"] == 700.0
+    assert service.data_version == "local-1"
+
+    store.publish(msif={2025: {"Birmingham": {"residential": 780.0}}})
+    assert service.fair_cost_data["Birmingham"]["residential"] == 780.0
+    assert service.data_version == f"snapshot-{store.version}"
+
+
+@patch("pricing_calculator.service.load_fair_cost_data")
+def test_service_reads_fair_cost_from_snapshot(mock_load):
+    """Fair cost data follows the published snapshot version."""
+    from data_ingestion.snapshot import SnapshotStore
+    from pricing_calculator.service import PricingService
+
+    store = SnapshotStore(loader=lambda: {
+        "msif": {2025: {"Birmingham": {"residential": 750.0}}},
+        "lottie": {},
+        "sources": {},
+    })
+    service = PricingService(snapshot_store=store)
+
+    assert service.fair_cost_data["Birmingham"]["residential"] == 750.0
+
+    store.publish(msif={2025: {"Birmingham": {"residential": 780.0}}})
+    assert service.fair_cost_data["Birmingham"]["residential"] == 780.0
+    mock_load.assert_not_called()
@@ -0,0 +1,94 @@
+"""Tests for la_regions.py."""
+
+from collections import Counter
+
+import pytest
+
+from pricing_calculator.la_regions import (
+    LARegionIndex,
+    LOCAL_AUTHORITIES,
+    REGION_CODES,
+    _read_ons_lookup_csv,
+    normalize_la_name,
+)
+from pricing_calculator.constants import LOTTIE_2025_REGIONAL_AVERAGES
+
+
+def test_table_covers_all_social_care_authorities():
+    """Test the built-in table has every English council with social care duties."""
+    assert len(LOCAL_AUTHORITIES) == 153
+    counts = Counter(region for _, region in LOCAL_AUTHORITIES.values())
+    assert counts["London"] == 33
+    assert set(counts) == set(REGION_CODES)
+
+
+def test_regions_match_lottie_regions():
+    """Test every region has Lottie averages."""
+    for region in REGION_CODES:
+        assert region in LOTTIE_2025_REGIONAL_AVERAGES
+
+
+@pytest.mark.parametrize("name,expected", [
+    ("Bristol, City of", "bristol"),
+    ("City of Bristol", "bristol"),
+    ("Bristol City Council", "bristol"),
+    ("St. Helens", "st helens"),
+    ("Brighton & Hove", "brighton and hove"),
+    ("Royal Borough of Greenwich", "greenwich"),
+])
+def test_normalize_la_name(name, expected):
+    """Test name normalization."""
+    assert normalize_la_name(name) == expected
+
+
+@pytest.mark.parametrize("name,region", [
+    # Previously misclassified by keyword scanning
+    ("Bracknell Forest", "South East"),
+    ("Kingston upon Hull, City of", "Yorkshire and the Humber"),
+    ("Herefordshire, County of", "West Midlands"),
+    ("Cumberland", "North West"),
+    ("Milton Keynes", "South East"),
+    ("Stoke-on-Trent", "West Midlands"),
+    ("Bury", "North West"),
+    ("Kingston upon Thames", "London"),
+    ("Durham", "North East"),
+])
+def test_region_for(name, region):
+    """Test region lookup by name."""
+    assert LARegionIndex().region_for(name) == region
+
+
+def test_lookup_prefers_ons_code():
+    """Test ONS code wins over the name."""
+    info = LARegionIndex().lookup("Somewhere else", ons_code="e06000023")
+    assert info["local_authority"] == "Bristol, City of"
+    assert info["region_code"] == "E12000009"
+
+
+def test_unknown_authority():
+    """Test unknown names fall back to default region."""
+    index = LARegionIndex()
+    assert index.lookup("Atlantis") is None
+    assert index.region_for("Atlantis") == "England"
+
+
+def test_ons_lookup_csv(tmp_path):
+    """Test ONS lookup CSV extends the table."""
+    path = tmp_path / "lad_rgn.csv"
+    path.write_text(
+        "LAD23CD,LAD23NM,RGN23CD,RGN23NM,ObjectId\n"
+        "E07000008,Cambridge,E12000006,East of England,1\n"
+        "E07000117,Burnley,,North West,2\n"
+    )
+
+    extra = _read_ons_lookup_csv(path)
+    assert extra == {
+        "E07000008": ("Cambridge", "East of England"),
+        "E07000117": ("Burnley", "North West"),
+    }
+
+    index = LARegionIndex(extra)
+    assert index.region_for("Cambridge") == "East of England"
+    assert index.region_for(ons_code="E07000117") == "North West"
+    # Built-ins are kept
+    assert index.region_for("Birmingham") == "West Midlands"
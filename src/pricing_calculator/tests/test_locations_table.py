@@ -0,0 +1,175 @@
+"""Tests for locations_table.py and the /api/pricing/locations endpoint."""
+
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from pricing_calculator import api
+from pricing_calculator.locations_table import LocationsTable
+from pricing_calculator.service import PricingService
+
+
+def make_row(la, region, care_type, fair_cost, band, private_average=900.0):
+    """Build one locations row."""
+    return {
+        "local_authority": la,
+        "ons_code": None,
+        "region": region,
+        "care_type": care_type,
+        "fair_cost_lower_bound_gbp": fair_cost,
+        "private_average_gbp": private_average,
+        "affordability_band": band,
+        "band_confidence_percent": 90,
+        "fair_cost_gap_gbp": private_average - fair_cost if fair_cost else 0.0,
+        "fair_cost_gap_percent": 0.0,
+    }
+
+
+@pytest.fixture
+def table():
+    """Small table with mixed regions, bands and a missing fair cost."""
+    return LocationsTable([
+        make_row("Birmingham", "West Midlands", "residential", 750.0, "A"),
+        make_row("Birmingham", "West Midlands", "nursing", 950.0, "B"),
+        make_row("Camden", "London", "residential", 1000.0, "C"),
+        make_row("Camden", "London", "nursing", None, "E"),
+        make_row("Kent", "South East", "residential", 800.0, "B"),
+    ], version="v1")
+
+
+def reference_query(rows, region=None, band=None, min_fair_cost=None, max_fair_cost=None):
+    """Filters as previously applied by the endpoint with list comprehensions."""
+    data = list(rows)
+    if region:
+        data = [r for r in data if r["region"].lower() == region.lower()]
+    if min_fair_cost is not None:
+        data = [r for r in data if r["fair_cost_lower_bound_gbp"] and r["fair_cost_lower_bound_gbp"] >= min_fair_cost]
+    if max_fair_cost is not None:
+        data = [r for r in data if r["fair_cost_lower_bound_gbp"] and r["fair_cost_lower_bound_gbp"] <= max_fair_cost]
+    if band:
+        data = [r for r in data if r["affordability_band"].upper() == band.upper()]
+    return data
+
+
+class TestLocationsTable:
+    """Test LocationsTable class."""
+
+    @pytest.mark.parametrize("filters", [
+        {},
+        {"region": "london"},
+        {"band": "b"},
+        {"min_fair_cost": 800.0},
+        {"max_fair_cost": 950.0},
+        {"min_fair_cost": 760.0, "max_fair_cost": 1000.0, "band": "B"},
+        {"region": "Atlantis"},
+    ])
+    def test_filters_match_reference(self, table, filters):
+        """Test indexed filters return the same rows as the list-comprehension filters."""
+        result = table.query(**filters)
+        expected = reference_query(table._rows, **filters)
+        assert result["data"] == expected
+        assert result["total"] == len(expected)
+
+    def test_care_type_filter(self, table):
+        """Test care type index."""
+        result = table.query(care_type="nursing")
+        assert [r["local_authority"] for r in result["data"]] == ["Birmingham", "Camden"]
+
+    def test_sort_numeric_missing_last(self, table):
+        """Test numeric sort keeps missing fair costs last in both directions."""
+        asc = table.query(sort_by="fair_cost_lower_bound_gbp")["data"]
+        desc = table.query(sort_by="fair_cost_lower_bound_gbp", descending=True)["data"]
+        assert [r["fair_cost_lower_bound_gbp"] for r in asc] == [750.0, 800.0, 950.0, 1000.0, None]
+        assert [r["fair_cost_lower_bound_gbp"] for r in desc] == [1000.0, 950.0, 800.0, 750.0, None]
+
+    def test_sort_text_with_filter(self, table):
+        """Test text sort combined with a filter."""
+        result = table.query(care_type="residential", sort_by="local_authority", descending=True)
+        assert [r["local_authority"] for r in result["data"]] == ["Kent", "Camden", "Birmingham"]
+
+    def test_pagination(self, table):
+        """Test offset/limit apply after filtering and sorting."""
+        result = table.query(sort_by="fair_cost_lower_bound_gbp", offset=1, limit=2)
+        assert result["total"] == 5
+        assert [r["fair_cost_lower_bound_gbp"] for r in result["data"]] == [800.0, 950.0]
+
+    def test_invalid_sort(self, table):
+        """Test unknown sort column is rejected."""
+        with pytest.raises(ValueError):
+            table.query(sort_by="postcode")
+
+    def test_etag(self, table):
+        """Test ETag depends on version and query."""
+        assert table.etag(region="London") == table.etag(region="London", band=None)
+        assert table.etag(region="London") != table.etag(region="Kent")
+        other = LocationsTable(table._rows, version="v2")
+        assert table.etag(region="London") != other.etag(region="London")
+
+
+@patch("pricing_calculator.service.get_lottie_price_sync", return_value=900.0)
+def test_service_rebuilds_table_per_data_version(mock_lottie):
+    """Test the table is built once per data version."""
+    service = PricingService()
+    service.fair_cost_data = {"Birmingham": {"residential": 750.0}}
+
+    table = service.get_locations_table()
+    assert service.get_locations_table() is table
+    assert len(table) == 5
+
+    service.fair_cost_data = {"Birmingham": {"residential": 760.0}}
+    rebuilt = service.get_locations_table()
+    assert rebuilt is not table
+    assert rebuilt.query(care_type="residential")["data"][0]["fair_cost_lower_bound_gbp"] == 760.0
+
+
+@pytest.fixture
+def client(table):
+    """Client for the pricing router with a fixed locations table."""
+    app = FastAPI()
+    app.include_router(api.router)
+    with patch.object(api, "get_pricing_service") as mock_get_service:
+        mock_get_service.return_value.get_locations_table.return_value = table
+        yield TestClient(app)
+
+
+class TestLocationsEndpoint:
+    """Test GET /api/pricing/locations."""
+
+    def test_query_and_pagination(self, client):
+        """Test filters, sorting and pagination parameters."""
+        response = client.get(
+            "/api/pricing/locations",
+            params={"care_type": "residential", "sort_by": "fair_cost_lower_bound_gbp",
+                    "order": "desc", "limit": 2},
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert body["total"] == 3
+        assert body["data_version"] == "v1"
+        assert [r["local_authority"] for r in body["data"]] == ["Camden", "Kent"]
+
+    def test_etag_not_modified(self, client):
+        """Test If-None-Match with the current ETag returns 304."""
+        first = client.get("/api/pricing/locations", params={"region": "London"})
+        etag = first.headers["etag"]
+
+        second = client.get(
+            "/api/pricing/locations",
+            params={"region": "London"},
+            headers={"If-None-Match": etag},
+        )
+        assert second.status_code == 304
+        assert second.headers["etag"] == etag
+
+        other = client.get(
+            "/api/pricing/locations",
+            params={"region": "Kent"},
+            headers={"If-None-Match": etag},
+        )
+        assert other.status_code == 200
+
+    def test_invalid_sort(self, client):
+        """Test unknown sort column returns 400."""
+        response = client.get("/api/pricing/locations", params={"sort_by": "postcode"})
+        assert response.status_code == 400
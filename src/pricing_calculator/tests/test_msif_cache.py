@@ -0,0 +1,187 @@
+"""Tests for msif_cache.py."""
+
+import os
+import time
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from pricing_calculator import msif_cache
+from pricing_calculator.exceptions import FairCostDataError
+from pricing_calculator.fair_cost_loader import _parse_msif_xls
+from pricing_calculator.msif_cache import FORMAT_JSON, ParsedMSIFCache, file_sha256
+from pricing_calculator.msif_parser import parse_msif_frame, parse_msif_workbook
+
+COLUMNS = [
+    "ONS Code", "Local authority", "Region", "a", "b", "c",
+    "Care homes without nursing 65+ 2025-26", "d", "e",
+    "Care homes with nursing 65+ 2025-26",
+]
+
+
+def write_workbook(path, fees):
+    """Write a Table A workbook laid out like the gov.uk file."""
+    rows = [["Notes"] + [None] * 9, [None] * 10]
+    for i, (la, residential, nursing) in enumerate(fees):
+        rows.append([f"E0900{i:04d}", la, "London", None, None, None, residential, None, None, nursing])
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        pd.DataFrame(rows, columns=COLUMNS).to_excel(
+            writer, sheet_name="Table A 2025-26", index=False, startrow=1
+        )
+    return path
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    """Small MSIF workbook."""
+    return write_workbook(tmp_path / "msif.xlsx", [
+        ("Barnet", 1116.0, 1500.0),
+        ("Camden", 1200.0, None),
+        ("Barnet", None, 1550.0),  # duplicate LA: merged into the first entry
+    ])
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """JSON-format cache in a temp directory."""
+    return ParsedMSIFCache(tmp_path / "parsed", artifact_format=FORMAT_JSON)
+
+
+def counting_parser():
+    """Patch parse_msif_frame in msif_cache and count calls."""
+    return patch.object(msif_cache, "parse_msif_frame", side_effect=parse_msif_frame)
+
+
+class TestParsedMSIFCache:
+    """Test ParsedMSIFCache class."""
+
+    def test_miss_then_hit(self, cache, workbook):
+        """Test the workbook is parsed once and the artifact is reused."""
+        with counting_parser() as parse:
+            first = cache.load(workbook, 2025)
+            second = cache.load(workbook, 2025)
+
+        assert parse.call_count == 1
+        assert first == second == parse_msif_workbook(workbook, 2025)
+        assert first["Barnet"] == pytest.approx({
+            "residential": 1116.0, "residential_dementia": 1116.0 * 1.12, "respite": 1116.0,
+            "nursing": 1550.0, "nursing_dementia": 1550.0 * 1.12,
+        })
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_shared_between_instances(self, tmp_path, workbook):
+        """Test a new process (cache instance) reads the artifact instead of parsing."""
+        ParsedMSIFCache(tmp_path / "parsed", artifact_format=FORMAT_JSON).load(workbook, 2025)
+        with counting_parser() as parse:
+            ParsedMSIFCache(tmp_path / "parsed", artifact_format=FORMAT_JSON).load(workbook, 2025)
+        parse.assert_not_called()
+
+    def test_changed_workbook_reparsed(self, cache, workbook):
+        """Test a different workbook hash triggers a reparse."""
+        cache.load(workbook, 2025)
+        write_workbook(workbook, [("Barnet", 1200.0, 1600.0)])
+
+        with counting_parser() as parse:
+            result = cache.load(workbook, 2025)
+
+        assert parse.call_count == 1
+        assert result["Barnet"]["residential"] == 1200.0
+
+    def test_year_in_key(self, cache, workbook):
+        """Test the same file parsed for another year gets its own artifact."""
+        digest = file_sha256(workbook)
+        assert cache.artifact_path(digest, 2025) != cache.artifact_path(digest, 2024)
+
+    def test_corrupt_artifact_reparsed(self, cache, workbook):
+        """Test an unreadable artifact is discarded and rebuilt."""
+        cache.load(workbook, 2025)
+        artifact = cache.artifact_path(file_sha256(workbook), 2025)
+        artifact.write_text("{not json")
+
+        assert cache.load(workbook, 2025)["Camden"]["residential"] == 1200.0
+        assert cache.misses == 2
+        assert artifact.exists()
+
+    def test_write_failure_does_not_fail_load(self, cache, workbook):
+        """Test artifact write errors are logged, not raised."""
+        with patch("pricing_calculator.msif_cache.json.dump", side_effect=OSError("disk full")):
+            assert "Barnet" in cache.load(workbook, 2025)
+        assert cache.status()["artifacts"] == []
+
+    def test_parse_error(self, cache, tmp_path):
+        """Test parse errors propagate and nothing is cached."""
+        path = tmp_path / "bad.xlsx"
+        with pd.ExcelWriter(path, engine="openpyxl") as writer:
+            pd.DataFrame({"A": [1]}).to_excel(writer, sheet_name="Cover", index=False)
+
+        with pytest.raises(FairCostDataError):
+            cache.load(path, 2025)
+        assert cache.status()["artifacts"] == []
+
+    def test_prune(self, tmp_path):
+        """Test least recently used artifacts are removed beyond max_artifacts."""
+        cache = ParsedMSIFCache(tmp_path / "parsed", artifact_format=FORMAT_JSON, max_artifacts=2)
+        paths = []
+        for i in range(3):
+            paths.append(write_workbook(tmp_path / f"msif_{i}.xlsx", [("Barnet", 1000.0 + i, None)]))
+            cache.load(paths[-1], 2025)
+            artifact = cache.artifact_path(file_sha256(paths[-1]), 2025)
+            os.utime(artifact, (time.time() + i, time.time() + i))
+
+        names = [a["name"] for a in cache.status()["artifacts"]]
+        assert len(names) == 2
+        assert cache.artifact_path(file_sha256(paths[0]), 2025).name not in names
+
+    def test_status(self, cache, workbook, tmp_path):
+        """Test per-source status."""
+        missing = tmp_path / "missing.xlsx"
+        before = cache.status([(workbook, 2025), (missing, 2024)])
+        assert before["sources"][0]["cached"] is False
+        assert before["sources"][1] == {"file": str(missing), "year": 2024, "exists": False}
+
+        cache.load(workbook, 2025)
+        after = cache.status([(workbook, 2025)])
+        assert after["sources"][0]["cached"] is True
+        assert after["sources"][0]["sha256"] == file_sha256(workbook)
+        assert after["format"] == "json"
+        assert len(after["artifacts"]) == 1
+
+    def test_clear(self, cache, workbook):
+        """Test clear removes artifacts."""
+        cache.load(workbook, 2025)
+        assert cache.clear() == 1
+        assert cache.status()["artifacts"] == []
+
+    def test_arrow_format(self, tmp_path, workbook):
+        """Test Arrow IPC artifacts round-trip through the memory map."""
+        pytest.importorskip("pyarrow")
+        cache = ParsedMSIFCache(tmp_path / "parsed", artifact_format="arrow")
+        first = cache.load(workbook, 2025)
+        with counting_parser() as parse:
+            assert ParsedMSIFCache(tmp_path / "parsed", artifact_format="arrow").load(workbook, 2025) == first
+        parse.assert_not_called()
+
+
+def test_parse_msif_xls_uses_cache(tmp_path, workbook):
+    """Test the fair cost loader goes through the parsed cache."""
+    cache = ParsedMSIFCache(tmp_path / "parsed", artifact_format=FORMAT_JSON)
+    with patch("pricing_calculator.fair_cost_loader.get_parsed_msif_cache", return_value=cache):
+        _parse_msif_xls(workbook, year=2025)
+        _parse_msif_xls(workbook, year=2025)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.benchmark
+def test_warm_load_time(tmp_path, workbook):
+    """Test a warm (artifact) load is faster than a cold (openpyxl parse) one."""
+    cache = ParsedMSIFCache(tmp_path / "parsed", artifact_format=FORMAT_JSON)
+    start = time.perf_counter()
+    cache.load(workbook, 2025)
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cache.load(workbook, 2025)
+    warm = time.perf_counter() - start
+
+    assert warm < cold, f"MSIF load: parse {cold * 1000:.1f} ms, cached artifact {warm * 1000:.2f} ms"
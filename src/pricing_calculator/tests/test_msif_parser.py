@@ -0,0 +1,225 @@
+"""Tests for msif_parser.py (parity with the previous row-by-row loaders, parse benchmark)."""
+
+import random
+import time
+
+import pandas as pd
+import pytest
+
+from pricing_calculator.exceptions import FairCostDataError
+from pricing_calculator.msif_parser import (
+    detect_msif_columns,
+    find_table_a_sheet,
+    frame_to_fee_table,
+    parse_msif_workbook,
+    parse_processed_csv,
+    parse_table_a,
+)
+
+TABLE_A_COLUMNS = [
+    "ONS Code",
+    "Local authority",
+    "Region",
+    "Care homes without nursing 65+ 2024-25",
+    "Care homes with nursing 65+ 2024-25",
+    "Unnamed: 5",
+    "Care homes without nursing 65+ 2025-26 (provisional)",
+    "Unnamed: 7",
+    "Unnamed: 8",
+    "Care homes with nursing 65+ 2025-26 (provisional)",
+]
+
+
+def legacy_parse_table_a(df, la_col_idx=1, residential_col_idx=6, nursing_col_idx=9):
+    """Row loop of the previous fair_cost_loader/msif_loader Table A parsers."""
+    result = {}
+    for idx, row in df.iterrows():
+        if idx < 2:
+            continue
+        la_name = str(row.iloc[la_col_idx]).strip()
+        if (not la_name or
+                la_name.lower() in ["nan", "none", "", "this worksheet", "ons code"] or
+                la_name.startswith("Table") or
+                len(la_name) < 2):
+            continue
+        residential_fee = None
+        nursing_fee = None
+        if pd.notna(row.iloc[residential_col_idx]):
+            try:
+                residential_fee = float(row.iloc[residential_col_idx])
+            except (ValueError, TypeError):
+                pass
+        if pd.notna(row.iloc[nursing_col_idx]):
+            try:
+                nursing_fee = float(row.iloc[nursing_col_idx])
+            except (ValueError, TypeError):
+                pass
+        if residential_fee or nursing_fee:
+            if la_name not in result:
+                result[la_name] = {}
+            if residential_fee and residential_fee > 0:
+                result[la_name]["residential"] = residential_fee
+                result[la_name]["residential_dementia"] = residential_fee * 1.12
+                result[la_name]["respite"] = residential_fee
+            if nursing_fee and nursing_fee > 0:
+                result[la_name]["nursing"] = nursing_fee
+                result[la_name]["nursing_dementia"] = nursing_fee * 1.12
+    return result
+
+
+def legacy_parse_csv(df):
+    """Row loop of the previous MSIFLoader.load_msif_from_csv."""
+    result = {}
+    for _, row in df.iterrows():
+        la_name = str(row["local_authority"]).strip()
+        if not la_name or la_name.lower() in ["nan", "none", ""]:
+            continue
+        residential_fee = None
+        nursing_fee = None
+        if pd.notna(row["residential_65_median"]):
+            try:
+                residential_fee = float(row["residential_65_median"])
+            except (ValueError, TypeError):
+                pass
+        if pd.notna(row["nursing_65_median"]):
+            try:
+                nursing_fee = float(row["nursing_65_median"])
+            except (ValueError, TypeError):
+                pass
+        if residential_fee or nursing_fee:
+            result[la_name] = {}
+            if residential_fee and residential_fee > 0:
+                result[la_name]["residential"] = residential_fee
+                result[la_name]["residential_dementia"] = residential_fee * 1.12
+                result[la_name]["respite"] = residential_fee
+            if nursing_fee and nursing_fee > 0:
+                result[la_name]["nursing"] = nursing_fee
+                result[la_name]["nursing_dementia"] = nursing_fee * 1.12
+    return result
+
+
+def make_table_a(n_rows, seed=0):
+    """Synthetic Table A sheet (as read with header=1) with note rows and messy cells."""
+    rng = random.Random(seed)
+    messy = [None, "", "n/a", "[x]", "£900", " 875.5 ", 0, -10.0, "1,200"]
+    rows = [
+        ["This worksheet contains one table"] + [None] * 9,
+        [None] * 10,
+    ]
+    for i in range(n_rows):
+        la = f"Authority {i % max(1, n_rows - 5)}"  # a few duplicates
+        if i % 97 == 0:
+            la = rng.choice(["nan", "Table A notes", "x", None, "ONS code"])
+        residential = rng.choice(messy) if i % 11 == 0 else round(rng.uniform(600, 1400), 2)
+        nursing = rng.choice(messy) if i % 13 == 0 else round(rng.uniform(800, 1600), 2)
+        rows.append([f"E06{i:06d}", la, "Region", 1.0, 2.0, None, residential, None, None, nursing])
+    return pd.DataFrame(rows, columns=TABLE_A_COLUMNS)
+
+
+def make_csv_frame(n_rows, seed=0):
+    """Synthetic pre-processed CSV frame."""
+    rng = random.Random(seed)
+    messy = [None, "", "n/a", 0, -5.0]
+    rows = []
+    for i in range(n_rows):
+        la = f"Authority {i % max(1, n_rows - 5)}" if i % 50 else rng.choice(["", None, "None", "T"])
+        residential = rng.choice(messy) if i % 7 == 0 else round(rng.uniform(600, 1400), 2)
+        nursing = rng.choice(messy) if i % 9 == 0 else round(rng.uniform(800, 1600), 2)
+        rows.append({"local_authority": la, "residential_65_median": residential, "nursing_65_median": nursing})
+    return pd.DataFrame(rows)
+
+
+class TestColumnDetection:
+    """Test sheet and column detection."""
+
+    def test_find_table_a_sheet(self):
+        """Test Table A sheet for the year is preferred."""
+        sheets = ["Cover", "Table A 2024-25", "Table A 2025-26"]
+        assert find_table_a_sheet(sheets, 2025) == "Table A 2025-26"
+        assert find_table_a_sheet(["Cover", "Fees"], 2025) == "Fees"
+        assert find_table_a_sheet(["Cover"], 2025) is None
+
+    def test_detect_columns_by_header(self):
+        """Test fee columns are matched by header text and year."""
+        labels = [
+            "ONS Code", "Local authority",
+            "Care homes without nursing 65+ 2025-26", "Care homes with nursing 65+ 2025-26",
+        ]
+        assert detect_msif_columns(labels, 2025) == {
+            "local_authority": 1, "ons_code": 0, "residential": 2, "nursing": 3,
+        }
+
+    def test_detect_columns_fallback_positions(self):
+        """Test known positions are used when headers do not match the year."""
+        cols = detect_msif_columns(TABLE_A_COLUMNS, 2023)
+        assert cols["residential"] == 6
+        assert cols["nursing"] == 9
+
+
+class TestParity:
+    """Vectorized parser returns exactly what the row loops returned."""
+
+    @pytest.mark.parametrize("n_rows,seed", [(0, 0), (160, 1), (1000, 2)])
+    def test_table_a_matches_legacy(self, n_rows, seed):
+        """Test Table A parity, including duplicates and messy cells."""
+        df = make_table_a(n_rows, seed)
+        assert frame_to_fee_table(parse_table_a(df, 2025)) == legacy_parse_table_a(df)
+
+    @pytest.mark.parametrize("n_rows,seed", [(0, 0), (160, 1), (1000, 2)])
+    def test_csv_matches_legacy(self, n_rows, seed):
+        """Test CSV parity (last duplicate wins)."""
+        df = make_csv_frame(n_rows, seed)
+        if df.empty:
+            df = pd.DataFrame(columns=["local_authority", "residential_65_median", "nursing_65_median"])
+        result = frame_to_fee_table(parse_processed_csv(df), merge_duplicates=False)
+        assert result == legacy_parse_csv(df)
+
+    def test_typed_frame(self):
+        """Test typed frame columns and ONS codes."""
+        frame = parse_table_a(make_table_a(20), 2025)
+        assert list(frame.columns[:2]) == ["local_authority", "ons_code"]
+        assert frame["residential"].dtype == "float64"
+        # row 0 is a note row ("nan"/"Table ..."), so the first authority is row 1
+        assert frame["ons_code"].iloc[0] == "E06000001"
+
+    def test_csv_missing_columns(self):
+        """Test missing CSV columns are reported."""
+        with pytest.raises(FairCostDataError):
+            parse_processed_csv(pd.DataFrame({"local_authority": ["Barnet"]}))
+
+
+def test_parse_msif_workbook(tmp_path):
+    """Test end-to-end parse of a workbook laid out like the gov.uk file."""
+    file_path = tmp_path / "msif.xlsx"
+    df = make_table_a(30)
+    with pd.ExcelWriter(file_path, engine="openpyxl") as writer:
+        df.to_excel(writer, sheet_name="Table A 2025-26", index=False, startrow=1)
+
+    result = parse_msif_workbook(file_path, 2025)
+    assert result == legacy_parse_table_a(pd.read_excel(file_path, sheet_name=0, header=1))
+    assert len(result) > 20
+
+
+class TestParseBenchmark:
+    """Parse time of the vectorized parser against the previous row loop."""
+
+    @staticmethod
+    def _best_of(func, repeat=3):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    @pytest.mark.benchmark
+    @pytest.mark.parametrize("n_rows", [160, 10_000])
+    def test_table_a_parse_time(self, n_rows):
+        """Vectorized parse beats the row loop; 160 rows ~ one MSIF workbook."""
+        df = make_table_a(n_rows)
+        legacy = self._best_of(lambda: legacy_parse_table_a(df))
+        vectorized = self._best_of(lambda: frame_to_fee_table(parse_table_a(df, 2025)))
+        assert vectorized < legacy, (
+            f"MSIF Table A parse, {n_rows} rows: iterrows {legacy * 1000:.1f} ms, "
+            f"vectorized {vectorized * 1000:.1f} ms"
+        )
@@ -91,6 +91,20 @@ def test_get_postcode_info_cached(mock_fetch):
     # Note: In real scenario, cache would be checked first
 
 
+def test_cache_lookups_recorded_as_postcode():
+    """Test postcode cache lookups are counted under the "postcode" cache label."""
+    mapper = PostcodeMapper()
+    cached = MagicMock(local_authority="Westminster")
+    with patch.object(mapper, "_get_from_cache", side_effect=[None, cached]), \
+         patch.object(mapper, "_fetch_from_api", return_value=cached), \
+         patch("pricing_calculator.postcode_mapper.record_cache_lookup") as record:
+        mapper.get_postcode_info("SW1A 1AA")
+        mapper.get_postcode_info("SW1A 1AA")
+    
+    assert [call.args for call in record.call_args_list] == [("postcode",), ("postcode",)]
+    assert [call.kwargs["hit"] for call in record.call_args_list] == [False, True]
+
+
 def test_get_postcode_info_function():
     """Test convenience function."""
     with patch("pricing_calculator.postcode_mapper.PostcodeMapper.get_postcode_info") as mock_get:
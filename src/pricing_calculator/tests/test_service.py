@@ -172,3 +172,30 @@ def test_generate_negotiation_text():
     assert "£750" in text
     assert "Band: B" in text or "Band B" in text
 
+
+
+@patch("pricing_calculator.service.get_lottie_price_sync")
+def test_get_all_locations_pricing(mock_lottie):
+    """Test locations table uses the LA -> region table and one Lottie lookup per region."""
+    mock_lottie.return_value = 900.0
+    
+    service = PricingService()
+    service.fair_cost_data = {
+        "Birmingham": {"residential": 750.0, "nursing": 950.0},
+        "Coventry": {"residential": 700.0},
+        "Bracknell Forest": {"residential": 850.0},
+        "Atlantis": {"residential": 600.0},
+    }
+    
+    rows = service.get_all_locations_pricing()
+    
+    assert len(rows) == 4 * 5
+    by_la = {row["local_authority"]: row for row in rows}
+    assert by_la["Birmingham"]["region"] == "West Midlands"
+    assert by_la["Birmingham"]["ons_code"] == "E08000025"
+    assert by_la["Bracknell Forest"]["region"] == "South East"
+    assert by_la["Atlantis"]["region"] == "England"
+    assert by_la["Atlantis"]["ons_code"] is None
+    
+    # 3 regions x 5 care types, not 4 LAs x 5 care types
+    assert mock_lottie.call_count == 15
@@ -4,6 +4,7 @@ from .service import PricingService
 from .models import PricingResult, CareType
 from .band_calculator import BandCalculatorV5
 from .adjustments import PriceAdjustments
+from .result_store import PricingResultStore, get_result_store
 
 __all__ = [
     "PricingService",
@@ -11,5 +12,7 @@ __all__ = [
     "CareType",
     "BandCalculatorV5",
     "PriceAdjustments",
+    "PricingResultStore",
+    "get_result_store",
 ]
 
@@ -1,38 +1,56 @@
 """FastAPI endpoints for pricing core module."""
 
+import importlib.util
 from typing import Optional
 import structlog
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from observability import span
 from .service import PricingService
 from .models import CareType, PricingResult
+from .result_store import get_result_store
 
 logger = structlog.get_logger(__name__)
 
 router = APIRouter(prefix="/api/pricing-core", tags=["pricing-core"])
 
-# Try to import weasyprint for PDF generation
-try:
-    from weasyprint import HTML
-    WEASYPRINT_AVAILABLE = True
-except ImportError:
-    WEASYPRINT_AVAILABLE = False
-    HTML = None
+# weasyprint is heavy (cairo/pango bindings); import it only when a PDF is rendered
+WEASYPRINT_AVAILABLE = importlib.util.find_spec("weasyprint") is not None
+HTML = None
+
+
+def _get_weasyprint_html():
+    """Lazy import weasyprint.HTML."""
+    global HTML
+    if HTML is None:
+        from weasyprint import HTML as _HTML
+        HTML = _HTML
+    return HTML
+
 
 # Global service instance
 _pricing_service: Optional[PricingService] = None
 
 
 def get_pricing_service() -> PricingService:
-    """Get or create PricingService instance."""
+    """Get or create PricingService instance (results shared via get_result_store)."""
     global _pricing_service
     if _pricing_service is None:
-        _pricing_service = PricingService()
+        _pricing_service = PricingService(result_store=get_result_store())
     return _pricing_service
 
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches etag (weak comparison)."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
 @router.get("/calculate", response_model=PricingResult)
 async def calculate_pricing(
+    request: Request,
     postcode: str = Query(..., description="UK postcode"),
     care_type: CareType = Query(..., description="Care type"),
     cqc_rating: Optional[str] = Query(None, description="CQC rating"),
@@ -45,10 +63,11 @@ async def calculate_pricing(
     Calculate full pricing with Band v5 logic.
     
     Returns complete pricing analysis including affordability band and adjustments.
+    Responses carry an ETag; a request whose If-None-Match matches gets 304.
     """
     try:
         service = get_pricing_service()
-        result = service.get_full_pricing(
+        stored = service.get_pricing_entry(
             postcode=postcode,
             care_type=care_type,
             cqc_rating=cqc_rating,
@@ -57,7 +76,12 @@ async def calculate_pricing(
             is_chain=is_chain,
             scraped_price=scraped_price
         )
-        return result
+        # Serialize explicitly so the cost shows up as its own stage (once per stored result)
+        with span("pricing_core.serialize"):
+            headers = {"ETag": stored.etag, "Cache-Control": "private, no-cache"}
+            if _etag_matches(request.headers.get("if-none-match"), stored.etag):
+                return Response(status_code=304, headers=headers)
+            return Response(content=stored.body, media_type="application/json", headers=headers)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -192,7 +216,7 @@ async def generate_pdf_report(
         
         # Convert HTML to PDF
         try:
-            pdf_bytes = HTML(string=html_content).write_pdf()
+            pdf_bytes = _get_weasyprint_html()(string=html_content).write_pdf()
         except Exception as pdf_error:
             logger.error("WeasyPrint PDF generation failed", error=str(pdf_error), error_type=type(pdf_error).__name__)
             raise HTTPException(
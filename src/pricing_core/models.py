@@ -54,6 +54,7 @@ class PricingResult(BaseModel):
     # Output text
     negotiation_leverage_text: str = Field(..., description="Ready-to-use text for PDF report")
     sources_used: list[str] = Field(default_factory=list, description="Data sources used")
+    data_version: Optional[int] = Field(None, description="Pricing data snapshot version used")
     
     @field_validator("band_score")
     @classmethod
@@ -0,0 +1,235 @@
+"""Short-lived store of PricingResults shared by the pricing and funding endpoints.
+
+A user journey prices a postcode and care type (``/api/pricing-core/calculate``)
+and then asks for funding figures for the same home (``/api/funding/...``), which
+need the same PricingResult. ``PricingService`` instances built with a result store
+look results up by their canonical inputs before resolving the postcode and
+pricing again.
+
+Entries expire after ``ttl_seconds`` and the least recently used are evicted
+beyond ``max_entries``. The process-wide store (``get_result_store``) is cleared
+when a pricing data snapshot with different content is published
+(``snapshot_changed``); a result computed from the previous snapshot while the
+clear happens is not stored (``generation``). Snapshot rebuilds that find the
+same data keep the entries and their ETags.
+
+Each entry carries the JSON body and a strong ETag of the result, so the pricing
+endpoint answers repeated requests with ``304 Not Modified`` without serializing.
+Stored results are shared between requests: treat them as read-only.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import structlog
+
+from observability import record_cache_lookup
+from .models import CareType, PricingResult
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_TTL_SECONDS = int(os.getenv("PRICING_RESULT_TTL_SECONDS", "300"))
+DEFAULT_MAX_ENTRIES = int(os.getenv("PRICING_RESULT_MAX_ENTRIES", "10000"))
+
+PricingKey = Tuple
+
+
+def pricing_key(
+    postcode: str,
+    care_type: CareType,
+    cqc_rating: Optional[str] = None,
+    facilities_score: Optional[int] = None,
+    bed_count: Optional[int] = None,
+    is_chain: bool = False,
+    scraped_price: Optional[float] = None
+) -> PricingKey:
+    """
+    Canonical key of get_full_pricing inputs.
+
+    Postcodes are compared without case or whitespace ("b152hq" == "B15 2HQ").
+    """
+    return (
+        "".join(postcode.split()).upper(),
+        CareType(care_type).value,
+        cqc_rating or None,
+        facilities_score,
+        bed_count,
+        bool(is_chain),
+        None if scraped_price is None else float(scraped_price),
+    )
+
+
+class StoredPricing:
+    """A PricingResult with its JSON body and ETag (computed on first use)."""
+
+    __slots__ = ("result", "expires_at", "_body", "_etag")
+
+    def __init__(self, result: PricingResult, expires_at: float = 0.0):
+        self.result = result
+        # time.monotonic() deadline (0 = not stored)
+        self.expires_at = expires_at
+        self._body: Optional[bytes] = None
+        self._etag: Optional[str] = None
+
+    @property
+    def body(self) -> bytes:
+        """JSON body, byte-identical to JSONResponse(result.model_dump(mode="json"))."""
+        if self._body is None:
+            self._body = json.dumps(
+                self.result.model_dump(mode="json"),
+                ensure_ascii=False,
+                allow_nan=False,
+                indent=None,
+                separators=(",", ":"),
+            ).encode("utf-8")
+        return self._body
+
+    @property
+    def etag(self) -> str:
+        """Strong ETag of the body."""
+        if self._etag is None:
+            self._etag = '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+        return self._etag
+
+    def for_postcode(self, postcode: str) -> "StoredPricing":
+        """This entry with result.postcode echoing the caller's spelling."""
+        if self.result.postcode == postcode:
+            return self
+        return StoredPricing(self.result.model_copy(update={"postcode": postcode}), self.expires_at)
+
+
+class PricingResultStore:
+    """Thread-safe in-process TTL/LRU store of PricingResults."""
+
+    def __init__(self, ttl_seconds: int = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Initialize the store.
+
+        Args:
+            ttl_seconds: Lifetime of an entry
+            max_entries: Max entries kept (least recently used are evicted)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[PricingKey, StoredPricing]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        # content_hash of the snapshot the entries were priced from
+        self._content_hash: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def generation(self) -> int:
+        """Incremented by clear(); pass the value read before pricing to put()."""
+        return self._generation
+
+    def get(self, key: PricingKey) -> Optional[StoredPricing]:
+        """
+        Look up a live entry.
+
+        Args:
+            key: pricing_key() of the request
+
+        Returns:
+            StoredPricing, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        record_cache_lookup("pricing", hit=entry is not None)
+        return entry
+
+    def put(self, key: PricingKey, result: PricingResult, generation: Optional[int] = None) -> StoredPricing:
+        """
+        Store a result.
+
+        Args:
+            key: pricing_key() of the request
+            result: PricingResult for key
+            generation: generation read before the result was computed; the
+                result is not stored if the store was cleared since
+
+        Returns:
+            The new entry
+        """
+        entry = StoredPricing(result, time.monotonic() + self.ttl_seconds)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return entry
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self, *_) -> None:
+        """Drop all entries (also usable as a SnapshotStore listener)."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+        logger.info("Pricing result store cleared", generation=self._generation)
+
+    def snapshot_changed(self, snapshot) -> None:
+        """
+        SnapshotStore listener: clear the store if the snapshot content changed.
+
+        Args:
+            snapshot: Newly published PricingDataSnapshot
+        """
+        content_hash = getattr(snapshot, "content_hash", None)
+        with self._lock:
+            unchanged = content_hash is not None and content_hash == self._content_hash
+            self._content_hash = content_hash
+        if not unchanged:
+            self.clear()
+
+    def stats(self) -> dict:
+        """Entry count, hit/miss counters and limits."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "ttl_seconds": self.ttl_seconds,
+                "max_entries": self.max_entries,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Global store instance
+_store: Optional[PricingResultStore] = None
+_store_lock = threading.Lock()
+
+
+def get_result_store() -> PricingResultStore:
+    """Get or create the process-wide PricingResultStore (cleared on new snapshot content)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                store = PricingResultStore()
+                try:
+                    from data_ingestion.snapshot import get_snapshot_store
+                    snapshot_store = get_snapshot_store()
+                    if snapshot_store.version:
+                        store.snapshot_changed(snapshot_store.current())
+                    snapshot_store.add_listener(store.snapshot_changed)
+                except ImportError:
+                    pass
+                _store = store
+    return _store
@@ -1,11 +1,14 @@
 """Main PricingService for pricing calculations."""
 
+import asyncio
 from typing import Optional
 import structlog
 from .models import PricingResult, CareType
 from .adjustments import PriceAdjustments
 from .band_calculator import BandCalculatorV5
 from .exceptions import DataNotFoundError, InvalidInputError, CalculationError
+from .result_store import PricingResultStore, StoredPricing, pricing_key
+from observability import span
 
 # Import external modules
 try:
@@ -14,9 +17,11 @@ except ImportError:
     PostcodeResolver = None
 
 try:
-    from data_ingestion.database import get_db_connection
+    from data_ingestion.snapshot import PricingDataSnapshot, SnapshotStore, get_snapshot_store
 except ImportError:
-    get_db_connection = None
+    PricingDataSnapshot = None
+    SnapshotStore = None
+    get_snapshot_store = None
 
 # Import fallback constants for Lottie averages
 try:
@@ -32,11 +37,37 @@ logger = structlog.get_logger(__name__)
 class PricingService:
     """Main pricing service with Band v5 logic."""
     
-    def __init__(self):
-        """Initialize PricingService."""
+    def __init__(
+        self,
+        snapshot_store: Optional["SnapshotStore"] = None,
+        result_store: Optional[PricingResultStore] = None
+    ):
+        """
+        Initialize PricingService.
+        
+        Args:
+            snapshot_store: Optional pricing data snapshot store (default: process-wide store)
+            result_store: Optional store of recent results to reuse (default: none,
+                every call prices; the API services share get_result_store())
+        """
         self.postcode_resolver = PostcodeResolver() if PostcodeResolver else None
         self.adjustments = PriceAdjustments()
         self.band_calculator = BandCalculatorV5()
+        self.snapshot_store = snapshot_store
+        self.result_store = result_store
+    
+    def _get_snapshot(self) -> Optional["PricingDataSnapshot"]:
+        """Get the current pricing data snapshot (None if data_ingestion is unavailable)."""
+        store = self.snapshot_store
+        if store is None:
+            if get_snapshot_store is None:
+                return None
+            store = get_snapshot_store()
+        try:
+            return store.current()
+        except Exception as e:
+            logger.warning("Pricing data snapshot not available", error=str(e))
+            return None
     
     def get_full_pricing(
         self,
@@ -68,6 +99,134 @@ class PricingService:
             InvalidInputError: If input parameters invalid
             CalculationError: If calculation fails
         """
+        return self.get_pricing_entry(
+            postcode, care_type, cqc_rating, facilities_score, bed_count, is_chain, scraped_price
+        ).result
+    
+    def get_pricing_entry(
+        self,
+        postcode: str,
+        care_type: CareType,
+        cqc_rating: Optional[str] = None,
+        facilities_score: Optional[int] = None,
+        bed_count: Optional[int] = None,
+        is_chain: bool = False,
+        scraped_price: Optional[float] = None
+    ) -> StoredPricing:
+        """
+        get_full_pricing with the result's JSON body and ETag.
+        
+        Served from the result store when it holds the same inputs.
+        
+        Args and Raises: as get_full_pricing
+        
+        Returns:
+            StoredPricing
+        """
+        self._validate_inputs(postcode, care_type, cqc_rating, facilities_score, bed_count, is_chain, scraped_price)
+        key = pricing_key(postcode, care_type, cqc_rating, facilities_score, bed_count, is_chain, scraped_price)
+        stored, generation = self._lookup(key, postcode)
+        if stored is not None:
+            return stored
+        postcode_info = self._resolve_postcode(postcode)
+        result = self._price_location(
+            postcode, care_type, postcode_info.local_authority, postcode_info.region,
+            cqc_rating, facilities_score, bed_count, is_chain, scraped_price
+        )
+        return self._store(key, result, generation)
+    
+    async def get_full_pricing_async(
+        self,
+        postcode: str,
+        care_type: CareType,
+        cqc_rating: Optional[str] = None,
+        facilities_score: Optional[int] = None,
+        bed_count: Optional[int] = None,
+        is_chain: bool = False,
+        scraped_price: Optional[float] = None
+    ) -> PricingResult:
+        """
+        Async get_full_pricing for use inside an event loop.
+        
+        The postcode is resolved with PostcodeResolver.resolve_async (non-blocking
+        HTTP); the rest (snapshot lookups, which may load the snapshot from the
+        database, and the band calculation) runs in a worker thread.
+        
+        Args and Returns: as get_full_pricing
+        
+        Raises:
+            DataNotFoundError: If required data not found
+            InvalidInputError: If input parameters invalid
+            CalculationError: If calculation fails
+        """
+        stored = await self.get_pricing_entry_async(
+            postcode, care_type, cqc_rating, facilities_score, bed_count, is_chain, scraped_price
+        )
+        return stored.result
+    
+    async def get_pricing_entry_async(
+        self,
+        postcode: str,
+        care_type: CareType,
+        cqc_rating: Optional[str] = None,
+        facilities_score: Optional[int] = None,
+        bed_count: Optional[int] = None,
+        is_chain: bool = False,
+        scraped_price: Optional[float] = None
+    ) -> StoredPricing:
+        """
+        Async get_pricing_entry (see get_full_pricing_async).
+        
+        Args and Raises: as get_full_pricing
+        
+        Returns:
+            StoredPricing
+        """
+        self._validate_inputs(postcode, care_type, cqc_rating, facilities_score, bed_count, is_chain, scraped_price)
+        key = pricing_key(postcode, care_type, cqc_rating, facilities_score, bed_count, is_chain, scraped_price)
+        stored, generation = self._lookup(key, postcode)
+        if stored is not None:
+            return stored
+        if not self.postcode_resolver:
+            raise DataNotFoundError("Postcode resolver not available")
+        try:
+            with span("pricing_core.postcode_resolve"):
+                postcode_info = await self.postcode_resolver.resolve_async(postcode, use_cache=True)
+        except Exception as e:
+            logger.error("Failed to resolve postcode", postcode=postcode, error=str(e))
+            raise DataNotFoundError(f"Failed to resolve postcode: {e}") from e
+        result = await asyncio.to_thread(
+            self._price_location,
+            postcode, care_type, postcode_info.local_authority, postcode_info.region,
+            cqc_rating, facilities_score, bed_count, is_chain, scraped_price
+        )
+        return self._store(key, result, generation)
+    
+    def _lookup(self, key, postcode: str):
+        """(stored entry or None, store generation) for key."""
+        if self.result_store is None:
+            return None, None
+        generation = self.result_store.generation
+        stored = self.result_store.get(key)
+        return (stored.for_postcode(postcode) if stored is not None else None), generation
+    
+    def _store(self, key, result: PricingResult, generation: Optional[int]) -> StoredPricing:
+        """Keep result in the result store (if any) and wrap it."""
+        if self.result_store is None:
+            return StoredPricing(result)
+        return self.result_store.put(key, result, generation)
+    
+    def _validate_inputs(
+        self,
+        postcode: str,
+        care_type: CareType,
+        cqc_rating: Optional[str],
+        facilities_score: Optional[int],
+        bed_count: Optional[int],
+        is_chain: bool,
+        scraped_price: Optional[float]
+    ) -> None:
+        """Log the request and validate inputs (raises InvalidInputError)."""
         logger.info(
             "Calculating pricing",
             postcode=postcode,
@@ -79,30 +238,47 @@ class PricingService:
             scraped_price=scraped_price
         )
         
-        # Validate inputs
         if facilities_score is not None and not (0 <= facilities_score <= 20):
             raise InvalidInputError("Facilities score must be between 0 and 20")
         
         if bed_count is not None and bed_count <= 0:
             raise InvalidInputError("Bed count must be positive")
-        
-        # Resolve postcode
+    
+    def _resolve_postcode(self, postcode: str):
+        """Resolve postcode to PostcodeInfo (raises DataNotFoundError)."""
         if not self.postcode_resolver:
             raise DataNotFoundError("Postcode resolver not available")
         
         try:
-            postcode_info = self.postcode_resolver.resolve(postcode, use_cache=True)
-            local_authority = postcode_info.local_authority
-            region = postcode_info.region
+            with span("pricing_core.postcode_resolve"):
+                return self.postcode_resolver.resolve(postcode, use_cache=True)
         except Exception as e:
             logger.error("Failed to resolve postcode", postcode=postcode, error=str(e))
             raise DataNotFoundError(f"Failed to resolve postcode: {e}") from e
-        
+    
+    def _price_location(
+        self,
+        postcode: str,
+        care_type: CareType,
+        local_authority: str,
+        region: str,
+        cqc_rating: Optional[str] = None,
+        facilities_score: Optional[int] = None,
+        bed_count: Optional[int] = None,
+        is_chain: bool = False,
+        scraped_price: Optional[float] = None
+    ) -> PricingResult:
+        """Price a resolved location (everything after postcode resolution)."""
         # Load MSIF data
-        msif_lower = self._get_msif_fee(local_authority, care_type)
+        # One snapshot for the whole calculation so MSIF and Lottie come from the same version
+        snapshot = self._get_snapshot()
+        
+        with span("pricing_core.msif_query"):
+            msif_lower = self._get_msif_fee(local_authority, care_type, snapshot=snapshot)
         
         # Load Lottie data
-        lottie_average = self._get_lottie_average(region, care_type)
+        with span("pricing_core.lottie_query"):
+            lottie_average = self._get_lottie_average(region, care_type, snapshot=snapshot)
         
         if lottie_average is None:
             raise DataNotFoundError(f"Lottie average not found for region: {region}, care_type: {care_type.value}")
@@ -117,61 +293,63 @@ class PricingService:
             adjustment_total = 0.0
             logger.info("Using scraped price", scraped_price=scraped_price)
         else:
-            # Calculate adjustments
-            adjustments = self.adjustments.calculate_all_adjustments(
-                care_type=care_type.value,
-                cqc_rating=cqc_rating,
-                facilities_score=facilities_score,
-                bed_count=bed_count,
-                is_chain=is_chain
-            )
+            with span("pricing_core.adjustments"):
+                # Calculate adjustments
+                adjustments = self.adjustments.calculate_all_adjustments(
+                    care_type=care_type.value,
+                    cqc_rating=cqc_rating,
+                    facilities_score=facilities_score,
+                    bed_count=bed_count,
+                    is_chain=is_chain
+                )
             
-            adjustment_total = sum(adjustments.values())
+                adjustment_total = sum(adjustments.values())
             
-            # Apply adjustments to base price
-            final_price = self.adjustments.apply_adjustments(base_price, adjustments)
-        
-        # Calculate band score
-        band_score = self.band_calculator.calculate_band_score(
-            final_price=final_price,
-            msif_lower=msif_lower,
-            lottie_average=lottie_average
-        )
+                # Apply adjustments to base price
+                final_price = self.adjustments.apply_adjustments(base_price, adjustments)
         
-        # Determine band
-        band, band_reasoning = self.band_calculator.calculate_band(band_score)
+        with span("pricing_core.band"):
+            # Calculate band score
+            band_score = self.band_calculator.calculate_band_score(
+                final_price=final_price,
+                msif_lower=msif_lower,
+                lottie_average=lottie_average
+            )
         
-        # Calculate confidence
-        confidence = self.band_calculator.calculate_confidence(
-            msif_lower=msif_lower,
-            lottie_average=lottie_average,
-            adjustments_applied=adjustments,
-            cqc_rating=cqc_rating
-        )
+            # Determine band
+            band, band_reasoning = self.band_calculator.calculate_band(band_score)
         
-        # Calculate expected range
-        expected_min, expected_max = self.band_calculator.calculate_expected_range(
-            final_price=final_price,
-            band_score=band_score
-        )
+            # Calculate confidence
+            confidence = self.band_calculator.calculate_confidence(
+                msif_lower=msif_lower,
+                lottie_average=lottie_average,
+                adjustments_applied=adjustments,
+                cqc_rating=cqc_rating
+            )
         
-        # Calculate gap
-        if msif_lower:
-            fair_cost_gap_gbp = final_price - msif_lower
-            fair_cost_gap_percent = (fair_cost_gap_gbp / msif_lower) * 100
-        else:
-            fair_cost_gap_gbp = final_price - lottie_average
-            fair_cost_gap_percent = (fair_cost_gap_gbp / lottie_average) * 100
-        
-        # Generate negotiation leverage text
-        negotiation_text = self._generate_negotiation_text(
-            final_price=final_price,
-            msif_lower=msif_lower,
-            lottie_average=lottie_average,
-            band=band,
-            band_score=band_score,
-            adjustments=adjustments
-        )
+            # Calculate expected range
+            expected_min, expected_max = self.band_calculator.calculate_expected_range(
+                final_price=final_price,
+                band_score=band_score
+            )
+        
+            # Calculate gap
+            if msif_lower:
+                fair_cost_gap_gbp = final_price - msif_lower
+                fair_cost_gap_percent = (fair_cost_gap_gbp / msif_lower) * 100
+            else:
+                fair_cost_gap_gbp = final_price - lottie_average
+                fair_cost_gap_percent = (fair_cost_gap_gbp / lottie_average) * 100
+        
+            # Generate negotiation leverage text
+            negotiation_text = self._generate_negotiation_text(
+                final_price=final_price,
+                msif_lower=msif_lower,
+                lottie_average=lottie_average,
+                band=band,
+                band_score=band_score,
+                adjustments=adjustments
+            )
         
         # Build sources list
         sources = ["Lottie 2025 Regional Averages"]
@@ -204,64 +382,49 @@ class PricingService:
             is_chain=is_chain,
             scraped_price_gbp=scraped_price,
             negotiation_leverage_text=negotiation_text,
-            sources_used=sources
+            sources_used=sources,
+            data_version=snapshot.version if snapshot is not None else None
         )
     
-    def _get_msif_fee(self, local_authority: str, care_type: CareType) -> Optional[float]:
+    def _get_msif_fee(
+        self,
+        local_authority: str,
+        care_type: CareType,
+        snapshot: Optional["PricingDataSnapshot"] = None
+    ) -> Optional[float]:
         """
         Get MSIF fee for local authority and care type.
         
         Args:
             local_authority: Local authority name
             care_type: Care type
+            snapshot: Pricing data snapshot (default: current snapshot)
             
         Returns:
             MSIF fee or None if not found
         """
-        if not get_db_connection:
-            logger.warning("Database connection not available")
+        if snapshot is None:
+            snapshot = self._get_snapshot()
+        if snapshot is None:
+            logger.warning("Pricing data snapshot not available")
             return None
         
-        try:
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Map care_type to MSIF column
-                column_map = {
-                    CareType.RESIDENTIAL: "residential_fee_65_plus",
-                    CareType.NURSING: "nursing_fee_65_plus",
-                    CareType.RESIDENTIAL_DEMENTIA: "residential_dementia_fee",
-                    CareType.NURSING_DEMENTIA: "nursing_dementia_fee",
-                    CareType.RESPITE: "respite_fee",
-                }
-                
-                column = column_map.get(care_type)
-                if not column:
-                    return None
-                
-                cursor.execute(f"""
-                    SELECT {column}
-                    FROM msif_fees_2025
-                    WHERE local_authority = %s
-                    LIMIT 1
-                """, (local_authority,))
-                
-                row = cursor.fetchone()
-                if row and row[0]:
-                    return float(row[0])
-                
-                return None
-        except Exception as e:
-            logger.warning("Failed to get MSIF fee", la=local_authority, error=str(e))
-            return None
+        fee = snapshot.msif_fee(local_authority, care_type.value)
+        return float(fee) if fee else None
     
-    def _get_lottie_average(self, region: str, care_type: CareType) -> Optional[float]:
+    def _get_lottie_average(
+        self,
+        region: str,
+        care_type: CareType,
+        snapshot: Optional["PricingDataSnapshot"] = None
+    ) -> Optional[float]:
         """
         Get Lottie regional average for region and care type.
         
         Args:
             region: UK region name
             care_type: Care type
+            snapshot: Pricing data snapshot (default: current snapshot)
             
         Returns:
             Lottie average or None if not found
@@ -275,93 +438,48 @@ class PricingService:
             except ImportError:
                 pass
         
-        if not get_db_connection:
-            logger.warning("Database connection not available")
-            # Use fallback immediately if no database
-            if LOTTIE_FALLBACK_AVAILABLE and get_lottie_average_fallback:
-                logger.info("Using fallback Lottie average (no database)", region=normalized_region, care_type=care_type.value)
+        if snapshot is None:
+            snapshot = self._get_snapshot()
+        
+        if snapshot is not None:
+            # Map care_type to Lottie care_type
+            care_type_map = {
+                CareType.RESIDENTIAL: "residential",
+                CareType.NURSING: "nursing",
+                CareType.RESIDENTIAL_DEMENTIA: "dementia",
+                CareType.NURSING_DEMENTIA: "dementia",
+                CareType.RESPITE: "residential",  # Respite typically same as residential
+            }
+            
+            lottie_care_type = care_type_map.get(care_type, "residential")
+            
+            # Try with normalized region first, then original region name
+            price = snapshot.lottie_price(normalized_region, lottie_care_type)
+            if not price and normalized_region != region:
+                price = snapshot.lottie_price(region, lottie_care_type)
+            if price:
+                return float(price)
+            
+            # Fallback: try residential if dementia not found
+            if lottie_care_type == "dementia":
+                price = snapshot.lottie_price(region, "residential")
+                if price:
+                    # Apply dementia adjustment
+                    return float(price) * 1.12
+        else:
+            logger.warning("Pricing data snapshot not available")
+        
+        # Fallback to constants if snapshot doesn't have data
+        if LOTTIE_FALLBACK_AVAILABLE and get_lottie_average_fallback:
+            try:
+                logger.info("Using fallback Lottie average from constants", region=normalized_region, care_type=care_type.value)
                 fallback_price = get_lottie_average_fallback(normalized_region, care_type)
                 if fallback_price and fallback_price > 0:
                     return fallback_price
-            return None
+            except Exception as fallback_error:
+                logger.warning("Fallback also failed", error=str(fallback_error))
         
-        try:
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Map care_type to Lottie care_type
-                care_type_map = {
-                    CareType.RESIDENTIAL: "residential",
-                    CareType.NURSING: "nursing",
-                    CareType.RESIDENTIAL_DEMENTIA: "dementia",
-                    CareType.NURSING_DEMENTIA: "dementia",
-                    CareType.RESPITE: "residential",  # Respite typically same as residential
-                }
-                
-                lottie_care_type = care_type_map.get(care_type, "residential")
-                
-                # Try with normalized region first
-                cursor.execute("""
-                    SELECT price_per_week
-                    FROM lottie_regional_averages
-                    WHERE region = %s AND care_type = %s
-                    ORDER BY updated_at DESC
-                    LIMIT 1
-                """, (normalized_region, lottie_care_type))
-                
-                row = cursor.fetchone()
-                if row and row[0]:
-                    return float(row[0])
-                
-                # Try with original region name if different from normalized
-                if normalized_region != region:
-                    cursor.execute("""
-                        SELECT price_per_week
-                        FROM lottie_regional_averages
-                        WHERE region = %s AND care_type = %s
-                        ORDER BY updated_at DESC
-                        LIMIT 1
-                    """, (region, lottie_care_type))
-                    
-                    row = cursor.fetchone()
-                    if row and row[0]:
-                        return float(row[0])
-                
-                # Fallback: try residential if dementia not found
-                if lottie_care_type == "dementia":
-                    cursor.execute("""
-                        SELECT price_per_week
-                        FROM lottie_regional_averages
-                        WHERE region = %s AND care_type = 'residential'
-                        ORDER BY updated_at DESC
-                        LIMIT 1
-                    """, (region,))
-                    
-                    row = cursor.fetchone()
-                    if row and row[0]:
-                        # Apply dementia adjustment
-                        return float(row[0]) * 1.12
-                
-                # Fallback to constants if database doesn't have data
-                if LOTTIE_FALLBACK_AVAILABLE and get_lottie_average_fallback:
-                    logger.info("Using fallback Lottie average from constants", region=normalized_region, care_type=care_type.value)
-                    fallback_price = get_lottie_average_fallback(normalized_region, care_type)
-                    if fallback_price and fallback_price > 0:
-                        return fallback_price
-                
-                return None
-        except Exception as e:
-            logger.warning("Failed to get Lottie average from database", region=normalized_region, error=str(e))
-            # Try fallback even on exception
-            if LOTTIE_FALLBACK_AVAILABLE and get_lottie_average_fallback:
-                try:
-                    logger.info("Using fallback Lottie average from constants after error", region=normalized_region, care_type=care_type.value)
-                    fallback_price = get_lottie_average_fallback(normalized_region, care_type)
-                    if fallback_price and fallback_price > 0:
-                        return fallback_price
-                except Exception as fallback_error:
-                    logger.warning("Fallback also failed", error=str(fallback_error))
-            return None
+        return None
     
     def _generate_negotiation_text(
         self,
@@ -0,0 +1,194 @@
+"""Tests for the shared pricing result store."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from data_ingestion.snapshot import PricingDataSnapshot, SnapshotStore
+from pricing_core import api as pricing_api
+from pricing_core.models import CareType
+from pricing_core.result_store import PricingResultStore, pricing_key
+from pricing_core.service import PricingService
+
+
+@pytest.fixture
+def snapshot_store():
+    """Snapshot store seeded with test data (no database)."""
+    return SnapshotStore(loader=lambda: {
+        "msif": {2025: {"Birmingham": {"residential": 900.0, "nursing": 1100.0}}},
+        "lottie": {"West Midlands": {"residential": 1000.0, "nursing": 1200.0}},
+        "sources": {"msif_2025": "test", "lottie": "test"},
+    })
+
+
+def make_service(snapshot_store, result_store):
+    """PricingService with a mock resolver (sync and async) for Birmingham."""
+    info = Mock(postcode="B15 2HQ", local_authority="Birmingham", region="West Midlands")
+    service = PricingService(snapshot_store=snapshot_store, result_store=result_store)
+    service.postcode_resolver = Mock()
+    service.postcode_resolver.resolve.return_value = info
+    service.postcode_resolver.resolve_async = AsyncMock(return_value=info)
+    return service
+
+
+class TestPricingResultStore:
+    """Test PricingResultStore expiry, eviction and invalidation."""
+
+    def test_pricing_key_is_canonical(self):
+        """Test postcode spelling and care type form do not change the key."""
+        assert pricing_key("b15 2hq", "residential") == pricing_key(" B152HQ ", CareType.RESIDENTIAL)
+        assert pricing_key("B15 2HQ", CareType.RESIDENTIAL) != pricing_key("B15 2HQ", CareType.NURSING)
+        assert pricing_key("B15 2HQ", CareType.RESIDENTIAL, scraped_price=900) \
+            == pricing_key("B15 2HQ", CareType.RESIDENTIAL, scraped_price=900.0)
+
+    def test_entries_expire(self):
+        """Test an entry is served until its TTL passes."""
+        store = PricingResultStore(ttl_seconds=60)
+        with patch("pricing_core.result_store.time.monotonic", return_value=1000.0):
+            store.put(("k",), Mock())
+        with patch("pricing_core.result_store.time.monotonic", return_value=1059.0):
+            assert store.get(("k",)) is not None
+        with patch("pricing_core.result_store.time.monotonic", return_value=1060.0):
+            assert store.get(("k",)) is None
+        assert len(store) == 0
+
+    def test_least_recently_used_evicted(self):
+        """Test the store stays within max_entries, evicting the oldest lookups."""
+        store = PricingResultStore(max_entries=2)
+        store.put(("a",), Mock())
+        store.put(("b",), Mock())
+        store.get(("a",))
+        store.put(("c",), Mock())
+        assert store.get(("b",)) is None
+        assert store.get(("a",)) is not None and store.get(("c",)) is not None
+
+    def test_result_from_before_clear_is_not_stored(self):
+        """Test a result computed across a clear() is returned but not kept."""
+        store = PricingResultStore()
+        generation = store.generation
+        store.clear()
+        store.put(("k",), Mock(), generation)
+        assert store.get(("k",)) is None
+
+    def test_cleared_on_new_snapshot(self, snapshot_store):
+        """Test the store empties when a new pricing data snapshot is published."""
+        store = PricingResultStore()
+        snapshot_store.add_listener(store.snapshot_changed)
+        store.put(("k",), Mock())
+        snapshot_store.publish(lottie={"West Midlands": {"residential": 1050.0}})
+        assert len(store) == 0
+
+    def test_kept_when_snapshot_content_unchanged(self, snapshot_store):
+        """Test entries (and their ETags) survive a snapshot with the same data."""
+        store = PricingResultStore()
+        current = snapshot_store.current()
+        store.snapshot_changed(current)
+        entry = store.put(("k",), Mock())
+        generation = store.generation
+
+        rebuilt = PricingDataSnapshot(current.version + 1, msif={2025: current.msif_fees(2025)}, lottie=current.lottie)
+        store.snapshot_changed(rebuilt)
+        assert store.get(("k",)) is entry and store.generation == generation
+
+        snapshot_store.publish(lottie={"West Midlands": {"residential": 1050.0}})
+        store.snapshot_changed(snapshot_store.current())
+        assert len(store) == 0
+
+
+class TestServiceReuse:
+    """Test PricingService reuses stored results."""
+
+    def test_repeated_inputs_priced_once(self, snapshot_store):
+        """Test sync and async calls with the same inputs resolve and price once."""
+        service = make_service(snapshot_store, PricingResultStore())
+        first = service.get_full_pricing("B15 2HQ", CareType.RESIDENTIAL, facilities_score=10)
+        second = asyncio.run(service.get_full_pricing_async("b15 2hq", CareType.RESIDENTIAL, facilities_score=10))
+
+        service.postcode_resolver.resolve.assert_called_once()
+        service.postcode_resolver.resolve_async.assert_not_awaited()
+        assert second.final_price_gbp == first.final_price_gbp
+        assert second.postcode == "b15 2hq"
+        assert service.result_store.stats()["hits"] == 1
+
+    def test_different_inputs_priced_separately(self, snapshot_store):
+        """Test other adjustments are not served from another request's entry."""
+        service = make_service(snapshot_store, PricingResultStore())
+        service.get_full_pricing("B15 2HQ", CareType.RESIDENTIAL)
+        service.get_full_pricing("B15 2HQ", CareType.RESIDENTIAL, cqc_rating="Outstanding")
+        assert service.postcode_resolver.resolve.call_count == 2
+
+    def test_without_store_every_call_prices(self, snapshot_store):
+        """Test services built without a store keep pricing every call."""
+        service = make_service(snapshot_store, None)
+        service.get_full_pricing("B15 2HQ", CareType.RESIDENTIAL)
+        service.get_full_pricing("B15 2HQ", CareType.RESIDENTIAL)
+        assert service.postcode_resolver.resolve.call_count == 2
+
+
+class TestEndpoints:
+    """Test ETags on /calculate and reuse by the funding endpoints."""
+
+    @pytest.fixture
+    def app(self, snapshot_store):
+        from funding_calculator import FundingEligibilityCalculator
+        from funding_calculator import api as funding_api
+
+        store = PricingResultStore()
+        pricing = make_service(snapshot_store, store)
+        funding = make_service(snapshot_store, store)
+        app = FastAPI()
+        app.include_router(pricing_api.router)
+        app.include_router(funding_api.router)
+        with patch.object(pricing_api, "_pricing_service", pricing), \
+             patch.object(funding_api, "_pricing_service", funding), \
+             patch.object(funding_api, "_funding_calculator", FundingEligibilityCalculator()):
+            app.state.services = (pricing, funding)
+            yield app
+
+    @staticmethod
+    def get(app, *requests):
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                return [await http.get(url, params=params, headers=headers) for url, params, headers in requests]
+        return asyncio.run(run())
+
+    def test_calculate_etag_and_304(self, app):
+        """Test a matching If-None-Match gets 304 and the body is the JSON result."""
+        params = {"postcode": "B15 2HQ", "care_type": "residential"}
+        (first,) = self.get(app, ("/api/pricing-core/calculate", params, {}))
+        etag = first.headers["etag"]
+        (again, other) = self.get(
+            app,
+            ("/api/pricing-core/calculate", params, {"If-None-Match": etag}),
+            ("/api/pricing-core/calculate", params, {"If-None-Match": '"stale"'}),
+        )
+
+        assert first.status_code == 200 and first.json()["local_authority"] == "Birmingham"
+        assert again.status_code == 304 and again.headers["etag"] == etag and again.content == b""
+        assert other.status_code == 200 and other.headers["etag"] == etag
+        pricing, _ = app.state.services
+        assert first.content == json.dumps(
+            pricing.get_full_pricing("B15 2HQ", CareType.RESIDENTIAL).model_dump(mode="json"),
+            separators=(",", ":"), ensure_ascii=False,
+        ).encode()
+        pricing.postcode_resolver.resolve.assert_called_once()
+
+    def test_funding_reuses_pricing_result(self, app):
+        """Test /calculate-savings after /calculate does not price the home again."""
+        (priced, savings) = self.get(
+            app,
+            ("/api/pricing-core/calculate", {"postcode": "B15 2HQ", "care_type": "residential"}, {}),
+            ("/api/funding/calculate-savings", {
+                "postcode": "B15 2HQ", "care_type": "residential", "age": 82, "use_cache": "false",
+            }, {}),
+        )
+        assert priced.status_code == savings.status_code == 200
+        assert savings.json()["pricing_gap"] == priced.json()["fair_cost_gap_gbp"]
+        pricing, funding = app.state.services
+        pricing.postcode_resolver.resolve.assert_called_once()
+        funding.postcode_resolver.resolve_async.assert_not_awaited()
@@ -5,12 +5,23 @@ from unittest.mock import Mock, patch, MagicMock
 from pricing_core.service import PricingService
 from pricing_core.models import CareType
 from pricing_core.exceptions import DataNotFoundError, InvalidInputError
+from data_ingestion.snapshot import SnapshotStore
 
 
 @pytest.fixture
-def pricing_service():
+def snapshot_store():
+    """Snapshot store seeded with test data (no database)."""
+    return SnapshotStore(loader=lambda: {
+        "msif": {2025: {"Birmingham": {"residential": 900.0, "nursing": 1100.0}}},
+        "lottie": {"West Midlands": {"residential": 1000.0, "nursing": 1200.0}},
+        "sources": {"msif_2025": "test", "lottie": "test"},
+    })
+
+
+@pytest.fixture
+def pricing_service(snapshot_store):
     """Create PricingService instance."""
-    return PricingService()
+    return PricingService(snapshot_store=snapshot_store)
 
 
 @pytest.fixture
@@ -90,25 +101,58 @@ class TestPricingService:
     
     def test_get_msif_fee(self, pricing_service):
         """Test getting MSIF fee."""
-        with patch('pricing_core.service.get_db_connection') as mock_db:
-            mock_conn = MagicMock()
-            mock_cursor = MagicMock()
-            mock_cursor.fetchone.return_value = (900.0,)
-            mock_conn.cursor.return_value = mock_cursor
-            mock_db.return_value.__enter__.return_value = mock_conn
-            
-            fee = pricing_service._get_msif_fee("Birmingham", CareType.RESIDENTIAL)
-            assert fee == 900.0
+        fee = pricing_service._get_msif_fee("Birmingham", CareType.RESIDENTIAL)
+        assert fee == 900.0
+        assert pricing_service._get_msif_fee("Unknown LA", CareType.RESIDENTIAL) is None
     
     def test_get_lottie_average(self, pricing_service):
         """Test getting Lottie average."""
-        with patch('pricing_core.service.get_db_connection') as mock_db:
-            mock_conn = MagicMock()
-            mock_cursor = MagicMock()
-            mock_cursor.fetchone.return_value = (1000.0,)
-            mock_conn.cursor.return_value = mock_cursor
-            mock_db.return_value.__enter__.return_value = mock_conn
-            
-            avg = pricing_service._get_lottie_average("West Midlands", CareType.RESIDENTIAL)
-            assert avg == 1000.0
-
+        avg = pricing_service._get_lottie_average("West Midlands", CareType.RESIDENTIAL)
+        assert avg == 1000.0
+    
+    def test_get_lottie_average_dementia_falls_back_to_residential(self, pricing_service):
+        """Test dementia uplift when only residential average is available."""
+        avg = pricing_service._get_lottie_average("West Midlands", CareType.RESIDENTIAL_DEMENTIA)
+        assert avg == pytest.approx(1000.0 * 1.12)
+    
+    def test_full_pricing_uses_one_snapshot(self, pricing_service, snapshot_store, mock_postcode_info):
+        """Test MSIF and Lottie come from the same snapshot version."""
+        pricing_service.postcode_resolver = Mock()
+        pricing_service.postcode_resolver.resolve.return_value = mock_postcode_info
+        
+        result = pricing_service.get_full_pricing(
+            postcode="B15 2HQ",
+            care_type=CareType.RESIDENTIAL,
+        )
+        assert result.msif_lower_bound_gbp == 900.0
+        assert result.base_price_gbp == 1000.0
+        assert result.data_version == snapshot_store.version
+    
+    def test_get_full_pricing_async_matches_sync(self, pricing_service, mock_postcode_info):
+        """Test the async path resolves with resolve_async and prices like get_full_pricing."""
+        import asyncio
+        from unittest.mock import AsyncMock
+        
+        pricing_service.postcode_resolver = Mock()
+        pricing_service.postcode_resolver.resolve.return_value = mock_postcode_info
+        pricing_service.postcode_resolver.resolve_async = AsyncMock(return_value=mock_postcode_info)
+        
+        result = asyncio.run(pricing_service.get_full_pricing_async(
+            postcode="B15 2HQ", care_type=CareType.RESIDENTIAL, facilities_score=10
+        ))
+        expected = pricing_service.get_full_pricing(
+            postcode="B15 2HQ", care_type=CareType.RESIDENTIAL, facilities_score=10
+        )
+        pricing_service.postcode_resolver.resolve_async.assert_awaited_once_with("B15 2HQ", use_cache=True)
+        assert result.final_price_gbp == expected.final_price_gbp
+        assert result.affordability_band == expected.affordability_band
+    
+    def test_get_full_pricing_async_resolve_error(self, pricing_service):
+        """Test a postcode failure in the async path raises DataNotFoundError."""
+        import asyncio
+        from unittest.mock import AsyncMock
+        
+        pricing_service.postcode_resolver = Mock()
+        pricing_service.postcode_resolver.resolve_async = AsyncMock(side_effect=RuntimeError("down"))
+        with pytest.raises(DataNotFoundError):
+            asyncio.run(pricing_service.get_full_pricing_async(postcode="B15 2HQ", care_type=CareType.RESIDENTIAL))